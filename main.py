@@ -1,6 +1,39 @@
+import sys
+from typing import Any, Callable
 from zoo_simulation.paddock import Paddock
+from zoo_simulation.batch import run_batch, run_replay_command
+from zoo_simulation.ensemble import run_ensemble_command
+from zoo_simulation.sweep import run_sweep_command
+from zoo_simulation.zoo import run_zoo_command
+from zoo_simulation.snapshot import run_snapshot_command
+from zoo_simulation.benchmark import run_benchmark_command
+
+# Dispatch table of the commands (see python main.py <command> --help)
+COMMANDS: dict[str, Callable[[list[str]], Any]] = {
+    # Ensemble mode : many runs of a configuration
+    'ensemble': run_ensemble_command,
+    # Parameter sweep : runs with different rules
+    'sweep': run_sweep_command,
+    # Zoo mode : many paddocks simulated at the same time
+    'zoo': run_zoo_command,
+    # Snapshot files : description and conversion from/to binary files
+    'snapshot': run_snapshot_command,
+    # Replay : a day of a simulation rebuilt from its replay log
+    'replay': run_replay_command,
+    # Benchmark : performance scenarios compared with a baseline
+    'bench': run_benchmark_command,
+}
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        results = COMMANDS[sys.argv[1]](sys.argv[2:])
+        # The benchmark fails when a scenario is slower than its baseline
+        sys.exit(1 if sys.argv[1] == 'bench' and results.get('regressions') else 0)
+    if len(sys.argv) > 1:
+        # Batch mode : the simulation is described by command line arguments (see python main.py --help)
+        run_batch(sys.argv[1:])
+        sys.exit(0)
+
     print("Welcome to Zoo simulation")
 
     # Create the new paddock
@@ -0,0 +1,44 @@
+import json
+import pytest
+from zoo_simulation.batch import run_batch, create_parser, load_scenario, create_paddock
+
+
+class TestBatch:
+
+    # Test a batch simulation with command line arguments (no limit on the number of days, final results written)
+    def test_batch_command_line(self, tmp_path, capsys):
+        output = tmp_path / "results.json"
+        results = run_batch(['--animal', 'Lion simba m', '--days', '1500',
+                             '--report-every', '500', '--events', 'none', '--output', str(output)])
+
+        assert results['simulated_days'] == 1500, "More than 1095 days can be simulated in batch mode"
+        assert capsys.readouterr().out.count("Paddock's age") == 3, "Report is displayed every 500 days"
+        assert json.loads(output.read_text()) == results
+
+    # Test a batch simulation described by a scenario file, until all animals are dead
+    def test_batch_scenario(self, tmp_path):
+        scenario = tmp_path / "scenario.json"
+        scenario.write_text(json.dumps({'config': 'tests/Beauval.json', 'until_extinction': True,
+                                        'report_every': 0, 'events': 'none'}))
+        results = run_batch(['--scenario', str(scenario), '--days', '100'])
+
+        assert results['simulated_days'] <= 100
+        assert results['paddock_age'] == results['simulated_days']
+
+    # Test the number of dead animals kept for the report (none by default with a summary report)
+    def test_batch_dead_animals_in_report(self, capsys):
+        run_batch(['--animal', 'Lion simba m', '--animal', 'Lion scar m', '--animal', 'Lion mufasa m', '--days', '30',
+                   '--report-every', '0', '--events', 'none', '--dead-animals-in-report', '1'])
+        assert capsys.readouterr().out.count("🦁") == 1, "Only the last dead animal is kept for the report"
+
+        scenario = load_scenario(create_parser().parse_args(['--days', '1', '--report-level', 'summary']))
+        assert create_paddock(scenario).graveyard.history_size == 0
+        with pytest.raises(SystemExit):
+            run_batch(['--days', '1', '--dead-animals-in-report', '-1'])
+
+    # Test an invalid scenario is rejected
+    def test_batch_invalid_scenario(self):
+        with pytest.raises(SystemExit):
+            run_batch(['--plants', '2'])
+        with pytest.raises(SystemExit):
+            run_batch(['--animal', 'Dragon drogo m', '--days', '2'])
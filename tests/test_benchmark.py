@@ -0,0 +1,49 @@
+import json
+import pytest
+from zoo_simulation.benchmark import run_benchmark, compare_results, run_benchmark_command, SCENARIOS
+
+
+class TestBenchmark:
+
+    # Test every scenario gives its measures (small scale, in this process)
+    def test_scenarios(self):
+        results = run_benchmark(scale=0.005, isolated=False)
+        assert list(results['scenarios']) == list(SCENARIOS) and results['scale'] == 0.005
+        for name, scenario_results in results['scenarios'].items():
+            assert scenario_results['peak_memory_mb'] > 0, name
+            if SCENARIOS[name].nb_days:
+                assert scenario_results['simulated_days'] > 0 and scenario_results['days_per_second'] > 0, name
+                assert scenario_results['profile']['nb_days'] == scenario_results['simulated_days'], name
+        assert results['scenarios']['plant_explosion']['simulated_days'] == 35
+        storage = results['scenarios']['save_load']['storage']
+        assert storage['json_bytes'] > 0 and storage['binary_bytes'] > 0 and storage['binary_load'] > 0
+        assert json.loads(json.dumps(results)) == results
+
+        # In a new process
+        results = run_benchmark(['long_run'], scale=0.05, engine='vectorized')
+        assert list(results['scenarios']) == ['long_run'] and results['scenarios']['long_run']['simulated_days'] > 0
+        with pytest.raises(ValueError):
+            run_benchmark(['unknown'])
+
+    # Test measures worse than the baseline are flagged
+    def test_compare(self, tmp_path, capsys):
+        baseline = {'scale': 1.0, 'engine': 'objects', 'plant_engine': 'objects',
+                    'scenarios': {'baby_boom': {'days_per_second': 10.0, 'peak_memory_mb': 100.0},
+                                  'save_load': {'days_per_second': None, 'peak_memory_mb': 100.0, 'storage': {'json_load': 2.0, 'json_bytes': 10}}}}
+        results = {'scale': 1.0, 'engine': 'objects', 'plant_engine': 'objects',
+                   'scenarios': {'baby_boom': {'days_per_second': 8.5, 'peak_memory_mb': 105.0},
+                                 'save_load': {'days_per_second': None, 'peak_memory_mb': 100.0, 'storage': {'json_load': 3.0, 'json_bytes': 20}},
+                                 'long_run': {'days_per_second': 1.0, 'peak_memory_mb': 100.0}}}
+        regressions = compare_results(results, baseline)
+        assert [(regression['scenario'], regression['measure']) for regression in regressions] == [('baby_boom', 'days_per_second'), ('save_load', 'json_load')]
+        assert regressions[0]['change'] == pytest.approx(-0.15) and compare_results(results, baseline, tolerance=0.6) == []
+        with pytest.raises(ValueError):
+            compare_results({**results, 'engine': 'vectorized'}, baseline)
+
+        # Command : results written, then used as a baseline
+        filename = str(tmp_path / "bench.json")
+        run_benchmark_command(['plant_explosion', '--scale', '0.01', '--in-process', '--output', filename])
+        results = run_benchmark_command(['plant_explosion', '--scale', '0.01', '--in-process', '--baseline', filename, '--tolerance', '100'])
+        assert results['regressions'] == [] and "0 regression(s)" in capsys.readouterr().out
+        with pytest.raises(SystemExit):
+            run_benchmark_command(['plant_explosion', '--scale', '0.02', '--in-process', '--baseline', filename])
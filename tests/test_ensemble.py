@@ -0,0 +1,45 @@
+import numpy as np
+from zoo_simulation.ensemble import EnsembleStatistics, run_ensemble, run_ensemble_command, SPECIES_NAMES
+
+
+class TestEnsemble:
+
+    # Test streaming statistics are the statistics of all runs (runs stopped early only count for their days)
+    def test_streaming_statistics(self):
+        rng = np.random.default_rng(0)
+        runs = [rng.integers(0, 50, (11 if run % 3 else 6, len(SPECIES_NAMES))) for run in range(30)]
+        statistics = EnsembleStatistics(10, reservoir_size=8)
+        for run in runs:
+            statistics.add_run(run, None if len(run) == 11 else 5)
+
+        full_runs = np.array([run for run in runs if len(run) == 11])
+        all_runs = np.array([run[:6] for run in runs])
+        assert np.allclose(statistics.mean[:6], all_runs.mean(axis=0)) and np.allclose(statistics.mean[6:], full_runs[:, 6:].mean(axis=0))
+        assert np.allclose(statistics.variance()[6:], full_runs[:, 6:].var(axis=0, ddof=1))
+        assert statistics.runs_by_day.tolist() == [30] * 6 + [20] * 5
+        assert statistics.reservoir.shape[0] == 8, "Memory doesn't grow with the number of runs"
+        assert statistics.quantile_values().shape == (3, 11, len(SPECIES_NAMES))
+        assert statistics.extinction_summary()['runs_with_extinction'] == 10 and statistics.extinction_summary()['mean_day'] == 5
+
+    # Test arrays grow with the longest run, not with the maximum number of days
+    def test_memory_follows_runs(self):
+        statistics = EnsembleStatistics(100000, reservoir_size=8)
+        rng = np.random.default_rng(0)
+        for length in [10, 300, 40]:
+            statistics.add_run(rng.integers(0, 50, (length, len(SPECIES_NAMES))), length - 1)
+
+        assert 300 <= len(statistics.runs_by_day) < 1000 and statistics.reservoir.shape[1] == len(statistics.runs_by_day)
+        assert statistics.runs_by_day[:301].tolist() == [3] * 10 + [2] * 30 + [1] * 260 + [0]
+        assert statistics.to_dict()['days'] == 299 and statistics.extinction_summary()['runs_with_extinction'] == 3
+
+    # Test the same seed gives the same statistics with or without worker processes
+    def test_ensemble_workers(self, tmp_path, capsys):
+        statistics = run_ensemble('tests/Beauval.json', 6, 30, until_extinction=True, seed=11, workers=1)
+        other_statistics = run_ensemble('tests/Beauval.json', 6, 30, until_extinction=True, seed=11, workers=2)
+        assert statistics.to_dict() == other_statistics.to_dict()
+        assert statistics.nb_runs == 6 and statistics.to_dict()['species']['Lion']['mean'][0] == 1
+
+        results = run_ensemble_command(['tests/Beauval.json', '--runs', '4', '--days', '5', '--seed', '2', '--workers', '1',
+                                        '--output', str(tmp_path / 'ensemble.json')])
+        assert results['seed'] == 2 and results['runs_by_day'] == [4] * 6
+        assert "4 run(s), seed 2, day 5" in capsys.readouterr().out
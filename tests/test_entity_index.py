@@ -0,0 +1,122 @@
+from zoo_simulation.living_entity import Plant, Sex, STANDARD_AGE_FOR_TEST
+from zoo_simulation.living_entity import Lion, Tiger, Elephant, Antelope
+import pickle
+import pytest
+from zoo_simulation.entity_index import IndexedSet, LivingEntityIndex, SpatialLivingEntityIndex
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+
+
+class TestLivingEntityIndex:
+
+    # Test add/discard/random access in IndexedSet
+    def test_indexed_set(self):
+        plants = [Plant(age=STANDARD_AGE_FOR_TEST) for _ in range(4)]
+        indexed_set = IndexedSet()
+        for plant in plants:
+            indexed_set.add(plant)
+        indexed_set.add(plants[0])
+        assert len(indexed_set) == 4, "IndexedSet musn't contain duplicates"
+
+        indexed_set.discard(plants[1])
+        indexed_set.discard(plants[1])
+        assert len(indexed_set) == 3, "IndexedSet should contain 3 plants"
+        assert plants[1] not in indexed_set, "Discarded plant musn't be in IndexedSet"
+        assert {indexed_set.item(i) for i in range(3)} == {plants[0], plants[2], plants[3]}
+
+    # Test counts by species and by diet class
+    def test_count(self):
+        dead_plant = Plant(age=STANDARD_AGE_FOR_TEST)
+        dead_plant._is_alive = False
+        index = LivingEntityIndex([Plant(age=STANDARD_AGE_FOR_TEST), Plant(age=STANDARD_AGE_FOR_TEST), dead_plant,
+                                   Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST), Elephant("elephant1", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)])
+
+        assert index.count() == 4, "Dead entities musn't be indexed"
+        assert index.count(species=Plant) == 2
+        assert index.count(diet="herbivore") == 1
+        assert index.count(species=Tiger) == 0
+
+    # Test food is only chosen in eatable entities
+    def test_random_food(self):
+        lion1 = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        lion2 = Lion("lion2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        elephant1 = Elephant("elephant1", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        plant = Plant(age=STANDARD_AGE_FOR_TEST)
+        index = LivingEntityIndex([lion1, lion2, antelope1, elephant1, plant])
+
+        for _ in range(50):
+            assert index.random_food(lion1) in [antelope1, elephant1], "Lion can only eat Antelope or Elephant"
+            assert index.random_food(antelope1) is plant, "Antelope can only eat Plant"
+
+        index.discard(plant)
+        assert index.random_food(elephant1) is None, "There is no plant to eat anymore"
+
+    # Test the index forgets dead entities
+    def test_refresh(self):
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        index = LivingEntityIndex([tiger1, antelope1])
+
+        antelope1._is_alive = False
+        index.refresh(antelope1)
+
+        assert index.random_food(tiger1) is None, "Tiger musn't eat dead Antelope"
+        assert index.count(diet="herbivore") == 0
+
+    # Test partner search (most recently added partner first)
+    def test_partner(self):
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger2 = Tiger("tiger2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        tiger3 = Tiger("tiger3", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        lion1 = Lion("lion1", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        for tiger in [tiger1, tiger2, tiger3, lion1]:
+            tiger.day_before_baby = 0
+        index = LivingEntityIndex([tiger1, tiger2, tiger3, lion1])
+
+        assert index.partner(tiger1) is tiger3, "tiger3 should be chosen as partner"
+        tiger3.day_before_baby = 1
+        assert index.partner(tiger1) is tiger2, "tiger2 should be chosen as partner"
+        assert index.partner(tiger2) is tiger1, "tiger1 should be chosen as partner"
+        assert index.partner(lion1) is None, "lion1 has no partner"
+
+    # Test food and partner are only found within radius in a spatial index
+    def test_spatial_index(self):
+        index = SpatialLivingEntityIndex(100, 100, radius=3, move_distance=0)
+        lion, far_lion = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST), Lion("lion2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        near_lioness, far_lioness = Lion("lioness1", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST), Lion("lioness2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        antelope, plant = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST), Plant(age=STANDARD_AGE_FOR_TEST)
+        for living_entity, position in [(lion, (10, 10)), (far_lion, (50, 50)), (near_lioness, (12, 11)), (far_lioness, (10, 14)),
+                                        (antelope, (51, 52)), (plant, (99, 99))]:
+            index.place(living_entity, position)
+            index.add(living_entity)
+        near_lioness.day_before_baby = far_lioness.day_before_baby = 0
+        assert index.neighbours(lion) == [near_lioness], "Only entities within radius are neighbours"
+        assert index.partner(lion) is near_lioness and index.partner(far_lion) is None
+        assert index.random_food(far_lion) is antelope and index.random_food(lion) is None
+        assert index.random_food(antelope) is None, "The plant is too far"
+
+        index.place(plant, (50, 53))
+        assert index.random_food(antelope) is plant, "The plant moved in another cell"
+        index.discard(near_lioness)
+        assert index.partner(lion) is None and near_lioness not in index.positions
+        with pytest.raises(ValueError):
+            index.place(lion, (100, 0))
+
+    # Test a spatial paddock moves animals and keeps positions in binary files
+    def test_spatial_paddock(self):
+        paddock = Paddock(events=EventBus(), seed=3, grid_size=(30, 20), radius=2, move_distance=1)
+        paddock.add_plants(200)
+        paddock.add_animals(Antelope, 20)
+        positions = {animal: paddock.position_of(animal) for animal in paddock.lst_living_entity if isinstance(animal, Antelope)}
+        assert all(0 <= x < 30 and 0 <= y < 20 for x, y in positions.values())
+        paddock.and_one_more_day(display_report=False)
+        moves = [(paddock.position_of(animal), position) for animal, position in positions.items() if animal.is_alive]
+        assert all(abs(x - old_x) <= 1 and abs(y - old_y) <= 1 for (x, y), (old_x, old_y) in moves)
+        assert any(new_position != position for new_position, position in moves), "Animals should move"
+
+        loaded_paddock = pickle.loads(pickle.dumps(paddock))
+        assert [loaded_paddock.position_of(le) for le in loaded_paddock.lst_living_entity] == [paddock.position_of(le) for le in paddock.lst_living_entity]
+        assert Paddock(events=EventBus()).position_of(Plant(age=STANDARD_AGE_FOR_TEST)) is None, "A paddock without grid has no position"
+        with pytest.raises(ValueError):
+            Paddock(events=EventBus(), engine='vectorized', grid_size=(10, 10))
@@ -0,0 +1,54 @@
+import os
+import json
+from zoo_simulation.living_entity import Plant, Sex, Tiger, Antelope, STANDARD_AGE_FOR_TEST
+from zoo_simulation.events import EventBus, StdoutSink, JsonLinesSink, CounterSink, NullSink
+from zoo_simulation.events import EATEN, SPLIT, DIED_OF_AGE
+from zoo_simulation.paddock import Paddock
+
+
+class TestEvents:
+
+    # Test stdout sink prints the same messages as before
+    def test_stdout_sink(self, capsys):
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger1.eat(antelope1, EventBus([StdoutSink()]))
+
+        assert capsys.readouterr().out == "🐅 Tiger woods ♂️ PV 15 Age 12 ❤️ eat 𓃴 Antelope antelope1 ♂️ PV 6 Age 12 ❤️\n"
+
+    # Test a bus without subscriber doesn't want any event
+    def test_null_sink(self, capsys):
+        events = EventBus([NullSink()])
+        assert not events.wants(EATEN), "Nobody subscribes to eaten events"
+
+        Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST).eat(Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST), events)
+        assert capsys.readouterr().out == "", "Nothing should be printed"
+
+    # Test counter sink counts events of a paddock
+    def test_counter_sink(self):
+        counter = CounterSink()
+        paddock = Paddock(events=EventBus([counter]))
+        paddock.add_plant(Plant(age=19))
+        paddock.add_plant(Plant(age=STANDARD_AGE_FOR_TEST))
+        paddock.and_one_more_day()
+
+        assert counter.counts == {SPLIT: 2, DIED_OF_AGE: 1}
+        assert counter.counts_by_species[(SPLIT, 'Plant')] == 2
+
+    # Test JSON Lines sink writes one line per event
+    def test_json_lines_sink(self):
+        filename = 'test_events.jsonl'
+        sink = JsonLinesSink(filename, event_types=[EATEN], buffer_size=2)
+        events = EventBus([sink])
+        events.day = 3
+        for i in range(3):
+            Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST).eat(Antelope(f"antelope{i}", Sex.MALE, age=STANDARD_AGE_FOR_TEST), events)
+        events.close()
+
+        with open(filename) as fp:
+            lines = [json.loads(line) for line in fp]
+        os.remove(filename)
+
+        assert len(lines) == 3, "3 events should be written"
+        assert lines[2]['day'] == 3 and lines[2]['event'] == EATEN
+        assert lines[2]['food'] == {'species': 'Antelope', 'life_point': 6, 'age': 12, 'is_alive': True, 'name': 'antelope2', 'sex': 'MALE'}
@@ -0,0 +1,103 @@
+import io
+import os
+import contextlib
+import numpy as np
+import pytest
+from zoo_simulation.living_entity import LivingEntity, Lion, Antelope, Elephant
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.batch import run_batch
+from zoo_simulation.journal import Journal, load_journal, journal_days, is_journal
+
+
+def create_paddock(engine: str = 'objects', plant_engine: str = 'objects', grid_size=None) -> Paddock:
+    paddock = Paddock(engine=engine, plant_engine=plant_engine, events=EventBus(), seed=4, dead_animals_in_report=5, grid_size=grid_size)
+    paddock.add_plants(300)
+    paddock.add_animals(Lion, 6, names=[f"lion {i}" for i in range(6)])
+    paddock.add_animals(Antelope, 30)
+    paddock.add_animals(Elephant, 10)
+    return paddock
+
+
+def create_report(paddock: Paddock) -> str:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return paddock.create_report()
+
+
+class TestJournal:
+
+    # Test each recorded day is loaded from the journal (with every engine)
+    def test_journal_days(self, tmp_path):
+        for engine, plant_engine, grid_size in [('objects', 'objects', None), ('objects', 'numpy', None), ('objects', 'cohorts', None),
+                                                ('vectorized', 'objects', None), ('objects', 'objects', (20, 20))]:
+            filename = str(tmp_path / f"{engine}-{plant_engine}-{grid_size is not None}.journal")
+            paddock = create_paddock(engine, plant_engine, grid_size)
+            paddock.set_journal(Journal(filename, base_every=3, keep_bases=None, sync=False))
+            reports = [create_report(paddock)]
+            for _ in range(7):
+                paddock.and_one_more_day(display_report=False)
+                reports.append(create_report(paddock))
+            paddock.journal.close()
+            assert journal_days(filename) == [(day, day % 3 == 0) for day in range(8)] and is_journal(filename)
+            for day, report in enumerate(reports):
+                assert create_report(load_journal(filename, day, events=EventBus())) == report, f"Day {day} ({engine}/{plant_engine}/{grid_size})"
+
+            # The last day goes on like the paddock
+            loaded_paddock = load_journal(filename, events=EventBus())
+            next_id = LivingEntity._next_id
+            summaries = []
+            for other_paddock in [paddock, loaded_paddock]:
+                LivingEntity._next_id = next_id
+                other_paddock.set_journal(None)
+                other_paddock.run_days(3, report_every=0)
+                summaries.append((create_report(other_paddock), other_paddock.species_summary()))
+            assert summaries[0] == summaries[1]
+
+    # Test the size of a record depends on the activity of the day, not on the population
+    def test_record_size(self, tmp_path):
+        for engine in ['objects', 'vectorized']:
+            paddock = Paddock(engine=engine, events=EventBus(), seed=1)
+            paddock.add_plants(20000, ages=np.random.default_rng(0).integers(0, 10, 20000))
+            paddock.add_animals(Antelope, 200)
+            with Journal(str(tmp_path / f"{engine}.journal"), sync=False) as journal:
+                base_size = journal.record(paddock)
+                for _ in range(5):
+                    paddock.and_one_more_day(display_report=False)
+                    size = journal.record(paddock)
+            assert paddock.count_alive_plants() == 40000 and size * 5 < base_size, "Most plants do the same thing each day"
+
+    # Test a torn record is ignored, then removed, and compaction keeps the last base records
+    def test_crash_and_compaction(self, tmp_path):
+        filename = str(tmp_path / "paddock.journal")
+        paddock = create_paddock()
+        journal = Journal(filename, base_every=2, keep_bases=None, sync=False)
+        paddock.set_journal(journal)
+        paddock.run_days(4, report_every=0)
+        report = create_report(paddock)
+        paddock.and_one_more_day(display_report=False)
+        journal.close()
+        # A crash during the last record
+        with open(filename, 'r+b') as fp:
+            fp.truncate(os.path.getsize(filename) - 10)
+        assert journal_days(filename)[-1] == (4, True)
+        assert create_report(load_journal(filename, events=EventBus())) == report
+        with pytest.raises(ValueError):
+            load_journal(filename, 5)
+
+        with Journal(filename, base_every=2, keep_bases=2, sync=False) as journal:
+            assert journal.nb_records == 5, "The torn record is removed"
+            paddock.set_journal(journal)
+            assert journal_days(filename) == [(4, True), (5, True)], "Only the last 2 base records are kept"
+            journal.compact(1)
+        assert journal_days(filename) == [(5, True)] and create_report(load_journal(filename, 5, events=EventBus())) == create_report(paddock)
+        with pytest.raises(ValueError):
+            journal_days('tests/Beauval.json')
+
+    # Test the journal of batch mode and the loading of its last day
+    def test_batch_journal(self, tmp_path):
+        filename = str(tmp_path / "batch.journal")
+        results = run_batch(['--config', 'tests/Beauval.json', '--days', '3', '--report-level', 'summary', '--events', 'none', '--seed', '2',
+                             '--journal', filename, '--journal-base-every', '2'])
+        assert journal_days(filename) == [(0, True), (1, False), (2, True), (3, False)]
+        other_results = run_batch(['--binary', filename, '--days', '2', '--report-level', 'summary', '--events', 'none'])
+        assert other_results['paddock_age'] == results['paddock_age'] + 2
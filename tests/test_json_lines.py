@@ -0,0 +1,44 @@
+import io
+import json
+import pytest
+from zoo_simulation.living_entity import Sex
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.json_lines import write_json_lines, read_json_lines, read_chunks
+
+
+class TestJsonLines:
+
+    # Test buffered writing and streaming reading of JSON lines
+    def test_write_and_read(self):
+        rows = [{'_age': age, 'name': f"name {age}", '__name__': 'Lion'} for age in range(50)]
+        fp = io.StringIO()
+        assert write_json_lines(fp, iter(rows), buffer_size=100) == 50
+        assert fp.getvalue() == "".join(f"{json.dumps(row)}\n" for row in rows), "Same lines as json.dumps"
+        assert list(read_json_lines(io.StringIO(fp.getvalue() + "\n\n"))) == rows
+        assert [len(chunk) for chunk in read_chunks(read_json_lines(io.StringIO(fp.getvalue())), 20)] == [20, 20, 10]
+        with pytest.raises(ValueError, match="line 2"):
+            list(read_json_lines(['{"_age": 1}\n', '{"_age": \n']))
+
+    # Test loading by chunks keeps the file and reads old and native encodings of Sex
+    def test_load_by_chunks(self, tmp_path):
+        paddock = Paddock(events=EventBus())
+        assert paddock.load_from_json('tests/Beauval.json', chunk_size=2)
+        assert [animal.sex for animal in paddock.animal_roster] == [Sex.MALE, Sex.MALE, Sex.FEMALE]
+        filename = str(tmp_path / 'paddock.json')
+        assert paddock.store_in_json(filename)
+        with open(filename) as fp, open('tests/Beauval.json') as reference:
+            assert fp.read() == reference.read()
+
+        with open(filename, 'a') as fp:
+            fp.write('{"_is_alive": true, "_life_point": 10, "_age": 3, "name": "nala", "sex": "FEMALE", "__name__": "Lion"}\n')
+        assert paddock.load_from_json(filename, chunk_size=4)
+        assert paddock.animal_roster[-1].sex == Sex.FEMALE and paddock.count_alive_animals() == 4
+
+        with open(filename, 'a') as fp:
+            fp.write('{"_is_alive": true, "_age": 3, "__name__": "Unicorn"}\n')
+        assert not paddock.load_from_json(filename, chunk_size=2)
+        assert paddock.count_alive_animals() == 0 and paddock.count_alive_plants() == 0, "An invalid file gives an empty paddock"
+        assert paddock.load_from_json('tests/Beauval.json')
+        assert not paddock.load_from_json(str(tmp_path / 'missing.json'))
+        assert paddock.count_alive_animals() == 3, "A missing file doesn't change the paddock"
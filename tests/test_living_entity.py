@@ -1,21 +1,16 @@
+import pickle
 from zoo_simulation.living_entity import LivingEntity, Plant, Animal, Sex
 from zoo_simulation.living_entity import Carnivorous, Herbivore
 from zoo_simulation.living_entity import Lion, Tiger, Coyote, Elephant, Giraffe, Antelope
 from zoo_simulation.living_entity import PV_LOSTS_ANIMAL_WHEN_EATEN, PV_OBTAINED_CARNIVOROUS_BY_ANIMAL
 from zoo_simulation.living_entity import PV_LOSTS_PLANT_WHEN_EATEN, PV_OBTAINED_HERBIVORE_BY_PLANT
-from zoo_simulation.living_entity import STANDARD_AGE_FOR_TEST, TIME_BEFORE_NEW_BABY
+from zoo_simulation.living_entity import STANDARD_AGE_FOR_TEST, TIME_BEFORE_NEW_BABY, MIN_AGE_FOR_ENTITY_ADDED, MAX_AGE_FOR_ENTITY_ADDED
+from zoo_simulation.events import EventBus
+from zoo_simulation.names_provider import DEFAULT_NAME_PROVIDER
 
 
 class TestLivingEntity:
 
-    # Setup method (will be called before running tests)
-    def setup_class(cls):
-        LivingEntity.testing_mode = True
-
-    # Teaddown methode (will be called at tests end)
-    def teardown_class(cls):
-        LivingEntity.testing_mode = False
-
     # Test if LivingEntity is an abstract class
     def test_livingentity_instantiation_forbidden(self):
         try:
@@ -66,13 +61,13 @@ class TestLivingEntity:
     # Test we can create an object of Lion class (check representation too)
     def test_lion_instantiation_representation(self):
         try:
-            lion1 = Lion("lion1", Sex.MALE)
+            lion1 = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Lion instantiation"
         assert str(lion1) == f'🦁 Lion lion1 ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
 
         try:
-            lion2 = Lion("lion2", Sex.FEMALE)
+            lion2 = Lion("lion2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Lion instantiation"
         assert str(lion2) == f'🦁 Lion lion2 ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
@@ -80,13 +75,13 @@ class TestLivingEntity:
     # Test we can create an object of Tiger class (check representation too)
     def test_tiger_instantiation_representation(self):
         try:
-            tiger1 = Tiger("woods", Sex.MALE)
+            tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Tiger instantiation"
         assert str(tiger1) == f'🐅 Tiger woods ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
 
         try:
-            tiger2 = Tiger("tiger2", Sex.FEMALE)
+            tiger2 = Tiger("tiger2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Tiger instantiation"
         assert str(tiger2) == f'🐅 Tiger tiger2 ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
@@ -94,13 +89,13 @@ class TestLivingEntity:
     # Test we can create an object of Coyote class (check representation too)
     def test_coyote_instantiation_representation(self):
         try:
-            coyote1 = Coyote("coyote1", Sex.MALE)
+            coyote1 = Coyote("coyote1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Coyote instantiation"
         assert str(coyote1) == f'🦊 Coyote coyote1 ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
 
         try:
-            coyote2 = Coyote("coyote2", Sex.FEMALE)
+            coyote2 = Coyote("coyote2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Coyote instantiation"
         assert str(coyote2) == f'🦊 Coyote coyote2 ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
@@ -108,13 +103,13 @@ class TestLivingEntity:
     # Test we can create an object of Elephant class (check representation too)
     def test_elephant_instantiation_representation(self):
         try:
-            elephant1 = Elephant("elephant1", Sex.MALE)
+            elephant1 = Elephant("elephant1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Elephant instantiation"
         assert str(elephant1) == f'🐘 Elephant elephant1 ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
 
         try:
-            elephant2 = Elephant("elephant2", Sex.FEMALE)
+            elephant2 = Elephant("elephant2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Elephant instantiation"
         assert str(elephant2) == f'🐘 Elephant elephant2 ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
@@ -122,13 +117,13 @@ class TestLivingEntity:
     # Test we can create an object of Giraffe class (check representation too)
     def test_giraffe_instantiation_representation(self):
         try:
-            giraffe1 = Giraffe("giraffe1", Sex.MALE)
+            giraffe1 = Giraffe("giraffe1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Giraffe instantiation"
         assert str(giraffe1) == f'🦒 Giraffe giraffe1 ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
 
         try:
-            giraffe2 = Giraffe("giraffe2", Sex.FEMALE)
+            giraffe2 = Giraffe("giraffe2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Giraffe instantiation"
         assert str(giraffe2) == f'🦒 Giraffe giraffe2 ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
@@ -136,25 +131,25 @@ class TestLivingEntity:
     # Test we can create an object of Antelope class (check representation too)
     def test_antelope_instantiation_representation(self):
         try:
-            antelope1 = Antelope("antelope1", Sex.MALE)
+            antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Antelope instantiation"
         assert str(antelope1) == f'𓃴 Antelope antelope1 ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
 
         try:
-            antelope2 = Antelope("antelope2", Sex.FEMALE)
+            antelope2 = Antelope("antelope2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
         except Exception:
             assert False, "Exception during Antelope instantiation"
         assert str(antelope2) == f'𓃴 Antelope antelope2 ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️'
 
     # Test an animal cannot eat himself
     def test_animal_non_autophagy(self):
-        antelope1 = Antelope("antelope1", Sex.MALE)
-        giraffe1 = Giraffe("giraffe1", Sex.MALE)
-        elephant1 = Elephant("elephant1", Sex.MALE)
-        coyote1 = Coyote("coyote1", Sex.MALE)
-        tiger1 = Tiger("woods", Sex.MALE)
-        lion1 = Lion("lion1", Sex.MALE)
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        giraffe1 = Giraffe("giraffe1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        elephant1 = Elephant("elephant1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        coyote1 = Coyote("coyote1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        lion1 = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
 
         assert not antelope1.can_eat(antelope1), "Antelope musn't eat himself"
         assert not giraffe1.can_eat(giraffe1), "Giraffe musn't eat himself"
@@ -165,18 +160,18 @@ class TestLivingEntity:
 
     # Test an animal cannot eat another animal with the same species
     def test_animal_cannot_eat_same_species(self):
-        antelope1 = Antelope("antelope1", Sex.MALE)
-        antelope2 = Antelope("antelope2", Sex.MALE)
-        giraffe1 = Giraffe("giraffe1", Sex.MALE)
-        giraffe2 = Giraffe("giraffe2", Sex.MALE)
-        elephant1 = Elephant("elephant1", Sex.MALE)
-        elephant2 = Elephant("elephant1", Sex.MALE)
-        coyote1 = Coyote("coyote1", Sex.MALE)
-        coyote2 = Coyote("coyote2", Sex.MALE)
-        tiger1 = Tiger("woods", Sex.MALE)
-        tiger2 = Tiger("woods2", Sex.MALE)
-        lion1 = Lion("lion1", Sex.MALE)
-        lion2 = Lion("lion2", Sex.MALE)
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        antelope2 = Antelope("antelope2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        giraffe1 = Giraffe("giraffe1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        giraffe2 = Giraffe("giraffe2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        elephant1 = Elephant("elephant1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        elephant2 = Elephant("elephant1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        coyote1 = Coyote("coyote1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        coyote2 = Coyote("coyote2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger2 = Tiger("woods2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        lion1 = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        lion2 = Lion("lion2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
 
         assert not antelope1.can_eat(antelope2), "Antelope musn't eat another Antelope"
         assert not giraffe1.can_eat(giraffe2), "Giraffe musn't eat another Giraffe"
@@ -187,25 +182,25 @@ class TestLivingEntity:
 
     # Test an animal cannot eat dead animal / plant
     def test_animal_cannot_eat_dead_entity(self):
-        antelope1 = Antelope("antelope1", Sex.MALE)
-        antelope2 = Antelope("antelope2", Sex.MALE)
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        antelope2 = Antelope("antelope2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         antelope2._is_alive = False
-        giraffe1 = Giraffe("giraffe1", Sex.MALE)
-        giraffe2 = Giraffe("giraffe2", Sex.MALE)
+        giraffe1 = Giraffe("giraffe1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        giraffe2 = Giraffe("giraffe2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         giraffe2._is_alive = False
-        elephant1 = Elephant("elephant1", Sex.MALE)
-        elephant2 = Elephant("elephant1", Sex.MALE)
+        elephant1 = Elephant("elephant1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        elephant2 = Elephant("elephant1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         elephant2._is_alive = False
-        coyote1 = Coyote("coyote1", Sex.MALE)
-        coyote2 = Coyote("coyote2", Sex.MALE)
+        coyote1 = Coyote("coyote1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        coyote2 = Coyote("coyote2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         coyote2._is_alive = False
-        tiger1 = Tiger("woods", Sex.MALE)
-        tiger2 = Tiger("woods2", Sex.MALE)
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger2 = Tiger("woods2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         tiger2._is_alive = False
-        lion1 = Lion("lion1", Sex.MALE)
-        lion2 = Lion("lion2", Sex.MALE)
+        lion1 = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        lion2 = Lion("lion2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
         lion2._is_alive = False
-        plant = Plant()
+        plant = Plant(age=STANDARD_AGE_FOR_TEST)
         plant._is_alive = False
 
         assert not antelope1.can_eat(plant), "Antelope musn't eat dead Plant"
@@ -217,10 +212,10 @@ class TestLivingEntity:
 
     # Test PV evolution during eating
     def test_pv_evolution_during_eating(self):
-        antelope1 = Antelope("antelope1", Sex.MALE)
-        antelope2 = Antelope("antelope2", Sex.MALE)
-        tiger1 = Tiger("woods", Sex.MALE)
-        plant = Plant()
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        antelope2 = Antelope("antelope2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        plant = Plant(age=STANDARD_AGE_FOR_TEST)
 
         tiger1.eat(antelope1)
         assert tiger1.life_point == 10 + PV_OBTAINED_CARNIVOROUS_BY_ANIMAL, f"Tiger PV must be {10 + PV_OBTAINED_CARNIVOROUS_BY_ANIMAL}"
@@ -237,8 +232,8 @@ class TestLivingEntity:
         plant = Plant()
         plant2 = Plant(age=8)
 
-        assert lion1.age == STANDARD_AGE_FOR_TEST, f'Lion1.age must be {STANDARD_AGE_FOR_TEST}'
-        assert plant.age == STANDARD_AGE_FOR_TEST, f'plant.age must be {STANDARD_AGE_FOR_TEST}'
+        assert MIN_AGE_FOR_ENTITY_ADDED <= lion1.age <= MAX_AGE_FOR_ENTITY_ADDED, 'Lion1.age must be drawn between the ages of the rules'
+        assert MIN_AGE_FOR_ENTITY_ADDED <= plant.age <= MAX_AGE_FOR_ENTITY_ADDED, 'plant.age must be drawn between the ages of the rules'
         assert lion2.age == 4, 'Lion2.age must be 4'
         assert plant2.age == 8, 'plant.age must be 8'
 
@@ -269,13 +264,13 @@ class TestLivingEntity:
 
     # Test making baby rules and creation
     def tests_making_baby(self):
-        lion1 = Lion("lion1", Sex.MALE)
-        lion2 = Lion("lion2", Sex.MALE)
+        lion1 = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        lion2 = Lion("lion2", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
 
         assert not lion1.can_make_baby(lion2), f"{lion1} and {lion2} cannot make a baby (2 male animals)"
 
-        tiger1 = Tiger("woods", Sex.MALE)
-        tiger2 = Tiger("tiger_female", Sex.FEMALE)
+        tiger1 = Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        tiger2 = Tiger("tiger_female", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
 
         assert not lion1.can_make_baby(tiger2), f"{lion1} and {tiger2} cannot make a baby (2 different species)"
 
@@ -295,3 +290,35 @@ class TestLivingEntity:
         assert isinstance(baby, Tiger), "baby should be a tiger"
         assert baby.age == 0, "baby's age should be 0"
         assert baby.day_before_baby == TIME_BEFORE_NEW_BABY, f"day_before_baby for baby {baby} should be {TIME_BEFORE_NEW_BABY}"
+
+    # Test each living entity has its own id
+    def test_ids(self):
+        plant = Plant(age=STANDARD_AGE_FOR_TEST)
+        lion1 = Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        assert plant.id != lion1.id, "Ids should be unique"
+        first_id = LivingEntity.reserve_ids(10)
+        assert Plant(age=STANDARD_AGE_FOR_TEST).id == first_id + 10, "Reserved ids are not given to new entities"
+
+    # Test the name of a baby is only drawn when it's needed, from its name key
+    def test_lazy_baby_name(self):
+        antelope1 = Antelope("antelope1", Sex.MALE, age=STANDARD_AGE_FOR_TEST)
+        antelope2 = Antelope("antelope2", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        antelope2.day_before_baby = 0
+        baby = antelope1.make_baby(antelope2, EventBus())
+
+        assert baby._name is None, "Baby's name should not be drawn at birth"
+        name = baby.name
+        assert name and baby._name == name, "Baby's name should be kept once drawn"
+        assert baby.name == DEFAULT_NAME_PROVIDER.name_for_key('female' if baby.sex == Sex.FEMALE else 'male', baby._name_key)
+        assert baby.to_json_dict()['name'] == name
+
+    # Test living entities have no __dict__ and are pickled with their slots
+    def test_slots(self):
+        lion1 = Lion("lion1", Sex.FEMALE, age=3)
+        plant = Plant(age=2)
+        assert not hasattr(lion1, '__dict__') and not hasattr(plant, '__dict__'), "Living entities should only have slots"
+        assert lion1._sex == Sex.FEMALE.value, "Only the value of the sex should be stored"
+
+        copy = pickle.loads(pickle.dumps(lion1))
+        assert repr(copy) == repr(lion1) and copy.id == lion1.id and copy.sex == Sex.FEMALE
+        assert repr(pickle.loads(pickle.dumps(plant))) == repr(plant)
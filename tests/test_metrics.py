@@ -0,0 +1,101 @@
+import csv
+import numpy as np
+import pytest
+from zoo_simulation.living_entity import LivingEntity, Lion, Antelope, Elephant
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.batch import run_batch
+from zoo_simulation.metrics import MetricsRecorder, METRICS
+
+
+def create_paddock(engine: str = 'objects', plant_engine: str = 'objects') -> Paddock:
+    paddock = Paddock(engine=engine, plant_engine=plant_engine, events=EventBus(), seed=3, report_level='summary')
+    paddock.add_plants(300)
+    paddock.add_animals(Lion, 8)
+    paddock.add_animals(Antelope, 40)
+    paddock.add_animals(Elephant, 10)
+    return paddock
+
+
+class TestMetrics:
+
+    # Test counts of each day match the paddock (with every engine) and recording doesn't change the simulation
+    def test_counts(self):
+        for engine, plant_engine in [('objects', 'objects'), ('objects', 'numpy'), ('objects', 'cohorts'), ('vectorized', 'objects')]:
+            summaries = []
+            for metrics in [None, MetricsRecorder()]:
+                LivingEntity._next_id = 0
+                paddock = create_paddock(engine, plant_engine)
+                if metrics is not None:
+                    paddock.set_metrics(metrics)
+                paddock.run_days(30, report_every=0)
+                summaries.append(paddock.species_summary())
+            assert summaries[0] == summaries[1], f"{engine}/{plant_engine}"
+
+            alive, births, deaths = metrics.column('alive'), metrics.column('births'), metrics.column('deaths')
+            assert metrics.nb_rows == 31 and metrics.days().tolist() == list(range(31))
+            assert alive[-1].tolist() == paddock.count_alive_by_species()
+            assert (alive[1:] - alive[:-1] == births[1:] - deaths[1:]).all()
+            assert deaths.sum(axis=0)[1] == paddock.graveyard.count('Lion') and births[1:, 0].sum() > 0
+            # Other deaths are animals without PV (plants only die of age or eaten)
+            other_deaths = deaths - metrics.column('deaths_of_age') - metrics.column('deaths_by_predation')
+            assert other_deaths.min() >= 0 and not other_deaths[:, 0].any() and metrics.column('deaths_of_age')[:, 0].sum() > 0
+            assert metrics.column('mean_life_point')[-1, 1] == summaries[1]['Lion']['mean_life_point'], f"{engine}/{plant_engine}"
+
+    # Test starvations are counted when there is no food
+    def test_starved(self):
+        for engine in ['objects', 'vectorized']:
+            paddock = Paddock(engine=engine, events=EventBus(), seed=1)
+            paddock.add_animals(Antelope, 5, ages=1)
+            metrics = MetricsRecorder()
+            paddock.set_metrics(metrics)
+            paddock.run_days(10, report_every=0)
+            starved, alive_at_start = metrics.column('starved')[:, 6], metrics.column('alive')[:-1, 6]
+            assert starved.sum() > 0 and (starved[1:] <= alive_at_start).all()
+
+    # Test rows of several days and merged rows give the same totals as one row per day
+    def test_downsampling(self):
+        recorders = [MetricsRecorder(), MetricsRecorder(days_per_row=5), MetricsRecorder(max_rows=6, capacity=2)]
+        for metrics in recorders:
+            LivingEntity._next_id = 0
+            paddock = create_paddock('vectorized')
+            paddock.set_metrics(metrics)
+            paddock.run_days(37, report_every=0)
+        daily, by_five, merged = recorders
+        assert by_five.nb_rows == 8 and by_five.days().tolist() == [4, 9, 14, 19, 24, 29, 34, 37]
+        assert merged.nb_rows == 5 and merged.days_per_row == 8 and merged.days().tolist() == [7, 15, 23, 31, 37]
+        for metrics in [by_five, merged]:
+            rows = np.searchsorted(metrics.days(), daily.days())
+            for metric in ['births', 'deaths', 'deaths_of_age', 'deaths_by_predation', 'starved']:
+                assert (np.add.reduceat(daily.column(metric), np.flatnonzero(np.diff(rows, prepend=-1))) == metrics.column(metric)).all(), metric
+            assert (daily.column('alive')[np.isin(daily.days(), metrics.days())] == metrics.column('alive')).all()
+
+        with pytest.raises(ValueError):
+            MetricsRecorder(days_per_row=0)
+        with pytest.raises(ValueError):
+            daily.column('weight')
+
+    # Test CSV and NPY files (and the metrics of batch mode)
+    def test_export(self, tmp_path):
+        paddock = create_paddock()
+        metrics = MetricsRecorder()
+        paddock.set_metrics(metrics)
+        paddock.run_days(5, report_every=0)
+        metrics.export(str(tmp_path / "metrics.csv"))
+        metrics.export(str(tmp_path / "metrics.npy"))
+        with open(tmp_path / "metrics.csv") as fp:
+            rows = list(csv.DictReader(fp))
+        table = np.load(tmp_path / "metrics.npy")
+        assert len(rows) == len(table) == 6 and list(rows[0]) == list(table.dtype.names) == metrics.column_names()
+        assert [int(row['Lion_alive']) for row in rows] == table['Lion_alive'].tolist() == metrics.column('alive')[:, 1].tolist()
+        assert rows[-1]['Tiger_mean_life_point'] == 'nan' and len(metrics.column_names()) == 1 + 7 * len(METRICS)
+        with pytest.raises(ValueError):
+            metrics.export(str(tmp_path / "metrics.txt"))
+
+        filename = str(tmp_path / "batch.npy")
+        results = run_batch(['--config', 'tests/Beauval.json', '--days', '6', '--report-level', 'summary', '--events', 'none', '--seed', '2',
+                             '--metrics', filename, '--metrics-days-per-row', '2'])
+        table = np.load(filename)
+        assert table['day'].tolist() == [1, 3, 5, 6] and table['Lion_alive'][-1] == results['alive_by_species'].get('Lion', 0)
+        with pytest.raises(SystemExit):
+            run_batch(['--config', 'tests/Beauval.json', '--days', '2', '--events', 'none', '--metrics', str(tmp_path / "metrics.txt")])
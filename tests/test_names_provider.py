@@ -0,0 +1,82 @@
+import random
+import pickle
+import numpy as np
+import names
+from zoo_simulation.living_entity import Sex, Antelope, STANDARD_AGE_FOR_TEST
+from zoo_simulation.names_provider import NamesPackageProvider, FileNameProvider
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+
+
+def get_animals(paddock: Paddock) -> list:
+    """
+    Return the animals of the report of paddock (with every engine)
+    """
+    if paddock.vector_engine is not None:
+        return list(paddock.vector_engine.living_entities(animals_only=True))
+    return paddock.animal_roster
+
+
+class TestNamesProvider:
+
+    # Test names package tables are loaded once, on the first draw
+    def test_names_package_provider(self):
+        provider = NamesPackageProvider()
+        assert provider._tables is None, "Tables should be loaded lazily"
+
+        random.seed(7)
+        name = provider.first_name('female')
+        assert provider._tables is not None
+        with open(names.FILES['first:female']) as name_file:
+            assert name.upper() in [line.split()[0] for line in name_file], "Name should come from the names package"
+        random.seed(7)
+        assert provider.first_name('female') == name, "Names are drawn with the random generator of the simulation"
+
+        drawn_names = provider.first_names(['male', 'female', 'male'], np.random.default_rng(1))
+        assert drawn_names == provider.first_names(['male', 'female', 'male'], np.random.default_rng(1)), "Names depend only on the generator"
+        assert pickle.loads(pickle.dumps(provider))._tables is None, "Tables should not be pickled"
+
+    # Test names of a custom file
+    def test_file_provider(self, tmp_path):
+        filename = tmp_path / "names.txt"
+        filename.write_text("Rex male\nBella female\nSam\n")
+        provider = FileNameProvider(str(filename))
+
+        assert {provider.first_name('male') for _ in range(50)} == {'Rex', 'Sam'}
+        assert set(provider.first_names(['female'] * 50, np.random.default_rng(0))) == {'Bella', 'Sam'}
+
+    # Test babies of a paddock are named by the provider of the paddock
+    def test_paddock_provider(self, tmp_path):
+        filename = tmp_path / "names.txt"
+        filename.write_text("Junior\n")
+        for engine in ['objects', 'vectorized']:
+            paddock = Paddock(engine=engine, name_provider=FileNameProvider(str(filename)))
+            for name, sex in [("Jean", Sex.MALE), ("Marie", Sex.FEMALE)]:
+                antelope = Antelope(name, sex, age=STANDARD_AGE_FOR_TEST)
+                antelope.day_before_baby = 1
+                paddock.add_animal(antelope)
+            paddock.and_one_more_day()
+
+            assert "Antelope Junior" in paddock.create_report(), f"Baby should be named Junior ({engine} engine)"
+
+    # Test two paddocks with the same seed give the same names in the same process (names don't depend on ids nor on other paddocks)
+    def test_same_seed_same_names(self):
+        for engine in ['objects', 'vectorized']:
+            runs = []
+            for _ in range(2):
+                paddock = Paddock(engine=engine, events=EventBus(), seed=1, report_level='summary')
+                paddock.add_plants(100)
+                paddock.add_animals(Antelope, 20)
+                paddock.run_days(10, report_every=0)
+                runs.append([(animal.species, animal.name) for animal in get_animals(paddock)])
+            assert runs[0] == runs[1], f"Names should only depend on the seed ({engine} engine)"
+            assert len(runs[0]) > 20, "Babies should be born"
+
+            other_paddock = Paddock(engine=engine, events=EventBus(), seed=2)
+            other_paddock.add_animals(Antelope, 20)
+            assert [animal.name for animal in get_animals(other_paddock)] != [name for _, name in runs[0][:20]], "Seeds should give other names"
+
+        provider = NamesPackageProvider()
+        spawned = provider.spawn(5)
+        assert spawned.spawn(5).seed == spawned.seed and spawned._get_tables() is provider._get_tables(), "Tables should be loaded once"
+        assert spawned.reserve_keys(3) == 0 and spawned.next_key == 3 and provider.next_key == 0
@@ -0,0 +1,118 @@
+import random
+import numpy as np
+from zoo_simulation.random_streams import GLOBAL_RANDOM
+from zoo_simulation.living_entity import LivingEntity, Plant, Sex, Elephant, Antelope, STANDARD_AGE_FOR_TEST
+from zoo_simulation.living_entity import PV_LOSTS_PLANT_WHEN_EATEN, PV_OBTAINED_HERBIVORE_BY_PLANT
+from zoo_simulation.plant_store import PlantArrayStore, PlantCohortStore
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus, CounterSink
+
+
+class TestPlantStore:
+
+    # Test grow old, PV gain, death and split of plants held by a PlantArrayStore
+    def test_one_more_day(self):
+        store = PlantArrayStore(capacity=1)
+        store.add_plant(Plant(age=19))
+        store.add_plant(Plant(age=3))
+        plant = Plant(age=5)
+        plant._life_point = 4
+        store.add_plant(plant)
+
+        nb_new_plants = store.one_more_day()
+
+        # Both plants with 10 PV split (even the dead one), the third one only gets 1 PV
+        assert nb_new_plants == 2, "2 plants should be born"
+        assert len(store) == 4, "Store should contain 4 alive plants"
+        assert store.take_dead_plants() == 1, "1 plant should be dead"
+        assert sorted(zip(store.ages[:4].tolist(), store.life_points[:4].tolist())) == [(0, 5), (0, 5), (4, 5), (6, 5)]
+
+    # Test a herbivore can eat a plant held by a PlantArrayStore
+    def test_eat_plant_in_store(self):
+        paddock = Paddock(plant_engine='numpy')
+        paddock.add_plant(Plant(age=STANDARD_AGE_FOR_TEST))
+        elephant = Elephant("elephant1", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+
+        plant = paddock.index.random_food(elephant)
+        elephant.eat(plant)
+
+        assert elephant.life_point == 10 + PV_OBTAINED_HERBIVORE_BY_PLANT
+        assert paddock.plant_store.life_points[0] == 10 - PV_LOSTS_PLANT_WHEN_EATEN
+
+    # Test plant engines give the same counts as the object-based one without animals (no food is drawn)
+    def test_same_counts_as_objects(self):
+        reports = []
+        for plant_engine in ['objects', 'numpy', 'cohorts']:
+            random.seed(42)
+            GLOBAL_RANDOM.seed(42)
+            paddock = Paddock(plant_engine=plant_engine)
+            for _ in range(20):
+                paddock.add_plant(Plant())
+            for _ in range(30):
+                paddock.and_one_more_day()
+            reports.append(paddock.create_report())
+
+        assert reports[0] == reports[1] == reports[2], "Reports should be the same"
+
+    # Test plant engines give statistically the same counts as the object-based one with herbivores. Plants of a store act
+    # before animals and are drawn in the order of the store, so a seed doesn't give the same run : mean counts of several seeds
+    # are compared (difference of means below 3 standard errors)
+    def test_same_mean_counts_with_herbivores(self):
+        counts = {}
+        for plant_engine in ['objects', 'numpy', 'cohorts']:
+            rows = []
+            for seed in range(20):
+                paddock = Paddock(plant_engine=plant_engine, events=EventBus(), seed=seed, report_level='summary')
+                paddock.add_plants(50)
+                paddock.add_animals(Elephant, 10)
+                paddock.add_animals(Antelope, 10)
+                paddock.run_days(20, report_every=0)
+                rows.append((paddock.count_alive_plants(), paddock.count_alive_animals()))
+            counts[plant_engine] = np.array(rows, dtype=np.float64)
+
+        objects_counts = counts['objects']
+        for plant_engine in ['numpy', 'cohorts']:
+            standard_errors = np.sqrt(objects_counts.var(axis=0, ddof=1) / len(objects_counts) + counts[plant_engine].var(axis=0, ddof=1) / len(counts[plant_engine]))
+            differences = np.abs(counts[plant_engine].mean(axis=0) - objects_counts.mean(axis=0))
+            assert (differences < 3 * standard_errors).all(), f"Mean counts of plants and animals should be the same with {plant_engine} ({differences} for {standard_errors})"
+
+    # Test grow old, PV gain, death and split of cohorts of plants
+    def test_cohorts_one_more_day(self):
+        store = PlantCohortStore()
+        store.add_plant(Plant(age=19))
+        store.add_plants([3, 3, 3])
+        plant = Plant(age=5)
+        plant._life_point = 4
+        store.add_plant(plant)
+
+        nb_new_plants = store.one_more_day()
+
+        # 4 plants with 10 PV split (even the dead one), the last one only gets 1 PV
+        assert nb_new_plants == 4, "4 plants should be born"
+        assert len(store) == 8, "Store should contain 8 alive plants"
+        assert store.take_dead_plants() == 1, "1 plant should be dead"
+        assert store.cohorts == {(0, 5): 4, (4, 5): 3, (6, 5): 1}
+
+    # Test a herbivore eats one member of a cohort
+    def test_eat_plant_in_cohort(self):
+        paddock = Paddock(plant_engine='cohorts')
+        paddock.add_plants(1000000, ages=STANDARD_AGE_FOR_TEST)
+        elephant = Elephant("elephant1", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+
+        elephant.eat(paddock.index.random_food(elephant))
+
+        assert elephant.life_point == 10 + PV_OBTAINED_HERBIVORE_BY_PLANT
+        assert paddock.plant_store.cohorts == {(12, 10): 999999, (12, 10 - PV_LOSTS_PLANT_WHEN_EATEN): 1}
+        assert paddock.count_alive_plants() == 1000000
+
+    # Test plants of a store don't take ids (references, standalone plants and events)
+    def test_views_take_no_id(self):
+        for plant_engine in ['numpy', 'cohorts']:
+            paddock = Paddock(plant_engine=plant_engine, events=EventBus([CounterSink()]), seed=2)
+            paddock.add_plants(50)
+            next_id = LivingEntity._next_id
+            elephant = Elephant.create_view(-1, 5, sex=Sex.FEMALE)
+            paddock.index.random_food(elephant)
+            paddock.run_days(3, report_every=1)
+            assert len(list(paddock.all_living_entities())) > 50
+            assert LivingEntity._next_id == next_id, plant_engine
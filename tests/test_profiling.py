@@ -0,0 +1,72 @@
+import json
+from zoo_simulation.living_entity import LivingEntity, Lion, Antelope, Elephant
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.batch import run_batch
+from zoo_simulation.metrics import MetricsRecorder
+from zoo_simulation.profiling import DayProfiler, PHASES
+
+
+def create_paddock(engine: str = 'objects', plant_engine: str = 'objects', grid_size: tuple | None = None) -> Paddock:
+    paddock = Paddock(engine=engine, plant_engine=plant_engine, grid_size=grid_size, events=EventBus(), seed=3, report_level='summary')
+    paddock.add_plants(200)
+    paddock.add_animals(Lion, 6)
+    paddock.add_animals(Antelope, 30)
+    paddock.add_animals(Elephant, 8)
+    return paddock
+
+
+class TestProfiling:
+
+    # Test phases and counters are measured with every engine and profiling doesn't change the simulation
+    def test_phases(self):
+        for engine, plant_engine, grid_size in [('objects', 'objects', None), ('objects', 'cohorts', None), ('objects', 'objects', (30, 30)),
+                                                ('vectorized', 'objects', None)]:
+            summaries = []
+            for profiler in [None, DayProfiler()]:
+                LivingEntity._next_id = 0
+                paddock = create_paddock(engine, plant_engine, grid_size)
+                paddock.set_profiler(profiler)
+                paddock.run_days(12, report_every=0)
+                summaries.append(paddock.species_summary())
+            assert summaries[0] == summaries[1], f"{engine}/{plant_engine}/{grid_size}"
+            assert profiler.nb_days == 12 and profiler.day_seconds > 0
+            for phase in ['plant_split', 'aging', 'feeding', 'mating', 'compaction']:
+                assert profiler.calls[phase] > 0 and profiler.seconds[phase] >= 0, f"{engine}/{plant_engine}/{grid_size} {phase}"
+            assert sum(profiler.seconds.values()) <= profiler.day_seconds * 1.01
+            assert profiler.counters['food_candidates'] > 0 and profiler.counters['partner_candidates'] > 0
+            assert (profiler.calls['moves'] > 0) == (grid_size is not None)
+            # The searches of the index are not replaced, the index times them with the profiler of the paddock
+            assert 'random_food' not in paddock.index.__dict__ and 'partner' not in paddock.index.__dict__
+            assert paddock.index.profiler is profiler
+            paddock.set_profiler(None)
+            assert paddock.index.profiler is None
+
+    # Test metrics and report phases, the table and the Chrome trace (and the profile of batch mode)
+    def test_outputs(self, tmp_path, capsys):
+        paddock = create_paddock()
+        profiler = DayProfiler(trace=True)
+        paddock.set_metrics(MetricsRecorder())
+        paddock.set_profiler(profiler)
+        paddock.run_days(4, report_every=2)
+        assert profiler.calls['metrics'] == 4 and profiler.calls['report'] == 2 and profiler.calls['io'] == 2
+
+        table = profiler.create_table()
+        assert table.startswith("4 day(s) profiled") and all(f"\n{phase} " in table for phase in PHASES + ['other', 'food_candidates'])
+        filename = str(tmp_path / "trace.json")
+        profiler.write_chrome_trace(filename)
+        with open(filename) as fp:
+            events = json.load(fp)['traceEvents']
+        days = [event for event in events if event['name'].startswith('day ')]
+        assert [event['name'] for event in days] == ['day 1', 'day 2', 'day 3', 'day 4']
+        assert all(event['ph'] == 'C' or event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+        assert len([event for event in events if event['ph'] == 'C']) == 4
+        assert json.loads(json.dumps(profiler.to_dict())) == profiler.to_dict()
+
+        capsys.readouterr()
+        filename = str(tmp_path / "batch.json")
+        results = run_batch(['--config', 'tests/Beauval.json', '--days', '3', '--report-level', 'summary', '--events', 'none', '--seed', '2',
+                             '--profile', '--profile-trace', filename])
+        assert results['profile']['nb_days'] == 3 and "Phase" in capsys.readouterr().out
+        with open(filename) as fp:
+            assert json.load(fp)['traceEvents']
@@ -0,0 +1,55 @@
+import os
+import random
+import pickle
+from zoo_simulation.living_entity import LivingEntity, Lion, Plant
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.random_streams import SimulationRandom
+
+
+def create_paddock(seed, engine='objects'):
+    paddock = Paddock(engine=engine, events=EventBus(), report_level='summary', seed=seed)
+    paddock.add_plants(30)
+    paddock.add_animals('Antelope', 8)
+    paddock.add_animals(Lion, 4)
+    return paddock
+
+
+class TestRandomStreams:
+
+    # Test two paddocks with the same seed give the same simulation, even when their days are interleaved
+    def test_same_seed_same_simulation(self):
+        for engine in ['objects', 'vectorized']:
+            paddock, other_paddock = create_paddock(42, engine), create_paddock(42, engine)
+            for _ in range(15):
+                random.random()
+                paddock.and_one_more_day(display_report=False)
+                other_paddock.and_one_more_day(display_report=False)
+                assert paddock.species_summary() == other_paddock.species_summary(), f"Paddocks should not interfere ({engine})"
+        assert create_paddock(1).species_summary() != create_paddock(2).species_summary()
+
+    # Test the generator is stored in binary files (the loaded simulation continues like the original one)
+    def test_generator_in_binary_file(self):
+        paddock = create_paddock(7)
+        paddock.and_one_more_day(display_report=False)
+        paddock.store_simulation_to_binary('test_random_streams.binary')
+        loaded_paddock = Paddock(events=EventBus())
+        assert loaded_paddock.load_simulation_from_binary('test_random_streams.binary')
+        os.remove('test_random_streams.binary')
+        assert loaded_paddock.rng.entropy == 7
+        for _ in range(5):
+            paddock.and_one_more_day(display_report=False)
+            loaded_paddock.and_one_more_day(display_report=False)
+        assert paddock.species_summary() == loaded_paddock.species_summary()
+
+    # Test a generator can be split into independent streams (same streams for the same seed)
+    def test_spawn(self):
+        streams = SimulationRandom(3).spawn(4)
+        assert len({stream.random() for stream in streams}) == 4, "Streams should be different"
+        assert [stream.random() for stream in SimulationRandom(3).spawn(4)] == [stream.random() for stream in pickle.loads(pickle.dumps(SimulationRandom(3))).spawn(4)]
+
+        paddock = Paddock(events=EventBus())
+        paddock.set_rng(streams[0])
+        assert paddock.index.rng is streams[0]
+        paddock.add_plant(Plant(age=LivingEntity.random_age(paddock.rng)))
+        assert paddock.count_alive_plants() == 1
@@ -0,0 +1,97 @@
+import io
+import json
+import contextlib
+import pytest
+from zoo_simulation.living_entity import Lion, Antelope, Elephant
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.batch import run_batch, run_replay_command
+from zoo_simulation.snapshot import write_snapshot, load_snapshot
+from zoo_simulation.journal import Journal, load_journal
+from zoo_simulation.replay import ReplayLogSink, verify_replay, seek_to_day, check_replayable
+
+
+def create_paddock(plant_engine: str = 'objects', replay_log: str | None = None) -> Paddock:
+    paddock = Paddock(plant_engine=plant_engine, events=EventBus(), seed=6, dead_animals_in_report=5)
+    paddock.add_plants(300)
+    paddock.add_animals(Lion, 6, names=[f"lion {i}" for i in range(6)])
+    paddock.add_animals(Antelope, 30)
+    paddock.add_animals(Elephant, 10)
+    if replay_log is not None:
+        paddock.events.subscribe(ReplayLogSink(replay_log, new_plants=paddock.plant_store is None))
+    return paddock
+
+
+def create_report(paddock: Paddock) -> str:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return paddock.create_report()
+
+
+class TestReplay:
+
+    # Test each replayed day is the recorded one (with every plant engine) and a changed log is detected
+    def test_verify(self, tmp_path):
+        for plant_engine in ['objects', 'numpy', 'cohorts']:
+            replay_log = str(tmp_path / f"{plant_engine}.replay")
+            journal = str(tmp_path / f"{plant_engine}.journal")
+            paddock = create_paddock(plant_engine, replay_log)
+            paddock.set_journal(Journal(journal, base_every=5, keep_bases=None, sync=False))
+            paddock.run_days(12, report_every=0)
+            paddock.events.close()
+            paddock.journal.close()
+            assert verify_replay(replay_log, journal) == {'identical_days': 12, 'first_different_day': None, 'differences': []}, plant_engine
+
+            # An animal eats something else the first day something is eaten
+            with open(replay_log) as fp:
+                day_logs = [json.loads(line) for line in fp]
+            day_log = next(day_log for day_log in day_logs if day_log['eaten'])
+            eater, food = day_log['eaten'][0]
+            day_log['eaten'][0] = [eater, food + 1 if food >= 0 else food - 1]
+            with open(replay_log, 'w') as fp:
+                fp.write("".join(json.dumps(day_log) + "\n" for day_log in day_logs))
+            result = verify_replay(replay_log, journal)
+            assert result['first_different_day'] == day_log['day'] and result['identical_days'] == day_log['day'] - 1 and result['differences'], plant_engine
+
+    # Test a day is rebuilt from the nearest checkpoint and is the recorded one
+    def test_seek_to_day(self, tmp_path):
+        replay_log = str(tmp_path / "paddock.replay")
+        paddock = create_paddock(replay_log=replay_log)
+        write_snapshot(paddock, str(tmp_path / "day0.snapshot"))
+        reports = [create_report(paddock)]
+        for day in range(1, 13):
+            paddock.and_one_more_day(display_report=False)
+            reports.append(create_report(paddock))
+            if day == 6:
+                write_snapshot(paddock, str(tmp_path / "day6.snapshot"))
+        paddock.events.close()
+        checkpoints = [str(tmp_path / "day0.snapshot"), str(tmp_path / "day6.snapshot")]
+
+        for day, nb_replayed_days in [(4, 4), (6, 0), (9, 3), (12, 6)]:
+            rebuilt_paddock, nb_days = seek_to_day(replay_log, day, checkpoints=checkpoints, events=EventBus())
+            assert nb_days == nb_replayed_days and create_report(rebuilt_paddock) == reports[day], f"Day {day}"
+        # A paddock given as start is replayed in place (it's nearer than the snapshot of day 0)
+        start, _ = seek_to_day(replay_log, 2, checkpoints=checkpoints[:1], events=EventBus())
+        rebuilt_paddock, nb_days = seek_to_day(replay_log, 5, start, checkpoints)
+        assert rebuilt_paddock is start and nb_days == 3 and create_report(start) == reports[5]
+
+        with pytest.raises(ValueError):
+            seek_to_day(replay_log, 1, load_snapshot(checkpoints[1], events=EventBus()))
+        with pytest.raises(ValueError):
+            check_replayable(Paddock(engine='vectorized', events=EventBus()))
+
+    # Test the replay command rebuilds a day of a batch simulation and verifies it with its journal
+    def test_replay_command(self, tmp_path, capsys):
+        replay_log = str(tmp_path / "batch.replay")
+        journal = str(tmp_path / "batch.journal")
+        options = ['--config', 'tests/Beauval.json', '--seed', '2', '--report-level', 'summary', '--events', 'none', '--replay-log', replay_log]
+        run_batch(options + ['--days', '6', '--journal', journal, '--journal-base-every', '2'])
+        results = run_replay_command(options + ['--days', '4', '--verify', journal])
+        assert results['paddock_age'] == 4 and results['replayed_days'] == 4
+        assert results['species_summary'] == load_journal(journal, 4, events=EventBus()).species_summary()
+        assert results['verification']['first_different_day'] is None and "Replay verified" in capsys.readouterr().out
+
+        # From the nearest day of the journal
+        results = run_replay_command(['--days', '5', '--replay-log', replay_log, '--checkpoint', journal, '--report-level', 'summary'])
+        assert results['replayed_days'] == 0 and results['species_summary'] == load_journal(journal, 5, events=EventBus()).species_summary()
+        with pytest.raises(SystemExit):
+            run_batch(options + ['--days', '2', '--engine', 'vectorized'])
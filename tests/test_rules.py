@@ -0,0 +1,61 @@
+import csv
+import pickle
+import pytest
+from zoo_simulation.living_entity import Plant, Sex, Lion, Antelope, DEATHING_AGE_IN_DEAY, LIMIT_PV_BEFORE_EATEN
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.rules import Rules, DEFAULT_RULES
+from zoo_simulation.sweep import grid, run_sweep, run_sweep_command
+
+
+class TestRules:
+
+    # Test default rules are the constants and invalid rules are rejected
+    def test_default_rules(self):
+        assert DEFAULT_RULES.deathing_age_in_deay == DEATHING_AGE_IN_DEAY and DEFAULT_RULES.limit_pv_before_eaten == LIMIT_PV_BEFORE_EATEN
+        rules = DEFAULT_RULES.replace(limit_pv_before_eaten=8)
+        assert rules.limit_pv_before_eaten == 8 and DEFAULT_RULES.limit_pv_before_eaten == LIMIT_PV_BEFORE_EATEN
+        assert repr(rules) == "Rules(limit_pv_before_eaten=8)" and rules == Rules(limit_pv_before_eaten=8)
+        for changes in [{'unknown_rule': 1}, {'time_before_new_baby': -1}, {'min_age_for_entity_added': 15, 'max_age_for_entity_added': 10}]:
+            with pytest.raises(ValueError):
+                DEFAULT_RULES.replace(**changes)
+
+    # Test every engine uses the rules of the paddock
+    def test_rules_of_paddock(self):
+        rules = Rules(deathing_age_in_deay=13, min_pv_to_split_plant=13)
+        reports = []
+        for engine, plant_engine in [('objects', 'objects'), ('objects', 'numpy'), ('objects', 'cohorts'), ('vectorized', 'objects')]:
+            paddock = Paddock(engine=engine, plant_engine=plant_engine, events=EventBus(), report_level='summary', rules=rules)
+            paddock.add_plants(4, ages=[9, 10, 11, 12])
+            for _ in range(2):
+                paddock.and_one_more_day(display_report=False)
+            assert paddock.count_alive_plants() == 2, f"Plants should die at 13 and not split before 13 PV ({engine}/{plant_engine})"
+            reports.append(paddock.species_summary())
+        assert all(report == reports[0] for report in reports)
+
+        paddock = Paddock(events=EventBus(), rules=Rules(limit_pv_before_eaten=9))
+        lion = Lion("simba", Sex.MALE, age=1)
+        paddock.add_animal(lion)
+        paddock.add_animal(Antelope("jean", Sex.MALE, age=1))
+        paddock.and_one_more_day(display_report=False)
+        assert lion.life_point == 9 + DEFAULT_RULES.pv_obtained_carnivorous_by_animal, "The lion should eat with 9 PV"
+        assert pickle.loads(pickle.dumps(paddock)).rules == Rules(limit_pv_before_eaten=9)
+        assert Plant(age=1).gets_eaten(Rules(pv_obtained_herbivore_by_plant=7)) == 7
+
+    # Test a sweep writes one row per run with the rules of the run
+    def test_sweep(self, tmp_path):
+        output = tmp_path / "sweep.csv"
+        combinations = grid({'limit_pv_before_eaten': [3, 7], 'time_before_new_baby': [1, 2, 3]})
+        assert len(combinations) == 6
+        assert run_sweep('tests/Beauval.json', combinations, str(output), 10, runs_per_combination=2, seed=5, workers=1) == 12
+        with open(output) as fp:
+            rows = list(csv.DictReader(fp))
+        assert [row['limit_pv_before_eaten'] for row in rows[::4]] == ['3', '3', '7'] and rows[3]['time_before_new_baby'] == '2'
+        assert all(int(row['days']) == 10 for row in rows) and rows[0]['peak_Lion'] == '1'
+
+        other_output = tmp_path / "other_sweep.csv"
+        assert run_sweep_command(['tests/Beauval.json', '--grid', 'limit_pv_before_eaten=3,7', '--grid', 'time_before_new_baby=1,2,3',
+                                  '--runs', '2', '--days', '10', '--seed', '5', '--workers', '2', '--output', str(other_output)]) == 12
+        assert other_output.read_text() == output.read_text(), "Same seed, same results (whatever the number of workers)"
+        with pytest.raises(SystemExit):
+            run_sweep_command(['tests/Beauval.json', '--grid', 'unknown_rule=1', '--days', '1', '--output', str(other_output)])
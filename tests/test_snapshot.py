@@ -0,0 +1,102 @@
+import io
+import pickle
+import contextlib
+import pytest
+from zoo_simulation.living_entity import LivingEntity, Lion, Antelope, Elephant
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.rules import Rules
+from zoo_simulation.batch import run_batch
+from zoo_simulation.snapshot import write_snapshot, load_snapshot, read_snapshot_header, is_snapshot, run_snapshot_command
+
+
+def create_paddock(engine: str = 'objects', plant_engine: str = 'objects', grid_size=None) -> Paddock:
+    paddock = Paddock(engine=engine, plant_engine=plant_engine, events=EventBus(), seed=3, dead_animals_in_report=5,
+                      rules=Rules(time_before_new_baby=2), grid_size=grid_size)
+    paddock.add_plants(100)
+    paddock.add_animals(Lion, 6, names=[f"lion {i}" for i in range(6)])
+    paddock.add_animals(Antelope, 20)
+    paddock.add_animals(Elephant, 6)
+    paddock.run_days(5, report_every=0)
+    return paddock
+
+
+def create_report(paddock: Paddock) -> str:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return paddock.create_report()
+
+
+class TestSnapshot:
+
+    # Test a loaded paddock goes on exactly like the stored one (with every engine)
+    def test_round_trip(self, tmp_path):
+        filename = str(tmp_path / "paddock.snapshot")
+        for engine, plant_engine, grid_size in [('objects', 'objects', None), ('objects', 'numpy', None), ('objects', 'cohorts', None),
+                                                ('vectorized', 'objects', None), ('objects', 'objects', (20, 20))]:
+            paddock = create_paddock(engine, plant_engine, grid_size)
+            write_snapshot(paddock, filename)
+            loaded_paddock = load_snapshot(filename, events=EventBus())
+            assert create_report(loaded_paddock) == create_report(paddock) and loaded_paddock.rules == paddock.rules
+            assert loaded_paddock.paddock_age == 5 and loaded_paddock.graveyard.deaths_by_species == paddock.graveyard.deaths_by_species
+            next_id = LivingEntity._next_id
+            reports = []
+            for other_paddock in [paddock, loaded_paddock]:
+                # Babies get the same ids, so the same names
+                LivingEntity._next_id = next_id
+                other_paddock.run_days(6, report_every=0)
+                reports.append((create_report(other_paddock), other_paddock.species_summary()))
+            assert reports[0] == reports[1], f"Same days after loading ({engine}/{plant_engine}/{grid_size})"
+
+            # A loaded paddock can be stored in its own file (its columns are mapped in memory)
+            write_snapshot(loaded_paddock, filename)
+            assert load_snapshot(filename, events=EventBus()).species_summary() == reports[1][1]
+
+    # Test the header is read alone and columns of the vectorized engine are not copied
+    def test_header(self, tmp_path):
+        filename = str(tmp_path / "paddock.snapshot")
+        paddock = create_paddock('vectorized')
+        header = write_snapshot(paddock, filename)
+        assert read_snapshot_header(filename) == header and is_snapshot(filename)
+        assert header['paddock_age'] == 5 and header['seed'] == 3 and header['rules']['time_before_new_baby'] == 2
+        assert header['alive_by_species']['Elephant'] == paddock.species_summary()['Elephant']['alive']
+        assert header['counts']['entities'] == len(paddock.vector_engine) + len(paddock.vector_engine.dead_animals), "Alive entities, then dead animals"
+        assert all(offset % 64 == 0 for _, offset, _ in header['columns'].values())
+
+        engine = load_snapshot(filename, events=EventBus()).vector_engine
+        assert not engine.ages.flags.owndata and engine.ages.flags.writeable
+        assert engine.names[:len(engine)].tolist() == paddock.vector_engine.names[:len(engine)].tolist()
+
+        with open(tmp_path / "empty.snapshot", 'wb'):
+            pass
+        assert not is_snapshot(str(tmp_path / "empty.snapshot"))
+        with pytest.raises(ValueError):
+            read_snapshot_header('tests/Beauval.json')
+        # A snapshot file of another version is detected but not read
+        with open(filename, 'rb') as fp:
+            old_version = b'ZOOSNAP1' + fp.read()[8:]
+        (tmp_path / "old.snapshot").write_bytes(old_version)
+        assert is_snapshot(str(tmp_path / "old.snapshot"))
+        with pytest.raises(ValueError, match="version 1"):
+            load_snapshot(str(tmp_path / "old.snapshot"))
+
+    # Test conversion from/to binary (pickle) files and snapshot files in batch mode
+    def test_conversion(self, tmp_path, capsys):
+        snapshot_filename = str(tmp_path / "baseline.snapshot")
+        binary_filename = str(tmp_path / "baseline.binary")
+        header = run_snapshot_command(['convert', 'tests/baseline.binary', snapshot_filename])
+        with open('tests/baseline.binary', 'rb') as fp:
+            paddock = pickle.load(fp)
+        assert header['paddock_age'] == paddock.paddock_age and is_snapshot(snapshot_filename)
+        run_snapshot_command(['convert', snapshot_filename, binary_filename])
+        with open(binary_filename, 'rb') as fp:
+            assert pickle.load(fp).species_summary() == paddock.species_summary()
+        run_snapshot_command(['info', snapshot_filename])
+        assert f"Paddock's age : {paddock.paddock_age} day(s)" in capsys.readouterr().out
+
+        other_snapshot_filename = str(tmp_path / "other.snapshot")
+        results = run_batch(['--binary', snapshot_filename, '--days', '2', '--report-level', 'summary', '--events', 'none',
+                             '--save-snapshot', other_snapshot_filename])
+        assert results['paddock_age'] == paddock.paddock_age + 2
+        assert read_snapshot_header(other_snapshot_filename)['paddock_age'] == paddock.paddock_age + 2
+        with pytest.raises(SystemExit):
+            run_snapshot_command(['info', 'tests/baseline.binary'])
@@ -0,0 +1,89 @@
+from zoo_simulation.living_entity import LivingEntity, Plant, Sex, STANDARD_AGE_FOR_TEST
+from zoo_simulation.living_entity import Lion, Tiger, Elephant, Antelope
+from zoo_simulation.living_entity import PV_OBTAINED_HERBIVORE_BY_PLANT
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus, CounterSink
+
+
+class TestVectorizedEngine:
+
+    # Test the vectorized engine gives the same report as the object-based engine (no hunger, no baby)
+    def test_same_report_as_objects(self):
+        reports = []
+        for engine in ['objects', 'vectorized']:
+            paddock = Paddock(engine=engine)
+            paddock.add_plant(Plant(age=STANDARD_AGE_FOR_TEST))
+            paddock.add_plant(Plant(age=STANDARD_AGE_FOR_TEST))
+            paddock.add_animal(Lion("lion1", Sex.MALE, age=STANDARD_AGE_FOR_TEST))
+            paddock.add_animal(Tiger("woods", Sex.MALE, age=STANDARD_AGE_FOR_TEST))
+            paddock.add_animal(Elephant("Céleste", Sex.FEMALE, age=19))
+            paddock.and_one_more_day()
+            reports.append(paddock.create_report())
+
+        assert reports[0] == reports[1], "Reports should be the same"
+
+    # Test dead animals leave the arrays of alive entities but stay in the report (in insertion order, oldest ones forgotten)
+    def test_dead_animals_out_of_arrays(self):
+        reports = []
+        for engine in ['objects', 'vectorized']:
+            paddock = Paddock(engine=engine, dead_animals_in_report=2)
+            for name, age in [("lion1", 19), ("lion2", 5), ("lion3", 19), ("lion4", 19), ("lion5", 5)]:
+                paddock.add_animal(Lion(name, Sex.MALE, age=age))
+            paddock.and_one_more_day()
+            reports.append(paddock.create_report())
+            if engine == 'vectorized':
+                engine_arrays = paddock.vector_engine
+                assert engine_arrays.alive[:len(engine_arrays)].all() and len(engine_arrays) == 2, "Arrays should only hold alive entities"
+                assert engine_arrays.count(Lion, alive=False) == 2, "Only the 2 last dead animals should be kept"
+                assert paddock.graveyard.count('Lion') == 3
+
+        assert reports[0] == reports[1], "Reports should be the same"
+
+    # Test a hungry herbivore eats a plant
+    def test_grazing(self):
+        paddock = Paddock(engine='vectorized')
+        paddock.add_plant(Plant(age=1))
+        elephant = Elephant("Céleste", Sex.FEMALE, age=STANDARD_AGE_FOR_TEST)
+        elephant._life_point = 6
+        paddock.add_animal(elephant)
+        paddock.and_one_more_day()
+
+        elephant = list(paddock.vector_engine.living_entities(animals_only=True))[0]
+        assert elephant.life_point == 5 + PV_OBTAINED_HERBIVORE_BY_PLANT, "Elephant should have eaten"
+
+    # Test two ready animals make a baby
+    def test_baby(self):
+        paddock = Paddock(engine='vectorized')
+        for name, sex in [("Jean", Sex.MALE), ("Marie", Sex.FEMALE)]:
+            antelope = Antelope(name, sex, age=STANDARD_AGE_FOR_TEST)
+            antelope.day_before_baby = 1
+            paddock.add_animal(antelope)
+        paddock.and_one_more_day()
+
+        assert paddock.vector_engine.count(Antelope) == 3, "A baby antelope should be born"
+        assert paddock.vector_engine.count() == int(paddock.vector_engine.alive[:len(paddock.vector_engine)].sum()), "Alive counters should be up to date"
+        assert paddock.vector_engine.count(Antelope, alive=False) == 0
+
+    # Test all animals die
+    def test_all_animals_are_dead(self):
+        paddock = Paddock(engine='vectorized')
+        paddock.add_animal(Lion("lion1", Sex.MALE, age=19))
+        assert not paddock.all_animals_are_dead()
+        paddock.and_one_more_day()
+        assert paddock.all_animals_are_dead()
+        assert paddock.graveyard.count('Lion') == 1
+
+    # Test reports and events don't take ids (ids and lazy names of babies are the same without them)
+    def test_views_take_no_id(self):
+        babies = []
+        for report_every, sinks in [(0, []), (1, [CounterSink()])]:
+            LivingEntity._next_id = 1
+            paddock = Paddock(engine='vectorized', events=EventBus(sinks), seed=1, report_level='summary')
+            paddock.add_plants(100)
+            paddock.add_animals(Antelope, 20, ages=5)
+            paddock.run_days(6, report_every=report_every)
+            next_id = LivingEntity._next_id
+            list(paddock.vector_engine.living_entities())
+            assert LivingEntity._next_id == next_id, "Objects built from the arrays shouldn't take ids"
+            babies.append([(animal.id, animal.name) for animal in paddock.vector_engine.living_entities(animals_only=True)])
+        assert babies[0] == babies[1] and len(babies[0]) > 20
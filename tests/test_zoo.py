@@ -0,0 +1,64 @@
+import pytest
+from zoo_simulation.living_entity import Lion, Antelope
+from zoo_simulation.paddock import Paddock
+from zoo_simulation.events import EventBus
+from zoo_simulation.zoo import Zoo, merge_species_summaries, run_zoo_command
+
+
+def create_paddock(engine: str = 'objects', seed: int = 0) -> Paddock:
+    paddock = Paddock(engine=engine, events=EventBus(), seed=seed)
+    paddock.add_plants(20)
+    paddock.add_animals(Lion, 4)
+    paddock.add_animals(Antelope, 6)
+    return paddock
+
+
+class TestZoo:
+
+    # Test animals taken from a paddock are not counted as dead
+    def test_take_animals(self):
+        for engine in ['objects', 'vectorized']:
+            paddock = create_paddock(engine)
+            lions = paddock.take_animals(3, Lion)
+            assert len(lions) == 3 and all(isinstance(lion, Lion) and lion._name is not None for lion in lions)
+            assert paddock.count_alive_by_species()[1] == 1 and paddock.graveyard.count('Lion') == 0
+            assert len(paddock.take_animals(100)) == 7 and paddock.all_animals_are_dead()
+            other_paddock = Paddock(engine=engine, events=EventBus())
+            other_paddock.add_living_entities(lions)
+            assert other_paddock.species_summary()['Lion']['alive'] == 3
+
+    # Test the same seed gives the same zoo with or without worker processes
+    def test_zoo_workers(self):
+        results = []
+        for workers in [1, 2]:
+            with Zoo(workers=workers, seed=8) as zoo:
+                for seed, name in enumerate(['north', 'south', 'east']):
+                    zoo.add_paddock(name, create_paddock(seed=seed))
+                zoo.add_transfer('north', 'south', 2, 3, 'Antelope')
+                zoo.add_transfer('east', 'north', 1, 4)
+                assert zoo.run_days(10) == 10
+                summaries = zoo.paddock_summaries()
+                results.append((summaries, zoo.species_summary(), zoo.nb_transferred_animals))
+            assert zoo.get_paddocks()['east'].paddock_age == 10, "Paddocks come back to the zoo when workers are stopped"
+        assert results[0] == results[1]
+        summaries, species_summary, nb_transferred_animals = results[0]
+        assert nb_transferred_animals > 0
+        assert species_summary == merge_species_summaries(summary['species'] for summary in summaries.values())
+        assert species_summary['Plant']['alive'] == sum(summary['species']['Plant']['alive'] for summary in summaries.values())
+
+        with pytest.raises(ValueError):
+            zoo.add_transfer('north', 'west', 1, 1)
+        with pytest.raises(ValueError):
+            zoo.add_transfer('north', 'north', 1, 1)
+        with pytest.raises(ValueError):
+            zoo.add_paddock('north', create_paddock())
+
+    # Test the command line of the zoo
+    def test_zoo_command(self, tmp_path, capsys):
+        results = run_zoo_command(['--paddock', 'beauval=tests/Beauval.json', '--copies', '3', '--days', '4', '--transfer', 'beauval-1:beauval-2:1:2:Lion',
+                                   '--seed', '1', '--workers', '1', '--output', str(tmp_path / 'zoo.json')])
+        assert list(results['paddocks']) == ['beauval-1', 'beauval-2', 'beauval-3'] and results['transferred_animals'] == 1
+        assert results['paddocks']['beauval-2']['alive_by_species']['Lion'] == 2 or results['species_summary']['Lion']['dead'] > 0
+        assert "Zoo's age : 4 day(s), 3 paddock(s)" in capsys.readouterr().out
+        with pytest.raises(SystemExit):
+            run_zoo_command(['--paddock', 'beauval', '--days', '1'])
@@ -1,17 +1,14 @@
-from zoo_simulation.living_entity import LivingEntity, STANDARD_AGE_FOR_TEST
+from zoo_simulation.living_entity import Plant, Sex, Lion, Tiger, STANDARD_AGE_FOR_TEST
+from zoo_simulation.rules import Rules
 import zoo_simulation.paddock as simuation_paddock
 import os
+import pytest
 
+# Living entities added without age get STANDARD_AGE_FOR_TEST (their age is drawn between the ages of the rules)
+TEST_RULES = Rules(min_age_for_entity_added=STANDARD_AGE_FOR_TEST, max_age_for_entity_added=STANDARD_AGE_FOR_TEST)
 
-class TestZooSimulation:
-
-    # Setup method (will be called before running tests)
-    def setup_class(cls):
-        LivingEntity.testing_mode = True
 
-    # Teaddown methode (will be called at tests end)
-    def teardown_class(cls):
-        LivingEntity.testing_mode = False
+class TestZooSimulation:
 
     # Test Paddock initialization (whith blank input)
     def test_empty_initialization(self):
@@ -21,7 +18,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
         report = paddock.create_report()
         assert report == """Plant(s)\n0❤️\n0💀\nAnimal(s):\n---------------\n"""
@@ -34,7 +31,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
         report = paddock.create_report()
         print(report)
@@ -48,7 +45,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
         report = paddock.create_report()
         assert report == """Plant(s)\n5❤️\n0💀\nAnimal(s):\n---------------\n"""
@@ -61,7 +58,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
         report = paddock.create_report()
         assert report == f"""Plant(s)\n1❤️\n0💀\nAnimal(s):\n\t🦁 Lion lion1 ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️\n---------------\n"""
@@ -74,7 +71,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
         report = paddock.create_report()
         assert report == f"""Plant(s)\n4❤️\n0💀\nAnimal(s):\n\t🐅 Tiger woods ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️\n\t🐘 Elephant Céleste ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️\n---------------\n"""
@@ -87,7 +84,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
         report = paddock.create_report()
         assert report == f"""Plant(s)\n1❤️\n0💀\nAnimal(s):\n\t🦊 Coyote vil_coyote ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️\n\t🦒 Giraffe Sophie ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️\n---------------\n"""
@@ -100,7 +97,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
         report = paddock.create_report()
         assert report == f"""Plant(s)\n2❤️\n0💀\nAnimal(s):\n\t𓃴 Antelope Jean ♂️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️\n\t𓃴 Antelope Marie ♀️ PV 10 Age {STANDARD_AGE_FOR_TEST} ❤️\n---------------\n"""
@@ -116,7 +113,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
 
         f = open(reference_file, "r").read()
@@ -141,7 +138,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
 
         res = paddock.create_report()
@@ -159,7 +156,7 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
 
         input_values = ['1', 's', current_binary_file, 'l', empty_binary_file, 'q']
@@ -180,8 +177,129 @@ class TestZooSimulation:
             return input_values.pop(0)
 
         simuation_paddock.input = mock_input
-        paddock = simuation_paddock.Paddock()
+        paddock = simuation_paddock.Paddock(seed=1, rules=TEST_RULES)
         paddock.initialization()
 
         assert paddock.paddock_age == 1, "Paddock age should be 1"
         assert len(paddock.lst_living_entity) == 7, "Paddock len(lst_living_entity) should be 7"
+
+    # Test dead entities are moved to the graveyard without changing the report
+    def test_dead_entities_compaction(self):
+        paddock = simuation_paddock.Paddock()
+        paddock.add_plant(Plant(age=19))
+        paddock.add_plant(Plant(age=1))
+        paddock.add_animal(Lion("lion1", Sex.MALE, age=19))
+        paddock.add_animal(Tiger("woods", Sex.MALE, age=1))
+        paddock.and_one_more_day()
+
+        # Both plants split (even the dead one), so there are 3 alive plants and one tiger
+        assert len(paddock.lst_living_entity) == 4, "Only alive entities should stay in lst_living_entity"
+        assert paddock.graveyard.count('Plant') == 1 and paddock.graveyard.count('Lion') == 1
+        assert paddock.create_report() == """Plant(s)\n3❤️\n1💀\nAnimal(s):\n\t🦁 Lion lion1 ♂️ PV 10 Age 20 💀\n\t🐅 Tiger woods ♂️ PV 9 Age 2 ❤️\n---------------\n"""
+
+    # Test the number of dead animals displayed in the report can be limited
+    def test_dead_animals_in_report_limit(self):
+        paddock = simuation_paddock.Paddock(dead_animals_in_report=1)
+        paddock.add_animal(Lion("lion1", Sex.MALE, age=19))
+        paddock.add_animal(Tiger("woods", Sex.MALE, age=1))
+        paddock.add_animal(Lion("lion2", Sex.MALE, age=19))
+        paddock.and_one_more_day()
+
+        assert paddock.graveyard.count() == 2
+        assert paddock.create_report() == """Plant(s)\n0❤️\n0💀\nAnimal(s):\n\t🐅 Tiger woods ♂️ PV 9 Age 2 ❤️\n\t🦁 Lion lion2 ♂️ PV 10 Age 20 💀\n---------------\n"""
+
+    # Test population counters are the same as counting living entities one by one
+    def test_population_counters(self):
+        paddock = simuation_paddock.Paddock()
+        for age in range(0, 20, 2):
+            paddock.add_plant(Plant(age=age))
+        dead_plant = Plant(age=STANDARD_AGE_FOR_TEST)
+        dead_plant._is_alive = False
+        paddock.add_plant(dead_plant)
+        paddock.add_animal(Lion("lion1", Sex.MALE, age=17))
+        paddock.add_animal(Tiger("woods", Sex.MALE, age=1))
+        assert paddock.count_alive_plants() == 10 and paddock.graveyard.count('Plant') == 1, "A dead plant is only counted"
+
+        for _ in range(5):
+            paddock.and_one_more_day()
+            entities = list(paddock.all_living_entities())
+            assert paddock.count_alive_plants() == len([le for le in entities if isinstance(le, Plant) and le.is_alive])
+            assert paddock.count_alive_animals() == len([le for le in paddock.animal_roster if le.is_alive])
+        assert not paddock.all_animals_are_dead(), "The tiger should be alive"
+
+    # Test summary report displays one line per species
+    def test_summary_report(self):
+        paddock = simuation_paddock.Paddock(report_level='summary')
+        paddock.add_plant(Plant(age=19))
+        paddock.add_plant(Plant(age=1))
+        paddock.add_animal(Lion("lion1", Sex.MALE, age=19))
+        paddock.add_animal(Tiger("woods", Sex.FEMALE, age=1))
+        paddock.and_one_more_day()
+
+        summary = paddock.species_summary()
+        assert summary['Plant']['alive'] == 3 and summary['Plant']['dead'] == 1
+        assert summary['Tiger'] == {'alive': 1, 'dead': 0, 'mean_life_point': 9, 'mean_age': 2, 'females_ready': 0}
+        assert paddock.create_report().splitlines()[3] == "Tiger            1       0      9.0       2.0              0"
+
+    # Test sampled report displays at most report_sample_size animals
+    def test_sampled_report(self):
+        paddock = simuation_paddock.Paddock()
+        for i in range(10):
+            paddock.add_animal(Lion(f"lion{i}", Sex.MALE))
+        assert paddock.set_report_level_from_command('v sampled 3')
+        report = paddock.create_report()
+
+        assert "Animal(s) (3 of 10):\n" in report
+        assert report.count("Lion") == 3
+        assert not paddock.set_report_level_from_command('v detailed'), "Unknown level should be rejected"
+        assert paddock.report_level == 'sampled'
+
+    # Test binary files written before slots (baseline version and version with lazy names) are still loaded
+    def test_loading_legacy_binaries(self):
+        for binary_file, baby_name in [('baseline.binary', 'Geraldine'), ('lazy_names.binary', 'Velda')]:
+            paddock = simuation_paddock.Paddock()
+            assert paddock.load_simulation_from_binary(os.path.join('tests', binary_file)), f"{binary_file} should be loaded"
+
+            assert paddock.create_report() == "Plant(s)\n5❤️\n1💀\nAnimal(s):\n\t🦁 Lion simba ♂️ PV 9 Age 4 ❤️\n\t𓃴 Antelope jean ♂️ PV 9 Age 3 ❤️\n" \
+                f"\t𓃴 Antelope marie ♀️ PV 9 Age 3 ❤️\n\t𓃴 Antelope {baby_name} ♀️ PV 10 Age 0 ❤️\n---------------\n"
+            paddock.and_one_more_day()
+            assert paddock.paddock_age == 2
+
+    # Test bulk creation of plants and animals gives the same counts with every engine
+    def test_bulk_creation(self):
+        for engine, plant_engine in [('objects', 'objects'), ('objects', 'cohorts'), ('vectorized', 'objects')]:
+            paddock = simuation_paddock.Paddock(engine=engine, plant_engine=plant_engine, report_level='summary', seed=1, rules=TEST_RULES)
+            paddock.add_plants(50)
+            paddock.add_plants(3, ages=[1, 2, 3])
+            paddock.add_animals('Antelope', 10, sex_ratio=1.0, ages=4)
+            paddock.add_animals(Lion, 2, names=['simba', 'nala'])
+            assert paddock.count_alive_plants() == 53 and paddock.count_alive_animals() == 12, f"Wrong counts with {engine}/{plant_engine}"
+            summary = paddock.species_summary()
+            assert summary['Plant']['mean_age'] == (50 * STANDARD_AGE_FOR_TEST + 6) / 53
+            assert summary['Antelope']['mean_age'] == 4 and summary['Antelope']['females_ready'] == 0, "All antelopes should be males"
+            paddock.and_one_more_day(display_report=False)
+
+        paddock = simuation_paddock.Paddock()
+        paddock.add_animals(Lion, 2, names=['simba', 'nala'])
+        assert [animal.name for animal in paddock.animal_roster] == ['simba', 'nala']
+        assert paddock.animal_roster[1].id == paddock.animal_roster[0].id + 1, "Ids are reserved at once"
+        for arguments in [(Plant, 1), ('Unicorn', 1), (Lion, 2, 1.5), (Lion, 2, 0.5, [1, 2, 3])]:
+            with pytest.raises(ValueError):
+                paddock.add_animals(*arguments)
+
+    # Test the JSON loader keeps the order of the file and the attributes of each entity
+    def test_loading_configuration_in_batch(self):
+        paddock = simuation_paddock.Paddock()
+        paddock.add_animal(Lion("simba", Sex.MALE, age=5))
+        paddock.add_plant(Plant(age=3))
+        paddock.add_animal(Tiger("woods", Sex.FEMALE, age=2))
+        paddock.add_animal(Lion("nala", Sex.FEMALE, age=4))
+        paddock.and_one_more_day(display_report=False)
+        report = paddock.create_report()
+        assert paddock.store_in_json('test_batch_loading.json')
+
+        loaded_paddock = simuation_paddock.Paddock()
+        assert loaded_paddock.load_from_json(filename='test_batch_loading.json')
+        os.remove('test_batch_loading.json')
+        assert loaded_paddock.create_report() == report
+        assert [animal.day_before_baby for animal in loaded_paddock.animal_roster] == [animal.day_before_baby for animal in paddock.animal_roster]
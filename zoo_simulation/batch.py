@@ -0,0 +1,265 @@
+from __future__ import annotations
+import argparse
+import json
+import time
+from .paddock import Paddock, ENGINES, PLANT_ENGINES, REPORT_LEVELS, create_animal
+from .events import EventBus, StdoutSink, JsonLinesSink
+from .names_provider import FileNameProvider
+from .snapshot import is_snapshot, load_snapshot, write_snapshot
+from .journal import Journal, is_journal, load_journal, BASE_EVERY
+from .replay import ReplayLogSink, check_replayable, seek_to_day, verify_replay
+from .metrics import MetricsRecorder
+from .profiling import DayProfiler
+
+# Keys of a scenario file (a JSON dict) : same names as the command line options
+SCENARIO_KEYS = ['config', 'binary', 'plants', 'animals', 'days', 'until_extinction', 'report_every',
+                 'report_level', 'report_sample_size', 'dead_animals_in_report', 'names_file', 'seed', 'grid', 'radius', 'move_distance', 'engine', 'plant_engine', 'events', 'events_file',
+                 'save_simulation', 'save_snapshot', 'journal', 'journal_base_every', 'replay_log',
+                 'metrics', 'metrics_days_per_row', 'metrics_max_rows', 'profile', 'profile_trace', 'output']
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line used to run a simulation without interaction
+    """
+    parser = argparse.ArgumentParser(prog='main.py',
+                                     description="Run a zoo simulation without interaction (batch mode). "
+                                                 "Without argument, the simulation is interactive.")
+    parser.add_argument('--scenario', help="JSON file with the options of the simulation (command line options take precedence)")
+    parser.add_argument('--config', help="JSON configuration file to load (written by the 'store in JSON file' command)")
+    parser.add_argument('--binary', help="Binary simulation file to load (snapshot and journal files are detected, the last day of a journal is loaded)")
+    parser.add_argument('--plants', type=int, help="Number of plants to add")
+    parser.add_argument('--animal', dest='animals', action='append',
+                        help="Animal to add, e.g. 'Lion simba m' (can be repeated)")
+    parser.add_argument('--days', type=int, help="Number of days to simulate (maximum number of days with --until-extinction)")
+    parser.add_argument('--until-extinction', action='store_true', default=None, help="Run the simulation until all animals are dead")
+    parser.add_argument('--report-every', type=int, help="Display the paddock report every K days (0 : only the final report)")
+    parser.add_argument('--report-level', choices=REPORT_LEVELS,
+                        help="'summary' : one line per species, 'full' : one line per animal, 'sampled' : at most --report-sample-size animals")
+    parser.add_argument('--report-sample-size', type=int, help="Maximum number of animals displayed by a sampled report")
+    parser.add_argument('--dead-animals-in-report', type=int,
+                        help="Maximum number of dead animals kept for the report (default : all of them, none with --report-level summary)")
+    parser.add_argument('--names-file', help="File of baby names (one name per line, optionally followed by 'male' or 'female')")
+    parser.add_argument('--seed', type=int, help="Seed of the random generator of the paddock (the same seed gives the same simulation)")
+    parser.add_argument('--grid', help="Size WIDTHxHEIGHT of the grid of a spatial paddock (animals move and find food and partner around them)")
+    parser.add_argument('--radius', type=float, help="Maximum distance between an animal and its food or its partner (with --grid)")
+    parser.add_argument('--move-distance', type=int, help="Maximum move of an animal each day (with --grid)")
+    parser.add_argument('--engine', choices=ENGINES, help="Engine used to simulate a day")
+    parser.add_argument('--plant-engine', choices=PLANT_ENGINES, help="Engine used to hold plants (with the 'objects' engine)")
+    parser.add_argument('--events', choices=['stdout', 'none'], help="Print events on standard output or not")
+    parser.add_argument('--events-file', help="Write events in a JSON Lines file")
+    parser.add_argument('--save-simulation', help="Binary file where the simulation is stored at the end")
+    parser.add_argument('--save-snapshot', help="Snapshot file (columnar binary format) where the simulation is stored at the end")
+    parser.add_argument('--journal', help="Journal file where the changes of each day are appended (incremental checkpoint)")
+    parser.add_argument('--journal-base-every', type=int, help=f"Number of days between two full records of the journal (default {BASE_EVERY})")
+    parser.add_argument('--replay-log', help="Replay log of the decisions of each day (written by a simulation, read by 'main.py replay')")
+    parser.add_argument('--metrics', help="CSV or NPY file where the metrics of each day (counts of each species) are written at the end")
+    parser.add_argument('--metrics-days-per-row', type=int, help="Number of days of a row of the metrics (default 1)")
+    parser.add_argument('--metrics-max-rows', type=int, help="Maximum number of rows of the metrics (rows are merged by pairs when they are all used)")
+    parser.add_argument('--profile', action='store_true', default=None, help="Time the phases of each day and print a table of the times at the end")
+    parser.add_argument('--profile-trace', help="JSON file where the phases of each day are written as a Chrome trace (chrome://tracing)")
+    parser.add_argument('--output', help="JSON file where final results are written")
+    return parser
+
+
+def create_replay_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line used to rebuild a day of a simulation : options of the recorded simulation
+    (the same options and seed give the same initial paddock), its replay log and its checkpoints
+    """
+    parser = create_parser()
+    parser.prog = 'main.py replay'
+    parser.description = ("Rebuild the paddock of a simulation after --days days with its replay log (--replay-log), from the initial paddock "
+                          "or from the nearest checkpoint. Food, partners and sex of babies are read in the log, not drawn again.")
+    parser.add_argument('--checkpoint', dest='checkpoints', action='append', default=[],
+                        help="Snapshot or journal file of the simulation (the nearest day before the rebuilt day is used, can be repeated)")
+    parser.add_argument('--verify', metavar='JOURNAL', help="Journal file of the simulation : each of its days is compared with the replayed one")
+    return parser
+
+
+def load_scenario(args: argparse.Namespace) -> dict:
+    """
+    Return the options of the simulation : defaults, then scenario file, then command line options
+    """
+    scenario = {'plants': 0, 'animals': [], 'days': None, 'until_extinction': False, 'report_every': 1,
+                'report_level': 'full', 'report_sample_size': 20, 'radius': 5, 'move_distance': 1, 'engine': 'objects', 'plant_engine': 'objects', 'events': 'stdout',
+                'journal_base_every': BASE_EVERY, 'metrics_days_per_row': 1}
+    if args.scenario is not None:
+        with open(args.scenario) as fp:
+            scenario_file = json.load(fp)
+        if unknown_keys := set(scenario_file) - set(SCENARIO_KEYS):
+            raise ValueError(f"Unknown key(s) in scenario file {args.scenario} : {', '.join(sorted(unknown_keys))}")
+        scenario.update(scenario_file)
+    for key in SCENARIO_KEYS:
+        if (value := getattr(args, key, None)) is not None:
+            scenario[key] = value
+    if scenario['days'] is None and not scenario['until_extinction']:
+        raise ValueError("Number of days (--days) is needed without --until-extinction")
+    return scenario
+
+
+def create_paddock(scenario: dict) -> Paddock:
+    """
+    Create and initialize the paddock described by scenario
+    """
+    events = EventBus([StdoutSink()] if scenario['events'] == 'stdout' else [])
+    if scenario.get('events_file'):
+        events.subscribe(JsonLinesSink(scenario['events_file']))
+    name_provider = FileNameProvider(scenario['names_file']) if scenario.get('names_file') else None
+    grid_size = None
+    if scenario.get('grid'):
+        width, _, height = str(scenario['grid']).lower().partition('x')
+        if not width.isdigit() or not height.isdigit():
+            raise ValueError(f"Invalid grid size '{scenario['grid']}' (expected WIDTHxHEIGHT)")
+        grid_size = (int(width), int(height))
+    dead_animals_in_report = scenario.get('dead_animals_in_report')
+    if dead_animals_in_report is not None and dead_animals_in_report < 0:
+        raise ValueError("Number of dead animals in report (--dead-animals-in-report) can't be negative")
+    if dead_animals_in_report is None and scenario['report_level'] == 'summary':
+        # A summary report doesn't list animals : dead animals are only counted
+        dead_animals_in_report = 0
+    paddock = Paddock(dead_animals_in_report=dead_animals_in_report, engine=scenario['engine'], plant_engine=scenario['plant_engine'], events=events,
+                      name_provider=name_provider, seed=scenario.get('seed'), grid_size=grid_size, radius=scenario['radius'],
+                      move_distance=scenario['move_distance'])
+    if scenario.get('binary') and is_snapshot(scenario['binary']):
+        # Columns of a snapshot file are mapped in memory (the engines are the ones of the snapshot)
+        paddock = load_snapshot(scenario['binary'], events, name_provider)
+    elif scenario.get('binary') and is_journal(scenario['binary']):
+        paddock = load_journal(scenario['binary'], events=events, name_provider=name_provider)
+    elif scenario.get('binary') and not paddock.load_simulation_from_binary(scenario['binary']):
+        raise ValueError(f"Binary file {scenario['binary']} can't be loaded")
+    if scenario.get('binary') and scenario.get('seed') is not None:
+        # The seed of the scenario replaces the generator stored in the binary file
+        paddock.set_rng(scenario['seed'])
+    # The report level of the scenario is used (even with a loaded binary file)
+    paddock.set_report_level(scenario['report_level'], scenario['report_sample_size'])
+    if scenario.get('binary') and scenario.get('dead_animals_in_report') is not None:
+        paddock.graveyard.history_size = scenario['dead_animals_in_report']
+    if scenario.get('config') and not paddock.load_from_json(filename=scenario['config']):
+        raise ValueError(f"JSON file {scenario['config']} can't be loaded")
+    paddock.add_plants(scenario['plants'])
+    for description in scenario['animals']:
+        if (animal := create_animal(description, paddock.rng, paddock.rules)) is None:
+            raise ValueError(f"Invalid animal description '{description}'")
+        paddock.add_animal(animal)
+    if scenario.get('replay_log'):
+        check_replayable(paddock)
+        paddock.events.subscribe(ReplayLogSink(scenario['replay_log'], new_plants=paddock.plant_store is None))
+    return paddock
+
+
+def create_results(paddock: Paddock, nb_days: int, elapsed: float) -> dict:
+    """
+    Return final results of a simulation (JSON serializable)
+    """
+    species_summary = paddock.species_summary()
+    return {'seed': paddock.rng.entropy,
+            'simulated_days': nb_days,
+            'paddock_age': paddock.paddock_age,
+            'elapsed_seconds': elapsed,
+            'days_per_second': nb_days / elapsed if elapsed > 0 else None,
+            'all_animals_are_dead': paddock.all_animals_are_dead(),
+            'alive_by_species': {species_name: row['alive'] for species_name, row in species_summary.items() if row['alive']},
+            'species_summary': species_summary}
+
+
+def run_batch(argv: list[str] | None = None) -> dict:
+    """
+    Run a simulation without interaction with command line arguments argv (sys.argv[1:] if None).
+    Return final results
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    try:
+        scenario = load_scenario(args)
+        paddock = create_paddock(scenario)
+        if scenario.get('journal'):
+            # The initial paddock is the first record of the journal
+            paddock.set_journal(Journal(scenario['journal'], base_every=scenario['journal_base_every']))
+        if scenario.get('metrics'):
+            if not scenario['metrics'].endswith(('.csv', '.npy')):
+                raise ValueError(f"Unknown metrics file format {scenario['metrics']} (expected a .csv or .npy file)")
+            paddock.set_metrics(MetricsRecorder(scenario['metrics_days_per_row'], scenario.get('metrics_max_rows')))
+        if scenario.get('profile') or scenario.get('profile_trace'):
+            paddock.set_profiler(DayProfiler(trace=bool(scenario.get('profile_trace'))))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    try:
+        start = time.perf_counter()
+        nb_days = paddock.run_days(scenario['days'], scenario['until_extinction'], scenario['report_every'])
+        elapsed = time.perf_counter() - start
+    finally:
+        paddock.events.close()
+        if paddock.journal is not None:
+            paddock.journal.close()
+
+    # Final report (if it was not displayed by the last day)
+    if scenario['report_every'] <= 0 or nb_days % scenario['report_every'] != 0:
+        print(paddock.create_report())
+    results = create_results(paddock, nb_days, elapsed)
+    print(f"{nb_days} day(s) simulated in {elapsed:.3f}s")
+    if scenario.get('save_simulation'):
+        paddock.store_simulation_to_binary(scenario['save_simulation'])
+    if scenario.get('save_snapshot'):
+        write_snapshot(paddock, scenario['save_snapshot'])
+        print(f"Snapshot file {scenario['save_snapshot']} written")
+    if paddock.metrics is not None:
+        paddock.metrics.export(scenario['metrics'])
+        print(f"Metrics file {scenario['metrics']} written ({paddock.metrics.nb_rows} row(s) of {paddock.metrics.days_per_row} day(s))")
+    if paddock.profiler is not None:
+        results['profile'] = paddock.profiler.to_dict()
+        if scenario.get('profile'):
+            print(paddock.profiler.create_table(), end="")
+        if scenario.get('profile_trace'):
+            paddock.profiler.write_chrome_trace(scenario['profile_trace'])
+            print(f"Chrome trace {scenario['profile_trace']} written")
+    if scenario.get('output'):
+        with open(scenario['output'], 'w') as fp:
+            json.dump(results, fp, indent=4)
+    return results
+
+
+def run_replay_command(argv: list[str] | None = None) -> dict:
+    """
+    Rebuild a day of a simulation with command line arguments argv (see create_replay_parser) and verify the replay
+    against a journal of the simulation. Return results of the rebuilt paddock
+    """
+    parser = create_replay_parser()
+    args = parser.parse_args(argv)
+    try:
+        scenario = load_scenario(args)
+        if not scenario.get('replay_log'):
+            raise ValueError("The replay log (--replay-log) is needed")
+        if scenario['days'] is None:
+            raise ValueError("Number of days (--days) is needed")
+        start = None
+        if any(scenario.get(key) for key in ['config', 'binary', 'plants', 'animals']):
+            # The initial paddock is created like the one of the simulation (no event, nothing is recorded)
+            start = create_paddock({**scenario, 'events': 'none', 'events_file': None, 'replay_log': None})
+        day = (start.paddock_age if start is not None else 0) + scenario['days']
+        begin = time.perf_counter()
+        paddock, nb_days = seek_to_day(scenario['replay_log'], day, start, args.checkpoints, events=EventBus())
+        elapsed = time.perf_counter() - begin
+        verification = verify_replay(scenario['replay_log'], args.verify) if args.verify else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    paddock.set_report_level(scenario['report_level'], scenario['report_sample_size'])
+    print(paddock.create_report())
+    print(f"Day {day} rebuilt : {nb_days} day(s) replayed in {elapsed:.3f}s")
+    if verification is not None:
+        if verification['first_different_day'] is None:
+            print(f"Replay verified : {verification['identical_days']} day(s) identical to the journal {args.verify}")
+        else:
+            print(f"Replay differs from the journal {args.verify} at day {verification['first_different_day']} : {', '.join(verification['differences'])}")
+    results = {'paddock_age': paddock.paddock_age, 'replayed_days': nb_days, 'elapsed_seconds': elapsed,
+               'species_summary': paddock.species_summary(), 'verification': verification}
+    if scenario.get('save_simulation'):
+        paddock.store_simulation_to_binary(scenario['save_simulation'])
+    if scenario.get('save_snapshot'):
+        write_snapshot(paddock, scenario['save_snapshot'])
+        print(f"Snapshot file {scenario['save_snapshot']} written")
+    if scenario.get('output'):
+        with open(scenario['output'], 'w') as fp:
+            json.dump(results, fp, indent=4)
+    return results
@@ -0,0 +1,280 @@
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import tempfile
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .paddock import Paddock, ENGINES, PLANT_ENGINES
+from .events import EventBus
+from .profiling import DayProfiler, PHASES
+from .rules import Rules, DEFAULT_RULES
+
+# Relative change beyond which a measure is flagged as a regression
+DEFAULT_TOLERANCE = 0.1
+# Seed of the scenarios (the same seed and scale give the same workload)
+DEFAULT_SEED = 1
+# Measures compared with a baseline : True if a higher value is better
+COMPARED_MEASURES = {'days_per_second': True, 'peak_memory_mb': False}
+# Number of phases (the longest ones) displayed for each scenario in the report
+DISPLAYED_PHASES = 4
+
+
+class Scenario():
+    """
+    A class to represent a scenario of the benchmark : an initial paddock, a number of days to simulate and optionally
+    the storage of the paddock in files (JSON configuration and binary file) and its loading.
+
+    ...
+
+    Attributes
+    ----------
+    description : str
+        What the scenario measures
+    plants : int
+        Number of plants of the initial paddock (multiplied by the scale of the benchmark)
+    animals : list
+        (species name, number of animals, age or None) of each group of animals of the initial paddock (numbers are multiplied by the scale)
+    nb_days : int
+        Number of days to simulate (maximum number of days if until_extinction is True)
+    until_extinction : bool
+        Stop the simulation when all animals are dead (like the 'u' command)
+    rules : Rules
+        Rules of the simulation
+    store : bool
+        If True, the paddock is stored in a JSON file and a binary file after the days, then loaded from them
+
+    Methods
+    -------
+    create_paddock(scale, engine, plant_engine, seed):
+        Create the initial paddock of the scenario
+    """
+
+    def __init__(self, description: str, plants: int, animals: list[tuple[str, int, int | None]], nb_days: int,
+                 until_extinction: bool = False, rules: Rules = DEFAULT_RULES, store: bool = False) -> None:
+        """
+        Construct a scenario (see attributes)
+        """
+        self.description = description
+        self.plants = plants
+        self.animals = animals
+        self.nb_days = nb_days
+        self.until_extinction = until_extinction
+        self.rules = rules
+        self.store = store
+
+    def create_paddock(self, scale: float = 1.0, engine: str = 'objects', plant_engine: str = 'objects', seed: int = DEFAULT_SEED) -> Paddock:
+        """
+        Create the initial paddock of the scenario with numbers of entities multiplied by scale (at least 1 of each group)
+        """
+        paddock = Paddock(dead_animals_in_report=0, engine=engine, plant_engine=plant_engine, events=EventBus(), seed=seed, rules=self.rules,
+                          report_level='summary')
+        paddock.add_plants(max(1, round(self.plants * scale)))
+        for species_name, nb_animals, ages in self.animals:
+            paddock.add_animals(species_name, max(1, round(nb_animals * scale)), ages=ages)
+        return paddock
+
+
+# Scenarios of the benchmark (sizes with scale 1)
+SCENARIOS = {
+    'plant_explosion': Scenario("1000 plants without animal, 35 days (about 75000 plants at the end)", 1000, [], 35),
+    'carnivores_vs_plants': Scenario("1000 carnivores and 100000 plants (no food for carnivores), 5 days", 100000,
+                                     [('Lion', 334, None), ('Tiger', 333, None), ('Coyote', 333, None)], 5),
+    'baby_boom': Scenario("2000 herbivores old enough to make babies and 20000 plants, 10 days", 20000,
+                          [('Antelope', 1000, 5), ('Elephant', 500, 5), ('Giraffe', 500, 5)], 10),
+    'long_run': Scenario("Run until all animals are dead like the 'u' command, at most 1095 days (3 years), with rules "
+                         "slowing plants and babies (about 120 days)", 2000,
+                         [('Antelope', 120, None), ('Elephant', 60, None), ('Giraffe', 60, None),
+                          ('Lion', 12, None), ('Tiger', 12, None), ('Coyote', 12, None)], 1095, until_extinction=True,
+                         rules=DEFAULT_RULES.replace(min_pv_to_split_plant=20, time_before_new_baby=5, pv_obtained_herbivore_by_plant=4,
+                                                     pv_obtained_carnivorous_by_animal=4)),
+    'save_load': Scenario("1000000 entities stored in a JSON file and a binary file, then loaded", 990000,
+                          [('Antelope', 4000, None), ('Elephant', 2000, None), ('Giraffe', 2000, None),
+                           ('Lion', 700, None), ('Tiger', 700, None), ('Coyote', 600, None)], 0, store=True),
+}
+
+
+def peak_memory_mb() -> float:
+    """
+    Return the peak resident memory of the process (MB)
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def store_and_load(paddock: Paddock, engine: str, plant_engine: str) -> dict:
+    """
+    Store paddock in a JSON file and in a binary file of a temporary directory, then load both files in new paddocks.
+    Return the time of each operation (seconds) and the size of each file (bytes)
+    """
+    timings = {}
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+        json_file, binary_file = os.path.join(directory, "paddock.json"), os.path.join(directory, "paddock.binary")
+        for operation, function in [('json_store', lambda: paddock.store_in_json(json_file)),
+                                    ('json_load', lambda: Paddock(engine=engine, plant_engine=plant_engine, events=EventBus()).load_from_json(json_file)),
+                                    ('binary_store', lambda: paddock.store_simulation_to_binary(binary_file)),
+                                    ('binary_load', lambda: Paddock(events=EventBus()).load_simulation_from_binary(binary_file))]:
+            start = time.perf_counter()
+            if not function():
+                raise ValueError(f"Operation {operation} of the benchmark failed")
+            timings[operation] = time.perf_counter() - start
+        timings['json_bytes'] = os.path.getsize(json_file)
+        timings['binary_bytes'] = os.path.getsize(binary_file)
+    return timings
+
+
+def run_scenario(name: str, scale: float = 1.0, engine: str = 'objects', plant_engine: str = 'objects', seed: int = DEFAULT_SEED) -> dict:
+    """
+    Run the scenario name of SCENARIOS with a profiler. Return its results (JSON serializable) : time to create the paddock,
+    simulated days, time of the days, days per second, alive entities at the end, profile of the days, time of each storage
+    operation (for a scenario storing the paddock) and peak memory of the process
+    """
+    scenario = SCENARIOS[name]
+    start = time.perf_counter()
+    paddock = scenario.create_paddock(scale, engine, plant_engine, seed)
+    creation_seconds = time.perf_counter() - start
+    profiler = DayProfiler()
+    paddock.set_profiler(profiler)
+    start = time.perf_counter()
+    nb_days = paddock.run_days(scenario.nb_days, scenario.until_extinction, report_every=0)
+    elapsed = time.perf_counter() - start
+    results = {'description': scenario.description,
+               'creation_seconds': creation_seconds,
+               'simulated_days': nb_days,
+               'elapsed_seconds': elapsed,
+               'days_per_second': nb_days / elapsed if nb_days and elapsed > 0 else None,
+               'alive': sum(paddock.count_alive_by_species()),
+               'profile': profiler.to_dict()}
+    if scenario.store:
+        results['storage'] = store_and_load(paddock, engine, plant_engine)
+    results['peak_memory_mb'] = peak_memory_mb()
+    return results
+
+
+def run_benchmark(names: list[str] | None = None, scale: float = 1.0, engine: str = 'objects', plant_engine: str = 'objects',
+                  seed: int = DEFAULT_SEED, isolated: bool = True) -> dict:
+    """
+    Run the scenarios names (all scenarios of SCENARIOS if None) and return the results of the benchmark (JSON serializable).
+    With isolated, each scenario runs in a new process (started with 'spawn'), so its peak memory is its own and scenarios
+    don't share caches. Otherwise scenarios run in this process (peak memory is the one of the process)
+    """
+    names = names or list(SCENARIOS)
+    if unknown_names := [name for name in names if name not in SCENARIOS]:
+        raise ValueError(f"Unknown scenario(s) {', '.join(unknown_names)} (available scenarios : {', '.join(SCENARIOS)})")
+    if scale <= 0:
+        raise ValueError(f"Scale must be positive (not {scale})")
+    results: dict = {'scale': scale, 'engine': engine, 'plant_engine': plant_engine, 'seed': seed,
+                     'python': platform.python_version(), 'machine': platform.machine(), 'scenarios': {}}
+    for name in names:
+        if isolated:
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+                results['scenarios'][name] = executor.submit(run_scenario, name, scale, engine, plant_engine, seed).result()
+        else:
+            results['scenarios'][name] = run_scenario(name, scale, engine, plant_engine, seed)
+    return results
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    """
+    Compare the results of a benchmark with the ones of baseline (same scale and engines). Return the regressions : measures of
+    COMPARED_MEASURES and storage times worse than the baseline by more than tolerance (relative change). Scenarios missing
+    in baseline are not compared. Raise a ValueError if baseline was run with another scale or other engines
+    """
+    for key in ['scale', 'engine', 'plant_engine']:
+        if baseline.get(key) != results[key]:
+            raise ValueError(f"The baseline was run with {key} {baseline.get(key)} (not {results[key]}) : results can't be compared")
+    regressions = []
+    for name, scenario_results in results['scenarios'].items():
+        if (baseline_results := baseline.get('scenarios', {}).get(name)) is None:
+            continue
+        measures = [(measure, scenario_results.get(measure), baseline_results.get(measure), higher_is_better)
+                    for measure, higher_is_better in COMPARED_MEASURES.items()]
+        measures += [(operation, seconds, baseline_results.get('storage', {}).get(operation), False)
+                     for operation, seconds in scenario_results.get('storage', {}).items() if not operation.endswith('_bytes')]
+        for measure, value, baseline_value, higher_is_better in measures:
+            if not value or not baseline_value:
+                continue
+            change = value / baseline_value - 1
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append({'scenario': name, 'measure': measure, 'baseline': baseline_value, 'value': value, 'change': change})
+    return regressions
+
+
+def create_benchmark_report(results: dict) -> str:
+    """
+    Create a report with one line per scenario (days per second, peak memory), its longest phases, its storage times
+    and the regressions found against a baseline
+    """
+    lines = [f"Benchmark : scale {results['scale']}, engine {results['engine']}, plant engine {results['plant_engine']}, seed {results['seed']}\n",
+             f"{'Scenario':<22}{'Days':>6}{'Time (s)':>10}{'Days/s':>10}{'Alive':>10}{'Peak MB':>10}\n"]
+    for name, scenario_results in results['scenarios'].items():
+        days_per_second = scenario_results['days_per_second']
+        lines.append(f"{name:<22}{scenario_results['simulated_days']:>6}{scenario_results['elapsed_seconds']:>10.3f}"
+                     f"{'-' if days_per_second is None else f'{days_per_second:.2f}':>10}{scenario_results['alive']:>10}"
+                     f"{scenario_results['peak_memory_mb']:>10.1f}\n")
+        profile = scenario_results['profile']
+        if profile['day_seconds'] > 0:
+            phases = sorted((phase for phase in PHASES if profile['phases'][phase]['seconds'] > 0),
+                            key=lambda phase: profile['phases'][phase]['seconds'], reverse=True)[:DISPLAYED_PHASES]
+            lines.append("    phases : " + ", ".join(f"{phase} {profile['phases'][phase]['seconds'] / profile['day_seconds']:.0%}" for phase in phases) + "\n")
+        if storage := scenario_results.get('storage'):
+            lines.append("    storage : " + ", ".join(f"{operation} {seconds:.2f}s" for operation, seconds in storage.items() if not operation.endswith('_bytes'))
+                         + f" (JSON {storage['json_bytes'] / 1e6:.1f} MB, binary {storage['binary_bytes'] / 1e6:.1f} MB)\n")
+    if 'regressions' in results:
+        lines.append(f"{len(results['regressions'])} regression(s) against the baseline (tolerance {results['tolerance']:.0%})\n")
+        for regression in results['regressions']:
+            lines.append(f"    {regression['scenario']} {regression['measure']} : {regression['baseline']:.3f} -> {regression['value']:.3f} ({regression['change']:+.1%})\n")
+    return "".join(lines)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line of the benchmark
+    """
+    parser = argparse.ArgumentParser(prog='main.py bench',
+                                     description="Run performance scenarios (days per second, peak memory, time of each phase of the days) "
+                                                 "and compare them with a baseline")
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run (all by default : {', '.join(SCENARIOS)})")
+    parser.add_argument('--list', action='store_true', help="List the scenarios and exit")
+    parser.add_argument('--scale', type=float, default=1.0, help="Factor applied to the numbers of entities of the scenarios")
+    parser.add_argument('--engine', choices=ENGINES, default='objects', help="Engine used to simulate a day")
+    parser.add_argument('--plant-engine', choices=PLANT_ENGINES, default='objects', help="Engine used to hold plants (with the 'objects' engine)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f"Seed of the scenarios (default {DEFAULT_SEED})")
+    parser.add_argument('--in-process', action='store_true', help="Run scenarios in this process (by default, each scenario runs in a new process)")
+    parser.add_argument('--output', help="JSON file where results are written (a baseline for later runs)")
+    parser.add_argument('--baseline', help="JSON file of previous results : measures worse than the baseline are flagged as regressions")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help=f"Relative change flagged as a regression (default {DEFAULT_TOLERANCE})")
+    return parser
+
+
+def run_benchmark_command(argv: list[str] | None = None) -> dict:
+    """
+    Run the benchmark with command line arguments argv, display its report and return its results
+    ('regressions' is set when a baseline is given)
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    if args.list:
+        for name, scenario in SCENARIOS.items():
+            print(f"{name:<22}{scenario.description}")
+        return {}
+    try:
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as fp:
+                baseline = json.load(fp)
+        results = run_benchmark(args.scenarios, args.scale, args.engine, args.plant_engine, args.seed, not args.in_process)
+        if baseline is not None:
+            results['tolerance'] = args.tolerance
+            results['regressions'] = compare_results(results, baseline, args.tolerance)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(create_benchmark_report(results), end="")
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=4)
+    return results
@@ -0,0 +1,324 @@
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import os
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .paddock import Paddock, ENGINES, PLANT_ENGINES
+from .vector_engine import SPECIES
+from .events import EventBus
+from .random_streams import SimulationRandom
+from .rules import Rules
+
+# Column of each species in trajectories (same order as SPECIES)
+SPECIES_NAMES = [species.__name__ for species in SPECIES]
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+# Initial number of days of trajectories and statistics (arrays are doubled when a run goes further, up to the maximum number of days)
+INITIAL_DAYS = 256
+
+
+def _grow_days(array: np.ndarray, day: int, max_day: int, fill_value=0, axis: int = 0) -> np.ndarray:
+    """
+    Return array (days along axis) with room for day : its capacity is doubled, at most max_day + 1 days (new days are fill_value)
+    """
+    capacity = array.shape[axis]
+    if day < capacity:
+        return array
+    shape = list(array.shape)
+    shape[axis] = min(max(day + 1, 2 * capacity), max_day + 1) - capacity
+    return np.concatenate([array, np.full(shape, fill_value, dtype=array.dtype)], axis=axis)
+
+
+def run_member(config: str, rng: SimulationRandom, nb_days: int, until_extinction: bool = False,
+               engine: str = 'objects', plant_engine: str = 'objects', rules: Rules | None = None) -> tuple[np.ndarray, int | None]:
+    """
+    Run one simulation of an ensemble : the configuration (a JSON file written by Paddock.store_in_json) is loaded
+    and the paddock uses rng and rules (DEFAULT_RULES if None). Return (trajectory, extinction_day) :
+    trajectory is an array (simulated days + 1, len(SPECIES)) of alive entities each day (line 0 : loaded configuration, its memory
+    grows with the simulated days, not with nb_days), extinction_day is the first day without alive animal (None if animals are still alive)
+    """
+    # Reports of members are never displayed : dead animals are only counted
+    paddock = Paddock(dead_animals_in_report=0, engine=engine, plant_engine=plant_engine, events=EventBus(), rules=rules, report_level='summary')
+    # Hundreds of runs : the loading message is not displayed
+    with contextlib.redirect_stdout(io.StringIO()):
+        loaded = paddock.load_from_json(filename=config)
+    if not loaded:
+        raise ValueError(f"JSON file {config} can't be loaded")
+    paddock.set_rng(rng)
+
+    trajectory = np.zeros((min(nb_days, INITIAL_DAYS) + 1, len(SPECIES)), dtype=np.int64)
+    trajectory[0] = paddock.count_alive_by_species()
+    extinction_day = 0 if paddock.all_animals_are_dead() else None
+    day = 0
+    while day < nb_days and not (until_extinction and extinction_day is not None):
+        day += 1
+        paddock.and_one_more_day(display_report=False)
+        trajectory = _grow_days(trajectory, day, nb_days)
+        trajectory[day] = paddock.count_alive_by_species()
+        if extinction_day is None and paddock.all_animals_are_dead():
+            extinction_day = day
+    return trajectory[:day + 1].copy(), extinction_day
+
+
+class EnsembleStatistics():
+    """
+    Streaming statistics of an ensemble of runs. Runs are added one by one and are not kept :
+    for each day and species, mean and variance of the number of alive entities are updated with Welford's algorithm
+    and quantiles are estimated on a reservoir sample of at most reservoir_size runs (memory doesn't grow with the number of runs).
+    A run stopped before nb_days (extinction) only counts for the days it simulated, arrays grow with the longest run (not with nb_days).
+
+    ...
+
+    Attributes
+    ----------
+    nb_days : int
+        Maximum number of simulated days of a run
+    quantiles : tuple
+        Probabilities of the quantiles (e.g. 0.5 for the median)
+    nb_runs : int
+        Number of added runs
+    runs_by_day : numpy array
+        Number of runs having simulated each day
+    mean : numpy array
+        Mean number of alive entities for each day and species
+    reservoir : numpy array
+        Trajectories of a uniform sample of the runs (NaN after the last day of a run)
+    extinction_days : numpy array
+        Number of runs whose animals all died on each day
+    runs_without_extinction : int
+        Number of runs with alive animals on their last day
+
+    Methods
+    -------
+    add_run(trajectory, extinction_day):
+        Update statistics with a run
+
+    variance():
+        Return the variance of alive entities for each day and species
+
+    quantile_values():
+        Return the estimated quantiles of alive entities for each day and species
+
+    extinction_summary():
+        Return statistics about extinction days
+
+    to_dict():
+        Return all statistics (JSON serializable)
+    """
+
+    def __init__(self, nb_days: int, quantiles=DEFAULT_QUANTILES, reservoir_size: int = 200, rng: np.random.Generator | None = None) -> None:
+        """
+        Construct empty statistics for runs of at most nb_days days (rng is used to sample the reservoir)
+        """
+        if reservoir_size < 1:
+            raise ValueError("Reservoir size must be positive")
+        if not all(0 <= q <= 1 for q in quantiles):
+            raise ValueError("Quantiles must be between 0 and 1")
+        self.nb_days = nb_days
+        self.quantiles = tuple(quantiles)
+        self.nb_runs = 0
+        self.last_day = 0
+        capacity = min(nb_days, INITIAL_DAYS) + 1
+        self.runs_by_day = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros((capacity, len(SPECIES)))
+        self._m2 = np.zeros((capacity, len(SPECIES)))
+        self.reservoir_size = reservoir_size
+        self.reservoir = np.full((reservoir_size, capacity, len(SPECIES)), np.nan)
+        self.extinction_days = np.zeros(capacity, dtype=np.int64)
+        self.runs_without_extinction = 0
+        self._rng = rng if rng is not None else np.random.default_rng()
+
+    def _reserve(self, last_day: int) -> None:
+        """
+        Grow arrays to hold days up to last_day (capacity is doubled, at most nb_days + 1 days)
+        """
+        if last_day < len(self.runs_by_day):
+            return
+        self.runs_by_day = _grow_days(self.runs_by_day, last_day, self.nb_days)
+        self.extinction_days = _grow_days(self.extinction_days, last_day, self.nb_days)
+        self.mean = _grow_days(self.mean, last_day, self.nb_days)
+        self._m2 = _grow_days(self._m2, last_day, self.nb_days)
+        self.reservoir = _grow_days(self.reservoir, last_day, self.nb_days, np.nan, axis=1)
+
+    def add_run(self, trajectory: np.ndarray, extinction_day: int | None) -> None:
+        """
+        Update statistics with a run (trajectory : alive entities for each day and species, see run_member)
+        """
+        length = len(trajectory)
+        self._reserve(length - 1)
+        self.nb_runs += 1
+        self.last_day = max(self.last_day, length - 1)
+        self.runs_by_day[:length] += 1
+        # Welford's algorithm on the days simulated by the run
+        delta = trajectory - self.mean[:length]
+        self.mean[:length] += delta / self.runs_by_day[:length, None]
+        self._m2[:length] += delta * (trajectory - self.mean[:length])
+        # Reservoir sampling : each run has the same probability to be in the reservoir
+        row = self.nb_runs - 1 if self.nb_runs <= self.reservoir_size else int(self._rng.integers(self.nb_runs))
+        if row < self.reservoir_size:
+            self.reservoir[row] = np.nan
+            self.reservoir[row, :length] = trajectory
+        if extinction_day is None:
+            self.runs_without_extinction += 1
+        else:
+            self.extinction_days[extinction_day] += 1
+
+    def variance(self) -> np.ndarray:
+        """
+        Return the variance (unbiased) of alive entities for each day and species (NaN with less than 2 runs)
+        """
+        degrees = (self.runs_by_day - 1)[:, None]
+        return np.divide(self._m2, degrees, out=np.full_like(self._m2, np.nan), where=degrees > 0)
+
+    def quantile_values(self) -> np.ndarray:
+        """
+        Return the estimated quantiles of alive entities : an array (len(quantiles), days, species)
+        """
+        sample = self.reservoir[:min(self.nb_runs, self.reservoir_size), :self.last_day + 1]
+        with warnings.catch_warnings():
+            # Days simulated by no run of the reservoir give NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanquantile(sample, self.quantiles, axis=0)
+
+    def extinction_summary(self) -> dict:
+        """
+        Return the number of runs with an extinction, the mean extinction day and its quantiles (among runs with an extinction)
+        """
+        nb_extinctions = int(self.extinction_days.sum())
+        summary: dict = {'runs_with_extinction': nb_extinctions, 'runs_without_extinction': self.runs_without_extinction,
+                         'mean_day': None, 'quantiles': {}}
+        if nb_extinctions:
+            days = np.arange(len(self.extinction_days))
+            summary['mean_day'] = float((days * self.extinction_days).sum() / nb_extinctions)
+            cumulative = np.cumsum(self.extinction_days)
+            for q in self.quantiles:
+                summary['quantiles'][str(q)] = int(np.searchsorted(cumulative, max(q * nb_extinctions, 1)))
+        return summary
+
+    def to_dict(self) -> dict:
+        """
+        Return all statistics (JSON serializable) : for each species having lived, mean, standard deviation and quantiles by day
+        """
+        days = slice(0, self.last_day + 1)
+        standard_deviations = np.sqrt(self.variance()[days])
+        quantile_values = self.quantile_values()
+        species = {}
+        for column, species_name in enumerate(SPECIES_NAMES):
+            if not self.mean[days, column].any():
+                continue
+            species[species_name] = {'mean': self.mean[days, column].tolist(),
+                                     'std': [None if np.isnan(value) else value for value in standard_deviations[:, column].tolist()],
+                                     'quantiles': {str(q): [None if np.isnan(value) else value for value in quantile_values[position, :, column].tolist()]
+                                                   for position, q in enumerate(self.quantiles)}}
+        return {'runs': self.nb_runs,
+                'days': self.last_day,
+                'runs_by_day': self.runs_by_day[days].tolist(),
+                'species': species,
+                'extinction': self.extinction_summary()}
+
+
+def map_in_order(function, tasks, workers: int | None = None):
+    """
+    Yield function(*task) for each task of tasks, computed in worker processes (os.cpu_count() if workers is None,
+    no process if workers is 1). Results are yielded in the order of tasks and at most 2 tasks per worker are waiting,
+    so results are not accumulated
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield function(*task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque = deque()
+        for task in tasks:
+            pending.append(executor.submit(function, *task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_ensemble(config: str, nb_runs: int, nb_days: int, until_extinction: bool = False, seed: int | None = None,
+                 workers: int | None = None, engine: str = 'objects', plant_engine: str = 'objects',
+                 quantiles=DEFAULT_QUANTILES, reservoir_size: int = 200) -> EnsembleStatistics:
+    """
+    Run nb_runs simulations of the configuration config (a JSON file written by Paddock.store_in_json) in worker processes
+    and return their statistics. Each run uses its own stream of the generator seeded with seed (the same seed gives the same
+    statistics, whatever the number of workers). workers : number of processes (os.cpu_count() if None, no process if 1).
+    Runs are submitted by small windows and their results are added in order, then dropped
+    """
+    if nb_runs < 1 or nb_days < 0:
+        raise ValueError("The number of runs must be positive and the number of days can't be negative")
+    root_rng = SimulationRandom(seed)
+    statistics = EnsembleStatistics(nb_days, quantiles, reservoir_size, root_rng.numpy)
+    tasks = ((config, stream, nb_days, until_extinction, engine, plant_engine) for stream in root_rng.spawn(nb_runs))
+    for trajectory, extinction_day in map_in_order(run_member, tasks, workers):
+        statistics.add_run(trajectory, extinction_day)
+    return statistics
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line of the ensemble runner
+    """
+    parser = argparse.ArgumentParser(prog='main.py ensemble',
+                                     description="Run the same configuration many times (one seed per run) and display statistics")
+    parser.add_argument('config', help="JSON configuration file (written by the 's' command)")
+    parser.add_argument('--runs', type=int, default=100, help="Number of runs")
+    parser.add_argument('--days', type=int, required=True, help="Number of days of each run (maximum number of days with --until-extinction)")
+    parser.add_argument('--until-extinction', action='store_true', help="Stop each run when all animals are dead")
+    parser.add_argument('--seed', type=int, help="Seed of the ensemble (the same seed gives the same statistics)")
+    parser.add_argument('--workers', type=int, help="Number of worker processes (number of CPUs by default)")
+    parser.add_argument('--engine', choices=ENGINES, default='objects', help="Engine used to simulate a day")
+    parser.add_argument('--plant-engine', choices=PLANT_ENGINES, default='objects', help="Engine used to hold plants (with the 'objects' engine)")
+    parser.add_argument('--quantiles', default=','.join(str(q) for q in DEFAULT_QUANTILES), help="Probabilities of the quantiles, e.g. 0.05,0.5,0.95")
+    parser.add_argument('--reservoir-size', type=int, default=200, help="Number of runs kept to estimate quantiles")
+    parser.add_argument('--output', help="JSON file where statistics are written")
+    return parser
+
+
+def create_ensemble_report(statistics: EnsembleStatistics, seed: int) -> str:
+    """
+    Create a report with the populations of the last day and the extinction days
+    """
+    day = statistics.last_day
+    standard_deviations = np.sqrt(statistics.variance()[day])
+    day_quantiles = statistics.quantile_values()[:, day]
+    lines = [f"{statistics.nb_runs} run(s), seed {seed}, day {day} ({statistics.runs_by_day[day]} run(s))\n",
+             f"{'Species':<10}{'Mean':>10}{'Std':>10}" + "".join(f"{'Q' + str(q):>10}" for q in statistics.quantiles) + "\n"]
+    for column, species_name in enumerate(SPECIES_NAMES):
+        if statistics.mean[:day + 1, column].any():
+            std = "-" if np.isnan(standard_deviations[column]) else f"{standard_deviations[column]:.1f}"
+            lines.append(f"{species_name:<10}{statistics.mean[day, column]:>10.1f}{std:>10}" + "".join(f"{value:>10.1f}" for value in day_quantiles[:, column]) + "\n")
+    extinction = statistics.extinction_summary()
+    lines.append(f"Extinction : {extinction['runs_with_extinction']} run(s)")
+    if extinction['mean_day'] is not None:
+        lines.append(f", mean day {extinction['mean_day']:.1f}, quantiles " + ", ".join(f"Q{q} {d}" for q, d in extinction['quantiles'].items()))
+    lines.append("\n")
+    return "".join(lines)
+
+
+def run_ensemble_command(argv: list[str] | None = None) -> dict:
+    """
+    Run an ensemble with command line arguments argv, display its report and return its statistics
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    try:
+        quantiles = [float(q) for q in args.quantiles.split(',')]
+        seed = args.seed if args.seed is not None else SimulationRandom().entropy
+        statistics = run_ensemble(args.config, args.runs, args.days, args.until_extinction, seed, args.workers,
+                                  args.engine, args.plant_engine, quantiles, args.reservoir_size)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(create_ensemble_report(statistics, seed), end="")
+    results = {'seed': seed, **statistics.to_dict()}
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp)
+    return results
@@ -0,0 +1,540 @@
+from __future__ import annotations
+import math
+from typing import TYPE_CHECKING
+from .events import DEFAULT_EVENT_BUS
+from .names_provider import DEFAULT_NAME_PROVIDER
+from .random_streams import GLOBAL_RANDOM
+from .rules import DEFAULT_RULES
+if TYPE_CHECKING:
+    from .profiling import DayProfiler
+
+
+class IndexedSet():
+    """
+    A set of living entities allowing O(1) add, discard and random access
+
+    ...
+
+    Attributes
+    ----------
+    _items : list
+        Entities of the set (order is not preserved by discard)
+    _positions : dict
+        Position of each entity in _items
+
+    Methods
+    -------
+    add(entity):
+        Add entity to the set (nothing is done if entity is already in the set)
+
+    discard(entity):
+        Remove entity from the set (nothing is done if entity is not in the set)
+
+    item(position):
+        Return the entity stored at position
+
+    sort(key):
+        Sort the entities of the set with key
+    """
+
+    def __init__(self) -> None:
+        """
+        Construct an empty IndexedSet
+        """
+        self._items: list = []
+        self._positions: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __contains__(self, entity) -> bool:
+        return entity in self._positions
+
+    def add(self, entity) -> None:
+        """
+        Add entity to the set (nothing is done if entity is already in the set)
+        """
+        if entity not in self._positions:
+            self._positions[entity] = len(self._items)
+            self._items.append(entity)
+
+    def discard(self, entity) -> None:
+        """
+        Remove entity from the set (nothing is done if entity is not in the set)
+        The last entity of the set takes the place of the removed one
+        """
+        position = self._positions.pop(entity, None)
+        if position is not None:
+            last = self._items.pop()
+            if last is not entity:
+                self._items[position] = last
+                self._positions[last] = position
+
+    def position(self, entity) -> int:
+        """
+        Return the position of entity in the set
+        """
+        return self._positions[entity]
+
+    def item(self, position: int):
+        """
+        Return the entity stored at position
+        """
+        return self._items[position]
+
+    def sort(self, key) -> None:
+        """
+        Sort the entities of the set with key (e.g. to put back the order of a stored index)
+        """
+        self._items.sort(key=key)
+        self._positions = {entity: position for position, entity in enumerate(self._items)}
+
+
+class LivingEntityIndex():
+    """
+    An index of the alive living entities of a paddock, keyed by diet class and by species.
+
+    The index is updated by the paddock when an entity is added, dies or gets eaten,
+    so an animal can find its food or its partner without scanning all living entities.
+
+    ...
+
+    Attributes
+    ----------
+    _by_diet : dict
+        For each diet class ('plant', 'herbivore', 'carnivorous'), a dict species -> IndexedSet of alive entities
+    _by_species_and_sex : dict
+        For each (species, sex), a dict (used as an ordered set) of alive animals in insertion order
+    events : EventBus
+        Bus used to emit events of the entities acting with this index
+    name_provider : NameProvider
+        Provider of the names of babies born with this index
+    rng : random.Random
+        Generator used to draw food and the sex of babies (GLOBAL_RANDOM if the index is not owned by a paddock)
+    rules : Rules
+        Rules of the entities acting with this index
+    food_candidates : int
+        Number of candidates considered by random_food (eatable entities the food is drawn among)
+    partner_candidates : int
+        Number of animals tried by partner
+    profiler : DayProfiler or None
+        Profiler timing random_food (feeding) and partner (mating), None : searches are not timed
+
+    Methods
+    -------
+    add(living_entity):
+        Add living_entity to the index (only if living_entity is alive)
+
+    discard(living_entity):
+        Remove living_entity from the index
+
+    refresh(living_entity):
+        Remove living_entity from the index if it is dead
+
+    set_bucket(diet, species, bucket):
+        Use bucket (an IndexedSet or a PlantStore) to hold alive entities of species
+
+    clear():
+        Remove all living entities from the index
+
+    count(species=None, diet=None):
+        Return the number of alive entities (for a species, a diet class or for the whole index)
+
+    random_food(animal):
+        Return a random alive entity that animal can eat (or None)
+
+    partner(animal):
+        Return an alive animal that can make a baby with animal (or None)
+
+    get_order(living_entities):
+        Return the order of the buckets and the position of each of living_entities in its buckets
+
+    set_order(keys, living_entities, ranks):
+        Put back an order given by get_order (in an index holding living_entities)
+    """
+
+    def __init__(self, living_entities=()) -> None:
+        """
+        Construct the index with the alive entities of living_entities
+        """
+        self._by_diet: dict[str, dict[type, IndexedSet]] = {}
+        self._by_species_and_sex: dict[tuple, dict] = {}
+        self.events = DEFAULT_EVENT_BUS
+        self.name_provider = DEFAULT_NAME_PROVIDER
+        self.rng = GLOBAL_RANDOM
+        self.rules = DEFAULT_RULES
+        # Work done by random_food and partner (read by the day profiler)
+        self.food_candidates = 0
+        self.partner_candidates = 0
+        self.profiler: DayProfiler | None = None
+        for living_entity in living_entities:
+            self.add(living_entity)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __iter__(self):
+        for species_buckets in self._by_diet.values():
+            for bucket in species_buckets.values():
+                yield from bucket
+
+    def add(self, living_entity) -> None:
+        """
+        Add living_entity to the index (only if living_entity is alive)
+        """
+        if not living_entity.is_alive:
+            return
+        species = type(living_entity)
+        species_buckets = self._by_diet.setdefault(living_entity.diet, {})
+        if species not in species_buckets:
+            species_buckets[species] = IndexedSet()
+        species_buckets[species].add(living_entity)
+        sex = getattr(living_entity, 'sex', None)
+        if sex is not None:
+            self._by_species_and_sex.setdefault((species, sex), {})[living_entity] = None
+
+    def discard(self, living_entity) -> None:
+        """
+        Remove living_entity from the index
+        """
+        bucket = self._by_diet.get(living_entity.diet, {}).get(type(living_entity))
+        if bucket is not None:
+            bucket.discard(living_entity)
+        sex = getattr(living_entity, 'sex', None)
+        if sex is not None:
+            self._by_species_and_sex.get((type(living_entity), sex), {}).pop(living_entity, None)
+
+    def refresh(self, living_entity) -> None:
+        """
+        Remove living_entity from the index if it is dead
+        """
+        if not living_entity.is_alive:
+            self.discard(living_entity)
+
+    def set_bucket(self, diet: str, species: type, bucket) -> None:
+        """
+        Use bucket (an IndexedSet or a PlantStore) to hold alive entities of species
+        """
+        self._by_diet.setdefault(diet, {})[species] = bucket
+
+    def clear(self) -> None:
+        """
+        Remove all living entities from the index
+        """
+        self._by_diet.clear()
+        self._by_species_and_sex.clear()
+
+    def count(self, species=None, diet=None) -> int:
+        """
+        Return the number of alive entities for species (a class), for a diet class or in the whole index
+        """
+        if species is not None:
+            bucket = self._by_diet.get(species.diet, {}).get(species)
+            return len(bucket) if bucket is not None else 0
+        diets = [diet] if diet is not None else list(self._by_diet)
+        return sum(len(bucket) for d in diets for bucket in self._by_diet.get(d, {}).values())
+
+    def random_food(self, animal):
+        """
+        Return a random alive entity that animal can eat (or None if there is nothing to eat). The search (_draw_food)
+        is timed by profiler if any
+        """
+        if self.profiler is not None:
+            return self.profiler.time_call('feeding', self._draw_food, animal)
+        return self._draw_food(animal)
+
+    def partner(self, animal):
+        """
+        Return an alive animal that can make a baby with animal (or None). The search (_find_partner) is timed by profiler if any
+        """
+        if self.profiler is not None:
+            return self.profiler.time_call('mating', self._find_partner, animal)
+        return self._find_partner(animal)
+
+    def _draw_food(self, animal):
+        """
+        Return a random alive entity that animal can eat (or None if there is nothing to eat).
+
+        Every eatable entity has the same probability to be chosen. We assume that can_eat
+        only depends on the species of the other entity (and on the fact it's alive and it's not animal itself).
+        """
+        eligible_buckets = []
+        total = 0
+        for diet in animal.food_diets:
+            for bucket in self._by_diet.get(diet, {}).values():
+                size = len(bucket) - (1 if animal in bucket else 0)
+                if size > 0:
+                    representative = bucket.item(0) if bucket.item(0) is not animal else bucket.item(1)
+                    if animal.can_eat(representative):
+                        eligible_buckets.append((bucket, size))
+                        total += size
+
+        self.food_candidates += total
+        if total == 0:
+            return None
+
+        drawn = self.rng.randrange(total)
+        for bucket, size in eligible_buckets:
+            if drawn < size:
+                # Skip animal itself if it belongs to the bucket
+                if animal in bucket and drawn >= bucket.position(animal):
+                    drawn += 1
+                return bucket.item(drawn)
+            drawn -= size
+        return None
+
+    def _find_partner(self, animal):
+        """
+        Return an alive animal that can make a baby with animal (or None)
+        As before the index, the most recently added animal is tried first
+        """
+        nb_tried = 0
+        for (species, sex), bucket in self._by_species_and_sex.items():
+            if species is type(animal) and sex != animal.sex:
+                for other_animal in reversed(bucket):
+                    nb_tried += 1
+                    if animal.can_make_baby(other_animal):
+                        self.partner_candidates += nb_tried
+                        return other_animal
+        self.partner_candidates += nb_tried
+        return None
+
+    def get_order(self, living_entities) -> tuple[dict, dict[str, list[int]]]:
+        """
+        Return the order of the index : keys of the buckets ({'buckets': {diet: [species]}, 'partners': [(species, sex)]}) and,
+        for each kind of bucket, the position of each of living_entities in its bucket (-1 if it's not in the index).
+        Random draws depend on this order : an index rebuilt from living_entities needs it to give the same draws
+        """
+        keys = {'buckets': {diet: list(buckets) for diet, buckets in self._by_diet.items()}, 'partners': list(self._by_species_and_sex)}
+        ranks = []
+        for living_entity in living_entities:
+            bucket = self._by_diet.get(living_entity.diet, {}).get(type(living_entity))
+            ranks.append(bucket.position(living_entity) if isinstance(bucket, IndexedSet) and living_entity in bucket else -1)
+        return keys, {'bucket': ranks}
+
+    def set_order(self, keys: dict, living_entities, ranks: dict[str, list[int]]) -> None:
+        """
+        Put back an order given by get_order (the index holds living_entities). Buckets which are not in keys stay at the end
+        """
+        by_diet: dict[str, dict[type, IndexedSet]] = {}
+        for diet, species_list in keys['buckets'].items():
+            buckets = self._by_diet.get(diet, {})
+            by_diet[diet] = {species: buckets[species] if species in buckets else IndexedSet() for species in species_list}
+        for diet, buckets in self._by_diet.items():
+            for species, bucket in buckets.items():
+                by_diet.setdefault(diet, {}).setdefault(species, bucket)
+        self._by_diet = by_diet
+        by_species_and_sex = {key: self._by_species_and_sex.get(key, {}) for key in keys['partners']}
+        self._by_species_and_sex = {**by_species_and_sex, **self._by_species_and_sex}
+
+        bucket_ranks = dict(zip(living_entities, ranks['bucket']))
+        for buckets in self._by_diet.values():
+            for bucket in buckets.values():
+                if isinstance(bucket, IndexedSet):
+                    bucket.sort(key=bucket_ranks.__getitem__)
+
+
+class SpatialLivingEntityIndex(LivingEntityIndex):
+    """
+    An index of the alive living entities of a spatial paddock : each entity has a position (x, y) on a grid
+    of width x height squares and animals move each day. Food and partner are only searched within radius
+    of the animal. Entities are also held in cell buckets (a uniform grid of cells of cell_size squares),
+    so a search only looks at the few cells around the animal : its cost depends on the local density,
+    not on the number of living entities.
+
+    ...
+
+    Attributes
+    ----------
+    width : int
+        Width of the grid (0 <= x < width)
+    height : int
+        Height of the grid (0 <= y < height)
+    radius : float
+        Maximum distance between an animal and its food or its partner
+    move_distance : int
+        Maximum move of an animal each day (in each direction)
+    cell_size : int
+        Size of the cell buckets (radius rounded up)
+    positions : dict
+        Position (x, y) of each alive entity (and of entities placed before being added)
+    _cells : dict
+        For each cell (i, j), an IndexedSet of the alive entities in the cell
+
+    Methods
+    -------
+    place(living_entity, position):
+        Put living_entity at position
+
+    place_near(living_entity, other_living_entity):
+        Put living_entity at a random position next to other_living_entity
+
+    neighbours(living_entity):
+        Return the alive entities within radius of living_entity
+
+    move_animals():
+        Move each alive animal of at most move_distance squares in each direction
+
+    get_order(living_entities) / set_order(keys, living_entities, ranks):
+        Same as LivingEntityIndex, the order of the cell buckets is included
+    """
+
+    def __init__(self, width: int, height: int, radius: float = 5, move_distance: int = 1, living_entities=()) -> None:
+        """
+        Construct the index of a width x height grid with the alive entities of living_entities (at random positions)
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError("Width and height of the grid need to be positiv integers")
+        if radius < 0 or move_distance < 0:
+            raise ValueError("Radius and move distance can't be negative")
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.move_distance = move_distance
+        self.cell_size = max(1, math.ceil(radius))
+        self.positions: dict = {}
+        self._cells: dict[tuple[int, int], IndexedSet] = {}
+        super().__init__(living_entities)
+
+    def _cell(self, position: tuple[int, int]) -> tuple[int, int]:
+        """
+        Return the cell of position
+        """
+        return position[0] // self.cell_size, position[1] // self.cell_size
+
+    def add(self, living_entity) -> None:
+        """
+        Add living_entity to the index (only if living_entity is alive) at its position (a random position if it was not placed)
+        """
+        if not living_entity.is_alive:
+            return
+        super().add(living_entity)
+        position = self.positions.get(living_entity)
+        if position is None:
+            position = (self.rng.randrange(self.width), self.rng.randrange(self.height))
+            self.positions[living_entity] = position
+        self._cells.setdefault(self._cell(position), IndexedSet()).add(living_entity)
+
+    def discard(self, living_entity) -> None:
+        """
+        Remove living_entity from the index
+        """
+        super().discard(living_entity)
+        position = self.positions.pop(living_entity, None)
+        if position is not None and (cell := self._cells.get(self._cell(position))) is not None:
+            cell.discard(living_entity)
+
+    def clear(self) -> None:
+        """
+        Remove all living entities from the index
+        """
+        super().clear()
+        self.positions.clear()
+        self._cells.clear()
+
+    def place(self, living_entity, position: tuple[int, int]) -> None:
+        """
+        Put living_entity at position (an entity placed before being added keeps its position when it's added)
+        """
+        x, y = position
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise ValueError(f"Position {position} is outside the grid ({self.width}x{self.height})")
+        old_position = self.positions.get(living_entity)
+        self.positions[living_entity] = (x, y)
+        if old_position is not None and (cell := self._cells.get(self._cell(old_position))) is not None and living_entity in cell:
+            if self._cell(old_position) != self._cell((x, y)):
+                cell.discard(living_entity)
+                self._cells.setdefault(self._cell((x, y)), IndexedSet()).add(living_entity)
+
+    def place_near(self, living_entity, other_living_entity) -> None:
+        """
+        Put living_entity at a random position next to other_living_entity (a baby next to its parent, a new plant next to the split plant).
+        Nothing is done if other_living_entity has no position
+        """
+        position = self.positions.get(other_living_entity)
+        if position is not None:
+            self.place(living_entity, self._step(position, 1))
+
+    def _step(self, position: tuple[int, int], distance: int) -> tuple[int, int]:
+        """
+        Return a random position at most distance squares away from position in each direction (inside the grid)
+        """
+        x = min(max(position[0] + self.rng.randint(-distance, distance), 0), self.width - 1)
+        y = min(max(position[1] + self.rng.randint(-distance, distance), 0), self.height - 1)
+        return x, y
+
+    def neighbours(self, living_entity) -> list:
+        """
+        Return the alive entities within radius of living_entity (living_entity excluded), only the cells around it are scanned
+        """
+        position = self.positions.get(living_entity)
+        if position is None:
+            return []
+        x, y = position
+        radius = self.radius
+        square_radius = radius * radius
+        neighbours = []
+        for i in range(int((x - radius) // self.cell_size), int((x + radius) // self.cell_size) + 1):
+            for j in range(int((y - radius) // self.cell_size), int((y + radius) // self.cell_size) + 1):
+                cell = self._cells.get((i, j))
+                if cell is None:
+                    continue
+                for other in cell:
+                    other_x, other_y = self.positions[other]
+                    if other is not living_entity and (other_x - x) ** 2 + (other_y - y) ** 2 <= square_radius:
+                        neighbours.append(other)
+        return neighbours
+
+    def _draw_food(self, animal):
+        """
+        Return a random alive entity within radius that animal can eat (or None if there is nothing to eat around). Neighbours are counted as candidates
+        """
+        neighbours = self.neighbours(animal)
+        self.food_candidates += len(neighbours)
+        food = [other for other in neighbours if other.diet in animal.food_diets and animal.can_eat(other)]
+        return self.rng.choice(food) if food else None
+
+    def _find_partner(self, animal):
+        """
+        Return the nearest alive animal within radius that can make a baby with animal (or None). Neighbours are counted as candidates
+        """
+        x, y = self.positions.get(animal, (0, 0))
+        neighbours = self.neighbours(animal)
+        self.partner_candidates += len(neighbours)
+        partners = [other for other in neighbours if type(other) is type(animal) and animal.can_make_baby(other)]
+        return min(partners, key=lambda other: (self.positions[other][0] - x) ** 2 + (self.positions[other][1] - y) ** 2, default=None)
+
+    def move_animals(self) -> None:
+        """
+        Move each alive animal of at most move_distance squares in each direction (plants don't move)
+        """
+        if self.move_distance == 0:
+            return
+        for bucket in self._by_species_and_sex.values():
+            for animal in bucket:
+                self.place(animal, self._step(self.positions[animal], self.move_distance))
+
+    def get_order(self, living_entities) -> tuple[dict, dict[str, list[int]]]:
+        """
+        Return the order of the index (see LivingEntityIndex.get_order), positions in cell buckets included
+        """
+        keys, ranks = super().get_order(living_entities)
+        cell_ranks = []
+        for living_entity in living_entities:
+            position = self.positions.get(living_entity)
+            cell = None if position is None else self._cells.get(self._cell(position))
+            cell_ranks.append(cell.position(living_entity) if cell is not None and living_entity in cell else -1)
+        ranks['cell'] = cell_ranks
+        return keys, ranks
+
+    def set_order(self, keys: dict, living_entities, ranks: dict[str, list[int]]) -> None:
+        """
+        Put back an order given by get_order (see LivingEntityIndex.set_order), order of cell buckets included
+        """
+        super().set_order(keys, living_entities, ranks)
+        cell_ranks = dict(zip(living_entities, ranks['cell']))
+        for cell in self._cells.values():
+            cell.sort(key=cell_ranks.__getitem__)
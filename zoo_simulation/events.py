@@ -0,0 +1,287 @@
+from __future__ import annotations
+import json
+from abc import ABC, abstractmethod
+
+# Events emitted by living entities during a day
+EATEN = 'eaten'                # fields : eater, food
+BORN = 'born'                  # fields : baby, parent, partner
+SPLIT = 'split'                # fields : plant, parent
+STARVED = 'starved'            # fields : animal (the animal couldn't eat)
+DIED_OF_AGE = 'died_of_age'    # fields : living_entity
+EVENT_TYPES = [EATEN, BORN, SPLIT, STARVED, DIED_OF_AGE]
+
+
+class EventSink(ABC):
+    """
+    An abstract class to represent a consumer of simulation events
+
+    ...
+
+    Attributes
+    ----------
+    event_types : set
+        Event types the sink subscribes to
+
+    Methods
+    -------
+    handle(event_type, day, fields):
+        Method called for each event the sink subscribes to (need to be implemented in subclasses)
+
+    close():
+        Method called when the sink will not receive events anymore
+    """
+
+    def __init__(self, event_types=None) -> None:
+        """
+        Construct a sink subscribing to event_types (all event types if event_types is None)
+        """
+        self.event_types = set(EVENT_TYPES if event_types is None else event_types)
+
+    @abstractmethod
+    def handle(self, event_type: str, day: int, fields: dict) -> None:
+        """
+        Method called for each event the sink subscribes to
+        (need to be implemented in subclasses)
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Method called when the sink will not receive events anymore
+        """
+        pass
+
+
+class StdoutSink(EventSink):
+    """
+    A sink printing events on the standard output (the messages printed by the simulation before events)
+    """
+
+    def __init__(self) -> None:
+        """
+        Construct a sink printing eaten, born, split and starved events
+        """
+        super().__init__([EATEN, BORN, SPLIT, STARVED])
+
+    def handle(self, event_type: str, day: int, fields: dict) -> None:
+        """
+        Print the message of the event
+        """
+        match event_type:
+            case 'eaten':
+                print(f"{fields['eater']} eat {fields['food']}")
+            case 'born':
+                print(f"New baby {fields['baby']} is born 👶")
+            case 'split':
+                print(f"New plant {fields['plant']} is born 👶")
+            case 'starved':
+                print(f"{fields['animal']} couldn't eat :'(")
+
+
+class JsonLinesSink(EventSink):
+    """
+    A sink writing one JSON document per event in a file. Lines are buffered and written by blocks.
+
+    ...
+
+    Attributes
+    ----------
+    filename : str
+        Name of the JSON Lines file
+    buffer_size : int
+        Number of events kept in memory before writing them
+    """
+
+    def __init__(self, filename: str, event_types=None, buffer_size: int = 4096) -> None:
+        """
+        Construct a sink writing events in filename (the file is truncated)
+        """
+        super().__init__(event_types)
+        self.filename = filename
+        self.buffer_size = buffer_size
+        self._buffer: list[str] = []
+        self._file = open(filename, 'w')
+
+    def handle(self, event_type: str, day: int, fields: dict) -> None:
+        """
+        Add the event to the buffer (and write the buffer if it's full)
+        """
+        document = {'day': day, 'event': event_type}
+        for key, value in fields.items():
+            document[key] = describe_living_entity(value)
+        self._buffer.append(json.dumps(document, ensure_ascii=False))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write buffered events in the file
+        """
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+
+    def close(self) -> None:
+        """
+        Write buffered events and close the file
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class CounterSink(EventSink):
+    """
+    A sink only counting events by type and by species (of the first living entity of the event)
+
+    ...
+
+    Attributes
+    ----------
+    counts : dict
+        Number of events for each event type
+    counts_by_species : dict
+        Number of events for each (event type, species name)
+    """
+
+    def __init__(self, event_types=None) -> None:
+        """
+        Construct a sink counting events
+        """
+        super().__init__(event_types)
+        self.counts: dict[str, int] = {}
+        self.counts_by_species: dict[tuple[str, str], int] = {}
+
+    def handle(self, event_type: str, day: int, fields: dict) -> None:
+        """
+        Count the event
+        """
+        self.counts[event_type] = self.counts.get(event_type, 0) + 1
+        key = (event_type, next(iter(fields.values())).species)
+        self.counts_by_species[key] = self.counts_by_species.get(key, 0) + 1
+
+
+class NullSink(EventSink):
+    """
+    A sink subscribing to no event
+    """
+
+    def __init__(self) -> None:
+        """
+        Construct a sink subscribing to no event
+        """
+        super().__init__([])
+
+    def handle(self, event_type: str, day: int, fields: dict) -> None:
+        """
+        Nothing to do
+        """
+        pass
+
+
+class EventBus():
+    """
+    A class to dispatch simulation events to sinks.
+
+    Emitters check wants(event_type) before building an event, so an event no sink subscribes to costs
+    only a dict lookup (no object, no string formatting).
+
+    ...
+
+    Attributes
+    ----------
+    day : int
+        Current day of the paddock (added to events)
+    _subscribers : dict
+        Sinks for each event type
+
+    Methods
+    -------
+    subscribe(sink):
+        Add sink to the bus
+
+    unsubscribe(sink):
+        Remove sink from the bus
+
+    wants(event_type):
+        Return True if at least one sink subscribes to event_type
+
+    emit(event_type, **fields):
+        Send the event to the sinks subscribing to event_type
+
+    close():
+        Close all sinks
+    """
+
+    def __init__(self, sinks=()) -> None:
+        """
+        Construct a bus with sinks (without sink, events are not built)
+        """
+        self.day = 0
+        self._sinks: list[EventSink] = []
+        self._subscribers: dict[str, list[EventSink]] = {}
+        for sink in sinks:
+            self.subscribe(sink)
+
+    @property
+    def sinks(self) -> list[EventSink]:
+        """
+        Getter for _sinks attribute
+        """
+        return list(self._sinks)
+
+    def subscribe(self, sink: EventSink) -> None:
+        """
+        Add sink to the bus
+        """
+        self._sinks.append(sink)
+        for event_type in sink.event_types:
+            self._subscribers.setdefault(event_type, []).append(sink)
+
+    def unsubscribe(self, sink: EventSink) -> None:
+        """
+        Remove sink from the bus
+        """
+        self._sinks.remove(sink)
+        for event_type in sink.event_types:
+            self._subscribers[event_type].remove(sink)
+            if not self._subscribers[event_type]:
+                del self._subscribers[event_type]
+
+    def wants(self, event_type: str) -> bool:
+        """
+        Return True if at least one sink subscribes to event_type
+        """
+        return event_type in self._subscribers
+
+    def emit(self, event_type: str, **fields) -> None:
+        """
+        Send the event to the sinks subscribing to event_type
+        """
+        for sink in self._subscribers.get(event_type, ()):
+            sink.handle(event_type, self.day, fields)
+
+    def close(self) -> None:
+        """
+        Close all sinks
+        """
+        for sink in self._sinks:
+            sink.close()
+
+
+def describe_living_entity(living_entity) -> dict:
+    """
+    Return a dict describing living_entity (used to serialize events)
+    """
+    description = {'species': living_entity.species,
+                   'life_point': living_entity.life_point,
+                   'age': living_entity.age,
+                   'is_alive': living_entity.is_alive}
+    if hasattr(living_entity, 'sex'):
+        description['name'] = living_entity.name
+        description['sex'] = living_entity.sex.name
+    return description
+
+
+# Bus used when a living entity acts outside a paddock (a list of LivingEntity is given to do_actions)
+DEFAULT_EVENT_BUS = EventBus([StdoutSink()])
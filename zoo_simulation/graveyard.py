@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+
+class Graveyard():
+    """
+    A class to hold aggregated informations about dead living entities of a paddock.
+
+    Dead living entities are moved out of Paddock.lst_living_entity (compaction) and only counted here,
+    so memory and time of a day only depend on the alive population.
+
+    ...
+
+    Attributes
+    ----------
+    deaths_by_species : dict
+        Number of dead living entities for each species (class name)
+    deaths_of_age_by_species : dict
+        Number of living entities dead of age for each species (included in deaths_by_species)
+    history_size : int or None
+        Maximum number of dead animals kept in the paddock report (None : all dead animals are kept)
+
+    Methods
+    -------
+    bury(living_entity, of_age=False):
+        Count a dead living entity
+
+    add_deaths(species_name, nb_deaths, nb_deaths_of_age=0):
+        Count nb_deaths dead living entities of species_name
+
+    count(species_name=None):
+        Return the number of dead living entities for species_name (or for all species)
+
+    count_of_age(species_name=None):
+        Return the number of living entities dead of age for species_name (or for all species)
+
+    clear():
+        Forget all dead living entities
+    """
+
+    def __init__(self, history_size: int | None = None) -> None:
+        """
+        Construct an empty graveyard
+
+        Parameters
+        ----------
+            history_size : int or None
+                Maximum number of dead animals kept in the paddock report (None : no limit)
+        """
+        self.deaths_by_species: dict[str, int] = {}
+        self.deaths_of_age_by_species: dict[str, int] = {}
+        self.history_size = history_size
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the state from pickle (deaths of age were not counted by binary files written before)
+        """
+        self.__dict__.update(state)
+        if 'deaths_of_age_by_species' not in state:
+            self.deaths_of_age_by_species = {}
+
+    def bury(self, living_entity, of_age: bool = False) -> None:
+        """
+        Count a dead living entity (of_age : the living entity died of age)
+        """
+        species_name = living_entity.__class__.__name__
+        self.deaths_by_species[species_name] = self.deaths_by_species.get(species_name, 0) + 1
+        if of_age:
+            self.deaths_of_age_by_species[species_name] = self.deaths_of_age_by_species.get(species_name, 0) + 1
+
+    def add_deaths(self, species_name: str, nb_deaths: int, nb_deaths_of_age: int = 0) -> None:
+        """
+        Count nb_deaths dead living entities of species_name, nb_deaths_of_age of them died of age
+        (used for plants held by a PlantStore and by the vectorized engine)
+        """
+        if nb_deaths:
+            self.deaths_by_species[species_name] = self.deaths_by_species.get(species_name, 0) + nb_deaths
+        if nb_deaths_of_age:
+            self.deaths_of_age_by_species[species_name] = self.deaths_of_age_by_species.get(species_name, 0) + nb_deaths_of_age
+
+    def count(self, species_name: str | None = None) -> int:
+        """
+        Return the number of dead living entities for species_name (or for all species if species_name is None)
+        """
+        if species_name is None:
+            return sum(self.deaths_by_species.values())
+        return self.deaths_by_species.get(species_name, 0)
+
+    def count_of_age(self, species_name: str | None = None) -> int:
+        """
+        Return the number of living entities dead of age for species_name (or for all species if species_name is None)
+        """
+        if species_name is None:
+            return sum(self.deaths_of_age_by_species.values())
+        return self.deaths_of_age_by_species.get(species_name, 0)
+
+    def clear(self) -> None:
+        """
+        Forget all dead living entities
+        """
+        self.deaths_by_species.clear()
+        self.deaths_of_age_by_species.clear()
@@ -0,0 +1,428 @@
+from __future__ import annotations
+import json
+import os
+import struct
+import zlib
+from typing import Iterator
+import numpy as np
+from .paddock import Paddock
+from .events import EventBus
+from .names_provider import NameProvider
+from .snapshot import snapshot_columns, paddock_from_columns, pack_names, unpack_names, COLUMN_TYPES, STORE_COLUMNS
+
+# First bytes of a journal file
+JOURNAL_MAGIC = b'ZOOJRNL1'
+# Each record starts with its size and its CRC32 (a torn record at the end of the file is detected and ignored)
+RECORD_PREFIX = struct.Struct('<QI')
+# Size of the JSON header of a record (compressed, the state of the generator is most of it)
+RECORD_HEADER_SIZE = struct.Struct('<I')
+# Default number of days between two base records (full state of the paddock)
+BASE_EVERY = 30
+# Default number of base records kept by compaction
+KEEP_BASES = 2
+# zlib level of the columns of a record (residuals are mostly the same value, a fast level is enough)
+COMPRESSION_LEVEL = 1
+
+
+def _matches(sources: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Return the rows coming from a previous row (source is not -1) and their sources (computed once for all columns)
+    """
+    rows = np.flatnonzero(sources >= 0)
+    return rows, sources[rows]
+
+
+def _predict(previous_column: np.ndarray | None, matches: tuple[np.ndarray, np.ndarray], size: int, dtype: np.dtype) -> np.ndarray:
+    """
+    Return the value of previous_column at the source of each row given by matches (0 or None for a new row)
+    """
+    rows, sources = matches
+    predicted = np.empty(size, dtype=dtype) if dtype == object else np.zeros(size, dtype=dtype)
+    if previous_column is None or not len(rows):
+        return predicted
+    if rows[-1] == len(rows) - 1:
+        # New rows are at the end (new entities are appended)
+        previous_column.take(sources, out=predicted[:len(rows)])
+    else:
+        predicted[rows] = previous_column.take(sources)
+    return predicted
+
+
+def _difference(column: np.ndarray, predicted: np.ndarray) -> np.ndarray:
+    """
+    Return column - predicted (exclusive or for booleans, integers wrap around like the reverse operation)
+    """
+    return column ^ predicted if column.dtype == np.bool_ else np.subtract(column, predicted, dtype=column.dtype)
+
+
+def _sum(predicted: np.ndarray, difference: np.ndarray) -> np.ndarray:
+    """
+    Return predicted + difference (reverse operation of _difference)
+    """
+    return predicted ^ difference if difference.dtype == np.bool_ else np.add(predicted, difference, dtype=difference.dtype)
+
+
+def _match_rows(previous_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """
+    Return, for each id of ids, its position in previous_ids (-1 if it's a new id)
+    """
+    if not len(previous_ids) or not len(ids):
+        return np.full(len(ids), -1, dtype=np.int64)
+    # Ids of the vectorized engine are already sorted when no dead animal is kept (new entities are appended with new ids)
+    order = None if np.all(previous_ids[1:] > previous_ids[:-1]) else np.argsort(previous_ids, kind='stable')
+    sorted_ids = previous_ids if order is None else previous_ids[order]
+    positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return np.where(sorted_ids[positions] == ids, positions if order is None else order[positions], -1)
+
+
+def _store_sources(nb_plants: int, nb_previous_plants: int) -> np.ndarray:
+    """
+    Return the source of each plant of a plant store (plants have no id : the plant at the same position)
+    """
+    sources = np.arange(nb_plants, dtype=np.int64)
+    sources[nb_previous_plants:] = -1
+    return sources
+
+
+def _compress(blob: np.ndarray) -> tuple[int, bytes]:
+    """
+    Return the number of stored values (-1 : all values) and the compressed bytes of blob. A blob with a few non-zero values
+    is stored as the positions (differences with the previous position) and the values of these non-zero values
+    """
+    nonzero = np.flatnonzero(blob)
+    if len(nonzero) <= len(blob) // 8:
+        data = np.diff(nonzero, prepend=0).tobytes() + blob[nonzero].tobytes()
+        return len(nonzero), zlib.compress(data, COMPRESSION_LEVEL)
+    return -1, zlib.compress(np.ascontiguousarray(blob).tobytes(), COMPRESSION_LEVEL)
+
+
+def _decompress(data: bytes, dtype: np.dtype, count: int, nb_values: int) -> np.ndarray:
+    """
+    Return the blob compressed by _compress
+    """
+    data = zlib.decompress(data)
+    if nb_values < 0:
+        return np.frombuffer(data, dtype=dtype, count=count)
+    blob = np.zeros(count, dtype=dtype)
+    positions = np.cumsum(np.frombuffer(data, dtype=np.int64, count=nb_values))
+    blob[positions] = np.frombuffer(data, dtype=dtype, count=nb_values, offset=nb_values * 8)
+    return blob
+
+
+class JournalState():
+    """
+    A class to hold the state of a journal after a record : columns of the paddock and residuals of the day.
+
+    ...
+
+    Attributes
+    ----------
+    header : dict
+        Header of the paddock (see snapshot_columns)
+    columns : dict
+        Columns of the paddock (see snapshot_columns)
+    residuals : dict
+        For each column, difference between the value of each row and the value of the same entity the day before
+    """
+
+    def __init__(self, header: dict | None = None, columns: dict[str, np.ndarray] | None = None, residuals: dict[str, np.ndarray] | None = None) -> None:
+        """
+        Construct a state (an empty state is the state before a base record)
+        """
+        self.header = header or {}
+        self.columns = columns or {}
+        self.residuals = residuals or {}
+
+
+def encode_record(header: dict, columns: dict[str, np.ndarray], previous_state: JournalState | None) -> tuple[bytes, JournalState]:
+    """
+    Return the record of a day and the new state of the journal. header and columns are given by snapshot_columns and
+    previous_state is the state after the previous record (None for a base record). Rows are matched by id : the residual
+    of a column is the change of the day (+1 for ages, -1 or +1 for PV...) and the record holds the change of the residual
+    compared with the day before. It's 0 for an entity doing the same thing as the day before, so a record only holds
+    the activity of the day (births, deaths, eaten entities, names drawn) and its size doesn't depend on the population
+    """
+    previous_state = previous_state or JournalState()
+    previous_columns = previous_state.columns
+    sources = _match_rows(previous_columns.get('ids', np.zeros(0, dtype=np.int64)), columns['ids'])
+    store_sources = _store_sources(len(columns.get('store_ages', ())), len(previous_columns.get('store_ages', ())))
+    # Most entities come from the next row of the day before
+    blobs = {'@sources': np.diff(sources, prepend=-1) - 1}
+    matches, store_matches = _matches(sources), _matches(store_sources)
+    residuals = {}
+    for name, column in columns.items():
+        if name == 'names':
+            continue
+        dtype = np.dtype(COLUMN_TYPES[name])
+        column_matches = store_matches if name in STORE_COLUMNS else matches
+        residuals[name] = _difference(np.asarray(column, dtype=dtype), _predict(previous_columns.get(name), column_matches, len(column), dtype))
+        blobs[name] = _difference(residuals[name], _predict(previous_state.residuals.get(name), column_matches, len(column), dtype))
+    # Names are only stored for new entities and babies whose name was drawn during the day
+    predicted_names = _predict(previous_columns.get('names'), matches, len(sources), np.dtype(object))
+    name_rows = np.flatnonzero(columns['names'] != predicted_names)
+    blobs['@name_rows'] = name_rows
+    blobs['@name_lengths'], blobs['@names'] = pack_names(columns['names'][name_rows])
+
+    layout = []
+    data = []
+    for name, blob in blobs.items():
+        nb_values, compressed = _compress(blob)
+        layout.append([name, blob.dtype.str, len(blob), nb_values, len(compressed)])
+        data.append(compressed)
+    record_header = zlib.compress(json.dumps({'day': header['paddock_age'], 'base': not previous_columns, 'paddock': header, 'columns': layout}).encode('utf-8'))
+    record = RECORD_HEADER_SIZE.pack(len(record_header)) + record_header + b''.join(data)
+    return record, JournalState(header, columns, residuals)
+
+
+def _record_header(record: bytes) -> dict:
+    """
+    Return the header of record (day, base record or not, header of the paddock, layout of columns)
+    """
+    header_size, = RECORD_HEADER_SIZE.unpack_from(record)
+    return json.loads(zlib.decompress(record[RECORD_HEADER_SIZE.size:RECORD_HEADER_SIZE.size + header_size]).decode('utf-8'))
+
+
+def decode_record(record: bytes, previous_state: JournalState | None) -> JournalState:
+    """
+    Return the state of the journal after record (previous_state is the state after the previous record, None for a base record)
+    """
+    previous_state = previous_state or JournalState()
+    record_header = _record_header(record)
+    offset = RECORD_HEADER_SIZE.size + RECORD_HEADER_SIZE.unpack_from(record)[0]
+    blobs = {}
+    for name, dtype, count, nb_values, nbytes in record_header['columns']:
+        blobs[name] = _decompress(record[offset:offset + nbytes], np.dtype(dtype), count, nb_values)
+        offset += nbytes
+
+    previous_columns = previous_state.columns
+    sources = np.cumsum(blobs.pop('@sources') + 1) - 1
+    store_sources = _store_sources(len(blobs.get('store_ages', ())), len(previous_columns.get('store_ages', ())))
+    matches, store_matches = _matches(sources), _matches(store_sources)
+    columns = {}
+    residuals = {}
+    for name, blob in blobs.items():
+        if name.startswith('@'):
+            continue
+        column_matches = store_matches if name in STORE_COLUMNS else matches
+        residuals[name] = _sum(_predict(previous_state.residuals.get(name), column_matches, len(blob), blob.dtype), blob)
+        columns[name] = _sum(_predict(previous_columns.get(name), column_matches, len(blob), blob.dtype), residuals[name])
+    columns['names'] = _predict(previous_columns.get('names'), matches, len(sources), np.dtype(object))
+    columns['names'][blobs['@name_rows']] = unpack_names(blobs['@name_lengths'], blobs['@names'])
+    return JournalState(record_header['paddock'], columns, residuals)
+
+
+def _scan(fp) -> Iterator[tuple[int, dict, bytes]]:
+    """
+    Yield the offset, the header and the content of each valid record of the journal file fp (opened at its beginning).
+    The scan stops at the first torn or corrupted record
+    """
+    if fp.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+        raise ValueError(f"{fp.name} is not a journal file")
+    while True:
+        offset = fp.tell()
+        prefix = fp.read(RECORD_PREFIX.size)
+        if len(prefix) < RECORD_PREFIX.size:
+            return
+        size, crc = RECORD_PREFIX.unpack(prefix)
+        record = fp.read(size)
+        if len(record) < size or zlib.crc32(record) != crc:
+            return
+        yield offset, _record_header(record), record
+
+
+def is_journal(filename: str) -> bool:
+    """
+    Return True if filename starts like a journal file
+    """
+    with open(filename, 'rb') as fp:
+        return fp.read(len(JOURNAL_MAGIC)) == JOURNAL_MAGIC
+
+
+def journal_days(filename: str) -> list[tuple[int, bool]]:
+    """
+    Return (day, True for a base record) for each valid record of the journal file filename
+    """
+    with open(filename, 'rb') as fp:
+        return [(record_header['day'], record_header['base']) for _, record_header, _ in _scan(fp)]
+
+
+def iter_journal(filename: str) -> Iterator[tuple[dict, dict[str, np.ndarray]]]:
+    """
+    Yield the header and the columns of the paddock at each recorded day of the journal file filename (records are decoded in order)
+    """
+    state = None
+    with open(filename, 'rb') as fp:
+        for _, record_header, record in _scan(fp):
+            state = decode_record(record, None if record_header['base'] else state)
+            yield state.header, state.columns
+
+
+def read_journal(filename: str, day: int | None = None) -> tuple[dict, dict[str, np.ndarray]]:
+    """
+    Return the header and the columns of the paddock at day (the last recorded day if None) : the last base record
+    before day is decoded, then the records of the following days. A ValueError is raised if day is not in the journal
+    """
+    records: list[bytes] = []
+    found = False
+    with open(filename, 'rb') as fp:
+        for _, record_header, record in _scan(fp):
+            if record_header['base']:
+                # Records before a base record are not needed
+                records.clear()
+            records.append(record)
+            if record_header['day'] == day:
+                found = True
+                break
+    if not records or (day is not None and not found):
+        raise ValueError(f"Day {day} is not in the journal {filename}" if day is not None else f"No record in the journal {filename}")
+    state = None
+    for record in records:
+        state = decode_record(record, state)
+    assert state is not None
+    return state.header, state.columns
+
+
+def load_journal(filename: str, day: int | None = None, events: EventBus | None = None, name_provider: NameProvider | None = None) -> Paddock:
+    """
+    Return the paddock at day (the last recorded day if None) of the journal file filename (after a crash, the paddock
+    of the last complete day). The event bus and the name provider are not stored : events and name_provider are given to the paddock
+    """
+    header, columns = read_journal(filename, day)
+    return paddock_from_columns(header, columns, events, name_provider)
+
+
+class Journal():
+    """
+    An append-only journal of the days of a paddock, used as an incremental checkpoint.
+
+    Each day, a record with the changes of the day is appended (rows matched by id, compressed residuals of the columns
+    of a snapshot, names of new animals, whole state of the generator). Every base_every days, a base record holds
+    the whole paddock ; older records are dropped by compaction. A crash loses at most the day being written.
+
+    ...
+
+    Attributes
+    ----------
+    filename : str
+        Name of the journal file
+    base_every : int
+        Number of days between two base records
+    keep_bases : int or None
+        Number of base records kept by compaction (None : the journal is never compacted)
+    sync : bool
+        If True, each record is written on the disk (os.fsync) before the day ends
+    nb_records : int
+        Number of records in the journal file
+    bytes_written : int
+        Number of bytes written by the journal (compaction excluded)
+
+    Methods
+    -------
+    record(paddock):
+        Append a record of the current day of paddock (a base record or the changes of the day)
+
+    compact(keep_bases=None):
+        Drop the records before the last keep_bases base records
+
+    close():
+        Close the journal file
+    """
+
+    def __init__(self, filename: str, base_every: int = BASE_EVERY, keep_bases: int | None = KEEP_BASES, sync: bool = True) -> None:
+        """
+        Open the journal file filename (created if it doesn't exist, a torn record at its end is removed).
+        The first record written by a Journal is always a base record
+        """
+        if base_every <= 0:
+            raise ValueError("Number of days between base records needs to be a positiv integer")
+        if keep_bases is not None and keep_bases <= 0:
+            raise ValueError("Number of kept base records needs to be a positiv integer")
+        self.filename = filename
+        self.base_every = base_every
+        self.keep_bases = keep_bases
+        self.sync = sync
+        self.nb_records = 0
+        self.bytes_written = 0
+        self._base_offsets: list[int] = []
+        self._state: JournalState | None = None
+        self._days_since_base = 0
+        self._fp = self._open()
+
+    def _open(self):
+        """
+        Open the journal file for appending (the records of an existing file are scanned, the file ends after the last valid record)
+        """
+        if not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0:
+            with open(self.filename, 'wb') as fp:
+                fp.write(JOURNAL_MAGIC)
+        self.nb_records = 0
+        self._base_offsets = []
+        end = len(JOURNAL_MAGIC)
+        with open(self.filename, 'r+b') as fp:
+            for offset, record_header, record in _scan(fp):
+                self.nb_records += 1
+                if record_header['base']:
+                    self._base_offsets.append(offset)
+                end = offset + RECORD_PREFIX.size + len(record)
+            fp.truncate(end)
+        return open(self.filename, 'ab')
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, paddock: Paddock) -> int:
+        """
+        Append a record of the current day of paddock : a base record every base_every days (and for the first record),
+        the changes since the previous record otherwise. Return the size of the record
+        """
+        header, columns = snapshot_columns(paddock)
+        # Columns of the vectorized engine are views : the next day changes them
+        columns = {name: np.array(column) for name, column in columns.items()}
+        is_base = self._state is None or self._days_since_base >= self.base_every
+        record, self._state = encode_record(header, columns, None if is_base else self._state)
+        offset = self._fp.tell()
+        self._fp.write(RECORD_PREFIX.pack(len(record), zlib.crc32(record)) + record)
+        self._fp.flush()
+        if self.sync:
+            os.fsync(self._fp.fileno())
+        self.nb_records += 1
+        self.bytes_written += RECORD_PREFIX.size + len(record)
+        if is_base:
+            self._base_offsets.append(offset)
+            self._days_since_base = 0
+            if self.keep_bases is not None and len(self._base_offsets) > self.keep_bases:
+                self.compact()
+        self._days_since_base += 1
+        return RECORD_PREFIX.size + len(record)
+
+    def compact(self, keep_bases: int | None = None) -> None:
+        """
+        Drop the records before the last keep_bases base records (keep_bases of the journal if None, 1 if it's None too).
+        The kept records are copied in a new file which replaces the journal file
+        """
+        keep_bases = keep_bases or self.keep_bases or 1
+        if len(self._base_offsets) <= keep_bases:
+            return
+        start = self._base_offsets[-keep_bases]
+        self._fp.close()
+        temporary_filename = f"{self.filename}.tmp"
+        with open(self.filename, 'rb') as source, open(temporary_filename, 'wb') as destination:
+            destination.write(JOURNAL_MAGIC)
+            source.seek(start)
+            while block := source.read(1 << 20):
+                destination.write(block)
+            destination.flush()
+            if self.sync:
+                os.fsync(destination.fileno())
+        os.replace(temporary_filename, self.filename)
+        self._fp = self._open()
+
+    def close(self) -> None:
+        """
+        Close the journal file
+        """
+        if not self._fp.closed:
+            self._fp.close()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+import json
+from itertools import islice
+from typing import Iterable, Iterator
+
+# Number of characters written at once by write_json_lines
+WRITE_BUFFER_SIZE = 1 << 16
+# Number of lines read at once by read_chunks
+READ_CHUNK_SIZE = 10000
+
+
+def write_json_lines(fp, rows: Iterable[dict], buffer_size: int = WRITE_BUFFER_SIZE) -> int:
+    """
+    Write one JSON line per row of rows (a dict of JSON values) in the text file fp.
+    Lines are written by blocks of about buffer_size characters. Return the number of written rows
+    """
+    encode = json.JSONEncoder().encode
+    block: list[str] = []
+    block_size = 0
+    nb_rows = 0
+    for row in rows:
+        line = encode(row)
+        block.append(line)
+        block_size += len(line) + 1
+        nb_rows += 1
+        if block_size >= buffer_size:
+            block.append("")
+            fp.write("\n".join(block))
+            block.clear()
+            block_size = 0
+    if block:
+        block.append("")
+        fp.write("\n".join(block))
+    return nb_rows
+
+
+def read_json_lines(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    Yield the value of each non-empty line of lines (e.g. a text file opened for reading), one line at a time.
+    A ValueError gives the number of an invalid line
+    """
+    decode = json.JSONDecoder().decode
+    for line_number, line in enumerate(lines, 1):
+        if line.strip():
+            try:
+                yield decode(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON line {line_number} ({e})") from e
+
+
+def read_chunks(rows: Iterable, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[list]:
+    """
+    Yield lists of at most chunk_size rows of rows (only one chunk is in memory at a time)
+    """
+    if chunk_size <= 0:
+        raise ValueError("Size of a chunk needs to be a positiv integer")
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
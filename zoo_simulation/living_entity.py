@@ -1,26 +1,19 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from enum import Enum
-from random import shuffle, randint, choice
-import names
+import random
+from itertools import repeat
+from .entity_index import LivingEntityIndex
+from .events import EventBus, DEFAULT_EVENT_BUS, EATEN, BORN, SPLIT, STARVED, DIED_OF_AGE
+from .names_provider import NameProvider, DEFAULT_NAME_PROVIDER
+from .random_streams import GLOBAL_RANDOM
+from .rules import Rules, DEFAULT_RULES
 
-PV_LOSTS_ANIMAL_BY_DAY = 1
-PV_LOSTS_ANIMAL_WHEN_EATEN = 4
-PV_OBTAINED_CARNIVOROUS_BY_ANIMAL = 5
-
-LIMIT_PV_BEFORE_EATEN = 5
-
-PV_OBTAINED_PLANT_BY_DAY = 1
-PV_LOSTS_PLANT_WHEN_EATEN = 2
-PV_OBTAINED_HERBIVORE_BY_PLANT = 3
-
-MIN_AGE_FOR_ENTITY_ADDED = 0
-MAX_AGE_FOR_ENTITY_ADDED = 19
-DEATHING_AGE_IN_DEAY = 20
-STANDARD_AGE_FOR_TEST = 12
-
-MIN_PV_TO_SPLIT_PLANT = 10
-TIME_BEFORE_NEW_BABY = 3
+# Constants of the default rules (still importable from this module)
+from .rules import PV_LOSTS_ANIMAL_BY_DAY, PV_LOSTS_ANIMAL_WHEN_EATEN, PV_OBTAINED_CARNIVOROUS_BY_ANIMAL, LIMIT_PV_BEFORE_EATEN  # noqa: F401
+from .rules import PV_OBTAINED_PLANT_BY_DAY, PV_LOSTS_PLANT_WHEN_EATEN, PV_OBTAINED_HERBIVORE_BY_PLANT  # noqa: F401
+from .rules import MIN_AGE_FOR_ENTITY_ADDED, MAX_AGE_FOR_ENTITY_ADDED, DEATHING_AGE_IN_DEAY, STANDARD_AGE_FOR_TEST  # noqa: F401
+from .rules import MIN_PV_TO_SPLIT_PLANT, TIME_BEFORE_NEW_BABY  # noqa: F401
 
 
 class Sex(Enum):
@@ -31,6 +24,17 @@ class Sex(Enum):
     FEMALE = 2
 
 
+# Sex of each value (animals store the value of their sex)
+SEX_BY_VALUE = {sex.value: sex for sex in Sex}
+# Text of each sex in JSON configuration files (str(sex), like the first files) and sex of each text (names are read too)
+SEX_TO_JSON = {sex: str(sex) for sex in Sex}
+SEX_FROM_JSON = {**{text: sex for sex, text in SEX_TO_JSON.items()}, **{sex.name: sex for sex in Sex}}
+# Id of a view of a plant held by a plant store (such plants have no id)
+NO_ID = 0
+# Name key of an animal whose name is given (a lazy name is drawn from the name key of the animal, see NameProvider)
+NO_NAME_KEY = -1
+
+
 class LivingEntity(ABC):
     """
     An abstract class to represent a living entity.
@@ -39,6 +43,7 @@ class LivingEntity(ABC):
 
     Attributes
     ----------
+    _id : Integer identity of the LivingEntity (unique in the process)
     _is_alive : True if LivingEntity is alive, False is LivingEntity is dead
     _life_point : Number of life point (PV) for this LivingEntity
     _age : LivingEntity age
@@ -63,6 +68,30 @@ class LivingEntity(ABC):
     age:
         Getter for _age attribute
 
+    species:
+        Name of the species (class name)
+
+    id:
+        Getter for _id attribute
+
+    random_age(rng=None, rules=None):
+        Return a random age for a new LivingEntity
+
+    reserve_ids(nb_ids):
+        Reserve nb_ids consecutive ids (used by entities not created as objects). Return the first one
+
+    create_batch(ages, life_points=None, alive=None):
+        Create len(ages) entities of the class at once (batch factory)
+
+    create_view(entity_id, age, life_point=10, is_alive=True):
+        Create an entity of the class with the id entity_id (no id is taken)
+
+    to_json_dict(self):
+        Return a dict describing the LivingEntity for JSON configuration files
+
+    set_attribute(self, attribute, value):
+        Set an attribute read from a JSON configuration file or a binary file
+
     gets_eaten(self):
         Method called when the LivingEntity has been eaten. Return PV to add to eater
         (need to be implemented in subclasses)
@@ -70,26 +99,35 @@ class LivingEntity(ABC):
     check_PV(self):
         Return True is _life_point is >1, False otherwise (in this case self._is_alive is set to False too)
     """
-    testing_mode = False  # Class variable we set to True (during test) to obtain reproducible behaviors
+    # Living entities have no __dict__ (a few millions of plants can be alive), attributes are stored in slots
+    __slots__ = ('_id', '_is_alive', '_life_point', '_age')
+    diet = ""  # Diet class of the LivingEntity ('plant', 'herbivore' or 'carnivorous'), used by LivingEntityIndex
+    _next_id = 1  # Class variable : id of the next LivingEntity
 
     def __init__(self, age) -> None:
         """
         Constructor for LivingEntity
         """
+        self._id = LivingEntity._next_id
+        LivingEntity._next_id += 1
         self._is_alive = True
         self._life_point = 10
         if age is not None:
             self._age = age
         else:
-            self._age = STANDARD_AGE_FOR_TEST if self.testing_mode else randint(MIN_AGE_FOR_ENTITY_ADDED, MAX_AGE_FOR_ENTITY_ADDED)
+            self._age = LivingEntity.random_age()
 
-    def grow_old(self) -> None:
+    def grow_old(self, events: EventBus | None = None, rules: Rules | None = None) -> None:
         """
-        Method called when the LivingEntity grow_old. If LivingEntity's age >= DEATHING_AGE_IN_DEAY, the LivingEntity will dead
+        Method called when the LivingEntity grow_old. If LivingEntity's age >= rules.deathing_age_in_deay, the LivingEntity will dead
+        (a died_of_age event is emitted on events, DEFAULT_RULES are used if rules is None)
         """
         self._age += 1
-        if self._age >= DEATHING_AGE_IN_DEAY:
+        if self._age >= (rules or DEFAULT_RULES).deathing_age_in_deay:
             self._is_alive = False
+            events = events or DEFAULT_EVENT_BUS
+            if events.wants(DIED_OF_AGE):
+                events.emit(DIED_OF_AGE, living_entity=self)
 
     @abstractmethod
     def __repr__(self) -> str:
@@ -100,7 +138,7 @@ class LivingEntity(ABC):
         return ""
 
     @abstractmethod
-    def do_actions(self, other_living_entities: list) -> None:
+    def do_actions(self, other_living_entities: list | LivingEntityIndex) -> None:
         """
         Do action(s) for the current living entity
         (need to be implemented in subclasses)
@@ -128,11 +166,117 @@ class LivingEntity(ABC):
         """
         return self._age
 
+    @property
+    def species(self) -> str:
+        """
+        Name of the species (class name)
+        """
+        return self.__class__.__name__
+
+    @property
+    def id(self) -> int:
+        """
+        Getter for _id attribute
+        """
+        return self._id
+
+    @staticmethod
+    def random_age(rng: random.Random | None = None, rules: Rules | None = None) -> int:
+        """
+        Return a random age for a new LivingEntity, drawn with rng (GLOBAL_RANDOM if None) between the ages of rules
+        (DEFAULT_RULES if None)
+        """
+        rules = rules or DEFAULT_RULES
+        return (rng or GLOBAL_RANDOM).randint(rules.min_age_for_entity_added, rules.max_age_for_entity_added)
+
+    @staticmethod
+    def reserve_ids(nb_ids: int) -> int:
+        """
+        Reserve nb_ids consecutive ids (used by entities not created as objects). Return the first one
+        """
+        first_id = LivingEntity._next_id
+        LivingEntity._next_id += nb_ids
+        return first_id
+
+    @classmethod
+    def create_batch(cls, ages, life_points=None, alive=None) -> list:
+        """
+        Create len(ages) entities of the class at once : the constructor is not called and ids are reserved in one step.
+        ages, life_points and alive are sequences (10 PV and alive if None)
+        """
+        ages = list(ages)
+        first_id = LivingEntity.reserve_ids(len(ages))
+        entities = []
+        for entity_id, age, life_point, is_alive in zip(range(first_id, first_id + len(ages)), ages,
+                                                        repeat(10) if life_points is None else life_points,
+                                                        repeat(True) if alive is None else alive):
+            entity = cls.__new__(cls)
+            entity._id = entity_id
+            entity._is_alive = is_alive
+            entity._life_point = life_point
+            entity._age = age
+            entities.append(entity)
+        return entities
+
+    @classmethod
+    def create_view(cls, entity_id: int, age: int, life_point: int = 10, is_alive: bool = True):
+        """
+        Create an entity of the class with the id entity_id : the constructor is not called and no id is taken.
+        Used to build short-lived objects describing entities held in arrays (events, reports), so reading them doesn't
+        change the ids (and the lazy names) of the next entities
+        """
+        entity = cls.__new__(cls)
+        entity._id = entity_id
+        entity._is_alive = is_alive
+        entity._life_point = life_point
+        entity._age = age
+        return entity
+
+    def _all_slots(self) -> list[str]:
+        """
+        Return names of the slots of the LivingEntity (slots of parent classes included)
+        """
+        return [slot for cls in reversed(type(self).__mro__) for slot in cls.__dict__.get('__slots__', ())]
+
+    def __getstate__(self) -> dict:
+        """
+        Return the state to pickle (a dict of slot values)
+        """
+        return {slot: getattr(self, slot) for slot in self._all_slots()}
+
+    def __setstate__(self, state) -> None:
+        """
+        Restore the state from pickle. state can be a dict of attributes (binary files written before slots)
+        or a tuple (None, slots) (default state of objects with slots)
+        """
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        for attribute, value in state.items():
+            self.set_attribute(attribute, value)
+        if '_id' not in state:
+            # Entities stored before ids
+            self._id = LivingEntity.reserve_ids(1)
+        elif self._id >= LivingEntity._next_id:
+            # New entities will not have the same id
+            LivingEntity._next_id = self._id + 1
+
+    def set_attribute(self, attribute: str, value) -> None:
+        """
+        Set an attribute read from a JSON configuration file or a binary file
+        """
+        setattr(self, attribute, value)
+
+    def to_json_dict(self) -> dict:
+        """
+        Return a dict describing the LivingEntity for JSON configuration files (the id is not stored)
+        """
+        return {'_is_alive': self._is_alive, '_life_point': self._life_point, '_age': self._age}
+
     @abstractmethod
-    def gets_eaten(self) -> int:
+    def gets_eaten(self, rules: Rules | None = None) -> int:
         """
         Method called when the LivingEntity has been eaten. Return PV to add to eater
-        (need to be implemented in subclasses)
+        (need to be implemented in subclasses, DEFAULT_RULES are used if rules is None)
         """
         return 0
 
@@ -159,6 +303,8 @@ class Animal(LivingEntity):
         the name of the animal
     sex : Sex (MALE/FEMALE)
         sex of the animal
+    food_diets : tuple
+        Diet classes of the living entities the animal can eat (class variable)
 
     Methods
     -------
@@ -175,81 +321,199 @@ class Animal(LivingEntity):
         Method to allow animal to eat (need to be implemented in subclasses)
 
     grow_old(self):
-        Method called when the Animal grow_old. If LivingEntity's age >= DEATHING_AGE_IN_DEAY, the LivingEntity will dead
+        Method called when the Animal grow_old. If LivingEntity's age >= rules.deathing_age_in_deay, the LivingEntity will dead
         This method also decrease day_before_baby attribute until 0
+
+    name:
+        Name of the animal (a baby's name is only drawn the first time it's needed)
+
+    sex:
+        Sex of the animal (the value of the sex is stored in _sex)
+
+    create_batch(ages, life_points=None, alive=None, sexes=None, names=None, days_before_baby=None, name_provider=None, name_keys=None):
+        Create len(ages) animals of the class at once (batch factory)
+
+    create_view(entity_id, age, life_point=10, is_alive=True, sex=None, name=None, day_before_baby=TIME_BEFORE_NEW_BABY, name_provider=None,
+                name_key=NO_NAME_KEY):
+        Create an animal of the class with the id entity_id (no id is taken)
     """
+    __slots__ = ('_name', '_name_provider', '_name_key', '_sex', 'day_before_baby')
+    food_diets: tuple[str, ...] = ()
 
-    def __init__(self, name: str, sex: Sex, age=None) -> None:
+    def __init__(self, name: str | None, sex: Sex, age=None, name_provider: NameProvider | None = None) -> None:
         """
         Construct all the necessary attributes for the animal object.
 
         Parameters
         ----------
-            name : str
-                the name of the animal
+            name : str or None
+                the name of the animal (None : the name will be drawn by name_provider from a name key of name_provider when needed)
             sex : Sex (MALE/FEMALE)
                 sex of the animal
+            name_provider : NameProvider or None
+                Provider of the name if name is None (DEFAULT_NAME_PROVIDER if None)
         """
         super().__init__(age=age)
-        self.name = name
+        self._name = name
+        self._name_provider = name_provider
+        self._name_key = (name_provider or DEFAULT_NAME_PROVIDER).reserve_keys(1) if name is None else NO_NAME_KEY
         self.sex = sex
         self.day_before_baby = TIME_BEFORE_NEW_BABY
 
+    @property
+    def name(self) -> str:
+        """
+        Name of the animal (a baby's name is drawn from its name key the first time it's needed, then kept)
+        """
+        if self._name is None:
+            name_provider = self._name_provider or DEFAULT_NAME_PROVIDER
+            self._name = name_provider.name_for_key('female' if self.sex == Sex.FEMALE else 'male', self._name_key)
+            self._name_provider = None
+        return self._name
+
+    @property
+    def sex(self) -> Sex:
+        """
+        Sex of the animal
+        """
+        return SEX_BY_VALUE[self._sex]
+
+    @sex.setter
+    def sex(self, sex: Sex) -> None:
+        """
+        Setter for sex (only the value is stored)
+        """
+        self._sex = sex.value
+
+    @classmethod
+    def create_batch(cls, ages, life_points=None, alive=None, sexes=None, names=None, days_before_baby=None,
+                     name_provider: NameProvider | None = None, name_keys=None) -> list:
+        """
+        Create len(ages) animals of the class at once (see LivingEntity.create_batch). sexes (needed) is a sequence of Sex,
+        animals without names (names is None) get their name from their name key with name_provider when needed
+        (name_keys : name key of each animal, keys are reserved in one step from name_provider if None)
+        """
+        if sexes is None:
+            raise ValueError("Sexes are needed to create animals")
+        animals = super().create_batch(ages, life_points, alive)
+        names = [None] * len(animals) if names is None else list(names)
+        if name_keys is None:
+            nb_lazy_names = names.count(None)
+            first_key = (name_provider or DEFAULT_NAME_PROVIDER).reserve_keys(nb_lazy_names)
+            new_keys = iter(range(first_key, first_key + nb_lazy_names))
+            name_keys = [next(new_keys) if name is None else NO_NAME_KEY for name in names]
+        for animal, sex, name, name_key, day_before_baby in zip(animals, sexes, names, name_keys,
+                                                                repeat(TIME_BEFORE_NEW_BABY) if days_before_baby is None else days_before_baby):
+            animal._name = name
+            animal._name_provider = name_provider
+            animal._name_key = name_key
+            animal._sex = sex.value
+            animal.day_before_baby = day_before_baby
+        return animals
+
+    @classmethod
+    def create_view(cls, entity_id: int, age: int, life_point: int = 10, is_alive: bool = True, sex: Sex | None = None, name: str | None = None,
+                    day_before_baby: int = TIME_BEFORE_NEW_BABY, name_provider: NameProvider | None = None, name_key: int = NO_NAME_KEY):
+        """
+        Create an animal of the class with the id entity_id (see LivingEntity.create_view). sex is needed,
+        an animal without name gets its name from name_key with name_provider when needed
+        """
+        if sex is None:
+            raise ValueError("The sex is needed to create an animal")
+        animal = super().create_view(entity_id, age, life_point, is_alive)
+        animal._name = name
+        animal._name_provider = name_provider
+        animal._name_key = name_key
+        animal._sex = sex.value
+        animal.day_before_baby = day_before_baby
+        return animal
+
+    def __setstate__(self, state) -> None:
+        """
+        Restore the state from pickle (see LivingEntity.__setstate__). Lazy names of animals stored before name keys
+        are drawn from their id
+        """
+        super().__setstate__(state)
+        if not hasattr(self, '_name_key'):
+            self._name_key = self._id
+
+    def set_attribute(self, attribute: str, value) -> None:
+        """
+        Set an attribute read from a JSON configuration file or a binary file
+        (works with animals stored before lazy names and slots : 'name' and 'sex' attributes)
+        """
+        if attribute == 'name':
+            self._name = value
+            self._name_provider = None
+            self._name_key = NO_NAME_KEY
+        elif attribute == 'sex':
+            self.sex = value if isinstance(value, Sex) else Sex.MALE if value == 'Sex.MALE' else Sex.FEMALE
+        else:
+            super().set_attribute(attribute, value)
+
+    def to_json_dict(self) -> dict:
+        """
+        Return a dict describing the animal for JSON configuration files (the name is drawn if needed)
+        """
+        json_dict = super().to_json_dict()
+        json_dict.update({'name': self.name, 'sex': SEX_TO_JSON[self.sex], 'day_before_baby': self.day_before_baby})
+        return json_dict
+
     def __repr__(self) -> str:
         """
         Return a string representation of the animal
         """
         return f'{self.__class__.__name__} {self.name} {"♂️" if self.sex == Sex.MALE else "♀️"} PV {self._life_point} Age {self._age} {"❤️" if self.is_alive else "💀"}'
 
-    def grow_old(self) -> None:
+    def grow_old(self, events: EventBus | None = None, rules: Rules | None = None) -> None:
         """
-        Method called when the Animal grow_old. If LivingEntity's age >= DEATHING_AGE_IN_DEAY, the LivingEntity will dead
+        Method called when the Animal grow_old. If LivingEntity's age >= rules.deathing_age_in_deay, the LivingEntity will dead
         This method also decrease day_before_baby attribute until 0
         """
-        super().grow_old()
+        super().grow_old(events, rules)
         if self.day_before_baby > 0:
             self.day_before_baby -= 1
 
-    def do_actions(self, other_living_entities: list[LivingEntity]):
+    def do_actions(self, other_living_entities: list[LivingEntity] | LivingEntityIndex):
         """
         Do action(s) for the current animal. If the Animal makes a baby, new animal will be return. In the othercase, None will be returned
+
+        other_living_entities can be a list of LivingEntity or the LivingEntityIndex maintained by the paddock
+        (in this case, food and partner are found without scanning all living entities and events are emitted on the paddock's bus)
         """
         baby = None
+        if isinstance(other_living_entities, LivingEntityIndex):
+            index = other_living_entities
+        else:
+            index = LivingEntityIndex(other_living_entities)
+        events = index.events
+        rules = index.rules
         # Only if the animal is alive
         if self.is_alive:
             # First, the animal grow old
-            self.grow_old()
+            self.grow_old(events, rules)
             # If the animal is always alive
             if self.is_alive:
-                # First, the animal losts PV_LOSTS_ANIMAL_BY_DAY (1) PV
-                self._life_point -= PV_LOSTS_ANIMAL_BY_DAY
+                # First, the animal losts rules.pv_losts_animal_by_day (1) PV
+                self._life_point -= rules.pv_losts_animal_by_day
                 # Check PV and continue process only if animal is alive
                 if self.check_PV():
-                    if self._life_point <= LIMIT_PV_BEFORE_EATEN:
+                    if self._life_point <= rules.limit_pv_before_eaten:
 
                         # The animal needs to eat a plant or an another animal
-                        living_entities = [le for le in other_living_entities if le.is_alive]
-                        shuffle(living_entities)
-                        has_already_eaten = False
-                        while not has_already_eaten and len(living_entities):
-                            another_living_entity = living_entities.pop()
-                            if self.can_eat(another_living_entity):
-                                self.eat(another_living_entity)
-                                has_already_eaten = True
-
-                        if not has_already_eaten:
-                            print(f"{self} couldn't eat :'(")
+                        another_living_entity = index.random_food(self)
+                        if another_living_entity is not None:
+                            self.eat(another_living_entity, events, rules)
+                            index.refresh(another_living_entity)
+                        elif events.wants(STARVED):
+                            events.emit(STARVED, animal=self)
 
                     else:
                         if self.day_before_baby == 0:
                             # Try to make baby with another animal
-                            living_entities = [le for le in other_living_entities if le.is_alive]
-                            has_already_make_baby = False
-                            while not has_already_make_baby and len(living_entities):
-                                another_living_entity = living_entities.pop()
-                                if self.can_make_baby(another_living_entity):
-                                    baby = self.make_baby(another_living_entity)
-                                    has_already_make_baby = True
+                            another_living_entity = index.partner(self)
+                            if another_living_entity is not None:
+                                baby = self.make_baby(another_living_entity, events, index.name_provider, index.rng, rules)
 
         return baby
 
@@ -269,7 +533,7 @@ class Animal(LivingEntity):
         """
         return False
 
-    def eat(self, other_living_entity) -> None:
+    def eat(self, other_living_entity, events: EventBus | None = None, rules: Rules | None = None) -> None:
         """
         Method to allow animal to eat
 
@@ -277,22 +541,29 @@ class Animal(LivingEntity):
         ----------
         other_living_entity : other LivingEntity
             that current animal will eat
+        events : EventBus
+            Bus where the eaten event is emitted (DEFAULT_EVENT_BUS if None)
+        rules : Rules
+            Rules giving the PV lost and obtained (DEFAULT_RULES if None)
 
         Returns
         -------
         None
         """
         if self.can_eat(other_living_entity):
-            self._life_point += other_living_entity.gets_eaten()
-            print(f"{self} eat {other_living_entity}")
+            self._life_point += other_living_entity.gets_eaten(rules)
+            events = events or DEFAULT_EVENT_BUS
+            if events.wants(EATEN):
+                events.emit(EATEN, eater=self, food=other_living_entity)
 
-    def gets_eaten(self) -> int:
+    def gets_eaten(self, rules: Rules | None = None) -> int:
         """
         Method called when the Animal has been eaten. Return PV to add to eater
         """
-        self._life_point -= PV_LOSTS_ANIMAL_WHEN_EATEN
+        rules = rules or DEFAULT_RULES
+        self._life_point -= rules.pv_losts_animal_when_eaten
         self.check_PV()
-        return PV_OBTAINED_CARNIVOROUS_BY_ANIMAL
+        return rules.pv_obtained_carnivorous_by_animal
 
     def can_make_baby(self, other_living_entity) -> bool:
         """
@@ -305,16 +576,21 @@ class Animal(LivingEntity):
             type(self) == type(other_living_entity) and \
             self.sex != other_living_entity.sex and other_living_entity.day_before_baby == 0
 
-    def make_baby(self, other_living_entity) -> LivingEntity:
-        """
-        Method that create a new animal
-        """
-        baby_sex = choice([Sex.FEMALE, Sex.MALE])
-        baby_name = names.get_first_name(gender='female' if baby_sex == Sex.FEMALE else 'male')
-        baby = self.__class__(baby_name, baby_sex, age=0)
-        print(f"New baby {baby} is born 👶")
-        self.day_before_baby = TIME_BEFORE_NEW_BABY
-        other_living_entity.day_before_baby = TIME_BEFORE_NEW_BABY
+    def make_baby(self, other_living_entity, events: EventBus | None = None, name_provider: NameProvider | None = None,
+                  rng: random.Random | None = None, rules: Rules | None = None) -> LivingEntity:
+        """
+        Method that create a new animal (a born event is emitted on events, the name of the baby will be given by name_provider,
+        its sex is drawn with rng, GLOBAL_RANDOM if None, parents wait rules.time_before_new_baby days before another baby)
+        """
+        baby_sex = (rng or GLOBAL_RANDOM).choice([Sex.FEMALE, Sex.MALE])
+        # The name of the baby will only be drawn if it's needed (report, serialization...)
+        baby = self.__class__(None, baby_sex, age=0, name_provider=name_provider)
+        baby.day_before_baby = (rules or DEFAULT_RULES).time_before_new_baby
+        self.day_before_baby = baby.day_before_baby
+        other_living_entity.day_before_baby = baby.day_before_baby
+        events = events or DEFAULT_EVENT_BUS
+        if events.wants(BORN):
+            events.emit(BORN, baby=baby, parent=self, partner=other_living_entity)
         return baby
 
 
@@ -342,6 +618,9 @@ class Carnivorous(Animal):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
+    diet = "carnivorous"
+    food_diets = ("herbivore", "carnivorous")
 
     @abstractmethod
     def can_eat(self, other_living_entity) -> bool:
@@ -384,6 +663,7 @@ class Lion(Carnivorous):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
 
     def can_eat(self, other_living_entity) -> bool:
         """
@@ -434,6 +714,7 @@ class Tiger(Carnivorous):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
 
     def can_eat(self, other_living_entity) -> bool:
         """
@@ -484,6 +765,7 @@ class Coyote(Carnivorous):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
 
     def can_eat(self, other_living_entity) -> bool:
         """
@@ -534,6 +816,10 @@ class Herbivore(Animal):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
+
+    diet = "herbivore"
+    food_diets = ("plant",)
 
     @abstractmethod
     def can_eat(self, other_living_entity) -> bool:
@@ -576,6 +862,7 @@ class Elephant(Herbivore):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
 
     def __repr__(self) -> str:
         """
@@ -623,6 +910,7 @@ class Giraffe(Herbivore):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
 
     def __repr__(self) -> str:
         """
@@ -670,6 +958,7 @@ class Antelope(Herbivore):
     eat(self, other_living_entity):
         Method to allow animal to eat (need to be implemented in subclasses)
     """
+    __slots__ = ()
 
     def __repr__(self) -> str:
         """
@@ -714,41 +1003,50 @@ class Plant(LivingEntity):
         Method called when the Plant has been eaten. Return PV to add to eater
 
     """
+    __slots__ = ()
+    diet = "plant"
+
     def __init__(self, age=None) -> None:
         """
         Construct all the necessary attributes for the Plant object.
         """
         super().__init__(age=age)
 
-    def do_actions(self, other_living_entities: list[LivingEntity]):
+    def do_actions(self, other_living_entities: list[LivingEntity] | LivingEntityIndex):
         """
         Do action(s) for the current Plant
         Can return a new plant (or None)
         """
         other_plant = None
+        if isinstance(other_living_entities, LivingEntityIndex):
+            events, rules = other_living_entities.events, other_living_entities.rules
+        else:
+            events, rules = DEFAULT_EVENT_BUS, DEFAULT_RULES
         if self.is_alive:
             # Plant grow old
-            self.grow_old()
+            self.grow_old(events, rules)
             # If plant is always alive
             if self.is_alive:
-                # Plant get PV_OBTAINED_PLANT_BY_DAY (1) PV per day
-                self._life_point += PV_OBTAINED_PLANT_BY_DAY
+                # Plant get rules.pv_obtained_plant_by_day (1) PV per day
+                self._life_point += rules.pv_obtained_plant_by_day
 
-            if self.life_point >= MIN_PV_TO_SPLIT_PLANT:
+            if self.life_point >= rules.min_pv_to_split_plant:
                 other_plant = Plant(age=0)
                 other_plant._life_point = self.life_point // 2
                 self._life_point = self.life_point // 2
-                print(f"New plant {other_plant} is born 👶")
+                if events.wants(SPLIT):
+                    events.emit(SPLIT, plant=other_plant, parent=self)
 
         return other_plant
 
-    def gets_eaten(self) -> int:
+    def gets_eaten(self, rules: Rules | None = None) -> int:
         """
         Method called when the Plant has been eaten. Return PV to add to eater
         """
-        self._life_point -= PV_LOSTS_PLANT_WHEN_EATEN
+        rules = rules or DEFAULT_RULES
+        self._life_point -= rules.pv_losts_plant_when_eaten
         self.check_PV()
-        return PV_OBTAINED_HERBIVORE_BY_PLANT
+        return rules.pv_obtained_herbivore_by_plant
 
     def __repr__(self) -> str:
         """
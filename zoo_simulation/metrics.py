@@ -0,0 +1,282 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import numpy as np
+from .events import EventSink, EATEN, STARVED
+from .vector_engine import SPECIES
+if TYPE_CHECKING:
+    from .paddock import Paddock
+
+# Metrics recorded each day for each species of SPECIES
+METRICS = ['alive', 'births', 'deaths', 'deaths_of_age', 'deaths_by_predation', 'starved', 'mean_life_point']
+# Metrics counting what happened during the days of a row (summed when rows are merged), other metrics are values of the last day of the row
+COUNTED_METRICS = ['births', 'deaths', 'deaths_of_age', 'deaths_by_predation', 'starved']
+# Species code (position in SPECIES) of each species name
+SPECIES_CODES = {species.__name__: code for code, species in enumerate(SPECIES)}
+# Initial number of rows of the arrays of a recorder (they are doubled when they are full)
+INITIAL_CAPACITY = 1024
+# Number of rows formatted at once when a CSV file is written
+CSV_CHUNK_ROWS = 4096
+
+
+class MetricsSink(EventSink):
+    """
+    A sink counting deaths by predation (eaten events whose food died) and starvations of each species code.
+    Used by a MetricsRecorder with the 'objects' engine (the vectorized engine counts them in its arrays)
+
+    ...
+
+    Attributes
+    ----------
+    predation_counts : list
+        Number of entities of each species code eaten to death
+    starved_counts : list
+        Number of times an animal of each species code couldn't eat
+    """
+
+    def __init__(self) -> None:
+        """
+        Construct a sink subscribing to eaten and starved events
+        """
+        super().__init__([EATEN, STARVED])
+        self.predation_counts = [0] * len(SPECIES)
+        self.starved_counts = [0] * len(SPECIES)
+
+    def handle(self, event_type: str, day: int, fields: dict) -> None:
+        """
+        Count the event
+        """
+        if event_type == EATEN:
+            if not fields['food'].is_alive:
+                self.predation_counts[SPECIES_CODES[fields['food'].species]] += 1
+        else:
+            self.starved_counts[SPECIES_CODES[fields['animal'].species]] += 1
+
+
+class MetricsRecorder():
+    """
+    A class to record the metrics of each day of a paddock (see METRICS) for each species of SPECIES in typed arrays.
+
+    A row holds days_per_row days : counted metrics are summed, alive and mean PV are the values of the last day of the row.
+    Arrays are preallocated and doubled when they are full. With max_rows, memory is bounded : when all rows are used,
+    rows are merged by pairs and days_per_row is doubled (a run of 100000 days fits in max_rows rows).
+    Counts of a day are differences of counters of the paddock (graveyard, alive entities) between the start and the end
+    of the day, births included (alive at the end - alive at the start + deaths).
+
+    ...
+
+    Attributes
+    ----------
+    days_per_row : int
+        Number of days of a row
+    max_rows : int or None
+        Maximum number of rows (None : no limit)
+    nb_rows : int
+        Number of rows recorded
+    sink : MetricsSink
+        Sink counting deaths by predation and starvations on the bus of the paddock ('objects' engine)
+
+    Methods
+    -------
+    start_day(paddock):
+        Take the counters of the paddock before the day
+
+    record(paddock):
+        Add the counts of the day to the last row (or to a new row)
+
+    days():
+        Return the last day of each row
+
+    column(metric):
+        Return the values of metric for each row and each species code
+
+    write_csv(filename):
+        Write one line per row in a CSV file
+
+    write_npy(filename):
+        Write a structured array with one item per row in a NPY file
+
+    export(filename):
+        Write a CSV or NPY file (depending on the extension of filename)
+    """
+
+    def __init__(self, days_per_row: int = 1, max_rows: int | None = None, capacity: int = INITIAL_CAPACITY) -> None:
+        """
+        Construct an empty recorder
+
+        Parameters
+        ----------
+            days_per_row : int
+                Number of days of a row (downsampling, 1 : one row per day)
+            max_rows : int or None
+                Maximum number of rows : rows are merged by pairs when they are all used (None : no limit)
+            capacity : int
+                Initial number of rows of the arrays
+        """
+        if days_per_row < 1:
+            raise ValueError(f"Number of days of a row must be at least 1 (not {days_per_row})")
+        if max_rows is not None and max_rows < 2:
+            raise ValueError(f"Maximum number of rows must be at least 2 (not {max_rows})")
+        self.days_per_row = days_per_row
+        self.max_rows = max_rows
+        self.nb_rows = 0
+        self.sink = MetricsSink()
+        capacity = max(1, capacity if max_rows is None else min(capacity, max_rows))
+        self._days = np.zeros(capacity, dtype=np.int64)
+        self._columns = {metric: np.zeros((capacity, len(SPECIES)), dtype=np.float64 if metric == 'mean_life_point' else np.int64) for metric in METRICS}
+        # Number of days in the last row
+        self._days_in_row = 0
+        # Counters of the paddock at the start of the day
+        self._counters_before: np.ndarray | None = None
+
+    def _counters(self, paddock: Paddock) -> np.ndarray:
+        """
+        Return the counters of paddock for each species code : alive entities, deaths, deaths of age, deaths by predation, starvations
+        """
+        graveyard = paddock.graveyard
+        counter = paddock.vector_engine if paddock.vector_engine is not None else self.sink
+        return np.array([paddock.count_alive_by_species(),
+                         [graveyard.count(species.__name__) for species in SPECIES],
+                         [graveyard.count_of_age(species.__name__) for species in SPECIES],
+                         counter.predation_counts,
+                         counter.starved_counts], dtype=np.int64)
+
+    def start_day(self, paddock: Paddock) -> None:
+        """
+        Take the counters of paddock before the day (called by Paddock.and_one_more_day)
+        """
+        self._counters_before = self._counters(paddock)
+
+    def record(self, paddock: Paddock) -> None:
+        """
+        Add the counts of the day to the last row, or to a new row if the last one is full (called by Paddock.and_one_more_day,
+        a day recorded without start_day has no births nor deaths)
+        """
+        counters = self._counters(paddock)
+        alive, deaths, deaths_of_age, deaths_by_predation, starved = counters - (self._counters_before if self._counters_before is not None else counters)
+        self._counters_before = None
+        if self.nb_rows == 0 or self._days_in_row >= self.days_per_row:
+            self._add_row()
+        row = self.nb_rows - 1
+        columns = self._columns
+        self._days[row] = paddock.paddock_age
+        columns['alive'][row] = counters[0]
+        columns['births'][row] += alive + deaths
+        columns['deaths'][row] += deaths
+        columns['deaths_of_age'][row] += deaths_of_age
+        columns['deaths_by_predation'][row] += deaths_by_predation
+        columns['starved'][row] += starved
+        with np.errstate(invalid='ignore', divide='ignore'):
+            columns['mean_life_point'][row] = np.array(paddock.life_points_by_species()) / counters[0]
+        self._days_in_row += 1
+
+    def _add_row(self) -> None:
+        """
+        Start a new row (rows are merged by pairs before if max_rows rows are used, the last row may be continued in this case)
+        """
+        if self.max_rows is not None and self.nb_rows >= self.max_rows:
+            self._merge_rows()
+            if self._days_in_row < self.days_per_row:
+                return
+        if self.nb_rows == len(self._days):
+            self._reserve(2 * self.nb_rows)
+        self._days[self.nb_rows] = 0
+        for column in self._columns.values():
+            column[self.nb_rows] = 0
+        self.nb_rows += 1
+        self._days_in_row = 0
+
+    def _reserve(self, capacity: int) -> None:
+        """
+        Grow arrays to hold capacity rows
+        """
+        if self.max_rows is not None:
+            capacity = min(capacity, self.max_rows)
+        self._days = np.concatenate([self._days, np.zeros(capacity - len(self._days), dtype=np.int64)])
+        for metric, column in self._columns.items():
+            self._columns[metric] = np.concatenate([column, np.zeros((capacity - len(column), len(SPECIES)), dtype=column.dtype)])
+
+    def _merge_rows(self) -> None:
+        """
+        Merge rows by pairs (counted metrics are summed, the second row of a pair gives other metrics) and double days_per_row.
+        With an odd number of rows, the last row is kept and continued
+        """
+        nb_pairs, odd = divmod(self.nb_rows, 2)
+        for metric, column in self._columns.items():
+            merged = column[0:2 * nb_pairs:2] + column[1:2 * nb_pairs:2] if metric in COUNTED_METRICS else column[1:2 * nb_pairs:2].copy()
+            column[:nb_pairs] = merged
+            if odd:
+                column[nb_pairs] = column[self.nb_rows - 1]
+        self._days[:nb_pairs] = self._days[1:2 * nb_pairs:2].copy()
+        if odd:
+            self._days[nb_pairs] = self._days[self.nb_rows - 1]
+        # A last row without pair is half of a row of the new size (it's continued), other rows are full
+        self._days_in_row = self.days_per_row if odd else 2 * self.days_per_row
+        self.nb_rows = nb_pairs + odd
+        self.days_per_row *= 2
+
+    def days(self) -> np.ndarray:
+        """
+        Return the last day of each row (a view of the array of the recorder)
+        """
+        return self._days[:self.nb_rows]
+
+    def column(self, metric: str) -> np.ndarray:
+        """
+        Return the values of metric for each row and each species code (a view of the array of the recorder, one line per row)
+        """
+        if metric not in self._columns:
+            raise ValueError(f"Unknown metric {metric} (available metrics : {', '.join(METRICS)})")
+        return self._columns[metric][:self.nb_rows]
+
+    def column_names(self) -> list[str]:
+        """
+        Return the names of the columns of the exported files : 'day', then 'Species_metric' for each species and each metric
+        """
+        return ['day'] + [f"{species.__name__}_{metric}" for species in SPECIES for metric in METRICS]
+
+    def _table(self, start: int, stop: int) -> np.ndarray:
+        """
+        Return the rows start to stop - 1 in a 2D array with the columns of column_names (counts are exact in float64)
+        """
+        table = np.empty((stop - start, 1 + len(SPECIES) * len(METRICS)), dtype=np.float64)
+        table[:, 0] = self._days[start:stop]
+        for metric_position, metric in enumerate(METRICS):
+            table[:, 1 + metric_position::len(METRICS)] = self._columns[metric][start:stop]
+        return table
+
+    def write_csv(self, filename: str, chunk_rows: int = CSV_CHUNK_ROWS) -> None:
+        """
+        Write a header line and one line per row in the CSV file filename. Rows are formatted chunk by chunk with one
+        format operation (no Python object per row)
+        """
+        row_format = ",".join(["%d"] + ["%.3f" if metric == 'mean_life_point' else "%d" for _ in SPECIES for metric in METRICS]) + "\n"
+        with open(filename, 'w') as fp:
+            fp.write(",".join(self.column_names()) + "\n")
+            for start in range(0, self.nb_rows, chunk_rows):
+                table = self._table(start, min(start + chunk_rows, self.nb_rows))
+                fp.write((row_format * len(table)) % tuple(table.ravel().tolist()))
+
+    def write_npy(self, filename: str) -> None:
+        """
+        Write a structured array with one item per row and one field per column of column_names in the NPY file filename
+        (fields are copied column by column, read it with numpy.load)
+        """
+        names = self.column_names()
+        dtypes = [np.dtype(np.int64)] + [self._columns[metric].dtype for _ in SPECIES for metric in METRICS]
+        table = np.zeros(self.nb_rows, dtype=list(zip(names, dtypes)))
+        table['day'] = self.days()
+        for code, species in enumerate(SPECIES):
+            for metric in METRICS:
+                table[f"{species.__name__}_{metric}"] = self._columns[metric][:self.nb_rows, code]
+        np.save(filename, table)
+
+    def export(self, filename: str) -> None:
+        """
+        Write a CSV file (.csv extension) or a NPY file (.npy extension)
+        """
+        if filename.endswith('.csv'):
+            self.write_csv(filename)
+        elif filename.endswith('.npy'):
+            self.write_npy(filename)
+        else:
+            raise ValueError(f"Unknown metrics file format {filename} (expected a .csv or .npy file)")
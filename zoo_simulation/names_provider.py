@@ -0,0 +1,231 @@
+from __future__ import annotations
+import copy
+import random
+from abc import ABC, abstractmethod
+import numpy as np
+
+GENDERS = ['male', 'female']
+MASK_64_BITS = (1 << 64) - 1
+
+
+def uniform_from_id(seed: int, entity_id: int) -> float:
+    """
+    Return a number in [0, 1) only depending on seed and entity_id (splitmix64 hash, entity_id is any integer key)
+    """
+    x = (seed * 0x9E3779B97F4A7C15 + entity_id * 0xBF58476D1CE4E5B9) & MASK_64_BITS
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64_BITS
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK_64_BITS
+    x ^= x >> 31
+    return x / (1 << 64)
+
+
+class NameProvider(ABC):
+    """
+    An abstract class to represent a provider of first names for baby animals.
+
+    Name tables are loaded once (lazily, the first time a name is needed) and names are drawn
+    with the random generator of the simulation. A lazy name is drawn from a name key given by the provider :
+    each paddock has its own copy of the provider (see spawn), with its own seed and its own keys, so the names
+    of a paddock don't depend on the other paddocks of the process.
+
+    ...
+
+    Attributes
+    ----------
+    _tables : dict or None
+        For each gender ('male', 'female'), a tuple (names, cumulative weights as a NumPy array). None until the first draw
+    _source : NameProvider or None
+        Provider loading the tables of a copy given by spawn (None : the provider loads its tables)
+    seed : int
+        Seed used to draw names from name keys of animals
+    next_key : int
+        Name key of the next animal with a lazy name
+
+    Methods
+    -------
+    first_name(gender, rng=None):
+        Return a random first name for gender ('male' or 'female')
+
+    reserve_keys(nb_keys):
+        Reserve nb_keys consecutive name keys. Return the first one
+
+    name_for_key(gender, name_key):
+        Return the first name of the animal whose name key is name_key (always the same for a given seed)
+
+    spawn(seed):
+        Return a copy of the provider with its own seed and its own name keys (tables are shared)
+
+    first_names(genders, rng):
+        Return a random first name for each gender of genders (rng is a NumPy Generator)
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        """
+        Construct a provider (tables are not loaded yet)
+        """
+        self._tables: dict[str, tuple[list[str], np.ndarray]] | None = None
+        self._source: NameProvider | None = None
+        self.seed = seed
+        self.next_key = 0
+
+    def __getstate__(self) -> dict:
+        """
+        Return the state to pickle (tables are not stored, they will be loaded again when needed)
+        """
+        state = dict(self.__dict__)
+        state['_tables'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the state from pickle (works with providers stored before name keys too)
+        """
+        self.__dict__.update(state)
+        self.__dict__.setdefault('_source', None)
+        self.__dict__.setdefault('next_key', 0)
+
+    @abstractmethod
+    def load_tables(self) -> dict[str, tuple[list[str], np.ndarray]]:
+        """
+        Return, for each gender, the list of names and their cumulative weights
+        (need to be implemented in subclasses)
+        """
+        return {}
+
+    def _get_tables(self) -> dict[str, tuple[list[str], np.ndarray]]:
+        """
+        Return name tables (they are loaded on the first call)
+        """
+        if self._source is not None:
+            return self._source._get_tables()
+        if self._tables is None:
+            self._tables = self.load_tables()
+        return self._tables
+
+    def first_name(self, gender: str, rng=None) -> str:
+        """
+        Return a random first name for gender ('male' or 'female'), drawn with rng (a random.Random, random module if None)
+        """
+        names, cumulative_weights = self._get_tables()[gender]
+        if not names:
+            return ""
+        return self._name_at(names, cumulative_weights, (rng or random).random())
+
+    def reserve_keys(self, nb_keys: int) -> int:
+        """
+        Reserve nb_keys consecutive name keys (the lazy names of new animals are drawn from them). Return the first one
+        """
+        first_key = self.next_key
+        self.next_key += nb_keys
+        return first_key
+
+    def name_for_key(self, gender: str, name_key: int) -> str:
+        """
+        Return the first name of the animal whose name key is name_key (always the same for a given seed, no random generator is used)
+        """
+        names, cumulative_weights = self._get_tables()[gender]
+        if not names:
+            return ""
+        return self._name_at(names, cumulative_weights, uniform_from_id(self.seed, name_key))
+
+    def spawn(self, seed: int) -> NameProvider:
+        """
+        Return a copy of the provider giving the same names with its own seed (the seed of the provider mixed with seed)
+        and its own name keys, starting at 0. Tables are loaded once, by the provider which was not spawned
+        """
+        source = self._source or self
+        provider = copy.copy(source)
+        provider._tables = None
+        provider._source = source
+        provider.seed = (source.seed ^ seed) & MASK_64_BITS
+        provider.next_key = 0
+        return provider
+
+    @staticmethod
+    def _name_at(names: list[str], cumulative_weights: np.ndarray, uniform: float) -> str:
+        """
+        Return the name selected by uniform (a number in [0, 1))
+        """
+        selected = uniform * cumulative_weights[-1]
+        return names[min(int(np.searchsorted(cumulative_weights, selected, side='right')), len(names) - 1)]
+
+    def first_names(self, genders: list[str], rng: np.random.Generator) -> list[str]:
+        """
+        Return a random first name for each gender of genders (all names are drawn with one call of rng by gender)
+        """
+        tables = self._get_tables()
+        genders_array = np.asarray(genders)
+        first_names = [""] * len(genders)
+        for gender in GENDERS:
+            positions = np.flatnonzero(genders_array == gender)
+            names, cumulative_weights = tables[gender]
+            if len(positions) == 0 or not names:
+                continue
+            selected = rng.random(len(positions)) * cumulative_weights[-1]
+            drawn = np.minimum(np.searchsorted(cumulative_weights, selected, side='right'), len(names) - 1)
+            for position, name_position in zip(positions.tolist(), drawn.tolist()):
+                first_names[position] = names[name_position]
+        return first_names
+
+
+class NamesPackageProvider(NameProvider):
+    """
+    A provider using the first names of the names package (names are drawn with the frequencies of the package)
+    """
+
+    def load_tables(self) -> dict[str, tuple[list[str], np.ndarray]]:
+        """
+        Read the male and female first name files of the names package
+        """
+        import names as names_package
+        tables = {}
+        for gender in GENDERS:
+            names, cumulative_weights = [], []
+            with open(names_package.FILES[f'first:{gender}']) as name_file:
+                for line in name_file:
+                    name, _, cumulative, _ = line.split()
+                    names.append(name.capitalize())
+                    cumulative_weights.append(float(cumulative))
+            tables[gender] = (names, np.array(cumulative_weights))
+        return tables
+
+
+class FileNameProvider(NameProvider):
+    """
+    A provider using a custom file of names : one name per line, optionally followed by 'male' or 'female'
+    (a name without gender can be given to both genders). All names have the same probability.
+
+    ...
+
+    Attributes
+    ----------
+    filename : str
+        Name of the file
+    """
+
+    def __init__(self, filename: str, seed: int = 0) -> None:
+        """
+        Construct a provider reading names in filename (the file is read on the first draw)
+        """
+        super().__init__(seed)
+        self.filename = filename
+
+    def load_tables(self) -> dict[str, tuple[list[str], np.ndarray]]:
+        """
+        Read names of the file
+        """
+        names: dict[str, list[str]] = {gender: [] for gender in GENDERS}
+        with open(self.filename) as name_file:
+            for line in name_file:
+                infos = line.split()
+                if not infos:
+                    continue
+                if len(infos) > 1 and infos[1].lower() not in GENDERS:
+                    raise ValueError(f"Unknown gender {infos[1]} for name {infos[0]} in {self.filename}")
+                for gender in GENDERS if len(infos) == 1 else [infos[1].lower()]:
+                    names[gender].append(infos[0])
+        return {gender: (names[gender], np.arange(1, len(names[gender]) + 1, dtype=np.float64)) for gender in GENDERS}
+
+
+# Provider used when no provider is given (a paddock uses a copy given by spawn, make_baby outside a paddock uses it)
+DEFAULT_NAME_PROVIDER: NameProvider = NamesPackageProvider()
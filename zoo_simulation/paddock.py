@@ -1,9 +1,117 @@
 import re
-import json
 import pickle
-from typing import Dict
-from io import StringIO
-from .living_entity import LivingEntity, Plant, Sex, Animal, Lion, Tiger, Coyote, Elephant, Giraffe, Antelope
+import time
+import numpy as np
+from functools import partial
+from typing import Dict, TYPE_CHECKING
+from .living_entity import LivingEntity, Plant, Sex, Animal, Herbivore, Carnivorous, Lion, Tiger, Coyote, Elephant, Giraffe, Antelope
+from .living_entity import TIME_BEFORE_NEW_BABY, SEX_FROM_JSON
+from .entity_index import LivingEntityIndex, SpatialLivingEntityIndex
+from .graveyard import Graveyard
+from .plant_store import PlantStore, PlantArrayStore, PlantCohortStore
+from .vector_engine import VectorizedEngine, DeadAnimalStore, SPECIES, PLANT_CODE
+from .events import EventBus, StdoutSink
+from .names_provider import NameProvider, DEFAULT_NAME_PROVIDER
+from .random_streams import SimulationRandom
+from .rules import Rules, DEFAULT_RULES
+from .json_lines import write_json_lines, read_json_lines, read_chunks, READ_CHUNK_SIZE
+if TYPE_CHECKING:
+    from .journal import Journal
+    from .metrics import MetricsRecorder
+    from .profiling import DayProfiler
+
+ANIMALS_DICT: Dict = {f"{e.__name__}": e for e in [Lion, Tiger, Coyote, Elephant, Giraffe, Antelope]}
+# Species code (position in SPECIES) of each class of living entity
+SPECIES_CODES: Dict = {species: code for code, species in enumerate(SPECIES)}
+ENGINES = ['objects', 'vectorized']
+PLANT_ENGINES = ['objects', 'numpy', 'cohorts']
+# 'summary' : one line per species, 'full' : one line per animal, 'sampled' : at most report_sample_size animals
+REPORT_LEVELS = ['summary', 'full', 'sampled']
+# Keys of a JSON configuration line used by the batch factory (other keys are set with set_attribute)
+JSON_BATCH_KEYS = {'__name__', '_is_alive', '_life_point', '_age', 'name', 'sex', 'day_before_baby'}
+
+
+def create_animal(description: str, rng: SimulationRandom | None = None, rules: Rules | None = None) -> Animal | None:
+    """
+    Create an animal from a description 'Lion/Tiger/Coyote/Elephant/Giraffe/Antelope animal_name m/f'
+    (its age is drawn with rng, GLOBAL_RANDOM if None, between the ages of rules). Return None if the description is not valid
+    """
+    infos = description.split(" ")
+    if len(infos) == 3 and infos[0] in ANIMALS_DICT and infos[2].lower() in ['m', 'f']:
+        return ANIMALS_DICT[infos[0]](infos[1], Sex.MALE if infos[2].lower() == 'm' else Sex.FEMALE, age=LivingEntity.random_age(rng, rules))
+    return None
+
+
+def create_plants_from_json(rows: list[dict]) -> list[LivingEntity]:
+    """
+    Create the plants described by rows of a JSON configuration file at once
+    """
+    return Plant.create_batch([row['_age'] for row in rows], [row.get('_life_point', 10) for row in rows], [row.get('_is_alive', True) for row in rows])
+
+
+def create_animals_from_json(animal_class: type[Animal], rows: list[dict]) -> list[LivingEntity]:
+    """
+    Create the animals of animal_class described by rows of a JSON configuration file at once
+    """
+    return animal_class.create_batch([row['_age'] for row in rows], [row.get('_life_point', 10) for row in rows], [row.get('_is_alive', True) for row in rows],
+                                     sexes=[SEX_FROM_JSON[row['sex']] for row in rows],
+                                     names=[row['name'] for row in rows],
+                                     days_before_baby=[row.get('day_before_baby', TIME_BEFORE_NEW_BABY) for row in rows])
+
+
+def create_factories(animals_dict=ANIMALS_DICT) -> dict:
+    """
+    Return the dispatch table of JSON configuration files : for each class name, the function creating entities of the class from rows
+    """
+    factories = {Plant.__name__: create_plants_from_json}
+    for class_name, animal_class in animals_dict.items():
+        factories[class_name] = partial(create_animals_from_json, animal_class)
+    return factories
+
+
+def create_living_entities(le_dicts: list[dict], animals_dict=ANIMALS_DICT, factories: dict | None = None) -> list[LivingEntity]:
+    """
+    Create the living entities described by dicts read in a JSON configuration file, in the same order.
+    Entities of a same class are created at once by the factory of the class (see create_factories)
+    """
+    factories = factories or create_factories(animals_dict)
+    positions_by_class: dict[str, list[int]] = {}
+    for position, le_dict in enumerate(le_dicts):
+        positions_by_class.setdefault(le_dict['__name__'], []).append(position)
+
+    living_entities: list = [None] * len(le_dicts)
+    for class_name, positions in positions_by_class.items():
+        if class_name not in factories:
+            raise ValueError(f"Unknown living entity class {class_name}")
+        rows = [le_dicts[position] for position in positions]
+        created = factories[class_name](rows)
+        for position, row, living_entity in zip(positions, rows, created):
+            for attribute in row.keys() - JSON_BATCH_KEYS:
+                living_entity.set_attribute(attribute, row[attribute])
+            living_entities[position] = living_entity
+    return living_entities
+
+
+def ask_filename(message: str) -> str:
+    """
+    Ask a filename to the user (interactive commands)
+    """
+    print(message)
+    return input()
+
+
+def create_summary_table(species_summary: dict[str, dict]) -> str:
+    """
+    Create a table with one line per species of species_summary (see Paddock.species_summary)
+    """
+    lines = [f"{'Species':<10}{'Alive':>8}{'Dead':>8}{'Mean PV':>9}{'Mean age':>10}{'Females ready':>15}\n"]
+    for species_name, row in species_summary.items():
+        mean_life_point = f"{row['mean_life_point']:.1f}" if row['mean_life_point'] is not None else "-"
+        mean_age = f"{row['mean_age']:.1f}" if row['mean_age'] is not None else "-"
+        females_ready = row['females_ready'] if row['females_ready'] is not None else "-"
+        lines.append(f"{species_name:<10}{row['alive']:>8}{row['dead']:>8}{mean_life_point:>9}{mean_age:>10}{females_ready:>15}\n")
+    lines.append("---------------\n")
+    return "".join(lines)
 
 
 class Paddock():
@@ -16,6 +124,40 @@ class Paddock():
     ----------
     lst_living_entity : list
         List of living entity in the paddock (plant(s) / animal(s))
+    index : LivingEntityIndex
+        Index of the alive living entities (by diet class and by species) used by animals to find food and partner
+    graveyard : Graveyard
+        Aggregated informations about dead living entities removed from lst_living_entity
+    animal_roster : list
+        Animals displayed in the report, in insertion order (alive animals and the last dead animals kept by the graveyard)
+    plant_store : PlantStore or None
+        Store holding the plants when plant engine is not 'objects' (plants are not in lst_living_entity in this case)
+    vector_engine : VectorizedEngine or None
+        Engine holding all living entities in typed arrays when engine is 'vectorized' (lst_living_entity is not used in this case)
+    events : EventBus
+        Bus where living entities emit their events (eaten, born, split, starved, died_of_age)
+    report_level : str
+        Level of the report ('summary', 'full' or 'sampled')
+    report_sample_size : int
+        Maximum number of animals displayed by a 'sampled' report
+    name_provider : NameProvider
+        Provider of the names of babies (a copy of the given provider, seeded by rng, with the name keys of the paddock)
+    rng : SimulationRandom
+        Random generator of the paddock (ages, food, sex of babies...), stored in binary files
+    rules : Rules
+        Rules of the simulation (PV lost and obtained, ages, split of plants...), stored in binary files
+    grid_size : tuple or None
+        (width, height) of the grid of a spatial paddock (None : no position, animals find food and partner in the whole paddock)
+    radius : float
+        Maximum distance between an animal and its food or its partner in a spatial paddock
+    move_distance : int
+        Maximum move of an animal each day in a spatial paddock (in each direction)
+    journal : Journal or None
+        Journal where a record is appended at the end of each day (incremental checkpoint), not stored in binary files
+    metrics : MetricsRecorder or None
+        Recorder of the metrics of each day (counts of each species), not stored in binary files
+    profiler : DayProfiler or None
+        Profiler timing the phases of each day, not stored in binary files
 
     Methods
     -------
@@ -32,21 +174,75 @@ class Paddock():
     run_simulation()
         Run simulation of life in a paddock
 
+    run_days(nb_days, until_extinction, report_every)
+        Run the simulation without interaction
+
     add_plant(plant: Plant)
         Add the plant to the paddock
 
     add_animal(animal: Animal)
         Add the animal to the paddock
 
+    add_plants(nb_plants, ages=None)
+        Add nb_plants plants at once
+
+    add_animals(species, nb_animals, sex_ratio=0.5, ages=None, names=None)
+        Add nb_animals animals of species at once
+
+    add_living_entities(living_entities)
+        Add plants and animals at once
+
+    take_animals(nb_animals, species=None)
+        Remove nb_animals alive animals drawn at random (e.g. to move them to another paddock) and return them
+
     and_one_more_day()
         Do day's action(s) and display a report
 
-    create_report()
+    create_report(report_level=None)
         Create a report for the paddock
 
+    set_report_level(report_level, report_sample_size=None)
+        Change the level of the report
+
+    set_rng(rng)
+        Change the random generator of the paddock (a SimulationRandom or a seed)
+
+    set_rules(rules)
+        Change the rules of the simulation
+
+    set_events(events)
+        Change the bus where living entities emit their events
+
+    set_journal(journal)
+        Append a record of each day to journal (None : no journal)
+
+    set_metrics(metrics)
+        Record the metrics of each day with metrics (None : no metrics)
+
+    set_profiler(profiler)
+        Time the phases of each day with profiler (None : no profiling)
+
+    position_of(living_entity)
+        Return the position of an alive living entity of a spatial paddock
+
+    species_summary()
+        Return statistics of each species (alive, dead, mean PV, mean age, females ready to make a baby)
+
     all_animals_are_dead()
         Return True is all Animal in lst_living_entity are dead, False otherwise
 
+    count_alive_by_species()
+        Return the number of alive entities of each species of SPECIES
+
+    life_points_by_species()
+        Return the sum of the PV of the alive entities of each species of SPECIES
+
+    compact_dead_entities()
+        Move dead living entities from lst_living_entity to the graveyard
+
+    all_living_entities()
+        Return all living entities of the paddock (plants held by plant_store included)
+
     def store_in_json()
         Method to manage configuration storage in JSON file
 
@@ -57,25 +253,241 @@ class Paddock():
         Save all informations about a simulation to a binary file
     """
 
-    def __init__(self) -> None:
+    def __init__(self, dead_animals_in_report: int | None = None, plant_engine: str = 'objects', engine: str = 'objects',
+                 events: EventBus | None = None, report_level: str = 'full', report_sample_size: int = 20,
+                 name_provider: NameProvider | None = None, seed: int | None = None,
+                 rules: Rules | None = None, grid_size: tuple[int, int] | None = None, radius: float = 5, move_distance: int = 1) -> None:
         """
         Construct all the necessary attributes for the paddock object.
+
+        Parameters
+        ----------
+            dead_animals_in_report : int or None
+                Maximum number of dead animals kept in the report (None : all dead animals are displayed)
+            plant_engine : str
+                'objects' : one Plant object by plant in lst_living_entity
+                'numpy' : plants are held by a PlantArrayStore (NumPy arrays) and updated in vectorized operations
+                'cohorts' : plants are held by a PlantCohortStore (plants with the same age and PV are only counted)
+                With herbivores, a store gives the same counts as 'objects' on average only (see PlantStore)
+            engine : str
+                'objects' : each living entity is an object doing its actions (reference implementation)
+                'vectorized' : all living entities are held in typed arrays by a VectorizedEngine (plant_engine is not used)
+            events : EventBus or None
+                Bus for events of living entities (None : events are printed on standard output, like before)
+            report_level : str
+                'summary' : one line per species, 'full' : one line per animal (like before), 'sampled' : at most report_sample_size animals
+            report_sample_size : int
+                Maximum number of animals displayed by a 'sampled' report
+            name_provider : NameProvider or None
+                Provider of the names of babies (None : names of the names package). The paddock uses a copy seeded by its
+                generator, so two paddocks with the same seed give the same names
+            seed : int or None
+                Seed of the random generator of the paddock (None : the seed is drawn with the random module)
+            rules : Rules or None
+                Rules of the simulation (None : DEFAULT_RULES, the constants of living_entity)
+            grid_size : tuple or None
+                (width, height) of the grid of a spatial paddock : living entities have a position, animals move each day
+                and find food and partner within radius (only with 'objects' engines). None : no position
+            radius : float
+                Maximum distance between an animal and its food or its partner (spatial paddock)
+            move_distance : int
+                Maximum move of an animal each day in each direction (spatial paddock)
         """
+        if plant_engine not in PLANT_ENGINES:
+            raise ValueError(f"Unknown plant engine {plant_engine} (available engines : {', '.join(PLANT_ENGINES)})")
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine} (available engines : {', '.join(ENGINES)})")
+        if grid_size is not None and (engine != 'objects' or plant_engine != 'objects'):
+            raise ValueError("A spatial paddock needs the 'objects' engine and the 'objects' plant engine")
         self.lst_living_entity = []  # type: list[LivingEntity]
         self.paddock_age = 0
+        self.events = events if events is not None else EventBus([StdoutSink()])
+        self.rng = SimulationRandom(seed)
+        self.name_provider = (name_provider or DEFAULT_NAME_PROVIDER).spawn(self.rng.names_seed)
+        self.rules = rules or DEFAULT_RULES
+        self.grid_size = grid_size
+        self.radius = radius
+        self.move_distance = move_distance
+        self.journal: "Journal | None" = None
+        self.metrics: "MetricsRecorder | None" = None
+        self.profiler: "DayProfiler | None" = None
+        self.index = self._create_index()
+        self.graveyard = Graveyard(history_size=dead_animals_in_report)
+        self.animal_roster = []  # type: list[Animal]
+        self._dead_animals_in_roster = 0
+        self.vector_engine = VectorizedEngine(self.graveyard, name_provider=self.name_provider, rng=self.rng.numpy, rules=self.rules) \
+            if engine == 'vectorized' else None
+        self.plant_store: PlantStore | None = None
+        if self.vector_engine is None and plant_engine != 'objects':
+            self.plant_store = PlantArrayStore() if plant_engine == 'numpy' else PlantCohortStore()
+        self._attach_plant_store()
+        self.set_report_level(report_level, report_sample_size)
+
+    def _create_index(self, living_entities=(), positions=None) -> LivingEntityIndex:
+        """
+        Create the index of living_entities (a SpatialLivingEntityIndex for a spatial paddock, living entities are put
+        at positions if it's given) with the bus, the name provider, the generator, the rules and the profiler of the paddock
+        """
+        if self.grid_size is None:
+            index = LivingEntityIndex()
+        else:
+            index = SpatialLivingEntityIndex(self.grid_size[0], self.grid_size[1], self.radius, self.move_distance)
+        index.events = self.events
+        index.name_provider = self.name_provider
+        index.rng = self.rng
+        index.rules = self.rules
+        index.profiler = self.profiler
+        if positions is not None and isinstance(index, SpatialLivingEntityIndex):
+            for living_entity, position in zip(living_entities, positions):
+                if position is not None:
+                    index.place(living_entity, position)
+        for living_entity in living_entities:
+            index.add(living_entity)
+        return index
+
+    def _attach_plant_store(self) -> None:
+        """
+        Use plant_store (if any) as the index bucket of plants
+        """
+        if self.plant_store is not None:
+            self.index.set_bucket(Plant.diet, Plant, self.plant_store)
+
+    def __getstate__(self) -> dict:
+        """
+        Return the state to pickle (the index is not stored, it will be rebuilt during loading, the event bus, the journal,
+        the metrics recorder and the profiler are not stored)
+        """
+        state = dict(self.__dict__)
+        state.pop('index', None)
+        state.pop('events', None)
+        state.pop('journal', None)
+        state.pop('metrics', None)
+        state.pop('profiler', None)
+        if isinstance(self.index, SpatialLivingEntityIndex):
+            # Positions are kept by the index
+            state['positions'] = [self.index.positions.get(living_entity) for living_entity in self.lst_living_entity]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """
+        Restore the state from pickle (works with binary files written before the index too)
+        """
+        positions = state.pop('positions', None)
+        self.__dict__.update(state)
+        if 'events' not in self.__dict__:
+            self.events = EventBus([StdoutSink()])
+        if 'journal' not in self.__dict__:
+            self.journal = None
+        if 'metrics' not in self.__dict__:
+            self.metrics = None
+        if 'profiler' not in self.__dict__:
+            self.profiler = None
+        if 'rng' not in state:
+            # Binary files written before the generator of the paddock
+            self.rng = SimulationRandom()
+        if 'name_provider' not in state:
+            self.name_provider = DEFAULT_NAME_PROVIDER.spawn(self.rng.names_seed)
+        if 'rules' not in state:
+            self.rules = DEFAULT_RULES
+        if 'grid_size' not in state:
+            self.grid_size = None
+            self.radius = 5
+            self.move_distance = 1
+        self.index = self._create_index(self.lst_living_entity, positions)
+        if (vector_engine := state.get('vector_engine')) is not None:
+            vector_engine.rules = self.rules
+        if 'plant_store' not in state:
+            self.plant_store = None
+        if 'vector_engine' not in state:
+            self.vector_engine = None
+        if self.vector_engine is not None and not hasattr(self.vector_engine, 'predation_counts'):
+            # Binary files written before the counters of the metrics recorder
+            self.vector_engine.predation_counts = np.zeros(len(SPECIES), dtype=np.int64)
+            self.vector_engine.starved_counts = np.zeros(len(SPECIES), dtype=np.int64)
+        if self.vector_engine is not None and not hasattr(self.vector_engine, 'food_candidates'):
+            # Binary files written before the counters of the profiler
+            self.vector_engine.food_candidates = 0
+            self.vector_engine.partner_candidates = 0
+        if self.vector_engine is not None and not hasattr(self.vector_engine, 'name_keys'):
+            # Binary files written before name keys (lazy names were drawn from ids)
+            self.vector_engine.name_keys = self.vector_engine.ids.copy()
+        if self.vector_engine is not None and not hasattr(self.vector_engine, 'dead_animals'):
+            # Binary files written before the dead animals store (dead animals were kept in the arrays of alive entities)
+            self.vector_engine.ranks = np.arange(len(self.vector_engine.species), dtype=np.int64)
+            self.vector_engine._next_rank = len(self.vector_engine)
+            self.vector_engine.dead_animals = DeadAnimalStore()
+            self.vector_engine._move_dead_animals()
+        if self.plant_store is not None and not hasattr(self.plant_store, 'dead_plants_of_age_to_bury'):
+            self.plant_store.dead_plants_of_age_to_bury = 0  # type: ignore[attr-defined]
+        self._attach_plant_store()
+        if 'graveyard' not in state:
+            self.graveyard = Graveyard()
+            self.animal_roster = [le for le in self.lst_living_entity if isinstance(le, Animal)]
+            self._dead_animals_in_roster = 0
+            # Dead entities are counted in the graveyard
+            self.compact_dead_entities()
+        if 'report_level' not in state:
+            self.set_report_level('full', 20)
 
     def all_animals_are_dead(self) -> bool:
         """
         Return true is all Animal in lst_living_entity are dead, false otherwise
+        (alive animals are counted by the index, no need to scan lst_living_entity)
+        """
+        return self.count_alive_animals() == 0
+
+    def count_alive_animals(self) -> int:
         """
-        alive_animal = [le for le in self.lst_living_entity if isinstance(le, Animal) and le.is_alive]
-        return len(alive_animal) == 0
+        Return the number of alive animals (counters of the index or of the vectorized engine, updated at birth, death and eating time)
+        """
+        if self.vector_engine is not None:
+            return self.vector_engine.count_alive_animals()
+        return self.index.count(diet=Herbivore.diet) + self.index.count(diet=Carnivorous.diet)
+
+    def count_alive_plants(self) -> int:
+        """
+        Return the number of alive plants (plants held by plant_store included)
+        """
+        if self.vector_engine is not None:
+            return self.vector_engine.count(Plant)
+        return self.index.count(Plant)
+
+    def count_alive_by_species(self) -> list[int]:
+        """
+        Return the number of alive entities of each species of SPECIES (counters of the index or of the vectorized engine)
+        """
+        if self.vector_engine is not None:
+            return self.vector_engine.alive_counts.tolist()
+        return [self.index.count(species) for species in SPECIES]
+
+    def life_points_by_species(self) -> list[int]:
+        """
+        Return the sum of the PV of the alive entities of each species of SPECIES (used by the metrics recorder)
+        """
+        if self.vector_engine is not None:
+            return self.vector_engine.life_points_by_species().tolist()
+        sums = [0] * len(SPECIES)
+        for living_entity in self.lst_living_entity:
+            if living_entity.is_alive:
+                sums[SPECIES_CODES[living_entity.__class__]] += living_entity.life_point
+        if self.plant_store is not None:
+            sums[PLANT_CODE] += self.plant_store.statistics()[1]
+        return sums
 
     def remove_all_plants_and_all_animals(self) -> None:
         """
         Remove all plants and animals in the paddock
         """
         self.lst_living_entity.clear()
+        self.index.clear()
+        if self.plant_store is not None:
+            self.plant_store.clear()
+            self._attach_plant_store()
+        if self.vector_engine is not None:
+            self.vector_engine.clear()
+        self.graveyard.clear()
+        self.animal_roster.clear()
+        self._dead_animals_in_roster = 0
         self.paddock_age = 0
 
     def add_plant(self, plant: Plant) -> None:
@@ -91,7 +503,16 @@ class Paddock():
         -------
         None
         """
-        self.lst_living_entity.append(plant)
+        if self.vector_engine is not None:
+            self.vector_engine.add_living_entity(plant)
+        elif self.plant_store is not None:
+            self.plant_store.add_plant(plant)
+        elif not plant.is_alive:
+            # A dead plant is only counted
+            self.graveyard.bury(plant)
+        else:
+            self.lst_living_entity.append(plant)
+            self.index.add(plant)
 
     def add_animal(self, animal: Animal) -> None:
         """
@@ -106,11 +527,126 @@ class Paddock():
         -------
         None
         """
+        if self.vector_engine is not None:
+            self.vector_engine.add_living_entity(animal)
+            return
+        self.animal_roster.append(animal)
+        if not animal.is_alive:
+            # A dead animal is only kept in the report
+            self.graveyard.bury(animal)
+            self._dead_animals_in_roster += 1
+            return
         self.lst_living_entity.append(animal)
+        self.index.add(animal)
 
-    def and_one_more_day(self) -> None:
+    def _batch_ages(self, nb_entities: int, ages, rng: np.random.Generator) -> np.ndarray:
         """
-        Do day's action(s) and display a report
+        Return the ages of nb_entities new entities : ages can be None (random ages drawn in one batch, like LivingEntity),
+        an age or a sequence of ages
+        """
+        if ages is None:
+            return rng.integers(self.rules.min_age_for_entity_added, self.rules.max_age_for_entity_added + 1, nb_entities)
+        if np.ndim(ages) == 0:
+            return np.full(nb_entities, ages, dtype=np.int64)
+        if len(ages) != nb_entities:
+            raise ValueError(f"{len(ages)} age(s) given for {nb_entities} living entities")
+        return np.array(ages, dtype=np.int64)
+
+    def add_plants(self, nb_plants: int, ages=None) -> None:
+        """
+        Add nb_plants plants at once. ages can be None (random ages drawn in one batch), an age or a sequence of ages.
+        A plant store or the vectorized engine receives all plants at once, other plants are created by Plant.create_batch
+        """
+        ages = self._batch_ages(nb_plants, ages, self.rng.numpy)
+        if self.vector_engine is not None:
+            self.vector_engine.add_batch(Plant, ages)
+        elif self.plant_store is not None:
+            self.plant_store.add_plants(ages)
+        else:
+            self.add_living_entities(Plant.create_batch(ages.tolist()))
+
+    def add_animals(self, species: type[Animal] | str, nb_animals: int, sex_ratio: float = 0.5, ages=None, names=None) -> None:
+        """
+        Add nb_animals animals of species (a class or a name of ANIMALS_DICT) at once. Each animal is a male with probability sex_ratio
+        (sexes and ages are drawn in one batch, ages are given like add_plants). Animals without names (names is None)
+        get their name from a name key of the paddock when needed
+        """
+        animal_class = ANIMALS_DICT.get(species.capitalize(), Animal) if isinstance(species, str) else species
+        if animal_class not in ANIMALS_DICT.values():
+            raise ValueError(f"Unknown species {species}")
+        if not 0 <= sex_ratio <= 1:
+            raise ValueError(f"Sex ratio must be between 0 and 1 (not {sex_ratio})")
+        if names is not None and len(names) != nb_animals:
+            raise ValueError(f"{len(names)} name(s) given for {nb_animals} animals")
+        ages = self._batch_ages(nb_animals, ages, self.rng.numpy)
+        males = self.rng.numpy.random(nb_animals) < sex_ratio
+        if self.vector_engine is not None:
+            self.vector_engine.add_batch(animal_class, ages, np.where(males, Sex.MALE.value, Sex.FEMALE.value), names)
+        else:
+            sexes = [Sex.MALE if male else Sex.FEMALE for male in males.tolist()]
+            self.add_living_entities(animal_class.create_batch(ages.tolist(), sexes=sexes, names=names, name_provider=self.name_provider,
+                                                               days_before_baby=[self.rules.time_before_new_baby] * nb_animals))
+
+    def add_living_entities(self, living_entities: list[LivingEntity]) -> None:
+        """
+        Add plants and animals at once (same result as add_plant/add_animal for each entity,
+        but lst_living_entity and animal_roster are extended once)
+        """
+        if self.vector_engine is not None:
+            for living_entity in living_entities:
+                self.vector_engine.add_living_entity(living_entity)
+            return
+        alive_entities = []
+        animals = []
+        for living_entity in living_entities:
+            if isinstance(living_entity, Animal):
+                animals.append(living_entity)
+                if not living_entity.is_alive:
+                    self._dead_animals_in_roster += 1
+            elif self.plant_store is not None and isinstance(living_entity, Plant):
+                self.plant_store.add_plant(living_entity)
+                continue
+            if living_entity.is_alive:
+                alive_entities.append(living_entity)
+            else:
+                # A dead entity is only counted (and kept in the report for an animal)
+                self.graveyard.bury(living_entity)
+        self.animal_roster.extend(animals)
+        self.lst_living_entity.extend(alive_entities)
+        for living_entity in alive_entities:
+            self.index.add(living_entity)
+
+    def take_animals(self, nb_animals: int, species: type[Animal] | None = None) -> list[Animal]:
+        """
+        Remove nb_animals alive animals of species (all species if None) drawn with the generator of the paddock
+        (all of them if there are less alive animals) and return them. Removed animals are not counted as dead,
+        their name is drawn before they leave (a baby keeps its name in another paddock)
+        """
+        if nb_animals < 0:
+            raise ValueError("Number of animals to take can't be negative")
+        species = species or Animal
+        if self.vector_engine is not None:
+            engine = self.vector_engine
+            codes = [code for code, engine_species in enumerate(SPECIES) if issubclass(engine_species, species)]
+            candidate_positions = np.flatnonzero(np.isin(engine.species[:len(engine)], codes)).tolist()
+            positions = sorted(self.rng.sample(candidate_positions, min(nb_animals, len(candidate_positions))))
+            animals: list[Animal] = engine.take(positions)  # type: ignore[assignment]
+        else:
+            candidates = [le for le in self.lst_living_entity if isinstance(le, species) and le.is_alive]
+            animals = self.rng.sample(candidates, min(nb_animals, len(candidates)))
+            taken = set(animals)
+            self.lst_living_entity[:] = [le for le in self.lst_living_entity if le not in taken]
+            self.animal_roster[:] = [animal for animal in self.animal_roster if animal not in taken]
+            for animal in animals:
+                self.index.discard(animal)
+        for animal in animals:
+            # A baby gets its name before leaving (its name comes from an id only known by this process)
+            animal.name
+        return animals
+
+    def and_one_more_day(self, display_report: bool = True) -> None:
+        """
+        Do day's action(s) and display a report (if display_report is True)
 
         Returns
         -------
@@ -118,12 +654,49 @@ class Paddock():
         """
         # Increase paddock's age
         self.paddock_age += 1
+        self.events.day = self.paddock_age
+        if self.metrics is not None:
+            self.metrics.start_day(self)
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.start_day(self)
+        if self.vector_engine is not None:
+            # All living entities do their actions in a few batched passes
+            self.vector_engine.one_more_day(self.events, profiler)
+            self._end_day(display_report)
+            return
+
         lst_new_entities: list[LivingEntity] = []
+        # Plants held by a plant store do their actions all at once
+        if self.plant_store is not None:
+            self.plant_store.one_more_day(self.events, self.rules)
+            if profiler is not None:
+                profiler.lap('plant_split')
+        spatial_index = self.index if isinstance(self.index, SpatialLivingEntityIndex) else None
+        if spatial_index is not None:
+            # In a spatial paddock, animals move before looking for food and partner
+            spatial_index.move_animals()
+            if profiler is not None:
+                profiler.lap('moves')
         # Since story #3, we have to manage actions in the paddock
+        # Animals use the index to find food and partner (the index is updated when an entity dies)
+        # With a profiler, each call of do_actions is timed (the index times its searches)
+        perf_counter = time.perf_counter
+        start = 0.0
         for living_entity in self.lst_living_entity:
-            new_entity = living_entity.do_actions(self.lst_living_entity)
+            if profiler is not None:
+                start = perf_counter()
+            new_entity = living_entity.do_actions(self.index)
+            if profiler is not None:
+                profiler.add_action(living_entity, perf_counter() - start)
+            if new_entity and spatial_index is not None:
+                # A baby (or a new plant) starts next to its parent
+                spatial_index.place_near(new_entity, living_entity)
+            self.index.refresh(living_entity)
             if new_entity:
                 lst_new_entities.append(new_entity)
+        if profiler is not None:
+            profiler.end_actions()
 
         # In a second time, we add new_entity
         for entity in lst_new_entities:
@@ -131,76 +704,341 @@ class Paddock():
                 self.add_animal(entity)
             elif isinstance(entity, Plant):
                 self.add_plant(entity)
+        if profiler is not None:
+            profiler.lap('births', len(lst_new_entities))
+
+        # Dead entities don't need to be processed anymore
+        self.compact_dead_entities()
+        if profiler is not None:
+            profiler.lap('compaction')
+
+        self._end_day(display_report)
+
+    def _end_day(self, display_report: bool) -> None:
+        """
+        End the day : counts of the day are appended to the metrics, only the changes of the day are appended to the journal,
+        then the report is displayed (if display_report is True)
+        """
+        profiler = self.profiler
+        if self.metrics is not None:
+            self.metrics.record(self)
+            if profiler is not None:
+                profiler.lap('metrics')
+        if self.journal is not None:
+            self.journal.record(self)
+            if profiler is not None:
+                profiler.lap('io')
+        if display_report:
+            report = self.create_report()
+            if profiler is not None:
+                profiler.lap('report')
+            print(report)
+            if profiler is not None:
+                profiler.lap('io')
+        if profiler is not None:
+            profiler.end_day(self)
+
+    def run_days(self, nb_days: int | None = None, until_extinction: bool = False, report_every: int = 1) -> int:
+        """
+        Run the simulation without interaction (no limit on the number of days).
+        Return the number of simulated days
+
+        Parameters
+        ----------
+        nb_days : int or None
+            Number of days to simulate (maximum number of days if until_extinction is True, no maximum if None)
+        until_extinction : bool
+            Stop the simulation when all animals are dead
+        report_every : int
+            Display the report every report_every days (0 : no report)
+        """
+        if nb_days is None and not until_extinction:
+            raise ValueError("nb_days is needed when until_extinction is False")
+        nb_simulated_days = 0
+        while nb_days is None or nb_simulated_days < nb_days:
+            if until_extinction and self.all_animals_are_dead():
+                break
+            nb_simulated_days += 1
+            self.and_one_more_day(display_report=report_every > 0 and nb_simulated_days % report_every == 0)
+        return nb_simulated_days
+
+    def compact_dead_entities(self) -> None:
+        """
+        Move dead living entities from lst_living_entity to the graveyard.
+        Dead animals stay in animal_roster (for the report) until the graveyard history is full.
+
+        Returns
+        -------
+        None
+        """
+        alive_entities = []
+        for living_entity in self.lst_living_entity:
+            if living_entity.is_alive:
+                alive_entities.append(living_entity)
+            else:
+                # An entity dead of age still has PV (an eaten or starving entity has none)
+                self.graveyard.bury(living_entity, of_age=living_entity.age >= self.rules.deathing_age_in_deay and living_entity.life_point > 0)
+                self.index.discard(living_entity)
+                if isinstance(living_entity, Animal):
+                    self._dead_animals_in_roster += 1
+        self.lst_living_entity[:] = alive_entities
+        if self.plant_store is not None:
+            self.graveyard.add_deaths(Plant.__name__, self.plant_store.take_dead_plants(), self.plant_store.take_dead_plants_of_age())
+
+        history_size = self.graveyard.history_size
+        if history_size is not None and self._dead_animals_in_roster > history_size:
+            # Forget the oldest dead animals
+            nb_to_forget = self._dead_animals_in_roster - history_size
+            roster = []
+            for animal in self.animal_roster:
+                if nb_to_forget and not animal.is_alive:
+                    nb_to_forget -= 1
+                else:
+                    roster.append(animal)
+            self.animal_roster[:] = roster
+            self._dead_animals_in_roster = history_size
+
+    def all_living_entities(self):
+        """
+        Return all living entities of the paddock (plants held by plant_store included)
+
+        Returns
+        -------
+        A generator of LivingEntity
+        """
+        if self.vector_engine is not None:
+            yield from self.vector_engine.living_entities()
+        yield from self.lst_living_entity
+        if self.plant_store is not None:
+            for plant in self.plant_store:
+                yield plant.to_plant()
+
+    def set_rng(self, rng: SimulationRandom | int) -> None:
+        """
+        Change the random generator of the paddock : rng is a SimulationRandom (e.g. a stream given by spawn() to a worker) or a seed.
+        Names which are not drawn yet are drawn with a seed of rng (name keys go on)
+        """
+        self.rng = rng if isinstance(rng, SimulationRandom) else SimulationRandom(rng)
+        self.index.rng = self.rng
+        next_key = self.name_provider.next_key
+        self.name_provider = self.name_provider.spawn(self.rng.names_seed)
+        self.name_provider.next_key = next_key
+        self.index.name_provider = self.name_provider
+        for animal in self.animal_roster:
+            if animal._name is None:
+                animal._name_provider = self.name_provider
+        if self.vector_engine is not None:
+            self.vector_engine.rng = self.rng.numpy
+            self.vector_engine.name_provider = self.name_provider
+
+    def set_rules(self, rules: Rules) -> None:
+        """
+        Change the rules of the simulation (used by the next days)
+        """
+        self.rules = rules
+        self.index.rules = rules
+        if self.vector_engine is not None:
+            self.vector_engine.rules = rules
 
-        # Then display the report
-        print(self.create_report())
+    def position_of(self, living_entity: LivingEntity) -> tuple[int, int] | None:
+        """
+        Return the position (x, y) of an alive living entity of a spatial paddock (None if the paddock is not spatial)
+        """
+        if isinstance(self.index, SpatialLivingEntityIndex):
+            return self.index.positions.get(living_entity)
+        return None
+
+    def set_events(self, events: EventBus) -> None:
+        """
+        Change the bus where living entities emit their events (the sink of the metrics recorder is moved to events)
+        """
+        if self.metrics is not None and self.metrics.sink in self.events.sinks:
+            self.events.unsubscribe(self.metrics.sink)
+            events.subscribe(self.metrics.sink)
+        self.events = events
+        self.index.events = events
+
+    def set_journal(self, journal: "Journal | None") -> None:
+        """
+        Append a record of each day to journal (the current day is recorded at once, as a base record of a new journal).
+        None : days are not recorded anymore
+        """
+        self.journal = journal
+        if journal is not None:
+            journal.record(self)
+
+    def set_metrics(self, metrics: "MetricsRecorder | None") -> None:
+        """
+        Record the metrics of each day with metrics (the current day is recorded at once). With the 'objects' engine,
+        the sink of metrics subscribes to the bus of the paddock (the vectorized engine counts by itself). None : no metrics
+        """
+        if self.metrics is not None and self.metrics.sink in self.events.sinks:
+            self.events.unsubscribe(self.metrics.sink)
+        self.metrics = metrics
+        if metrics is not None:
+            if self.vector_engine is None:
+                self.events.subscribe(metrics.sink)
+            metrics.record(self)
 
-    def create_report(self) -> str:
+    def set_profiler(self, profiler: "DayProfiler | None") -> None:
+        """
+        Time the phases of each day with profiler (None : days are not timed anymore)
+        """
+        self.profiler = profiler
+        self.index.profiler = profiler
+
+    def set_report_level(self, report_level: str, report_sample_size: int | None = None) -> None:
+        """
+        Change the level of the report ('summary', 'full' or 'sampled')
+        and the maximum number of animals displayed by a 'sampled' report (unchanged if None)
+        """
+        if report_level not in REPORT_LEVELS:
+            raise ValueError(f"Unknown report level {report_level} (available levels : {', '.join(REPORT_LEVELS)})")
+        if report_sample_size is not None:
+            if report_sample_size <= 0:
+                raise ValueError("Number of animals of a sampled report needs to be a positiv integer")
+            self.report_sample_size = report_sample_size
+        self.report_level = report_level
+
+    def create_report(self, report_level: str | None = None) -> str:
         """
         Create a report for the paddock
 
+        Parameters
+        ----------
+        report_level : str or None
+            'summary', 'full' or 'sampled' (None : report_level of the paddock)
+
         Returns
         -------
         A string containing the report
         """
         print(f"Paddock's age : {self.paddock_age} day(s)\n")
 
-        alive_plants = [le for le in self.lst_living_entity if isinstance(le, Plant) and le.is_alive]
-        dead_plants = [le for le in self.lst_living_entity if isinstance(le, Plant) and not le.is_alive]
-        ret = (f"Plant(s)\n{len(alive_plants)}❤️\n{len(dead_plants)}💀\n")
+        report_level = report_level or self.report_level
+        if report_level == 'summary':
+            return self._create_summary_report()
+
+        # Plants are counted by the index (alive plants) and the graveyard (dead plants)
+        nb_dead_plants = self.graveyard.count(Plant.__name__)
+        animals = self.animal_roster  # type: list[Animal]
+        if self.vector_engine is not None:
+            animals = list(self.vector_engine.living_entities(animals_only=True))  # type: ignore[arg-type]
+        lines = [f"Plant(s)\n{self.count_alive_plants()}❤️\n{nb_dead_plants}💀\n"]
+        if report_level == 'sampled' and len(animals) > self.report_sample_size:
+            # Animals are taken at regular intervals of the roster (the random generator is not used)
+            step = len(animals) / self.report_sample_size
+            lines.append(f"Animal(s) ({self.report_sample_size} of {len(animals)}):\n")
+            animals = [animals[int(i * step)] for i in range(self.report_sample_size)]
+        else:
+            lines.append("Animal(s):\n")
+        lines.extend(f"\t{animal}\n" for animal in animals)
+        lines.append("---------------\n")
+        return "".join(lines)
+
+    def species_summary(self) -> dict[str, dict]:
+        """
+        Return statistics of each species living (or having lived) in the paddock.
+        For each species name : number of alive and dead entities, mean PV and mean age of alive entities,
+        number of females ready to make a baby (None for plants)
+        """
+        # For each species name : number of alive entities, sum of PV, sum of ages, females ready
+        statistics: dict[str, list[int]] = {species.__name__: [0, 0, 0, 0] for species in SPECIES}
+        if self.vector_engine is not None:
+            for species_name, engine_statistics in self.vector_engine.statistics().items():
+                statistics[species_name] = list(engine_statistics)
+        else:
+            for living_entity in self.lst_living_entity:
+                if living_entity.is_alive:
+                    values = statistics[living_entity.species]
+                    values[0] += 1
+                    values[1] += living_entity.life_point
+                    values[2] += living_entity.age
+                    if isinstance(living_entity, Animal) and living_entity.sex == Sex.FEMALE and living_entity.day_before_baby == 0:
+                        values[3] += 1
+            if self.plant_store is not None:
+                nb_plants, sum_life_points, sum_ages = self.plant_store.statistics()
+                values = statistics[Plant.__name__]
+                values[0] += nb_plants
+                values[1] += sum_life_points
+                values[2] += sum_ages
 
-        ret += "Animal(s):\n"
-        for animal in [le for le in self.lst_living_entity if isinstance(le, Animal)]:
-            ret += f"\t{animal}\n"
+        summary = {}
+        for species_name, (nb_alive, sum_life_points, sum_ages, females_ready) in statistics.items():
+            nb_dead = self.graveyard.count(species_name)
+            if nb_alive or nb_dead:
+                summary[species_name] = {'alive': nb_alive,
+                                         'dead': nb_dead,
+                                         'mean_life_point': sum_life_points / nb_alive if nb_alive else None,
+                                         'mean_age': sum_ages / nb_alive if nb_alive else None,
+                                         'females_ready': None if species_name == Plant.__name__ else females_ready}
+        return summary
 
-        ret += "---------------\n"
-        return ret
+    def _create_summary_report(self) -> str:
+        """
+        Create a report with one line per species
+        """
+        return create_summary_table(self.species_summary())
 
-    def store_in_json(self) -> None:
+    def store_in_json(self, filename: str) -> bool:
         """
-        Method to manage configuration storage in JSON file
+        Method to manage configuration storage in JSON Lines file filename (one line per living entity).
+        Living entities are encoded one at a time and lines are written by blocks.
+        Return True if storage is a success
         """
-        print("Enter JSON filename (it will be store in the current directory)")
-        filename = input()
         try:
             with open(filename, 'w') as fpjson:
-                for le in self.lst_living_entity:
-                    dict_to_serialize = dict(le.__dict__)
-                    dict_to_serialize['__name__'] = le.__class__.__name__
-                    le_json_dict = json.dumps(dict_to_serialize, default=str)
-                    fpjson.write(f"{le_json_dict}\n")
-                print(f"JSON file {filename} written")
+                write_json_lines(fpjson, ({**le.to_json_dict(), '__name__': le.__class__.__name__} for le in self.all_living_entities()))
+            print(f"JSON file {filename} written")
+            return True
         except Exception as e:
             print(f'{e} during JSON file "{filename}" writting')
+            return False
 
-    def load_from_json(self, animals_dict) -> None:
+    def load_from_json(self, filename: str, animals_dict=ANIMALS_DICT, chunk_size: int = READ_CHUNK_SIZE) -> bool:
         """
-        Method to manage configuration loading from JSON file
+        Method to manage configuration loading from JSON Lines file filename (existing living entities are removed).
+        The file is read line by line, entities are created and added by chunks of chunk_size lines
+        (memory used by loading doesn't depend on the size of the file).
+        Return True if loading is a success (the paddock is empty if the file is not valid)
         """
-        print("Enter JSON filename to load")
-        filename = input()
         try:
-            with open(filename, 'r') as fpjson:
-                self.remove_all_plants_and_all_animals()
-                lines = fpjson.readlines()
-                for line in lines:
-                    io = StringIO(line)
-                    le_dict = json.load(io)
-                    if le_dict['__name__'] == 'Plant':
-                        plant = Plant(age=le_dict['_age'])
-                        for k, v in le_dict.items():
-                            if k not in ['__name__', '_age']:
-                                plant.__dict__[k] = v
-                        self.add_plant(plant)
-                    else:
-                        entity = animals_dict[le_dict['__name__']](le_dict['name'], Sex.MALE if le_dict['sex'] == 'Sex.MALE' else Sex.FEMALE, age=le_dict['_age'])
-                        for k, v in le_dict.items():
-                            if k not in ['__name__', 'name', 'sex', '_age']:
-                                entity.__dict__[k] = v
-                        self.add_animal(entity)
-                print(f"JSON file {filename} loaded")
-        except Exception as e:
+            fpjson = open(filename, 'r')
+        except OSError as e:
             print(f'{e} during JSON file "{filename}" loading')
+            return False
+        with fpjson:
+            self.remove_all_plants_and_all_animals()
+            try:
+                factories = create_factories(animals_dict)
+                for le_dicts in read_chunks(read_json_lines(fpjson), chunk_size):
+                    self.add_living_entities(create_living_entities(le_dicts, factories=factories))
+            except Exception as e:
+                # Entities of the chunks read before the error are removed
+                self.remove_all_plants_and_all_animals()
+                print(f'{e} during JSON file "{filename}" loading')
+                return False
+        print(f"JSON file {filename} loaded")
+        return True
+
+    def set_report_level_from_command(self, command: str) -> bool:
+        """
+        Change the report level with a command 'v summary', 'v full' or 'v sampled K'.
+        Return True if the command is valid
+        """
+        infos = command.lower().split()
+        try:
+            if len(infos) == 2 and infos[1] in REPORT_LEVELS:
+                self.set_report_level(infos[1])
+                return True
+            if len(infos) == 3 and infos[1] == 'sampled':
+                self.set_report_level(infos[1], int(infos[2]))
+                return True
+        except ValueError as e:
+            print(f"{e}\n")
+            return False
+        print("Unknown report level, please retry ('v summary', 'v full' or 'v sampled K')\n")
+        return False
 
     def initialization(self) -> None:
         """
@@ -211,7 +1049,7 @@ class Paddock():
         None
         """
         print("Let's start initialization step")
-        animals_dict: Dict = {f"{e.__name__}": e for e in [Lion, Tiger, Coyote, Elephant, Giraffe, Antelope]}
+        animals_dict = ANIMALS_DICT
         pattern = r'^[Pp][Ll][Aa][Nn][Tt] (\d+)$'
         continue_initialization = True
         while continue_initialization:
@@ -221,48 +1059,48 @@ class Paddock():
             print("Enter 's' to store current configuration to JSON file")
             print("Enter 'l' to load a JSON file as current configuration( WARNING existing living entity will be ereased)")
             print("Enter 'lsimulation' to load a complete simulation from a binary file")
-            print("Enter 'v' to view paddock content")
+            print("Enter 'v' to view paddock content ('v summary', 'v full' or 'v sampled K' to change the report level)")
             print("Enter 'q' to stop initilization step")
             answer = input()
             match answer.lower():
                 case "q":
                     continue_initialization = False
                 case "plant":
-                    self.add_plant(Plant())
+                    self.add_plant(Plant(age=LivingEntity.random_age(self.rng, self.rules)))
                     print("One plant added\n")
                 case 'v':
                     print(self.create_report())
+                case command if command.startswith('v '):
+                    if self.set_report_level_from_command(answer):
+                        print(self.create_report())
                 case 's':
-                    self.store_in_json()
+                    self.store_in_json(ask_filename("Enter JSON filename (it will be store in the current directory)"))
                 case 'l':
-                    self.load_from_json(animals_dict)
+                    self.load_from_json(ask_filename("Enter JSON filename to load"), animals_dict)
                 case 'lsimulation':
                     if self.load_simulation_from_binary():
                         print("Loading simulation complete, let's continue\n")
                         continue_initialization = False
                 case _:
-                    if len(infos := answer.split(" ")) == 3 and \
-                            infos[0] in animals_dict and \
-                            infos[2].lower() in ['m', 'f']:
-                        animal = animals_dict[infos[0]](infos[1], Sex.MALE if infos[2].lower() == 'm' else Sex.FEMALE)
+                    if animal := create_animal(answer, self.rng, self.rules):
                         self.add_animal(animal)
                         print(f"{animal}  added\n")
                     elif result := re.match(pattern, answer):
                         nb_plants_to_add = int(result.group(1))
-                        for p in range(nb_plants_to_add):
-                            self.add_plant(Plant())
+                        self.add_plants(nb_plants_to_add)
                         print(f"{nb_plants_to_add} plant(s) added\n")
                     else:
                         print("Unknown command, please retry\n")
         print("End of initialization step")
 
-    def load_simulation_from_binary(self) -> bool:
+    def load_simulation_from_binary(self, filename: str | None = None) -> bool:
         """
-        Load all informations about a simulation from binary file
+        Load all informations about a simulation from binary file (filename is asked to the user if it's None)
         """
-        print("Enter binary filename to load")
         all_is_ok = False
-        filename = input()
+        if filename is None:
+            print("Enter binary filename to load")
+            filename = input()
         another_paddock = None
         try:
             with open(filename, 'rb') as fpbinary:
@@ -275,24 +1113,27 @@ class Paddock():
             print(f'{e} during binary file "{filename}" loading')
 
         if all_is_ok and another_paddock:
-            self.paddock_age = another_paddock.paddock_age
-            self.lst_living_entity = another_paddock.lst_living_entity
+            self.__setstate__(another_paddock.__getstate__())
             return True
         else:
             return False
 
-    def store_simulation_to_binary(self) -> None:
+    def store_simulation_to_binary(self, filename: str | None = None) -> bool:
         """
-        Save all informations about a simulation to a binary file
+        Save all informations about a simulation to a binary file (filename is asked to the user if it's None).
+        Return True if storage is a success
         """
-        print("Enter binary filename (it will be store in the current directory)")
-        filename = input()
+        if filename is None:
+            print("Enter binary filename (it will be store in the current directory)")
+            filename = input()
         try:
             with open(filename, 'wb') as fpbinary:
                 pickle.dump(self, fpbinary)
                 print(f"Binary file {filename} written")
+                return True
         except Exception as e:
             print(f'{e} during simulation storing in binary file "{filename}"')
+            return False
 
     def run_simulation(self) -> None:
         """
@@ -309,10 +1150,14 @@ class Paddock():
             print("You can enter 'u' to run the simulation until all animals will be dead (maybe the simulation will never stop...)")
             print("You can enter 's' to store all informations about the simulation in a binary file")
             print("You can enter 'l' to load all informations about the simulation from a binary file")
+            print("You can enter 'v summary', 'v full' or 'v sampled K' to change the report level")
             print("You can enter 'q' in order to quit")
             answer = input()
             if answer.lower() == 'q':
                 continue_simulation = False
+            elif answer.lower().startswith('v '):
+                if self.set_report_level_from_command(answer):
+                    print(f"Report level : {self.report_level}\n")
             elif answer.lower() == 'u':
                 while not self.all_animals_are_dead():
                     self.and_one_more_day()
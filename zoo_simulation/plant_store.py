@@ -0,0 +1,632 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+import numpy as np
+from .living_entity import Plant, NO_ID
+from .events import EventBus, SPLIT, DIED_OF_AGE
+from .rules import Rules, DEFAULT_RULES
+
+
+class PlantStore(ABC):
+    """
+    An abstract class to represent a store holding all the alive plants of a paddock
+    (instead of one Plant object per plant in Paddock.lst_living_entity).
+
+    A PlantStore can be used as a bucket of LivingEntityIndex, so herbivores can draw the plant they eat from it.
+
+    Without herbivores, a paddock gives the same counts with a store as with Plant objects. With herbivores, a seed
+    doesn't give the same run : all plants of a store act before the animals (Plant objects act in the order of
+    Paddock.lst_living_entity, so a plant can be eaten before or after its split) and plants are drawn in the order
+    of the store. Counts are only the same on average (see tests/test_plant_store.py).
+
+    ...
+
+    Methods
+    -------
+    add_plant(plant):
+        Add a plant to the store
+
+    add_plants(ages, life_point=10):
+        Add alive plants with ages and life_point PV
+
+    add_arrays(ages, life_points):
+        Add alive plants with ages and life_points (arrays with one value per plant)
+
+    to_arrays():
+        Return the ages and the PV of all alive plants (arrays with one value per plant)
+
+    one_more_day(events=None, rules=None):
+        Do day's action(s) for all plants (split and died_of_age events are emitted on events). Return the number of new plants
+
+    take_dead_plants():
+        Return the number of plants dead since the previous call
+
+    take_dead_plants_of_age():
+        Return the number of plants dead of age since the previous call
+
+    item(position):
+        Return the plant at position (every alive plant has a position between 0 and len(store) - 1)
+
+    reference(position):
+        Return the plant whose PlantRef has position (PlantRef.position, used to replay a day)
+
+    plant_eaten(position, life_point):
+        Update the PV of the plant at position after it has been eaten (the plant is removed if it's dead)
+
+    discard(plant):
+        Nothing to do, eaten plants are removed from the store when they die
+
+    statistics():
+        Return the number of alive plants, the sum of their PV and the sum of their ages
+
+    clear():
+        Remove all plants from the store
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """
+        Return the number of alive plants
+        """
+        return 0
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.item(position)
+
+    def __contains__(self, living_entity) -> bool:
+        return isinstance(living_entity, PlantRef) and living_entity._store is self and living_entity.is_alive
+
+    @abstractmethod
+    def add_plant(self, plant: Plant) -> None:
+        """
+        Add a plant to the store
+        """
+        pass
+
+    def add_plants(self, ages, life_point: int = 10) -> None:
+        """
+        Add alive plants with ages (a sequence or a NumPy array) and life_point PV
+        """
+        for age in ages:
+            self.add_plant(Plant.create_view(NO_ID, int(age), life_point))
+
+    def add_arrays(self, ages, life_points) -> None:
+        """
+        Add alive plants with ages and life_points (arrays with one value per plant, e.g. read in a snapshot)
+        """
+        for age, life_point in zip(np.asarray(ages).tolist(), np.asarray(life_points).tolist()):
+            self.add_plant(Plant.create_view(NO_ID, age, life_point))
+
+    def to_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the ages and the PV of all alive plants (in the order of the store)
+        """
+        plants = list(self)
+        return np.array([plant.age for plant in plants], dtype=np.int32), np.array([plant.life_point for plant in plants], dtype=np.int32)
+
+    @abstractmethod
+    def one_more_day(self, events: EventBus | None = None, rules: Rules | None = None) -> int:
+        """
+        Do day's action(s) for all plants (split and died_of_age events are emitted on events, DEFAULT_RULES are used if rules is None).
+        Return the number of new plants
+        """
+        return 0
+
+    @abstractmethod
+    def take_dead_plants(self) -> int:
+        """
+        Return the number of plants dead since the previous call
+        """
+        return 0
+
+    @abstractmethod
+    def take_dead_plants_of_age(self) -> int:
+        """
+        Return the number of plants dead of age since the previous call (included in the plants given by take_dead_plants)
+        """
+        return 0
+
+    @abstractmethod
+    def item(self, position: int) -> PlantRef:
+        """
+        Return the plant at position
+        """
+        pass
+
+    def reference(self, position: int) -> PlantRef:
+        """
+        Return the plant whose PlantRef has position (the position of a plant given by item, by default)
+        """
+        return self.item(position)
+
+    @abstractmethod
+    def plant_eaten(self, position: int, life_point: int) -> None:
+        """
+        Update the PV of the plant at position after it has been eaten (the plant is removed if it's dead)
+        """
+        pass
+
+    def discard(self, plant) -> None:
+        """
+        Nothing to do, eaten plants are removed from the store when they die
+        """
+        pass
+
+    def statistics(self) -> tuple[int, int, int]:
+        """
+        Return the number of alive plants, the sum of their PV and the sum of their ages (used by the summary report)
+        """
+        plants = list(self)
+        return len(plants), sum(plant.life_point for plant in plants), sum(plant.age for plant in plants)
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Remove all plants from the store
+        """
+        pass
+
+
+class PlantRef(Plant):
+    """
+    A class to represent a plant held by a PlantStore.
+    A PlantRef is created when a herbivore wants to eat a plant and is only valid until the next change in the store.
+
+    ...
+
+    Attributes
+    ----------
+    _store : PlantStore
+        Store holding the plant
+    _position : int
+        Position of the plant in the store
+
+    Methods
+    -------
+    gets_eaten(self)
+        Method called when the Plant has been eaten. Return PV to add to eater (the store is updated)
+
+    to_plant(self)
+        Return a standalone Plant with the same age and PV
+
+    species
+        Name of the species ('Plant')
+
+    position
+        Getter for _position attribute
+    """
+    __slots__ = ('_store', '_position')
+
+    def __init__(self, store: PlantStore, position: int, age: int, life_point: int) -> None:
+        """
+        Construct a reference to the plant at position in store (the constructor of Plant is not called : a plant
+        of a store has no id, so no id is taken)
+        """
+        self._id = NO_ID
+        self._is_alive = True
+        self._age = age
+        self._life_point = life_point
+        self._store = store
+        self._position = position
+
+    def gets_eaten(self, rules: Rules | None = None) -> int:
+        """
+        Method called when the Plant has been eaten. Return PV to add to eater (the store is updated)
+        """
+        pv_to_add = super().gets_eaten(rules)
+        self._store.plant_eaten(self._position, self._life_point)
+        return pv_to_add
+
+    @property
+    def species(self) -> str:
+        """
+        Name of the species ('Plant')
+        """
+        return Plant.__name__
+
+    @property
+    def position(self) -> int:
+        """
+        Getter for _position attribute
+        """
+        return self._position
+
+    def to_plant(self) -> Plant:
+        """
+        Return a standalone Plant with the same age and PV (without id, like the plants of a store)
+        """
+        return Plant.create_view(NO_ID, self._age, self._life_point)
+
+
+class PlantArrayStore(PlantStore):
+    """
+    A PlantStore backed by NumPy arrays (struct of arrays) : all plants grow old, gain PV and split in vectorized operations.
+
+    Alive plants are stored in the positions 0 to len(store) - 1 of the arrays (dead plants are removed immediately).
+
+    ...
+
+    Attributes
+    ----------
+    ages : numpy array
+        Age of each plant
+    life_points : numpy array
+        PV of each plant
+    _size : int
+        Number of alive plants
+    dead_plants_to_bury : int
+        Number of plants dead since the last call of take_dead_plants (eaten plants included)
+    dead_plants_of_age_to_bury : int
+        Number of plants dead of age since the last call of take_dead_plants_of_age
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        Construct an empty store
+        """
+        self.ages = np.zeros(capacity, dtype=np.int32)
+        self.life_points = np.zeros(capacity, dtype=np.int32)
+        self._size = 0
+        self.dead_plants_to_bury = 0
+        self.dead_plants_of_age_to_bury = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int) -> None:
+        """
+        Grow arrays to hold at least size plants
+        """
+        if size > len(self.ages):
+            capacity = max(size, 2 * len(self.ages))
+            for attribute in ['ages', 'life_points']:
+                array = np.zeros(capacity, dtype=np.int32)
+                array[:self._size] = getattr(self, attribute)[:self._size]
+                setattr(self, attribute, array)
+
+    def add_plant(self, plant: Plant) -> None:
+        """
+        Add a plant to the store (a dead plant is only counted as dead)
+        """
+        if not plant.is_alive:
+            self.dead_plants_to_bury += 1
+            return
+        self._reserve(self._size + 1)
+        self.ages[self._size] = plant.age
+        self.life_points[self._size] = plant.life_point
+        self._size += 1
+
+    def add_plants(self, ages, life_point: int = 10) -> None:
+        """
+        Add alive plants with ages (a sequence or a NumPy array) and life_point PV in one copy
+        """
+        ages = np.asarray(ages, dtype=np.int32)
+        self._reserve(self._size + len(ages))
+        self.ages[self._size:self._size + len(ages)] = ages
+        self.life_points[self._size:self._size + len(ages)] = life_point
+        self._size += len(ages)
+
+    def add_arrays(self, ages, life_points) -> None:
+        """
+        Add alive plants with ages and life_points in one copy
+        """
+        nb_plants = len(ages)
+        self._reserve(self._size + nb_plants)
+        self.ages[self._size:self._size + nb_plants] = ages
+        self.life_points[self._size:self._size + nb_plants] = life_points
+        self._size += nb_plants
+
+    def to_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the ages and the PV of all alive plants (views of the arrays of the store)
+        """
+        return self.ages[:self._size], self.life_points[:self._size]
+
+    def item(self, position: int) -> PlantRef:
+        """
+        Return the plant at position
+        """
+        return PlantRef(self, position, int(self.ages[position]), int(self.life_points[position]))
+
+    def plant_eaten(self, position: int, life_point: int) -> None:
+        """
+        Update the PV of the plant at position after it has been eaten (the plant is removed if it's dead)
+        """
+        if life_point > 0:
+            self.life_points[position] = life_point
+        else:
+            # The last alive plant takes the place of the dead one
+            last = self._size - 1
+            self.ages[position] = self.ages[last]
+            self.life_points[position] = self.life_points[last]
+            self._size = last
+            self.dead_plants_to_bury += 1
+
+    def one_more_day(self, events: EventBus | None = None, rules: Rules | None = None) -> int:
+        """
+        Do day's action(s) for all plants (same rules as Plant.do_actions). Return the number of new plants
+
+        Events are only built if a sink of events subscribes to them
+        """
+        rules = rules or DEFAULT_RULES
+        size = self._size
+        ages = self.ages[:size]
+        life_points = self.life_points[:size]
+
+        # Plants grow old
+        ages += 1
+        alive = ages < rules.deathing_age_in_deay
+        # Alive plants get rules.pv_obtained_plant_by_day (1) PV per day
+        life_points[alive] += rules.pv_obtained_plant_by_day
+        # Plants split (like Plant.do_actions, a plant dead today can split too)
+        split = life_points >= rules.min_pv_to_split_plant
+        life_points[split] //= 2
+        new_life_points = life_points[split]
+        if events is not None:
+            self._emit_events(events, alive, split)
+
+        # Dead plants are removed
+        nb_dead = size - int(np.count_nonzero(alive))
+        if nb_dead:
+            self.ages[:size - nb_dead] = ages[alive]
+            self.life_points[:size - nb_dead] = life_points[alive]
+            self._size = size - nb_dead
+            self.dead_plants_to_bury += nb_dead
+            self.dead_plants_of_age_to_bury += nb_dead
+
+        # New plants are added
+        nb_new = len(new_life_points)
+        if nb_new:
+            self._reserve(self._size + nb_new)
+            self.ages[self._size:self._size + nb_new] = 0
+            self.life_points[self._size:self._size + nb_new] = new_life_points
+            self._size += nb_new
+
+        return nb_new
+
+    def _emit_events(self, events: EventBus, alive, split) -> None:
+        """
+        Emit died_of_age and split events of the day (before dead plants are removed)
+        """
+        if events.wants(DIED_OF_AGE):
+            for position in np.flatnonzero(~alive).tolist():
+                events.emit(DIED_OF_AGE, living_entity=Plant.create_view(NO_ID, int(self.ages[position]), int(self.life_points[position]), False))
+        if events.wants(SPLIT):
+            for position in np.flatnonzero(split).tolist():
+                parent = Plant.create_view(NO_ID, int(self.ages[position]), int(self.life_points[position]), bool(alive[position]))
+                events.emit(SPLIT, plant=Plant.create_view(NO_ID, 0, parent.life_point), parent=parent)
+
+    def statistics(self) -> tuple[int, int, int]:
+        """
+        Return the number of alive plants, the sum of their PV and the sum of their ages
+        """
+        return self._size, int(self.life_points[:self._size].sum()), int(self.ages[:self._size].sum())
+
+    def take_dead_plants(self) -> int:
+        """
+        Return the number of plants dead since the previous call
+        """
+        nb_dead = self.dead_plants_to_bury
+        self.dead_plants_to_bury = 0
+        return nb_dead
+
+    def take_dead_plants_of_age(self) -> int:
+        """
+        Return the number of plants dead of age since the previous call
+        """
+        nb_dead = self.dead_plants_of_age_to_bury
+        self.dead_plants_of_age_to_bury = 0
+        return nb_dead
+
+    def clear(self) -> None:
+        """
+        Remove all plants from the store
+        """
+        self._size = 0
+        self.dead_plants_to_bury = 0
+        self.dead_plants_of_age_to_bury = 0
+
+
+class PlantCohortStore(PlantStore):
+    """
+    A PlantStore grouping interchangeable plants in cohorts : plants with the same age and PV are only counted.
+
+    All plants of a cohort grow old, get PV and split at once. A herbivore eats one member of a cohort
+    (cohorts are chosen with a probability proportional to their count, like plants of a list).
+
+    ...
+
+    Attributes
+    ----------
+    cohorts : dict
+        Number of alive plants for each (age, PV)
+    _size : int
+        Number of alive plants
+    _keys : list or None
+        Cohorts (age, PV) in the order of cohorts dict, used to give a position to a cohort (None when cohorts changed)
+    dead_plants_to_bury : int
+        Number of plants dead since the last call of take_dead_plants (eaten plants included)
+    dead_plants_of_age_to_bury : int
+        Number of plants dead of age since the last call of take_dead_plants_of_age
+    """
+
+    def __init__(self) -> None:
+        """
+        Construct an empty store
+        """
+        self.cohorts: dict[tuple[int, int], int] = {}
+        self._size = 0
+        self._keys: list[tuple[int, int]] | None = None
+        self.dead_plants_to_bury = 0
+        self.dead_plants_of_age_to_bury = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for cohort_position, ((age, life_point), count) in enumerate(self.cohorts.items()):
+            for _ in range(count):
+                yield PlantRef(self, cohort_position, age, life_point)
+
+    def _add_to_cohort(self, age: int, life_point: int, count: int) -> None:
+        """
+        Add count alive plants to the cohort (age, life_point)
+        """
+        key = (age, life_point)
+        if key not in self.cohorts:
+            self._keys = None
+        self.cohorts[key] = self.cohorts.get(key, 0) + count
+        self._size += count
+
+    def add_plant(self, plant: Plant) -> None:
+        """
+        Add a plant to the store (a dead plant is only counted as dead)
+        """
+        if not plant.is_alive:
+            self.dead_plants_to_bury += 1
+            return
+        self._add_to_cohort(plant.age, plant.life_point, 1)
+
+    def add_plants(self, ages, life_point: int = 10) -> None:
+        """
+        Add alive plants with ages (a sequence or a NumPy array) and life_point PV (only a few cohorts are created)
+        """
+        cohort_ages, counts = np.unique(np.asarray(ages, dtype=np.int64), return_counts=True)
+        for age, count in zip(cohort_ages.tolist(), counts.tolist()):
+            self._add_to_cohort(age, life_point, count)
+
+    def add_arrays(self, ages, life_points) -> None:
+        """
+        Add alive plants with ages and life_points (cohorts are created in the order of their first plant)
+        """
+        pairs = np.stack([np.asarray(ages, dtype=np.int64), np.asarray(life_points, dtype=np.int64)], axis=1)
+        cohorts, first_positions, counts = np.unique(pairs, axis=0, return_index=True, return_counts=True)
+        for position in np.argsort(first_positions).tolist():
+            self._add_to_cohort(int(cohorts[position, 0]), int(cohorts[position, 1]), int(counts[position]))
+
+    def to_arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the ages and the PV of all alive plants (plants of a cohort are consecutive)
+        """
+        counts = list(self.cohorts.values())
+        ages = np.repeat(np.array([age for age, _ in self.cohorts], dtype=np.int32), counts)
+        life_points = np.repeat(np.array([life_point for _, life_point in self.cohorts], dtype=np.int32), counts)
+        return ages, life_points
+
+    def item(self, position: int) -> PlantRef:
+        """
+        Return the plant at position (plants of a cohort have consecutive positions)
+        """
+        if self._keys is None:
+            self._keys = list(self.cohorts)
+        for cohort_position, key in enumerate(self._keys):
+            count = self.cohorts[key]
+            if position < count:
+                return PlantRef(self, cohort_position, key[0], key[1])
+            position -= count
+        raise IndexError("Plant position out of range")
+
+    def reference(self, position: int) -> PlantRef:
+        """
+        Return a plant of the cohort at position (a cohort position given by item)
+        """
+        if self._keys is None:
+            self._keys = list(self.cohorts)
+        age, life_point = self._keys[position]
+        return PlantRef(self, position, age, life_point)
+
+    def plant_eaten(self, position: int, life_point: int) -> None:
+        """
+        Move one plant of the cohort at position (a cohort position given by item) to its new PV (the plant is removed if it's dead)
+        """
+        if self._keys is None:
+            self._keys = list(self.cohorts)
+        age, old_life_point = key = self._keys[position]
+        self.cohorts[key] -= 1
+        self._size -= 1
+        if self.cohorts[key] == 0:
+            del self.cohorts[key]
+            self._keys = None
+        if life_point > 0:
+            self._add_to_cohort(age, life_point, 1)
+        else:
+            self.dead_plants_to_bury += 1
+
+    def one_more_day(self, events: EventBus | None = None, rules: Rules | None = None) -> int:
+        """
+        Do day's action(s) for all cohorts (same rules as Plant.do_actions). Return the number of new plants
+        """
+        rules = rules or DEFAULT_RULES
+        cohorts: dict[tuple[int, int], int] = {}
+        nb_new = 0
+        emit_died = events is not None and events.wants(DIED_OF_AGE)
+        emit_split = events is not None and events.wants(SPLIT)
+        for (age, life_point), count in self.cohorts.items():
+            # Plants grow old
+            age += 1
+            alive = age < rules.deathing_age_in_deay
+            # Alive plants get rules.pv_obtained_plant_by_day (1) PV per day
+            if alive:
+                life_point += rules.pv_obtained_plant_by_day
+            else:
+                self.dead_plants_to_bury += count
+                self.dead_plants_of_age_to_bury += count
+            # Plants split (like Plant.do_actions, a plant dead today can split too)
+            split = life_point >= rules.min_pv_to_split_plant
+            if split:
+                life_point //= 2
+                cohorts[(0, life_point)] = cohorts.get((0, life_point), 0) + count
+                nb_new += count
+            if alive:
+                cohorts[(age, life_point)] = cohorts.get((age, life_point), 0) + count
+            if emit_died or emit_split:
+                self._emit_events(events, age, life_point, count, alive, split)
+        self.cohorts = cohorts
+        self._size = sum(cohorts.values())
+        self._keys = None
+        return nb_new
+
+    def _emit_events(self, events, age: int, life_point: int, count: int, alive: bool, split: bool) -> None:
+        """
+        Emit died_of_age and split events of the count plants of a cohort
+        """
+        for _ in range(count):
+            parent = Plant.create_view(NO_ID, age, life_point, alive)
+            if not alive and events.wants(DIED_OF_AGE):
+                events.emit(DIED_OF_AGE, living_entity=parent)
+            if split and events.wants(SPLIT):
+                events.emit(SPLIT, plant=Plant.create_view(NO_ID, 0, life_point), parent=parent)
+
+    def statistics(self) -> tuple[int, int, int]:
+        """
+        Return the number of alive plants, the sum of their PV and the sum of their ages
+        """
+        sum_life_points = sum(life_point * count for (_, life_point), count in self.cohorts.items())
+        sum_ages = sum(age * count for (age, _), count in self.cohorts.items())
+        return self._size, sum_life_points, sum_ages
+
+    def take_dead_plants(self) -> int:
+        """
+        Return the number of plants dead since the previous call
+        """
+        nb_dead = self.dead_plants_to_bury
+        self.dead_plants_to_bury = 0
+        return nb_dead
+
+    def take_dead_plants_of_age(self) -> int:
+        """
+        Return the number of plants dead of age since the previous call
+        """
+        nb_dead = self.dead_plants_of_age_to_bury
+        self.dead_plants_of_age_to_bury = 0
+        return nb_dead
+
+    def clear(self) -> None:
+        """
+        Remove all plants from the store
+        """
+        self.cohorts.clear()
+        self._size = 0
+        self._keys = None
+        self.dead_plants_to_bury = 0
+        self.dead_plants_of_age_to_bury = 0
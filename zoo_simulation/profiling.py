@@ -0,0 +1,249 @@
+from __future__ import annotations
+import json
+import time
+from typing import TYPE_CHECKING
+from .living_entity import LivingEntity, Plant
+if TYPE_CHECKING:
+    from .paddock import Paddock
+
+# Phases of a day, in the order of the day step
+PHASES = ['moves', 'plant_split', 'aging', 'feeding', 'mating', 'births', 'compaction', 'metrics', 'report', 'io']
+# Counters of the work done by the searches of food and partners (see LivingEntityIndex and VectorizedEngine)
+COUNTERS = ['food_candidates', 'partner_candidates']
+
+
+class DayProfiler():
+    """
+    A class to measure the wall time and the number of calls of each phase of the days of a paddock (see PHASES)
+    and to count the candidates considered by the searches of food and partners.
+
+    The profiler is opt-in (Paddock.set_profiler) : without profiler, the day step is not timed at all.
+    Phases done in one block (a plant store, the vectorized engine, births, compaction, report, journal) are timed
+    with lap(). With the 'objects' engine, actions of entities are interleaved : each call of do_actions is timed
+    (plants : plant_split, animals : aging), food and partner searches of the index are timed apart (feeding, mating,
+    the index calls time_call) and their time is removed from aging. 'io' is the time spent writing the journal and printing the report.
+
+    ...
+
+    Attributes
+    ----------
+    seconds : dict
+        Wall time of each phase (seconds)
+    calls : dict
+        Number of calls of each phase
+    counters : dict
+        Value of each counter of COUNTERS
+    nb_days : int
+        Number of profiled days
+    day_seconds : float
+        Wall time of the profiled days (phases and what is not in a phase)
+    trace : bool
+        If True, the phases of each day are kept as events of a Chrome trace
+    trace_events : list
+        Events of the Chrome trace (only if trace is True)
+
+    Methods
+    -------
+    start_day(paddock):
+        Start the measure of a day
+
+    lap(phase, calls=1):
+        Add the time since the previous lap to phase
+
+    time_call(phase, function, *args):
+        Return function(*args), its time and its call are added to phase
+
+    add_action(living_entity, seconds):
+        Add the time of a call of do_actions of living_entity ('objects' engine)
+
+    end_actions():
+        Add the time of the actions of the day to plant_split and aging ('objects' engine)
+
+    end_day(paddock):
+        End the measure of a day
+
+    to_dict():
+        Return the measures (JSON serializable)
+
+    create_table():
+        Return a table with one line per phase and counter
+
+    chrome_trace():
+        Return the Chrome trace of the profiled days
+
+    write_chrome_trace(filename):
+        Write the Chrome trace in a JSON file (chrome://tracing or https://ui.perfetto.dev)
+    """
+
+    def __init__(self, trace: bool = False) -> None:
+        """
+        Construct a profiler without measure (trace : keep the phases of each day for a Chrome trace)
+        """
+        self.seconds = {phase: 0.0 for phase in PHASES}
+        self.calls = {phase: 0 for phase in PHASES}
+        self.counters = {counter: 0 for counter in COUNTERS}
+        self.nb_days = 0
+        self.day_seconds = 0.0
+        self.trace = trace
+        self.trace_events: list[dict] = []
+        self._origin = time.perf_counter()
+        self._day = 0
+        self._day_start = self._mark = self._origin
+        self._counters_before = [0] * len(COUNTERS)
+        self._reset_actions()
+
+    def _reset_actions(self) -> None:
+        """
+        Forget the times of the actions of the day (added by add_action and time_call)
+        """
+        self._plant_seconds = self._animal_seconds = self._search_seconds = 0.0
+        self._nb_plants = self._nb_animals = 0
+
+    def _candidate_counters(self, paddock: Paddock) -> list[int]:
+        """
+        Return the counters of COUNTERS of the engine of paddock
+        """
+        counter = paddock.vector_engine if paddock.vector_engine is not None else paddock.index
+        return [counter.food_candidates, counter.partner_candidates]
+
+    def _timestamp(self, instant: float) -> float:
+        """
+        Return the timestamp of a Chrome trace event at instant (microseconds since the profiler was created)
+        """
+        return (instant - self._origin) * 1e6
+
+    def _add_trace_event(self, name: str, start: float, seconds: float, args: dict | None = None) -> None:
+        """
+        Add a complete event (a span) to the Chrome trace
+        """
+        event = {'name': name, 'cat': 'day', 'ph': 'X', 'ts': self._timestamp(start), 'dur': seconds * 1e6, 'pid': 1, 'tid': 1}
+        if args:
+            event['args'] = args
+        self.trace_events.append(event)
+
+    def start_day(self, paddock: Paddock) -> None:
+        """
+        Start the measure of the day of paddock (called by Paddock.and_one_more_day)
+        """
+        self._day = paddock.paddock_age
+        self._counters_before = self._candidate_counters(paddock)
+        self._reset_actions()
+        self._day_start = self._mark = time.perf_counter()
+
+    def lap(self, phase: str, calls: int = 1) -> None:
+        """
+        Add the time since the previous lap (or the start of the day) to phase
+        """
+        now = time.perf_counter()
+        self.seconds[phase] += now - self._mark
+        self.calls[phase] += calls
+        if self.trace:
+            self._add_trace_event(phase, self._mark, now - self._mark)
+        self._mark = now
+
+    def time_call(self, phase: str, function, *args):
+        """
+        Return function(*args), its time and its call are added to phase (used by LivingEntityIndex for the searches of food
+        and partners, their time will be removed from the time of the actions by end_actions)
+        """
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            seconds = time.perf_counter() - start
+            self.seconds[phase] += seconds
+            self.calls[phase] += 1
+            self._search_seconds += seconds
+
+    def add_action(self, living_entity: LivingEntity, seconds: float) -> None:
+        """
+        Add the time of a call of do_actions of living_entity (seconds) : it will be added to plant_split for a plant,
+        to aging for an animal (called by Paddock.and_one_more_day for each entity of lst_living_entity)
+        """
+        if isinstance(living_entity, Plant):
+            self._plant_seconds += seconds
+            self._nb_plants += 1
+        else:
+            self._animal_seconds += seconds
+            self._nb_animals += 1
+
+    def end_actions(self) -> None:
+        """
+        Add the time of the calls of do_actions since the previous lap to plant_split and aging (the time of the searches
+        of the actions is removed from aging, it's in feeding and mating). In the Chrome trace, the phases of the actions
+        are laid end to end in an 'actions' span (they were interleaved)
+        """
+        plant_seconds, nb_plants, nb_animals = self._plant_seconds, self._nb_plants, self._nb_animals
+        animal_seconds, search_seconds = self._animal_seconds, self._search_seconds
+        self._reset_actions()
+        now = time.perf_counter()
+        self.seconds['plant_split'] += plant_seconds
+        self.calls['plant_split'] += nb_plants
+        self.seconds['aging'] += animal_seconds - search_seconds
+        self.calls['aging'] += nb_animals
+        if self.trace:
+            self._add_trace_event('actions', self._mark, now - self._mark, {'plants': nb_plants, 'animals': nb_animals})
+            start = self._mark
+            for phase, seconds in [('plant_split', plant_seconds), ('aging', animal_seconds - search_seconds), ('feeding and mating', search_seconds)]:
+                self._add_trace_event(phase, start, seconds)
+                start += seconds
+        self._mark = now
+
+    def end_day(self, paddock: Paddock) -> None:
+        """
+        End the measure of the day of paddock (counters are read, called by Paddock.and_one_more_day)
+        """
+        now = time.perf_counter()
+        counters = self._candidate_counters(paddock)
+        day_counters = {}
+        for counter, value, value_before in zip(COUNTERS, counters, self._counters_before):
+            day_counters[counter] = value - value_before
+            self.counters[counter] += value - value_before
+        self.nb_days += 1
+        self.day_seconds += now - self._day_start
+        if self.trace:
+            self._add_trace_event(f"day {self._day}", self._day_start, now - self._day_start)
+            self.trace_events.append({'name': 'candidates', 'ph': 'C', 'ts': self._timestamp(now), 'pid': 1, 'args': day_counters})
+        self._mark = now
+
+    def to_dict(self) -> dict:
+        """
+        Return the measures (JSON serializable) : number of days, time of the days and, for each phase, time and number of calls
+        """
+        return {'nb_days': self.nb_days,
+                'day_seconds': self.day_seconds,
+                'phases': {phase: {'seconds': self.seconds[phase], 'calls': self.calls[phase]} for phase in PHASES},
+                'counters': dict(self.counters)}
+
+    def create_table(self) -> str:
+        """
+        Return a table with one line per phase (time, calls, mean time of a call, share of the time of the days) and one line per counter
+        """
+        lines = [f"{self.nb_days} day(s) profiled in {self.day_seconds:.3f}s\n",
+                 f"{'Phase':<16}{'Time (s)':>12}{'Calls':>12}{'Mean (µs)':>12}{'Share':>9}\n"]
+        day_seconds = self.day_seconds or 1.0
+        for phase in PHASES + ['other']:
+            if phase == 'other':
+                seconds, calls = max(0.0, self.day_seconds - sum(self.seconds.values())), 0
+            else:
+                seconds, calls = self.seconds[phase], self.calls[phase]
+            mean = f"{seconds / calls * 1e6:.2f}" if calls else "-"
+            lines.append(f"{phase:<16}{seconds:>12.4f}{calls:>12}{mean:>12}{seconds / day_seconds:>9.1%}\n")
+        for counter in COUNTERS:
+            per_day = self.counters[counter] / self.nb_days if self.nb_days else 0
+            lines.append(f"{counter:<16}{self.counters[counter]:>12} ({per_day:.1f} per day)\n")
+        lines.append("---------------\n")
+        return "".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """
+        Return the Chrome trace of the profiled days (trace events format), empty if trace is False
+        """
+        return {'traceEvents': self.trace_events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, filename: str) -> None:
+        """
+        Write the Chrome trace in the JSON file filename (open it with chrome://tracing or https://ui.perfetto.dev)
+        """
+        with open(filename, 'w') as fp:
+            json.dump(self.chrome_trace(), fp)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+import random
+import numpy as np
+
+# Generator used by living entities outside a paddock (a paddock gives its own generator)
+GLOBAL_RANDOM = random.Random()
+
+
+class SimulationRandom(random.Random):
+    """
+    The random generator of a paddock : a random.Random (shuffle, choice, randrange...) with a NumPy generator
+    for batched draws. Both are seeded from a NumPy SeedSequence, so the generator can be split into independent
+    streams (one per parallel worker) and the whole state is stored in binary files.
+
+    ...
+
+    Attributes
+    ----------
+    seed_sequence : numpy SeedSequence
+        Seed of the generator (its entropy is the seed given at construction)
+    numpy : numpy Generator
+        Generator used by batched draws (bulk creation, vectorized engine)
+
+    Methods
+    -------
+    spawn(nb_streams):
+        Return nb_streams independent generators
+
+    entropy:
+        Seed of the generator
+
+    names_seed:
+        Seed of the names of babies (no number is drawn)
+
+    to_dict():
+        Return the whole state of the generator (JSON serializable)
+
+    from_dict(state):
+        Return a generator restored from a state given by to_dict()
+    """
+
+    def __init__(self, seed: int | np.random.SeedSequence | None = None) -> None:
+        """
+        Construct a generator from seed (an int or a SeedSequence). Without seed, the seed is drawn with the random module
+        (random.seed() gives the same paddocks)
+        """
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(random.getrandbits(128) if seed is None else seed)
+        self.seed_sequence = seed
+        super().__init__(int.from_bytes(seed.generate_state(4).tobytes(), 'little'))
+        self.numpy = np.random.default_rng(self.getrandbits(128))
+
+    @property
+    def entropy(self) -> int:
+        """
+        Seed of the generator (streams given by spawn() keep the seed of their parent, they also have a spawn_key)
+        """
+        entropy = self.seed_sequence.entropy
+        assert isinstance(entropy, int)
+        return entropy
+
+    @property
+    def names_seed(self) -> int:
+        """
+        Seed of the names of babies of a paddock, derived from the seed sequence : no number is drawn, so the streams of the generator
+        are unchanged, and a restored generator gives the same seed
+        """
+        return int.from_bytes(self.seed_sequence.generate_state(6)[4:].tobytes(), 'little')
+
+    def spawn(self, nb_streams: int) -> list[SimulationRandom]:
+        """
+        Return nb_streams independent generators (streams of parallel workers). Two calls give different streams
+        """
+        return [SimulationRandom(child) for child in self.seed_sequence.spawn(nb_streams)]
+
+    def __reduce__(self):
+        """
+        Pickle the states of both generators and the seed sequence (random.Random only pickles its own state)
+        """
+        return (self.__class__, (0,), (self.getstate(), self.seed_sequence, self.numpy))
+
+    def __setstate__(self, state) -> None:
+        """
+        Restore the states pickled by __reduce__
+        """
+        random_state, self.seed_sequence, self.numpy = state
+        self.setstate(random_state)
+
+    def to_dict(self) -> dict:
+        """
+        Return the whole state of the generator (JSON serializable) : seed sequence, state of random.Random and of the NumPy generator
+        """
+        version, internal_state, gauss_next = self.getstate()
+        return {'entropy': self.seed_sequence.entropy,
+                'spawn_key': list(self.seed_sequence.spawn_key),
+                'pool_size': self.seed_sequence.pool_size,
+                'n_children_spawned': self.seed_sequence.n_children_spawned,
+                'random': [version, list(internal_state), gauss_next],
+                'numpy': self.numpy.bit_generator.state}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> SimulationRandom:
+        """
+        Return a generator restored from a state given by to_dict()
+        """
+        rng = cls(0)
+        rng.seed_sequence = np.random.SeedSequence(state['entropy'], spawn_key=tuple(state['spawn_key']), pool_size=state['pool_size'],
+                                                   n_children_spawned=state['n_children_spawned'])
+        version, internal_state, gauss_next = state['random']
+        rng.setstate((version, tuple(internal_state), gauss_next))
+        rng.numpy.bit_generator.state = state['numpy']
+        return rng
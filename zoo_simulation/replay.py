@@ -0,0 +1,360 @@
+from __future__ import annotations
+import bisect
+import json
+from operator import attrgetter
+import numpy as np
+from .paddock import Paddock
+from .living_entity import LivingEntity, Animal, SEX_BY_VALUE
+from .entity_index import LivingEntityIndex, SpatialLivingEntityIndex
+from .plant_store import PlantRef
+from .events import EventSink, EventBus, EATEN, BORN, SPLIT
+from .json_lines import read_json_lines
+from .names_provider import NameProvider
+from .snapshot import snapshot_columns, paddock_from_columns, is_snapshot, read_snapshot_header, load_snapshot
+from .journal import is_journal, journal_days, load_journal, iter_journal
+
+# Header keys not compared by compare_states : draws of replayed days are not made, the generator is the one of the checkpoint
+UNCOMPARED_HEADER_KEYS = {'rng'}
+
+
+def check_replayable(paddock: Paddock) -> None:
+    """
+    Raise a ValueError if the days of paddock can't be replayed : the vectorized engine draws the decisions of all animals
+    at once and animals of a spatial paddock move at random (moves are not in a replay log)
+    """
+    if paddock.vector_engine is not None or isinstance(paddock.index, SpatialLivingEntityIndex):
+        raise ValueError("Only the days of the 'objects' engine without grid can be replayed")
+
+
+class ReplayLogSink(EventSink):
+    """
+    A sink writing the decisions of each day in a replay log : one JSON line per day with the food of each animal
+    which ate ([eater id, food id], -1 - PlantRef.position for a plant of a plant store), the babies ([baby id, parent id,
+    partner id, sex]) and the ids of new plants (runs [first id, number of consecutive ids]). With a checkpoint of the paddock, these lines are enough to rebuild
+    the next days without drawing anything (see replay_day)
+
+    ...
+
+    Attributes
+    ----------
+    filename : str
+        Name of the replay log file
+    day : int or None
+        Day of the decisions kept in memory (written when the events of the next day come)
+    """
+
+    def __init__(self, filename: str, new_plants: bool = True) -> None:
+        """
+        Construct a sink writing the decisions of each day in filename (the file is truncated). If new_plants is False,
+        ids of new plants are not written (plants of a plant store have no id, split events would only cost time)
+        """
+        super().__init__([EATEN, BORN, SPLIT] if new_plants else [EATEN, BORN])
+        self.filename = filename
+        self.day: int | None = None
+        self._day_log: dict = {}
+        self._encode = json.JSONEncoder().encode
+        self._file = open(filename, 'w')
+
+    def handle(self, event_type: str, day: int, fields: dict) -> None:
+        """
+        Add the decision of the event to the decisions of the day
+        """
+        if day != self.day:
+            self.flush()
+            self.day = day
+            self._day_log = {'day': day, 'eaten': [], 'born': [], 'split': []}
+        match event_type:
+            case 'eaten':
+                food = fields['food']
+                self._day_log['eaten'].append([fields['eater'].id, -1 - food.position if isinstance(food, PlantRef) else food.id])
+            case 'born':
+                baby = fields['baby']
+                self._day_log['born'].append([baby.id, fields['parent'].id, fields['partner'].id, baby.sex.value])
+            case 'split':
+                runs = self._day_log['split']
+                if runs and runs[-1][0] + runs[-1][1] == fields['plant'].id:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([fields['plant'].id, 1])
+
+    def flush(self) -> None:
+        """
+        Write the decisions of the day kept in memory
+        """
+        if self._day_log:
+            self._file.write(self._encode(self._day_log) + "\n")
+            self._day_log = {}
+
+    def close(self) -> None:
+        """
+        Write the decisions of the last day and close the file
+        """
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class ReplayedDraws():
+    """
+    A generator giving back the sex of the babies of a day (Animal.make_baby draws the sex of a baby with choice)
+    """
+
+    def __init__(self, sexes: list[int]) -> None:
+        """
+        Construct a generator giving back sexes (values of Sex) in order
+        """
+        self._sexes = iter(sexes)
+
+    def choice(self, sequence):
+        """
+        Return the sex of the next baby
+        """
+        sex_value = next(self._sexes, None)
+        if sex_value is None:
+            raise ValueError("More babies than in the replay log")
+        return SEX_BY_VALUE[sex_value]
+
+
+class ReplayIndex(LivingEntityIndex):
+    """
+    An index answering the decisions of animals with the ones of a day of a replay log (food and partner are not searched).
+    It shares the buckets of the index of the paddock, so entities added and removed during the day are in the index of the paddock
+
+    ...
+
+    Attributes
+    ----------
+    day : int
+        Replayed day
+    new_entities : list
+        Living entities added during the day (in order)
+
+    Methods
+    -------
+    add(living_entity):
+        Add living_entity to the index (it's a new entity of the day)
+
+    random_food(animal):
+        Return the food of animal in the replay log (None : animal didn't eat)
+
+    partner(animal):
+        Return the partner of animal in the replay log (None : animal didn't make a baby)
+
+    check_all_used():
+        Raise a ValueError if a decision of the replay log was not used
+    """
+
+    def __init__(self, paddock: Paddock, day_log: dict) -> None:
+        """
+        Construct the index of the next day of paddock, whose decisions are in day_log (a line of a replay log)
+        """
+        super().__init__()
+        self._by_diet = paddock.index._by_diet
+        self._by_species_and_sex = paddock.index._by_species_and_sex
+        self.events = paddock.events
+        self.name_provider = paddock.name_provider
+        self.rules = paddock.rules
+        self.rng = ReplayedDraws([sex_value for _, _, _, sex_value in day_log['born']])  # type: ignore[assignment]
+        self.day = day_log['day']
+        self.new_entities: list[LivingEntity] = []
+        self._plant_store = paddock.plant_store
+        self._living_entities = paddock.lst_living_entity
+        self._entities: dict[int, LivingEntity] | None = None
+        self._food = {eater: food for eater, food in day_log['eaten']}
+        self._partners = {parent: partner for _, parent, partner, _ in day_log['born']}
+        if len(self._food) != len(day_log['eaten']) or len(self._partners) != len(day_log['born']):
+            raise ValueError(f"An animal acts twice at day {self.day} of the replay log")
+
+    def _entity(self, entity_id: int) -> LivingEntity:
+        """
+        Return the living entity whose id is entity_id
+        """
+        # Living entities are usually sorted by id (new entities are appended with new ids)
+        position = bisect.bisect_left(self._living_entities, entity_id, key=attrgetter('_id'))
+        if position < len(self._living_entities) and self._living_entities[position]._id == entity_id:
+            return self._living_entities[position]
+        if self._entities is None:
+            # Not sorted (e.g. animals coming from another paddock) : all living entities are searched
+            self._entities = {living_entity._id: living_entity for living_entity in self._living_entities}
+        if entity_id not in self._entities:
+            raise ValueError(f"Living entity {entity_id} of day {self.day} of the replay log is not in the paddock")
+        return self._entities[entity_id]
+
+    def add(self, living_entity) -> None:
+        """
+        Add living_entity to the index (it's a new entity of the day)
+        """
+        self.new_entities.append(living_entity)
+        super().add(living_entity)
+
+    def random_food(self, animal):
+        """
+        Return the food of animal in the replay log (None : animal didn't eat)
+        """
+        food = self._food.pop(animal.id, None)
+        if food is None or food >= 0:
+            return None if food is None else self._entity(food)
+        if self._plant_store is None:
+            raise ValueError(f"A plant of a plant store is eaten at day {self.day} of the replay log, the paddock has no plant store")
+        return self._plant_store.reference(-1 - food)
+
+    def partner(self, animal):
+        """
+        Return the partner of animal in the replay log (None : animal didn't make a baby)
+        """
+        partner = self._partners.pop(animal.id, None)
+        return None if partner is None else self._entity(partner)
+
+    def check_all_used(self) -> None:
+        """
+        Raise a ValueError if a decision of the replay log was not used (the paddock is not the one of the log)
+        """
+        if self._food or self._partners:
+            raise ValueError(f"Decisions of day {self.day} of the replay log were not used : the paddock is not the recorded one")
+
+
+def replay_day(paddock: Paddock, day_log: dict) -> None:
+    """
+    Do the next day of paddock with the decisions of day_log (a line of a replay log) : the day is simulated as usual, but food,
+    partners and sex of babies are taken from the log instead of being drawn. New entities get the ids of the log (babies get
+    the same name keys, they are born in the same order). No event is emitted, no report is displayed and the day is not recorded in the journal nor in the metrics of the paddock (nor profiled)
+    """
+    check_replayable(paddock)
+    if day_log['day'] != paddock.paddock_age + 1:
+        raise ValueError(f"Day {day_log['day']} of the replay log can't be replayed after day {paddock.paddock_age}")
+    events, index, journal, metrics, profiler = paddock.events, paddock.index, paddock.journal, paddock.metrics, paddock.profiler
+    paddock.events = EventBus()
+    replay_index = ReplayIndex(paddock, day_log)
+    paddock.index, paddock.journal, paddock.metrics, paddock.profiler = replay_index, None, None, None
+    try:
+        paddock.and_one_more_day(display_report=False)
+    finally:
+        paddock.events, paddock.index, paddock.journal, paddock.metrics, paddock.profiler = events, index, journal, metrics, profiler
+    events.day = paddock.paddock_age
+    replay_index.check_all_used()
+
+    # New entities are added in the order of their events (plants of a plant store have no id)
+    baby_ids = iter([baby for baby, _, _, _ in day_log['born']])
+    plant_ids = (first_id + offset for first_id, nb_ids in day_log['split'] for offset in range(nb_ids))
+    for living_entity in replay_index.new_entities:
+        new_id = next(baby_ids if isinstance(living_entity, Animal) else plant_ids, None)
+        if new_id is None:
+            raise ValueError(f"More new living entities than in day {paddock.paddock_age} of the replay log")
+        living_entity._id = new_id
+        LivingEntity._next_id = max(LivingEntity._next_id, new_id + 1)
+
+
+def read_replay_log(filename: str, first_day: int, last_day: int) -> dict[int, dict]:
+    """
+    Return the decisions of each day from first_day to last_day of the replay log filename. A day without line
+    had no decision (e.g. days after the death of all living entities)
+    """
+    day_logs = {}
+    with open(filename) as fp:
+        for day_log in read_json_lines(fp):
+            if day_log['day'] > last_day:
+                break
+            if day_log['day'] >= first_day:
+                day_logs[day_log['day']] = day_log
+    return day_logs
+
+
+def replay_days(paddock: Paddock, day_logs: dict[int, dict], day: int) -> int:
+    """
+    Replay the days of paddock until day with day_logs (given by read_replay_log). Return the number of replayed days
+    """
+    if day < paddock.paddock_age:
+        raise ValueError(f"Day {day} is before the day of the paddock ({paddock.paddock_age})")
+    nb_days = day - paddock.paddock_age
+    for next_day in range(paddock.paddock_age + 1, day + 1):
+        replay_day(paddock, day_logs.get(next_day) or {'day': next_day, 'eaten': [], 'born': [], 'split': []})
+    return nb_days
+
+
+def nearest_checkpoint(day: int, checkpoints: list[str]) -> tuple[int, str] | None:
+    """
+    Return the last day at or before day of the checkpoints (snapshot or journal files) and its file (None if there is no such day)
+    """
+    nearest = None
+    for checkpoint in checkpoints:
+        if is_snapshot(checkpoint):
+            days = [read_snapshot_header(checkpoint)['paddock_age']]
+        elif is_journal(checkpoint):
+            days = [journal_day for journal_day, _ in journal_days(checkpoint)]
+        else:
+            raise ValueError(f"{checkpoint} is not a snapshot file or a journal file")
+        days = [checkpoint_day for checkpoint_day in days if checkpoint_day <= day]
+        if days and (nearest is None or max(days) > nearest[0]):
+            nearest = (max(days), checkpoint)
+    return nearest
+
+
+def seek_to_day(filename: str, day: int, start: Paddock | None = None, checkpoints: list[str] | None = None,
+                events: EventBus | None = None, name_provider: NameProvider | None = None) -> tuple[Paddock, int]:
+    """
+    Return the paddock at day, rebuilt with the replay log filename, and the number of replayed days. The days are replayed
+    from the nearest checkpoint before day : start (a paddock, replayed in place) or a day of checkpoints (snapshot or journal
+    files, loaded with events and name_provider). The generator of the paddock is the one of the checkpoint
+    """
+    nearest = nearest_checkpoint(day, checkpoints or [])
+    if start is not None and start.paddock_age <= day and (nearest is None or start.paddock_age >= nearest[0]):
+        paddock = start
+    elif nearest is None:
+        raise ValueError(f"No checkpoint at or before day {day}")
+    elif is_snapshot(nearest[1]):
+        paddock = load_snapshot(nearest[1], events, name_provider)
+    else:
+        paddock = load_journal(nearest[1], nearest[0], events, name_provider)
+    check_replayable(paddock)
+    day_logs = read_replay_log(filename, paddock.paddock_age + 1, day) if day > paddock.paddock_age else {}
+    return paddock, replay_days(paddock, day_logs, day)
+
+
+def compare_states(header: dict, columns: dict[str, np.ndarray], other_header: dict, other_columns: dict[str, np.ndarray]) -> list[str]:
+    """
+    Return the keys of the headers and the columns (given by snapshot_columns) which differ. Names are only compared when both are
+    drawn (a lazy name is drawn from the name key, which is compared)
+    """
+    differences = [key for key in sorted(set(header) | set(other_header)) if key not in UNCOMPARED_HEADER_KEYS and header.get(key) != other_header.get(key)]
+    for name in sorted(set(columns) | set(other_columns)):
+        column, other_column = columns.get(name), other_columns.get(name)
+        if column is None or other_column is None or len(column) != len(other_column):
+            differences.append(name)
+        elif name == 'names':
+            drawn = (column != None) & (other_column != None)  # noqa: E711 (elementwise comparison)
+            if not np.array_equal(column[drawn], other_column[drawn]):
+                differences.append(name)
+        elif not np.array_equal(column, other_column):
+            differences.append(name)
+    return differences
+
+
+def verify_replay(filename: str, journal_filename: str) -> dict:
+    """
+    Replay the days of the journal file journal_filename (recorded by the original run) with the replay log filename, from the first
+    day of the journal, and compare each replayed day with the recorded one. Return the number of identical days, the first day
+    which differs (None if all days are the same) and its differences
+    """
+    recorded_days = journal_days(journal_filename)
+    if not recorded_days:
+        raise ValueError(f"No record in the journal {journal_filename}")
+    paddock = None
+    day_logs: dict[int, dict] = {}
+    result: dict = {'identical_days': 0, 'first_different_day': None, 'differences': []}
+    for header, columns in iter_journal(journal_filename):
+        if paddock is None:
+            paddock = paddock_from_columns(header, columns, EventBus())
+            check_replayable(paddock)
+            day_logs = read_replay_log(filename, paddock.paddock_age + 1, recorded_days[-1][0])
+            continue
+        try:
+            replay_days(paddock, day_logs, header['paddock_age'])
+        except ValueError as e:
+            # The decisions of the log don't match the replayed paddock
+            result.update({'first_different_day': paddock.paddock_age, 'differences': [str(e)]})
+            break
+        if differences := compare_states(*snapshot_columns(paddock), header, columns):
+            result.update({'first_different_day': header['paddock_age'], 'differences': differences})
+            break
+        result['identical_days'] += 1
+    return result
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+PV_LOSTS_ANIMAL_BY_DAY = 1
+PV_LOSTS_ANIMAL_WHEN_EATEN = 4
+PV_OBTAINED_CARNIVOROUS_BY_ANIMAL = 5
+
+LIMIT_PV_BEFORE_EATEN = 5
+
+PV_OBTAINED_PLANT_BY_DAY = 1
+PV_LOSTS_PLANT_WHEN_EATEN = 2
+PV_OBTAINED_HERBIVORE_BY_PLANT = 3
+
+MIN_AGE_FOR_ENTITY_ADDED = 0
+MAX_AGE_FOR_ENTITY_ADDED = 19
+DEATHING_AGE_IN_DEAY = 20
+STANDARD_AGE_FOR_TEST = 12
+
+MIN_PV_TO_SPLIT_PLANT = 10
+TIME_BEFORE_NEW_BABY = 3
+
+
+class Rules():
+    """
+    A class to represent the rules of a simulation (the dynamics of living entities).
+    Each rule is named like the constant giving its default value (in lower case), so default rules are the rules
+    of the constants. A paddock owns its rules, they are given to living entities through the index.
+
+    ...
+
+    Attributes
+    ----------
+    pv_losts_animal_by_day : int
+        PV lost by an animal each day
+    pv_losts_animal_when_eaten : int
+        PV lost by an animal eaten by a carnivorous
+    pv_obtained_carnivorous_by_animal : int
+        PV obtained by a carnivorous eating an animal
+    limit_pv_before_eaten : int
+        An animal eats when its PV are lower or equal to this limit
+    pv_obtained_plant_by_day : int
+        PV obtained by a plant each day
+    pv_losts_plant_when_eaten : int
+        PV lost by a plant eaten by a herbivore
+    pv_obtained_herbivore_by_plant : int
+        PV obtained by a herbivore eating a plant
+    min_age_for_entity_added : int
+        Minimum random age of an entity added to a paddock
+    max_age_for_entity_added : int
+        Maximum random age of an entity added to a paddock
+    deathing_age_in_deay : int
+        A living entity dies at this age
+    min_pv_to_split_plant : int
+        A plant splits when its PV reach this value
+    time_before_new_baby : int
+        Number of days between two babies of an animal
+
+    Methods
+    -------
+    replace(**rules):
+        Return a copy of the rules with some rules changed
+
+    to_dict():
+        Return the value of each rule
+    """
+
+    def __init__(self, pv_losts_animal_by_day: int = PV_LOSTS_ANIMAL_BY_DAY, pv_losts_animal_when_eaten: int = PV_LOSTS_ANIMAL_WHEN_EATEN,
+                 pv_obtained_carnivorous_by_animal: int = PV_OBTAINED_CARNIVOROUS_BY_ANIMAL, limit_pv_before_eaten: int = LIMIT_PV_BEFORE_EATEN,
+                 pv_obtained_plant_by_day: int = PV_OBTAINED_PLANT_BY_DAY, pv_losts_plant_when_eaten: int = PV_LOSTS_PLANT_WHEN_EATEN,
+                 pv_obtained_herbivore_by_plant: int = PV_OBTAINED_HERBIVORE_BY_PLANT, min_age_for_entity_added: int = MIN_AGE_FOR_ENTITY_ADDED,
+                 max_age_for_entity_added: int = MAX_AGE_FOR_ENTITY_ADDED, deathing_age_in_deay: int = DEATHING_AGE_IN_DEAY,
+                 min_pv_to_split_plant: int = MIN_PV_TO_SPLIT_PLANT, time_before_new_baby: int = TIME_BEFORE_NEW_BABY) -> None:
+        """
+        Construct rules (default values are the constants of the module). Raise a ValueError if a rule is not valid
+        """
+        self.pv_losts_animal_by_day = pv_losts_animal_by_day
+        self.pv_losts_animal_when_eaten = pv_losts_animal_when_eaten
+        self.pv_obtained_carnivorous_by_animal = pv_obtained_carnivorous_by_animal
+        self.limit_pv_before_eaten = limit_pv_before_eaten
+        self.pv_obtained_plant_by_day = pv_obtained_plant_by_day
+        self.pv_losts_plant_when_eaten = pv_losts_plant_when_eaten
+        self.pv_obtained_herbivore_by_plant = pv_obtained_herbivore_by_plant
+        self.min_age_for_entity_added = min_age_for_entity_added
+        self.max_age_for_entity_added = max_age_for_entity_added
+        self.deathing_age_in_deay = deathing_age_in_deay
+        self.min_pv_to_split_plant = min_pv_to_split_plant
+        self.time_before_new_baby = time_before_new_baby
+        for name, value in self.to_dict().items():
+            if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                raise ValueError(f"Rule {name} must be an integer >= 0 (not {value!r})")
+        if min_age_for_entity_added > max_age_for_entity_added:
+            raise ValueError("min_age_for_entity_added can't be greater than max_age_for_entity_added")
+
+    def to_dict(self) -> dict[str, int]:
+        """
+        Return the value of each rule
+        """
+        return dict(self.__dict__)
+
+    def replace(self, **rules: int) -> Rules:
+        """
+        Return a copy of the rules with some rules changed (a ValueError is raised for an unknown rule)
+        """
+        if unknown_rules := set(rules) - set(self.__dict__):
+            raise ValueError(f"Unknown rule(s) : {', '.join(sorted(unknown_rules))}")
+        return Rules(**{**self.to_dict(), **rules})
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Rules) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        # Only rules different from the default ones are displayed
+        default_rules = Rules().to_dict()
+        changed_rules = {name: value for name, value in self.to_dict().items() if value != default_rules[name]}
+        return f"Rules({', '.join(f'{name}={value}' for name, value in changed_rules.items())})"
+
+
+# Rules used by living entities outside a paddock (and by paddocks created without rules)
+DEFAULT_RULES = Rules()
+# Names of all rules
+RULE_NAMES = list(DEFAULT_RULES.to_dict())
@@ -0,0 +1,412 @@
+from __future__ import annotations
+import argparse
+import json
+import mmap
+import os
+import pickle
+import struct
+import numpy as np
+from .paddock import Paddock
+from .living_entity import LivingEntity, Animal, SEX_BY_VALUE, NO_NAME_KEY
+from .entity_index import SpatialLivingEntityIndex
+from .plant_store import PlantArrayStore, PlantCohortStore
+from .vector_engine import SPECIES, PLANT_CODE
+from .events import EventBus
+from .names_provider import NameProvider
+from .random_streams import SimulationRandom
+from .rules import Rules
+
+# First bytes of a snapshot file (the version is in the magic, a new layout needs a new magic)
+SNAPSHOT_MAGIC = b'ZOOSNAP2'
+SNAPSHOT_VERSION = 2
+# First bytes of snapshot files of every version (followed by the version)
+SNAPSHOT_MAGIC_PREFIX = b'ZOOSNAP'
+# Columns are aligned on ALIGNMENT bytes (the data section starts on an aligned offset too)
+ALIGNMENT = 64
+# Magic, then the size of the JSON header (unsigned 64 bits, little endian)
+PREAMBLE = struct.Struct('<8sQ')
+
+# Columns of living entities (one value per entity) and their type
+ENTITY_COLUMNS = {'species': '<i1', 'sex': '<i1', 'ages': '<i4', 'life_points': '<i4', 'day_before_baby': '<i2', 'alive': '|b1', 'ids': '<i8',
+                  'name_keys': '<i8', 'name_lengths': '<i4', 'names': '|u1'}
+# Columns of the order of the 'objects' engine (report and index) and of the 'vectorized' engine (report)
+ORDER_COLUMNS = {'roster_ranks': '<i4', 'bucket_ranks': '<i4', 'ranks': '<i8'}
+# Columns of positions (spatial paddock only)
+POSITION_COLUMNS = {'x': '<i4', 'y': '<i4', 'cell_ranks': '<i4'}
+# Columns of plants held by a plant store (one value per plant)
+STORE_COLUMNS = {'store_ages': '<i4', 'store_life_points': '<i4'}
+COLUMN_TYPES = {**ENTITY_COLUMNS, **ORDER_COLUMNS, **POSITION_COLUMNS, **STORE_COLUMNS}
+
+
+def _align(offset: int) -> int:
+    """
+    Return the first aligned offset after offset (offset included)
+    """
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _entity_rows(paddock: Paddock) -> tuple[dict[str, np.ndarray], dict]:
+    """
+    Return the entity columns of paddock ('names' is an object array) and the keys of its index. With the 'objects' engine,
+    rows are lst_living_entity (in order), then the dead animals kept in animal_roster. With the 'vectorized' engine,
+    rows are the arrays of the engine (views, not copies if no dead animal is kept), then its dead animals
+    """
+    engine = paddock.vector_engine
+    index_keys: dict = {'buckets': {}, 'partners': []}
+    if engine is not None:
+        size, nb_dead = len(engine), len(engine.dead_animals)
+        if nb_dead:
+            columns = {name: np.concatenate([getattr(engine, name)[:size], getattr(engine.dead_animals, name)[:nb_dead]])
+                       for name in ['species', 'sex', 'ages', 'life_points', 'day_before_baby', 'ids', 'name_keys', 'ranks']}
+            columns['alive'] = np.concatenate([engine.alive[:size], np.zeros(nb_dead, dtype=np.bool_)])
+            names = np.concatenate([engine.names[:size], engine.dead_animals.names[:nb_dead]])
+        else:
+            columns = {name: getattr(engine, name)[:size] for name in ['species', 'sex', 'ages', 'life_points', 'day_before_baby', 'alive', 'ids', 'name_keys', 'ranks']}
+            names = engine.names[:size]
+    else:
+        roster_ranks = {id(animal): rank for rank, animal in enumerate(paddock.animal_roster)}
+        entities: list[LivingEntity] = paddock.lst_living_entity + [animal for animal in paddock.animal_roster if not animal.is_alive]
+        animals = [(le._sex, le.day_before_baby, le._name) if isinstance(le, Animal) else (0, 0, None) for le in entities]
+        columns = {'species': np.array([SPECIES.index(type(le)) for le in entities], dtype=np.int8),
+                   'sex': np.array([sex for sex, _, _ in animals], dtype=np.int8),
+                   'ages': np.array([le._age for le in entities], dtype=np.int32),
+                   'life_points': np.array([le._life_point for le in entities], dtype=np.int32),
+                   'day_before_baby': np.array([day_before_baby for _, day_before_baby, _ in animals], dtype=np.int16),
+                   'alive': np.array([le._is_alive for le in entities], dtype=np.bool_),
+                   'ids': np.array([le._id for le in entities], dtype=np.int64),
+                   'name_keys': np.array([le._name_key if isinstance(le, Animal) else NO_NAME_KEY for le in entities], dtype=np.int64),
+                   'roster_ranks': np.array([roster_ranks.get(id(le), -1) for le in entities], dtype=np.int32)}
+        names = np.empty(len(entities), dtype=object)
+        names[:] = [name for _, _, name in animals]
+        # Random draws depend on the order of the index, it's stored so a loaded paddock goes on like the stored one
+        keys, ranks = paddock.index.get_order(entities)
+        index_keys = {'buckets': {diet: [species.__name__ for species in species_list] for diet, species_list in keys['buckets'].items()},
+                      'partners': [[species.__name__, sex.value] for species, sex in keys['partners']]}
+        columns['bucket_ranks'] = np.array(ranks['bucket'], dtype=np.int32)
+        if isinstance(paddock.index, SpatialLivingEntityIndex):
+            positions = [paddock.index.positions.get(le, (-1, -1)) for le in entities]
+            columns['x'] = np.array([x for x, _ in positions], dtype=np.int32)
+            columns['y'] = np.array([y for _, y in positions], dtype=np.int32)
+            columns['cell_ranks'] = np.array(ranks['cell'], dtype=np.int32)
+    columns['names'] = names
+    return columns, index_keys
+
+
+def pack_names(names: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Pack names (an object array of str or None) in one UTF-8 table. Return the length of each name in bytes
+    (-1 : no name, a plant or a baby whose name was not drawn yet) and the table
+    """
+    named_rows = np.flatnonzero(names != None)  # noqa: E711 (elementwise comparison)
+    encoded_names = [name.encode('utf-8') for name in names[named_rows].tolist()]
+    name_lengths = np.full(len(names), -1, dtype=np.int32)
+    name_lengths[named_rows] = [len(name) for name in encoded_names]
+    return name_lengths, np.frombuffer(b''.join(encoded_names), dtype=np.uint8)
+
+
+def create_header(paddock: Paddock) -> dict:
+    """
+    Return the JSON header of the snapshot of paddock (everything except the columns) : age, engines, seed and state
+    of the generator, next name key, rules, graveyard and counts
+    """
+    plant_engine = 'objects'
+    if isinstance(paddock.plant_store, PlantArrayStore):
+        plant_engine = 'numpy'
+    elif isinstance(paddock.plant_store, PlantCohortStore):
+        plant_engine = 'cohorts'
+    return {'version': SNAPSHOT_VERSION,
+            'paddock_age': paddock.paddock_age,
+            'engine': 'objects' if paddock.vector_engine is None else 'vectorized',
+            'plant_engine': plant_engine,
+            'report_level': paddock.report_level,
+            'report_sample_size': paddock.report_sample_size,
+            'history_size': paddock.graveyard.history_size,
+            'deaths_by_species': dict(paddock.graveyard.deaths_by_species),
+            'deaths_of_age_by_species': dict(paddock.graveyard.deaths_of_age_by_species),
+            'rules': paddock.rules.to_dict(),
+            'seed': paddock.rng.entropy,
+            'rng': paddock.rng.to_dict(),
+            'next_name_key': paddock.name_provider.next_key,
+            'grid_size': None if paddock.grid_size is None else list(paddock.grid_size),
+            'radius': paddock.radius,
+            'move_distance': paddock.move_distance,
+            'alive_by_species': {species.__name__: count for species, count in zip(SPECIES, paddock.count_alive_by_species()) if count}}
+
+
+def snapshot_columns(paddock: Paddock) -> tuple[dict, dict[str, np.ndarray]]:
+    """
+    Return the header (without the layout of columns) and the columns of paddock. 'names' is an object array (names are
+    packed when they are written) and columns of the vectorized engine are views of its arrays
+    """
+    columns, index_keys = _entity_rows(paddock)
+    if paddock.plant_store is not None:
+        columns['store_ages'], columns['store_life_points'] = paddock.plant_store.to_arrays()
+    header = create_header(paddock)
+    header['index'] = index_keys
+    header['counts'] = {'entities': len(columns['species']), 'store_plants': len(columns.get('store_ages', ()))}
+    return header, columns
+
+
+def write_snapshot(paddock: Paddock, filename: str) -> dict:
+    """
+    Write paddock in the snapshot file filename and return its header. The file is written next to filename then renamed,
+    so a paddock loaded from filename (its columns are mapped in memory) can be stored in the same file
+    """
+    header, columns = snapshot_columns(paddock)
+    columns['name_lengths'], columns['names'] = pack_names(columns['names'])
+    # Offsets are relative to the start of the data section
+    offset = 0
+    layout: dict[str, list] = {}
+    for name, column in columns.items():
+        dtype = COLUMN_TYPES[name]
+        columns[name] = np.ascontiguousarray(column, dtype=dtype)
+        layout[name] = [dtype, offset, len(column)]
+        offset = _align(offset + columns[name].nbytes)
+    header['columns'] = layout
+    encoded_header = json.dumps(header).encode('utf-8')
+    data_start = _align(PREAMBLE.size + len(encoded_header))
+
+    temporary_filename = f"{filename}.tmp"
+    with open(temporary_filename, 'wb') as fp:
+        fp.write(PREAMBLE.pack(SNAPSHOT_MAGIC, len(encoded_header)))
+        fp.write(encoded_header)
+        for name, column in columns.items():
+            fp.seek(data_start + layout[name][1])
+            fp.write(column.data)
+        fp.truncate(data_start + offset)
+    os.replace(temporary_filename, filename)
+    return header
+
+
+def _read_preamble(fp, filename: str) -> tuple[dict, int]:
+    """
+    Read the header of the snapshot file fp. Return the header and the offset of the data section
+    """
+    preamble = fp.read(PREAMBLE.size)
+    if len(preamble) < PREAMBLE.size or not preamble.startswith(SNAPSHOT_MAGIC_PREFIX):
+        raise ValueError(f"{filename} is not a snapshot file")
+    magic, header_size = PREAMBLE.unpack(preamble)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{filename} is a snapshot file of version {magic[len(SNAPSHOT_MAGIC_PREFIX):].decode('ascii', 'replace')}, "
+                         f"only version {SNAPSHOT_VERSION} can be read")
+    header = json.loads(fp.read(header_size).decode('utf-8'))
+    return header, _align(PREAMBLE.size + header_size)
+
+
+def is_snapshot(filename: str) -> bool:
+    """
+    Return True if filename starts like a snapshot file of any version (False for a pickled binary file)
+    """
+    with open(filename, 'rb') as fp:
+        return fp.read(len(SNAPSHOT_MAGIC_PREFIX)) == SNAPSHOT_MAGIC_PREFIX
+
+
+def read_snapshot_header(filename: str) -> dict:
+    """
+    Return the header of the snapshot file filename (age, engines, rules, counts...) : columns are not read
+    """
+    with open(filename, 'rb') as fp:
+        return _read_preamble(fp, filename)[0]
+
+
+def read_snapshot(filename: str) -> tuple[dict, dict[str, np.ndarray]]:
+    """
+    Return the header and the columns of the snapshot file filename. Columns are mapped in memory (copy on write) :
+    pages are only read when they are used and changes of the arrays are not written in the file
+    """
+    with open(filename, 'rb') as fp:
+        header, data_start = _read_preamble(fp, filename)
+        # The mapping is kept alive by the arrays (the file can be closed)
+        mapping = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY)
+    columns = {}
+    for name, (dtype, offset, count) in header['columns'].items():
+        columns[name] = np.frombuffer(mapping, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+    return header, columns
+
+
+def unpack_names(name_lengths: np.ndarray, packed_names: np.ndarray) -> np.ndarray:
+    """
+    Return the names of the packed table (an object array, None for a length -1)
+    """
+    names = np.empty(len(name_lengths), dtype=object)
+    named_rows = np.flatnonzero(name_lengths >= 0)
+    lengths = name_lengths[named_rows].tolist()
+    ends = np.cumsum(lengths).tolist()
+    blob = packed_names.tobytes()
+    names[named_rows] = [blob[end - length:end].decode('utf-8') for length, end in zip(lengths, ends)]
+    return names
+
+
+def _restore_objects(paddock: Paddock, index_keys: dict, columns: dict[str, np.ndarray], names: np.ndarray) -> None:
+    """
+    Create the living entities of the 'objects' engine from the columns (one batch per species, stored ids are kept)
+    """
+    codes = columns['species']
+    entities: list = [None] * len(codes)
+    for code, species in enumerate(SPECIES):
+        rows = np.flatnonzero(codes == code)
+        if not len(rows):
+            continue
+        ages = columns['ages'][rows].tolist()
+        life_points = columns['life_points'][rows].tolist()
+        alive = columns['alive'][rows].tolist()
+        if code == PLANT_CODE:
+            batch = species.create_batch(ages, life_points, alive)
+        else:
+            batch = species.create_batch(ages, life_points, alive, sexes=[SEX_BY_VALUE[sex] for sex in columns['sex'][rows].tolist()],  # type: ignore[call-arg]
+                                         names=names[rows].tolist(), days_before_baby=columns['day_before_baby'][rows].tolist(),
+                                         name_provider=paddock.name_provider, name_keys=columns['name_keys'][rows].tolist())
+        for row, living_entity, entity_id in zip(rows.tolist(), batch, columns['ids'][rows].tolist()):
+            living_entity._id = entity_id
+            entities[row] = living_entity
+    if len(codes):
+        # New entities will not have the same id
+        LivingEntity._next_id = max(LivingEntity._next_id, int(columns['ids'].max()) + 1)
+
+    alive = columns['alive'].tolist()
+    paddock.lst_living_entity = [le for le, is_alive in zip(entities, alive) if is_alive]
+    roster_ranks = columns['roster_ranks'].tolist()
+    paddock.animal_roster = [le for _, le in sorted((rank, le) for rank, le in zip(roster_ranks, entities) if rank >= 0)]
+    paddock._dead_animals_in_roster = sum(1 for animal in paddock.animal_roster if not animal.is_alive)
+    positions = None
+    ranks = {'bucket': [rank for rank, is_alive in zip(columns['bucket_ranks'].tolist(), alive) if is_alive]}
+    if 'x' in columns:
+        positions = [position for position, is_alive in zip(zip(columns['x'].tolist(), columns['y'].tolist()), alive) if is_alive]
+        ranks['cell'] = [rank for rank, is_alive in zip(columns['cell_ranks'].tolist(), alive) if is_alive]
+    paddock.index = paddock._create_index(paddock.lst_living_entity, positions)
+    species_by_name = {species.__name__: species for species in SPECIES}
+    keys = {'buckets': {diet: [species_by_name[name] for name in species_names] for diet, species_names in index_keys['buckets'].items()},
+            'partners': [(species_by_name[name], SEX_BY_VALUE[sex]) for name, sex in index_keys['partners']]}
+    paddock.index.set_order(keys, paddock.lst_living_entity, ranks)
+    if paddock.plant_store is not None:
+        paddock.plant_store.add_arrays(columns['store_ages'], columns['store_life_points'])
+        paddock._attach_plant_store()
+
+
+def _restore_engine(paddock: Paddock, columns: dict[str, np.ndarray], names: np.ndarray) -> None:
+    """
+    Use the columns as the arrays of the vectorized engine (no copy, arrays are copied when they grow) : rows of alive
+    entities, then rows of the dead animals kept for the report
+    """
+    engine = paddock.vector_engine
+    assert engine is not None
+    size = int(np.count_nonzero(columns['alive']))
+    nb_dead = len(columns['species']) - size
+    for name in ['species', 'sex', 'ages', 'life_points', 'day_before_baby', 'alive', 'ids', 'name_keys', 'ranks']:
+        setattr(engine, name, columns[name][:size] if size else np.zeros(1, dtype=columns[name].dtype))
+    engine.names = names[:size] if size else np.empty(1, dtype=object)
+    engine._size = size
+    dead_animals = engine.dead_animals
+    for name in ['species', 'sex', 'ages', 'life_points', 'day_before_baby', 'ids', 'name_keys', 'ranks']:
+        setattr(dead_animals, name, columns[name][size:] if nb_dead else np.zeros(1, dtype=columns[name].dtype))
+    dead_animals.names = names[size:] if nb_dead else np.empty(1, dtype=object)
+    dead_animals._size = nb_dead
+    engine.alive_counts = np.bincount(columns['species'][:size], minlength=len(SPECIES)).astype(np.int64)
+    if len(columns['species']):
+        engine._next_rank = int(columns['ranks'].max()) + 1
+        LivingEntity._next_id = max(LivingEntity._next_id, int(columns['ids'].max()) + 1)
+
+
+def paddock_from_columns(header: dict, columns: dict[str, np.ndarray], events: EventBus | None = None,
+                         name_provider: NameProvider | None = None) -> Paddock:
+    """
+    Return the paddock described by header and columns (given by snapshot_columns or read in a snapshot file, 'names' is an
+    object array). Columns become the arrays of a vectorized engine. Raise a ValueError for a header of another version
+    (records of a journal hold the header of a snapshot)
+    """
+    if header['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot of version {header['version']}, only version {SNAPSHOT_VERSION} can be read")
+    grid_size = None if header['grid_size'] is None else tuple(header['grid_size'])
+    paddock = Paddock(dead_animals_in_report=header['history_size'], plant_engine=header['plant_engine'], engine=header['engine'],
+                      events=events, report_level=header['report_level'], report_sample_size=header['report_sample_size'],
+                      name_provider=name_provider, rules=Rules(**header['rules']), grid_size=grid_size,
+                      radius=header['radius'], move_distance=header['move_distance'])
+    paddock.paddock_age = header['paddock_age']
+    paddock.set_rng(SimulationRandom.from_dict(header['rng']))
+    paddock.name_provider.next_key = header['next_name_key']
+    paddock.graveyard.deaths_by_species.update(header['deaths_by_species'])
+    paddock.graveyard.deaths_of_age_by_species.update(header['deaths_of_age_by_species'])
+    if paddock.vector_engine is not None:
+        _restore_engine(paddock, columns, columns['names'])
+    else:
+        _restore_objects(paddock, header['index'], columns, columns['names'])
+    return paddock
+
+
+def load_snapshot(filename: str, events: EventBus | None = None, name_provider: NameProvider | None = None) -> Paddock:
+    """
+    Return the paddock stored in the snapshot file filename. The event bus and the name provider are not stored
+    (like binary files) : events and name_provider are given to the paddock
+    """
+    header, columns = read_snapshot(filename)
+    columns['names'] = unpack_names(columns.pop('name_lengths'), columns['names'])
+    return paddock_from_columns(header, columns, events, name_provider)
+
+
+def convert_binary_to_snapshot(binary_filename: str, snapshot_filename: str) -> dict:
+    """
+    Write the paddock of a binary (pickle) file in a snapshot file. Return the header of the snapshot
+    """
+    with open(binary_filename, 'rb') as fp:
+        paddock = pickle.load(fp)
+    return write_snapshot(paddock, snapshot_filename)
+
+
+def convert_snapshot_to_binary(snapshot_filename: str, binary_filename: str) -> Paddock:
+    """
+    Write the paddock of a snapshot file in a binary (pickle) file. Return the paddock
+    """
+    paddock = load_snapshot(snapshot_filename)
+    with open(binary_filename, 'wb') as fp:
+        pickle.dump(paddock, fp)
+    return paddock
+
+
+def describe_header(header: dict) -> str:
+    """
+    Return a text describing the header of a snapshot
+    """
+    lines = [f"Paddock's age : {header['paddock_age']} day(s), engine {header['engine']}, plant engine {header['plant_engine']}, seed {header['seed']}",
+             f"Entities : {header['counts']['entities']} row(s), {header['counts']['store_plants']} plant(s) in the plant store",
+             "Alive : " + (', '.join(f"{species_name} {count}" for species_name, count in header['alive_by_species'].items()) or "nobody"),
+             "Dead : " + (', '.join(f"{species_name} {count}" for species_name, count in header['deaths_by_species'].items()) or "nobody")]
+    if header['grid_size'] is not None:
+        lines.append(f"Grid : {header['grid_size'][0]}x{header['grid_size'][1]}, radius {header['radius']}, move distance {header['move_distance']}")
+    lines.append(f"Rules : {Rules(**header['rules'])!r}")
+    return '\n'.join(lines)
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line of snapshot files
+    """
+    parser = argparse.ArgumentParser(prog='main.py snapshot', description="Describe snapshot files and convert them from/to binary (pickle) files")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    info_parser = subparsers.add_parser('info', help="Describe a snapshot file (only its header is read)")
+    info_parser.add_argument('snapshot', help="Snapshot file")
+    convert_parser = subparsers.add_parser('convert', help="Convert a binary file to a snapshot file or a snapshot file to a binary file")
+    convert_parser.add_argument('source', help="Binary or snapshot file (the format is detected)")
+    convert_parser.add_argument('destination', help="File written in the other format")
+    return parser
+
+
+def run_snapshot_command(argv: list[str] | None = None) -> dict:
+    """
+    Run the snapshot command with command line arguments argv. Return the header of the snapshot file
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'info':
+            header = read_snapshot_header(args.snapshot)
+            print(describe_header(header))
+        elif is_snapshot(args.source):
+            header = read_snapshot_header(args.source)
+            convert_snapshot_to_binary(args.source, args.destination)
+            print(f"Binary file {args.destination} written")
+        else:
+            header = convert_binary_to_snapshot(args.source, args.destination)
+            print(f"Snapshot file {args.destination} written")
+    except (OSError, ValueError, pickle.UnpicklingError) as e:
+        parser.error(str(e))
+    return header
@@ -0,0 +1,129 @@
+from __future__ import annotations
+import argparse
+import csv
+import itertools
+import numpy as np
+from .paddock import ENGINES, PLANT_ENGINES
+from .ensemble import run_member, map_in_order, SPECIES_NAMES
+from .random_streams import SimulationRandom
+from .rules import DEFAULT_RULES, RULE_NAMES
+
+
+def grid(values: dict[str, list[int]]) -> list[dict[str, int]]:
+    """
+    Return all combinations of values (for each rule name, a list of values)
+    """
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*(values[name] for name in names))]
+
+
+def random_sample(ranges: dict[str, tuple[int, int]], nb_samples: int, rng: np.random.Generator) -> list[dict[str, int]]:
+    """
+    Return nb_samples combinations whose values are drawn uniformly in ranges (for each rule name, (minimum, maximum) included)
+    """
+    columns = {name: rng.integers(low, high + 1, nb_samples).tolist() for name, (low, high) in ranges.items()}
+    return [{name: columns[name][position] for name in ranges} for position in range(nb_samples)]
+
+
+def run_sweep_member(config: str, changes: dict[str, int], rng: SimulationRandom, nb_days: int, until_extinction: bool = False,
+                     engine: str = 'objects', plant_engine: str = 'objects') -> dict:
+    """
+    Run one simulation of config with DEFAULT_RULES changed by changes. Return its results row : number of simulated days,
+    extinction day (None if animals are still alive), final and peak number of alive entities of each species
+    """
+    trajectory, extinction_day = run_member(config, rng, nb_days, until_extinction, engine, plant_engine, DEFAULT_RULES.replace(**changes))
+    row: dict = {'days': len(trajectory) - 1, 'extinction_day': extinction_day}
+    for column, species_name in enumerate(SPECIES_NAMES):
+        row[f'final_{species_name}'] = int(trajectory[-1, column])
+        row[f'peak_{species_name}'] = int(trajectory[:, column].max())
+    return row
+
+
+def run_sweep(config: str, combinations: list[dict[str, int]], output: str, nb_days: int, until_extinction: bool = False,
+              runs_per_combination: int = 1, seed: int | None = None, workers: int | None = None,
+              engine: str = 'objects', plant_engine: str = 'objects') -> int:
+    """
+    Run runs_per_combination simulations of config for each combination of rules (a dict rule name -> value, other rules
+    are the default ones) in worker processes, and write one CSV row per run in output (rows are written as soon as possible,
+    in the order of runs). Each run uses its own stream of the generator seeded with seed. Return the number of rows
+    """
+    # Invalid rules are rejected before starting workers
+    for changes in combinations:
+        DEFAULT_RULES.replace(**changes)
+    swept_rules = [name for name in RULE_NAMES if any(name in changes for changes in combinations)]
+    runs = [(combination, replicate) for combination in range(len(combinations)) for replicate in range(runs_per_combination)]
+    streams = SimulationRandom(seed).spawn(len(runs))
+    tasks = ((config, combinations[combination], stream, nb_days, until_extinction, engine, plant_engine)
+             for (combination, _), stream in zip(runs, streams))
+
+    nb_rows = 0
+    with open(output, 'w', newline='') as fp:
+        writer = None
+        for (combination, replicate), row in zip(runs, map_in_order(run_sweep_member, tasks, workers)):
+            rules = {name: combinations[combination].get(name, getattr(DEFAULT_RULES, name)) for name in swept_rules}
+            row = {'run': nb_rows, 'combination': combination, 'replicate': replicate, **rules, **row}
+            if writer is None:
+                writer = csv.DictWriter(fp, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            nb_rows += 1
+    return nb_rows
+
+
+def parse_rule_values(descriptions: list[str], separator: str) -> dict[str, list[int]]:
+    """
+    Parse rule descriptions 'name=v1,v2,v3' (separator ',') or 'name=minimum:maximum' (separator ':').
+    Return, for each rule name, the list of integers
+    """
+    values = {}
+    for description in descriptions:
+        name, _, text = description.partition('=')
+        if name not in RULE_NAMES:
+            raise ValueError(f"Unknown rule {name} (rules : {', '.join(RULE_NAMES)})")
+        values[name] = [int(value) for value in text.split(separator)]
+        if separator == ':' and len(values[name]) != 2:
+            raise ValueError(f"Invalid range '{description}' (expected {name}=minimum:maximum)")
+    return values
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line of the parameter sweep
+    """
+    parser = argparse.ArgumentParser(prog='main.py sweep',
+                                     description="Run a configuration with different rules (a grid or a random sample) and write one CSV row per run")
+    parser.add_argument('config', help="JSON configuration file (written by the 's' command)")
+    parser.add_argument('--grid', action='append', default=[], help="Values of a rule, e.g. limit_pv_before_eaten=3,5,7 (can be repeated)")
+    parser.add_argument('--random', action='append', default=[], help="Range of a rule for random samples, e.g. time_before_new_baby=1:6 (can be repeated)")
+    parser.add_argument('--samples', type=int, default=10, help="Number of random samples (with --random)")
+    parser.add_argument('--runs', type=int, default=1, help="Number of runs for each combination of rules")
+    parser.add_argument('--days', type=int, required=True, help="Number of days of each run (maximum number of days with --until-extinction)")
+    parser.add_argument('--until-extinction', action='store_true', help="Stop each run when all animals are dead")
+    parser.add_argument('--seed', type=int, help="Seed of the sweep (random samples and runs)")
+    parser.add_argument('--workers', type=int, help="Number of worker processes (number of CPUs by default)")
+    parser.add_argument('--engine', choices=ENGINES, default='objects', help="Engine used to simulate a day")
+    parser.add_argument('--plant-engine', choices=PLANT_ENGINES, default='objects', help="Engine used to hold plants (with the 'objects' engine)")
+    parser.add_argument('--output', required=True, help="CSV file where results are written")
+    return parser
+
+
+def run_sweep_command(argv: list[str] | None = None) -> int:
+    """
+    Run a parameter sweep with command line arguments argv. Return the number of runs
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    # The same seed gives the same random samples and the same runs
+    seed = args.seed if args.seed is not None else SimulationRandom().entropy
+    try:
+        combinations = grid(parse_rule_values(args.grid, ','))
+        if args.random:
+            ranges = {name: (low, high) for name, (low, high) in parse_rule_values(args.random, ':').items()}
+            samples = random_sample(ranges, args.samples, np.random.default_rng(seed))
+            combinations = [{**combination, **sample} for combination in combinations for sample in samples]
+        nb_runs = run_sweep(args.config, combinations, args.output, args.days, args.until_extinction, args.runs,
+                            seed, args.workers, args.engine, args.plant_engine)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(f"{nb_runs} run(s) written in {args.output} (seed {seed})")
+    return nb_runs
@@ -0,0 +1,686 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, cast
+import numpy as np
+from .graveyard import Graveyard
+from .names_provider import NameProvider, DEFAULT_NAME_PROVIDER
+from .events import EventBus, EATEN, BORN, SPLIT, STARVED, DIED_OF_AGE
+from .living_entity import LivingEntity, Plant, Animal, Sex, Lion, Tiger, Coyote, Elephant, Giraffe, Antelope, Herbivore, Carnivorous, NO_NAME_KEY
+from .rules import Rules, DEFAULT_RULES
+if TYPE_CHECKING:
+    from .profiling import DayProfiler
+
+# Species code of an entity is its position in this list
+SPECIES: list[type[LivingEntity]] = [Plant, Lion, Tiger, Coyote, Elephant, Giraffe, Antelope]
+PLANT_CODE = 0
+HERBIVORE_CODES = [code for code, species in enumerate(SPECIES) if issubclass(species, Herbivore)]
+CARNIVOROUS_CODES = [code for code, species in enumerate(SPECIES) if issubclass(species, Carnivorous)]
+NO_SEX = 0
+
+# A hungry animal whose prey has been eaten by another animal tries again (at most MAX_FEEDING_ROUNDS times)
+MAX_FEEDING_ROUNDS = 4
+
+# Per-entity arrays of dead animals kept for the report (the arrays of the engine without 'alive')
+DEAD_ANIMAL_ARRAYS = ['species', 'sex', 'ages', 'life_points', 'day_before_baby', 'names', 'name_keys', 'ids', 'ranks']
+
+
+def _no_lap(phase: str, calls: int = 1) -> None:
+    """
+    Nothing to do (passes are not timed without profiler)
+    """
+    pass
+
+
+class DeadAnimalStore():
+    """
+    A class to hold the dead animals of a vectorized engine kept for the report, out of the arrays of alive entities
+    (so the passes of a day only scan alive entities). Dead animals are appended in the order of their death,
+    their insertion rank gives their place in the report.
+
+    ...
+
+    Attributes
+    ----------
+    species, sex, ages, life_points, day_before_baby, names, name_keys, ids, ranks : numpy array
+        Arrays of dead animals (like the arrays of VectorizedEngine)
+
+    Methods
+    -------
+    append(arrays):
+        Append dead animals (arrays : dict of arrays of DEAD_ANIMAL_ARRAYS)
+
+    forget_oldest(history_size):
+        Keep only the history_size dead animals inserted last
+
+    clear():
+        Forget all dead animals
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        """
+        Construct an empty store (arrays of capacity dead animals)
+        """
+        self._size = 0
+        self.species = np.zeros(capacity, dtype=np.int8)
+        self.sex = np.zeros(capacity, dtype=np.int8)
+        self.ages = np.zeros(capacity, dtype=np.int32)
+        self.life_points = np.zeros(capacity, dtype=np.int32)
+        self.day_before_baby = np.zeros(capacity, dtype=np.int16)
+        self.names = np.empty(capacity, dtype=object)
+        self.name_keys = np.zeros(capacity, dtype=np.int64)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.ranks = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _reserve(self, size: int) -> None:
+        """
+        Grow arrays to hold at least size dead animals
+        """
+        if size > len(self.species):
+            capacity = max(size, 2 * len(self.species))
+            for attribute in DEAD_ANIMAL_ARRAYS:
+                old_array = getattr(self, attribute)
+                array = np.empty(capacity, dtype=old_array.dtype) if old_array.dtype == object else np.zeros(capacity, dtype=old_array.dtype)
+                array[:self._size] = old_array[:self._size]
+                setattr(self, attribute, array)
+
+    def append(self, arrays: dict) -> None:
+        """
+        Append dead animals at the end of arrays (arrays : dict of arrays or lists of DEAD_ANIMAL_ARRAYS, all of the same length)
+        """
+        nb_new = len(arrays['ids'])
+        if nb_new == 0:
+            return
+        self._reserve(self._size + nb_new)
+        for attribute in DEAD_ANIMAL_ARRAYS:
+            getattr(self, attribute)[self._size:self._size + nb_new] = arrays[attribute]
+        self._size += nb_new
+
+    def forget_oldest(self, history_size: int) -> None:
+        """
+        Keep only the history_size dead animals inserted last (like Paddock.animal_roster, the oldest ones in the report are forgotten)
+        """
+        size = self._size
+        if size <= history_size:
+            return
+        keep = np.sort(np.argsort(self.ranks[:size], kind='stable')[size - history_size:])
+        for attribute in DEAD_ANIMAL_ARRAYS:
+            array = getattr(self, attribute)
+            array[:history_size] = array[:size][keep]
+        self.names[history_size:size] = None
+        self._size = history_size
+
+    def clear(self) -> None:
+        """
+        Forget all dead animals
+        """
+        self.names[:self._size] = None
+        self._size = 0
+
+
+class VectorizedEngine():
+    """
+    A class to run the day step of a paddock on typed arrays (one array per attribute, one position per entity).
+
+    Animal and Plant classes stay the reference implementation : the engine applies the same rules in a handful of
+    batched passes (grow old, daily PV, hunger, grazing/predation, mating, births) instead of calling do_actions
+    for each entity. Inside a pass, all entities act at the same time, so the order of actions is not the same
+    as in the object-based day step :
+    - all herbivores graze, then all carnivores hunt (a prey eaten to death during a pass can't be eaten again,
+      the hungry animal tries another one during the next round)
+    - animals that are not hungry mate with a ready partner of the same species (the partner can be hungry)
+
+    ...
+
+    Attributes
+    ----------
+    species : numpy array
+        Species code of each entity (position in SPECIES)
+    sex : numpy array
+        Sex value of each animal (NO_SEX for plants)
+    ages : numpy array
+        Age of each entity
+    life_points : numpy array
+        PV of each entity
+    day_before_baby : numpy array
+        day_before_baby of each animal
+    alive : numpy array
+        True for alive entities
+    names : numpy array
+        Name of each animal (None for plants and for animals whose name was not drawn yet)
+    name_keys : numpy array
+        Name key of each animal (the name of a baby is drawn from its name key when it's needed, NO_NAME_KEY for plants and named animals)
+    ids : numpy array
+        Id of each entity
+    ranks : numpy array
+        Insertion rank of each entity (order of the report)
+    dead_animals : DeadAnimalStore
+        Dead animals kept for the report (at most graveyard.history_size of them, arrays only hold alive entities between days)
+    alive_counts : numpy array
+        Number of alive entities of each species code
+    predation_counts : numpy array
+        Number of entities of each species code eaten to death (since the engine was created)
+    starved_counts : numpy array
+        Number of times an animal of each species code couldn't eat (since the engine was created)
+    food_candidates : int
+        Number of candidates considered by the draws of food (alive plants or preys the food is drawn among)
+    partner_candidates : int
+        Number of ready animals considered by the pairing of partners
+    graveyard : Graveyard
+        Graveyard of the paddock (dead entities are counted in it)
+    rng : numpy Generator
+        Random generator used by the engine
+    rules : Rules
+        Rules of the simulation
+    name_provider : NameProvider
+        Provider of the names of babies
+
+    Methods
+    -------
+    add_living_entity(living_entity):
+        Add a living entity (Plant or Animal object) to the engine
+
+    add_batch(species, ages, sexes=None, names=None):
+        Add len(ages) alive entities of species at once
+
+    one_more_day(events=None, profiler=None):
+        Do day's action(s) for all entities (events are emitted on events, each pass is timed by profiler)
+
+    count(species=None, alive=True):
+        Return the number of alive (or dead) entities of species (all species if species is None)
+
+    statistics():
+        Return, for each species, the number of alive entities, the sum of their PV, the sum of their ages and the number of females ready to make a baby
+
+    life_points_by_species():
+        Return the sum of the PV of the alive entities of each species code
+
+    entity_at(position):
+        Return a Plant/Animal object built from the arrays at position
+
+    dead_animal_at(position):
+        Return an Animal object built from the arrays of dead_animals at position
+
+    living_entities(animals_only=False):
+        Return Plant/Animal objects built from the arrays and the dead animals kept for the report (in insertion order)
+
+    take(positions):
+        Remove the alive entities at positions and return them as Plant/Animal objects
+
+    clear():
+        Remove all entities
+    """
+
+    def __init__(self, graveyard: Graveyard, capacity: int = 1024, name_provider: NameProvider | None = None,
+                 rng: np.random.Generator | None = None, rules: Rules | None = None) -> None:
+        """
+        Construct an empty engine
+
+        Parameters
+        ----------
+            graveyard : Graveyard
+                Graveyard of the paddock
+            capacity : int
+                Initial size of arrays
+            name_provider : NameProvider or None
+                Provider of the names of babies (DEFAULT_NAME_PROVIDER if None)
+            rng : numpy Generator or None
+                Generator of random draws (a new unseeded generator if None)
+            rules : Rules or None
+                Rules of the simulation (DEFAULT_RULES if None)
+        """
+        self.graveyard = graveyard
+        self.name_provider = name_provider or DEFAULT_NAME_PROVIDER
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.rules = rules or DEFAULT_RULES
+        self._size = 0
+        self.species = np.zeros(capacity, dtype=np.int8)
+        self.sex = np.zeros(capacity, dtype=np.int8)
+        self.ages = np.zeros(capacity, dtype=np.int32)
+        self.life_points = np.zeros(capacity, dtype=np.int32)
+        self.day_before_baby = np.zeros(capacity, dtype=np.int16)
+        self.alive = np.zeros(capacity, dtype=np.bool_)
+        self.names = np.empty(capacity, dtype=object)
+        self.name_keys = np.zeros(capacity, dtype=np.int64)
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.ranks = np.zeros(capacity, dtype=np.int64)
+        self._next_rank = 0
+        self.dead_animals = DeadAnimalStore()
+        # Number of alive entities of each species code (updated when entities are added or die)
+        self.alive_counts = np.zeros(len(SPECIES), dtype=np.int64)
+        # Deaths by predation and starvations (counted by species code like alive_counts, read by the metrics recorder)
+        self.predation_counts = np.zeros(len(SPECIES), dtype=np.int64)
+        self.starved_counts = np.zeros(len(SPECIES), dtype=np.int64)
+        # Work done by the draws of food and the pairing of partners (read by the day profiler)
+        self.food_candidates = 0
+        self.partner_candidates = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _arrays(self) -> list[str]:
+        """
+        Return names of the per-entity arrays
+        """
+        return DEAD_ANIMAL_ARRAYS + ['alive']
+
+    def _reserve(self, size: int) -> None:
+        """
+        Grow arrays to hold at least size entities
+        """
+        if size > len(self.species):
+            capacity = max(size, 2 * len(self.species))
+            for attribute in self._arrays():
+                old_array = getattr(self, attribute)
+                array = np.empty(capacity, dtype=old_array.dtype) if old_array.dtype == object else np.zeros(capacity, dtype=old_array.dtype)
+                array[:self._size] = old_array[:self._size]
+                setattr(self, attribute, array)
+
+    def _append(self, species, sex, ages, life_points, day_before_baby, ids=None, name_keys=NO_NAME_KEY) -> None:
+        """
+        Append entities at the end of arrays (all parameters are arrays or scalars).
+        Names are not drawn, new ids are given to entities if ids is None
+        """
+        nb_new = len(ages)
+        if nb_new == 0:
+            return
+        self._reserve(self._size + nb_new)
+        new = slice(self._size, self._size + nb_new)
+        self.species[new] = species
+        self.sex[new] = sex
+        self.ages[new] = ages
+        self.life_points[new] = life_points
+        self.day_before_baby[new] = day_before_baby
+        self.alive[new] = True
+        self.names[new] = None
+        self.name_keys[new] = name_keys
+        if ids is None:
+            first_id = LivingEntity.reserve_ids(nb_new)
+            ids = np.arange(first_id, first_id + nb_new)
+        self.ids[new] = ids
+        self.ranks[new] = np.arange(self._next_rank, self._next_rank + nb_new)
+        self._next_rank += nb_new
+        self.alive_counts += np.bincount(self.species[new], minlength=len(SPECIES))
+        self._size += nb_new
+
+    def add_living_entity(self, living_entity: LivingEntity) -> None:
+        """
+        Add a living entity (Plant or Animal object) to the engine (a dead animal goes to dead_animals, a dead plant is not kept)
+        """
+        if not living_entity.is_alive:
+            if isinstance(living_entity, Animal) and self.graveyard.history_size != 0:
+                self.dead_animals.append({'species': [SPECIES.index(type(living_entity))], 'sex': [living_entity.sex.value], 'ages': [living_entity.age],
+                                          'life_points': [living_entity.life_point], 'day_before_baby': [living_entity.day_before_baby],
+                                          'names': [living_entity._name], 'name_keys': [living_entity._name_key], 'ids': [living_entity.id],
+                                          'ranks': [self._next_rank]})
+                self._next_rank += 1
+                if self.graveyard.history_size is not None:
+                    self.dead_animals.forget_oldest(self.graveyard.history_size)
+            return
+        self._reserve(self._size + 1)
+        position = self._size
+        self.species[position] = SPECIES.index(type(living_entity))
+        self.ages[position] = living_entity.age
+        self.life_points[position] = living_entity.life_point
+        self.alive[position] = living_entity.is_alive
+        if isinstance(living_entity, Animal):
+            self.sex[position] = living_entity.sex.value
+            self.day_before_baby[position] = living_entity.day_before_baby
+            self.names[position] = living_entity._name
+            self.name_keys[position] = living_entity._name_key
+        else:
+            self.sex[position] = NO_SEX
+            self.day_before_baby[position] = 0
+            self.names[position] = None
+            self.name_keys[position] = NO_NAME_KEY
+        self.ids[position] = living_entity.id
+        self.ranks[position] = self._next_rank
+        self._next_rank += 1
+        self.alive_counts[self.species[position]] += 1
+        self._size += 1
+
+    def add_batch(self, species: type[LivingEntity], ages, sexes=None, names=None) -> None:
+        """
+        Add len(ages) alive entities of species at once, with 10 PV (sexes are values of Sex, needed for animals).
+        Animals without names (names is None) get their name from a name key of name_provider when needed
+        """
+        code = SPECIES.index(species)
+        start = self._size
+        if code == PLANT_CODE:
+            self._append(code, NO_SEX, ages, 10, 0)
+            return
+        lazy_names = np.ones(len(ages), dtype=np.bool_) if names is None else np.array([name is None for name in names], dtype=np.bool_)
+        name_keys = np.full(len(ages), NO_NAME_KEY, dtype=np.int64)
+        first_key = self.name_provider.reserve_keys(int(np.count_nonzero(lazy_names)))
+        name_keys[lazy_names] = np.arange(first_key, first_key + np.count_nonzero(lazy_names))
+        self._append(code, sexes, ages, 10, self.rules.time_before_new_baby, name_keys=name_keys)
+        if names is not None:
+            self.names[start:self._size] = names
+
+    def count(self, species: type[LivingEntity] | None = None, alive: bool = True) -> int:
+        """
+        Return the number of alive entities (or of dead animals kept for the report) of species (all species if species is None)
+        Alive entities are counted in O(1) with alive_counts
+        """
+        if alive:
+            return int(self.alive_counts[SPECIES.index(species)] if species is not None else self.alive_counts.sum())
+        if species is None:
+            return len(self.dead_animals)
+        return int(np.count_nonzero(self.dead_animals.species[:len(self.dead_animals)] == SPECIES.index(species)))
+
+    def count_alive_animals(self) -> int:
+        """
+        Return the number of alive animals
+        """
+        return int(self.alive_counts.sum() - self.alive_counts[PLANT_CODE])
+
+    def statistics(self) -> dict[str, tuple[int, int, int, int]]:
+        """
+        Return, for each species name, the number of alive entities, the sum of their PV, the sum of their ages
+        and the number of females ready to make a baby (computed with bincount, used by the summary report).
+        Between days, arrays only hold alive entities
+        """
+        size = self._size
+        species = self.species[:size]
+        nb_species = len(SPECIES)
+        sum_life_points = np.bincount(species, weights=self.life_points[:size], minlength=nb_species)
+        sum_ages = np.bincount(species, weights=self.ages[:size], minlength=nb_species)
+        ready = (self.sex[:size] == Sex.FEMALE.value) & (self.day_before_baby[:size] == 0)
+        females_ready = np.bincount(species[ready], minlength=nb_species)
+        return {SPECIES[code].__name__: (int(self.alive_counts[code]), int(sum_life_points[code]), int(sum_ages[code]), int(females_ready[code]))
+                for code in range(nb_species)}
+
+    def life_points_by_species(self) -> np.ndarray:
+        """
+        Return the sum of the PV of the alive entities of each species code (computed with bincount)
+        """
+        return np.bincount(self.species[:self._size], weights=self.life_points[:self._size], minlength=len(SPECIES)).astype(np.int64)
+
+    def one_more_day(self, events: EventBus | None = None, profiler: DayProfiler | None = None) -> None:
+        """
+        Do day's action(s) for all entities.
+        Events are emitted on events (an event is only built if a sink subscribes to it), each pass is a phase of profiler
+        """
+        events = events or EventBus()
+        lap = profiler.lap if profiler is not None else _no_lap
+        rules = self.rules
+        size = self._size
+        species = self.species[:size]
+        ages = self.ages[:size]
+        life_points = self.life_points[:size]
+        day_before_baby = self.day_before_baby[:size]
+        alive = self.alive[:size]
+        is_plant = species == PLANT_CODE
+        was_alive = alive.copy()
+
+        # Everybody grows old
+        ages[was_alive] += 1
+        alive &= ages < rules.deathing_age_in_deay
+        day_before_baby[was_alive & ~is_plant & (day_before_baby > 0)] -= 1
+        if events.wants(DIED_OF_AGE):
+            for position in np.flatnonzero(was_alive & ~alive).tolist():
+                events.emit(DIED_OF_AGE, living_entity=self.entity_at(position))
+        lap('aging')
+
+        # Plants get PV and split (like Plant.do_actions, a plant dead today can split too)
+        life_points[alive & is_plant] += rules.pv_obtained_plant_by_day
+        split = was_alive & is_plant & (life_points >= rules.min_pv_to_split_plant)
+        life_points[split] //= 2
+        new_plant_life_points = life_points[split]
+        # New plants get their ids now, so split events give them
+        first_plant_id = LivingEntity.reserve_ids(len(new_plant_life_points))
+        new_plant_ids = np.arange(first_plant_id, first_plant_id + len(new_plant_life_points))
+        if events.wants(SPLIT):
+            for position, plant_id in zip(np.flatnonzero(split).tolist(), new_plant_ids.tolist()):
+                events.emit(SPLIT, plant=Plant.create_view(plant_id, 0, int(life_points[position])), parent=self.entity_at(position))
+        lap('plant_split')
+
+        # Animals lose PV
+        alive_animals = alive & ~is_plant
+        life_points[alive_animals] -= rules.pv_losts_animal_by_day
+        alive &= (life_points > 0) | is_plant
+        hungry = alive & ~is_plant & (life_points <= rules.limit_pv_before_eaten)
+        not_hungry = alive & ~is_plant & ~hungry
+        lap('aging', calls=0)
+
+        # Hungry herbivores graze, then hungry carnivores hunt
+        herbivores = np.flatnonzero(hungry & np.isin(species, HERBIVORE_CODES))
+        self._feed(herbivores, self._draw_plants, rules.pv_losts_plant_when_eaten, rules.pv_obtained_herbivore_by_plant, events)
+        carnivores = np.flatnonzero(hungry & np.isin(species, CARNIVOROUS_CODES))
+        self._feed(carnivores, self._draw_preys, rules.pv_losts_animal_when_eaten, rules.pv_obtained_carnivorous_by_animal, events)
+        lap('feeding')
+
+        # Animals that are not hungry make babies
+        baby_species, baby_sex, fathers, mothers = self._mate(not_hungry & alive)
+        # Names of babies are not drawn (they will be drawn from name keys only when needed)
+        first_baby_id = LivingEntity.reserve_ids(len(baby_species))
+        baby_ids = np.arange(first_baby_id, first_baby_id + len(baby_species))
+        first_baby_key = self.name_provider.reserve_keys(len(baby_species))
+        baby_keys = np.arange(first_baby_key, first_baby_key + len(baby_species))
+        if events.wants(BORN):
+            for code, sex, baby_id, baby_key, father, mother in zip(baby_species.tolist(), baby_sex.tolist(), baby_ids.tolist(), baby_keys.tolist(),
+                                                                    fathers.tolist(), mothers.tolist()):
+                animal_class = cast(type[Animal], SPECIES[code])
+                baby = animal_class.create_view(baby_id, 0, sex=Sex(sex), day_before_baby=rules.time_before_new_baby, name_provider=self.name_provider,
+                                                name_key=baby_key)
+                events.emit(BORN, baby=baby, parent=self.entity_at(father), partner=self.entity_at(mother))
+        lap('mating')
+
+        # Dead entities are counted (and removed), then new plants and babies are added
+        self._compact(was_alive & ~alive)
+        lap('compaction')
+        self._append(PLANT_CODE, NO_SEX, np.zeros(len(new_plant_life_points), dtype=np.int32), new_plant_life_points, 0, new_plant_ids)
+        self._append(baby_species, baby_sex, np.zeros(len(baby_species), dtype=np.int32), 10, rules.time_before_new_baby, baby_ids, baby_keys)
+        lap('births')
+
+    def _draw_plants(self, eaters):
+        """
+        Return a random alive plant for each eater (-1 if there is no plant)
+        """
+        plants = np.flatnonzero(self.alive[:self._size] & (self.species[:self._size] == PLANT_CODE))
+        self.food_candidates += len(plants)
+        if len(plants) == 0:
+            return np.full(len(eaters), -1)
+        return plants[self.rng.integers(len(plants), size=len(eaters))]
+
+    def _draw_preys(self, eaters):
+        """
+        Return a random alive animal of another species for each eater (-1 if there is no prey)
+        """
+        species = self.species[:self._size]
+        targets = np.full(len(eaters), -1)
+        eater_species = species[eaters]
+        alive_animals = self.alive[:self._size] & (species != PLANT_CODE)
+        for code in np.unique(eater_species).tolist():
+            preys = np.flatnonzero(alive_animals & (species != code))
+            self.food_candidates += len(preys)
+            same_species = eater_species == code
+            if len(preys):
+                targets[same_species] = preys[self.rng.integers(len(preys), size=int(np.count_nonzero(same_species)))]
+        return targets
+
+    def _feed(self, eaters, draw_targets, pv_lost_by_target, pv_obtained_by_eater, events: EventBus) -> None:
+        """
+        Each eater eats a target drawn by draw_targets.
+        A bite succeeds only if the target is still alive (a target bitten several times loses PV for each bite)
+        """
+        life_points = self.life_points
+        eaters = self.rng.permutation(eaters)
+        for _ in range(MAX_FEEDING_ROUNDS):
+            if len(eaters) == 0:
+                break
+            targets = draw_targets(eaters)
+            has_target = targets >= 0
+            self._emit_starved(eaters[~has_target], events)
+            eaters, targets = eaters[has_target], targets[has_target]
+            if len(eaters) == 0:
+                break
+
+            # Rank of each bite for the same target (eaters are in random order)
+            order = np.argsort(targets, kind='stable')
+            sorted_targets = targets[order]
+            group_start = np.flatnonzero(np.r_[True, sorted_targets[1:] != sorted_targets[:-1]])
+            group_size = np.diff(np.r_[group_start, len(sorted_targets)])
+            rank = np.arange(len(sorted_targets)) - np.repeat(group_start, group_size)
+            success = np.empty(len(eaters), dtype=np.bool_)
+            success[order] = life_points[sorted_targets] - pv_lost_by_target * rank > 0
+
+            life_points[eaters[success]] += pv_obtained_by_eater
+            np.subtract.at(life_points, targets[success], pv_lost_by_target)
+            self.alive[targets[success]] &= life_points[targets[success]] > 0
+            # A target bitten to death by several eaters is counted once
+            killed = np.unique(targets[success][~self.alive[targets[success]]])
+            self.predation_counts += np.bincount(self.species[killed], minlength=len(SPECIES))
+            if events.wants(EATEN):
+                for eater, target in zip(eaters[success].tolist(), targets[success].tolist()):
+                    events.emit(EATEN, eater=self.entity_at(eater), food=self.entity_at(target))
+            eaters = eaters[~success]
+        self._emit_starved(eaters, events)
+
+    def _emit_starved(self, animals, events: EventBus) -> None:
+        """
+        Count the animals of animals (positions) that couldn't eat and emit a starved event for each of them
+        """
+        self.starved_counts += np.bincount(self.species[animals], minlength=len(SPECIES))
+        if events.wants(STARVED):
+            for position in animals.tolist():
+                events.emit(STARVED, animal=self.entity_at(position))
+
+    def _mate(self, can_ask):
+        """
+        Make pairs of ready animals (day_before_baby == 0) of the same species and opposite sex.
+        In each pair, at least one animal must be in can_ask (alive and not hungry).
+        Return species and sex of babies, positions of fathers and mothers
+        """
+        size = self._size
+        species = self.species[:size]
+        sex = self.sex[:size]
+        ready = self.alive[:size] & (species != PLANT_CODE) & (self.day_before_baby[:size] == 0)
+        self.partner_candidates += int(np.count_nonzero(ready))
+        lst_baby_species = []
+        lst_fathers = []
+        lst_mothers = []
+        for code in np.unique(species[ready]).tolist():
+            parents = []
+            nb_asking = []
+            for sex_value in [Sex.MALE.value, Sex.FEMALE.value]:
+                candidates = self.rng.permutation(np.flatnonzero(ready & (species == code) & (sex == sex_value)))
+                # Animals that can ask for a baby first
+                candidates = candidates[np.argsort(~can_ask[candidates], kind='stable')]
+                parents.append(candidates)
+                nb_asking.append(int(np.count_nonzero(can_ask[candidates])))
+            nb_babies = min(len(parents[0]), len(parents[1]), max(nb_asking))
+            if nb_babies:
+                self.day_before_baby[parents[0][:nb_babies]] = self.rules.time_before_new_baby
+                self.day_before_baby[parents[1][:nb_babies]] = self.rules.time_before_new_baby
+                lst_baby_species.append(np.full(nb_babies, code, dtype=np.int8))
+                lst_fathers.append(parents[0][:nb_babies])
+                lst_mothers.append(parents[1][:nb_babies])
+        if not lst_baby_species:
+            no_baby = np.zeros(0, dtype=np.int64)
+            return no_baby.astype(np.int8), no_baby.astype(np.int8), no_baby, no_baby
+        baby_species = np.concatenate(lst_baby_species)
+        baby_sex = self.rng.integers(Sex.MALE.value, Sex.FEMALE.value + 1, size=len(baby_species)).astype(np.int8)
+        return baby_species, baby_sex, np.concatenate(lst_fathers), np.concatenate(lst_mothers)
+
+    def _compact(self, dead_today) -> None:
+        """
+        Count entities dead today in the graveyard and remove dead entities from arrays.
+        Like Paddock.animal_roster, dead animals are kept (in dead_animals, for the report) until the graveyard history is full.
+        """
+        size = self._size
+        species = self.species[:size]
+        dead_counts = np.bincount(species[dead_today], minlength=len(SPECIES))
+        dead_of_age_counts = np.bincount(species[dead_today & (self.ages[:size] >= self.rules.deathing_age_in_deay) & (self.life_points[:size] > 0)], minlength=len(SPECIES))
+        self.alive_counts -= dead_counts
+        for code, (nb_dead, nb_dead_of_age) in enumerate(zip(dead_counts.tolist(), dead_of_age_counts.tolist())):
+            self.graveyard.add_deaths(SPECIES[code].__name__, nb_dead, nb_dead_of_age)
+
+        self._move_dead_animals()
+
+    def _move_dead_animals(self) -> None:
+        """
+        Remove dead entities from arrays. Dead animals go to dead_animals (for the report) until the graveyard history is full
+        """
+        size = self._size
+        alive = self.alive[:size]
+        if alive.all():
+            return
+        history_size = self.graveyard.history_size
+        if history_size != 0:
+            dead_animals = np.flatnonzero(~alive & (self.species[:size] != PLANT_CODE))
+            self.dead_animals.append({attribute: getattr(self, attribute)[dead_animals] for attribute in DEAD_ANIMAL_ARRAYS})
+            if history_size is not None:
+                self.dead_animals.forget_oldest(history_size)
+        new_size = int(np.count_nonzero(alive))
+        for attribute in self._arrays():
+            array = getattr(self, attribute)
+            array[:new_size] = array[:size][alive]
+        self.names[new_size:size] = None
+        self._size = new_size
+
+    def _view(self, arrays, position: int, is_alive: bool) -> LivingEntity:
+        """
+        Return a Plant/Animal object built from arrays (the engine or dead_animals) at position
+        """
+        code = int(arrays.species[position])
+        entity_id, age, life_point = int(arrays.ids[position]), int(arrays.ages[position]), int(arrays.life_points[position])
+        if code == PLANT_CODE:
+            return Plant.create_view(entity_id, age, life_point, is_alive)
+        animal_class = cast(type[Animal], SPECIES[code])
+        return animal_class.create_view(entity_id, age, life_point, is_alive, Sex(int(arrays.sex[position])), arrays.names[position],
+                                        int(arrays.day_before_baby[position]), self.name_provider, int(arrays.name_keys[position]))
+
+    def entity_at(self, position: int) -> LivingEntity:
+        """
+        Return a Plant/Animal object built from the arrays at position (with the id of the entity, no id is taken)
+        """
+        return self._view(self, position, bool(self.alive[position]))
+
+    def dead_animal_at(self, position: int) -> Animal:
+        """
+        Return an Animal object built from the arrays of dead_animals at position
+        """
+        return cast(Animal, self._view(self.dead_animals, position, False))
+
+    def living_entities(self, animals_only: bool = False):
+        """
+        Return Plant/Animal objects built from the arrays and the dead animals kept for the report (in insertion order, like Paddock.animal_roster)
+        """
+        positions = np.flatnonzero(self.species[:self._size] != PLANT_CODE) if animals_only else np.arange(self._size)
+        dead_positions = np.argsort(self.dead_animals.ranks[:len(self.dead_animals)], kind='stable')
+        ranks = np.concatenate([self.ranks[positions], self.dead_animals.ranks[dead_positions]])
+        # Dead animals are given negative positions (-1 - their position in dead_animals)
+        merged_positions = np.concatenate([positions, -1 - dead_positions])[np.argsort(ranks, kind='stable')]
+        for position in merged_positions.tolist():
+            yield self.entity_at(position) if position >= 0 else self.dead_animal_at(-1 - position)
+
+    def take(self, positions) -> list[LivingEntity]:
+        """
+        Remove the alive entities at positions (e.g. animals moved to another paddock) and return them as Plant/Animal objects.
+        They are not counted in the graveyard
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        living_entities = [self.entity_at(position) for position in positions.tolist()]
+        self.alive_counts -= np.bincount(self.species[positions], minlength=len(SPECIES))
+        keep = np.ones(self._size, dtype=np.bool_)
+        keep[positions] = False
+        new_size = int(np.count_nonzero(keep))
+        for attribute in self._arrays():
+            array = getattr(self, attribute)
+            array[:new_size] = array[:self._size][keep]
+        self.names[new_size:self._size] = None
+        self._size = new_size
+        return living_entities
+
+    def clear(self) -> None:
+        """
+        Remove all entities
+        """
+        self.names[:self._size] = None
+        self.dead_animals.clear()
+        self.alive_counts[:] = 0
+        self.predation_counts[:] = 0
+        self.starved_counts[:] = 0
+        self._size = 0
@@ -0,0 +1,531 @@
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import time
+from .paddock import Paddock, ANIMALS_DICT, ENGINES, PLANT_ENGINES, create_summary_table
+from .living_entity import Animal, Plant
+from .vector_engine import SPECIES
+from .events import EventBus
+from .random_streams import SimulationRandom
+
+
+class Transfer():
+    """
+    A class to represent a periodic transfer of animals between two paddocks of a zoo
+
+    ...
+
+    Attributes
+    ----------
+    source : str
+        Name of the paddock the animals leave
+    destination : str
+        Name of the paddock the animals join
+    nb_animals : int
+        Number of animals moved by each transfer (less if the source has less alive animals)
+    every : int
+        Animals are moved at the end of each day multiple of every
+    species : str or None
+        Name of the species of moved animals (all species if None)
+
+    Methods
+    -------
+    is_due(day):
+        Return True if animals are moved at the end of day
+    """
+
+    def __init__(self, source: str, destination: str, nb_animals: int, every: int, species: str | None = None) -> None:
+        """
+        Construct a transfer (a ValueError is raised if it's not valid)
+        """
+        if source == destination:
+            raise ValueError(f"Animals can't be moved from paddock {source} to itself")
+        if nb_animals <= 0 or every <= 0:
+            raise ValueError("Number of animals and period of a transfer need to be positiv integers")
+        if species is not None and species not in ANIMALS_DICT:
+            raise ValueError(f"Unknown species {species}")
+        self.source = source
+        self.destination = destination
+        self.nb_animals = nb_animals
+        self.every = every
+        self.species = species
+
+    def is_due(self, day: int) -> bool:
+        """
+        Return True if animals are moved at the end of day
+        """
+        return day % self.every == 0
+
+
+class PaddockGroup():
+    """
+    A class to represent the paddocks of a zoo simulated by one worker. Paddocks are sent once to the worker
+    and stay there : each day, the zoo only sends the number of days to run and receives small results.
+
+    ...
+
+    Attributes
+    ----------
+    paddocks : dict
+        Paddocks of the group by name
+
+    Methods
+    -------
+    add_paddocks(paddocks):
+        Add paddocks (by name) to the group
+
+    run_days(nb_days):
+        Run nb_days days in each paddock
+
+    take_animals(name, nb_animals, species_name):
+        Remove animals from a paddock and return them
+
+    add_animals(name, animals):
+        Add animals to a paddock
+
+    paddock_summaries():
+        Return the age and the species summary of each paddock
+
+    get_paddocks():
+        Return all paddocks
+    """
+
+    def __init__(self) -> None:
+        """
+        Construct an empty group
+        """
+        self.paddocks: dict[str, Paddock] = {}
+
+    def add_paddocks(self, paddocks: dict[str, Paddock]) -> None:
+        """
+        Add paddocks (by name) to the group (events of their living entities are not built anymore)
+        """
+        for name, paddock in paddocks.items():
+            paddock.set_events(EventBus())
+            self.paddocks[name] = paddock
+
+    def run_days(self, nb_days: int) -> None:
+        """
+        Run nb_days days in each paddock of the group (without report)
+        """
+        for paddock in self.paddocks.values():
+            paddock.run_days(nb_days, report_every=0)
+
+    def take_animals(self, name: str, nb_animals: int, species_name: str | None = None) -> list[Animal]:
+        """
+        Remove nb_animals alive animals of species_name (all species if None) from paddock name and return them
+        """
+        return self.paddocks[name].take_animals(nb_animals, ANIMALS_DICT[species_name] if species_name else None)
+
+    def add_animals(self, name: str, animals: list[Animal]) -> None:
+        """
+        Add animals (taken from another paddock) to paddock name
+        """
+        self.paddocks[name].add_living_entities(animals)  # type: ignore[arg-type]
+
+    def paddock_summaries(self) -> dict[str, dict]:
+        """
+        Return, for each paddock name, the age of the paddock and its species summary
+        """
+        return {name: {'age': paddock.paddock_age, 'species': paddock.species_summary()} for name, paddock in self.paddocks.items()}
+
+    def get_paddocks(self) -> dict[str, Paddock]:
+        """
+        Return all paddocks of the group
+        """
+        return self.paddocks
+
+
+class LocalWorker():
+    """
+    A worker simulating its group in the current process (a zoo with one worker)
+    """
+
+    def __init__(self) -> None:
+        self.group = PaddockGroup()
+        self._result = None
+
+    def send(self, method: str, *args) -> None:
+        """
+        Call method of the group with args (its result is given by receive())
+        """
+        self._result = getattr(self.group, method)(*args)
+
+    def receive(self):
+        """
+        Return the result of the last call
+        """
+        return self._result
+
+    def close(self) -> None:
+        pass
+
+
+def _serve(connection, group: PaddockGroup) -> None:
+    """
+    Loop of a worker process : call the methods of group asked by the zoo until None is received
+    """
+    while (request := connection.recv()) is not None:
+        method, args = request
+        try:
+            connection.send((True, getattr(group, method)(*args)))
+        except Exception as e:
+            connection.send((False, e))
+    connection.close()
+
+
+class ProcessWorker():
+    """
+    A worker simulating its group in a child process (calls are sent through a pipe, so all workers run at the same time)
+    """
+
+    def __init__(self) -> None:
+        self._connection, child_connection = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(child_connection, PaddockGroup()), daemon=True)
+        self._process.start()
+        child_connection.close()
+
+    def send(self, method: str, *args) -> None:
+        """
+        Ask the process to call method of its group with args (receive() waits for the result)
+        """
+        self._connection.send((method, args))
+
+    def receive(self):
+        """
+        Wait for the result of the last call (an exception raised in the process is raised again)
+        """
+        success, result = self._connection.recv()
+        if not success:
+            raise result
+        return result
+
+    def close(self) -> None:
+        """
+        Stop the process
+        """
+        self._connection.send(None)
+        self._process.join()
+        self._connection.close()
+
+
+def merge_species_summaries(summaries) -> dict[str, dict]:
+    """
+    Merge species summaries of many paddocks (see Paddock.species_summary) : alive and dead entities and females ready are added,
+    means are weighted by the alive entities of each paddock
+    """
+    totals: dict[str, list] = {}
+    for summary in summaries:
+        for species_name, row in summary.items():
+            total = totals.setdefault(species_name, [0, 0, 0.0, 0.0, 0])
+            total[0] += row['alive']
+            total[1] += row['dead']
+            if row['alive']:
+                total[2] += row['mean_life_point'] * row['alive']
+                total[3] += row['mean_age'] * row['alive']
+            total[4] += row['females_ready'] or 0
+    merged = {}
+    for species_name in (species.__name__ for species in SPECIES):
+        if species_name in totals:
+            nb_alive, nb_dead, sum_life_points, sum_ages, females_ready = totals[species_name]
+            merged[species_name] = {'alive': nb_alive,
+                                    'dead': nb_dead,
+                                    'mean_life_point': sum_life_points / nb_alive if nb_alive else None,
+                                    'mean_age': sum_ages / nb_alive if nb_alive else None,
+                                    'females_ready': None if species_name == Plant.__name__ else females_ready}
+    return merged
+
+
+class Zoo():
+    """
+    A class to represent a zoo : many paddocks simulated day after day by worker processes.
+
+    Paddocks are spread over the workers when the simulation starts and stay in their worker (they are pickled once),
+    all workers run their paddocks at the same time. Animals can be moved between paddocks at day boundaries.
+    Each paddock gets its own stream of the generator of the zoo, so the same seed gives the same zoo whatever
+    the number of workers. Events of living entities are not built in a zoo (the zoo report summarizes the paddocks).
+
+    ...
+
+    Attributes
+    ----------
+    paddock_names : list
+        Names of the paddocks, in insertion order
+    transfers : list
+        Periodic transfers of animals between paddocks
+    zoo_age : int
+        Number of days simulated by the zoo
+    nb_transferred_animals : int
+        Number of animals moved between paddocks
+    nb_workers : int
+        Maximum number of worker processes (no process if 1)
+    rng : SimulationRandom
+        Generator of the zoo (each paddock gets a stream of it)
+
+    Methods
+    -------
+    add_paddock(name, paddock):
+        Add a paddock to the zoo
+
+    add_transfer(source, destination, nb_animals, every, species=None):
+        Move nb_animals animals from source to destination every `every` days
+
+    run_days(nb_days, report_every=0):
+        Run nb_days days in all paddocks
+
+    paddock_summaries():
+        Return the age and the species summary of each paddock
+
+    species_summary():
+        Return statistics of each species in the whole zoo
+
+    create_report():
+        Create a report with one line per paddock and one line per species
+
+    get_paddocks():
+        Return all paddocks
+
+    close():
+        Stop worker processes (paddocks come back to the zoo)
+    """
+
+    def __init__(self, workers: int | None = None, seed: int | None = None) -> None:
+        """
+        Construct an empty zoo simulated by at most workers processes (os.cpu_count() if None, no process if 1).
+        seed : seed of the generator of the zoo (drawn with the random module if None)
+        """
+        self.paddock_names: list[str] = []
+        self.transfers: list[Transfer] = []
+        self.zoo_age = 0
+        self.nb_transferred_animals = 0
+        self.nb_workers = workers or os.cpu_count() or 1
+        self.rng = SimulationRandom(seed)
+        # Paddocks waiting for the workers (all paddocks before start() and after close())
+        self._waiting_paddocks: dict[str, Paddock] = {}
+        self._workers: list = []
+        self._worker_of: dict[str, LocalWorker | ProcessWorker] = {}
+
+    def __enter__(self) -> Zoo:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_paddock(self, name: str, paddock: Paddock) -> None:
+        """
+        Add a paddock to the zoo (its generator is replaced by a stream of the generator of the zoo)
+        """
+        if name in self.paddock_names:
+            raise ValueError(f"Paddock {name} is already in the zoo")
+        paddock.set_rng(self.rng.spawn(1)[0])
+        self.paddock_names.append(name)
+        if self._workers:
+            worker = self._workers[(len(self.paddock_names) - 1) % len(self._workers)]
+            worker.send('add_paddocks', {name: paddock})
+            worker.receive()
+            self._worker_of[name] = worker
+        else:
+            self._waiting_paddocks[name] = paddock
+
+    def add_transfer(self, source: str, destination: str, nb_animals: int, every: int, species: str | None = None) -> None:
+        """
+        Move nb_animals alive animals (drawn at random) of species (all species if None) from paddock source
+        to paddock destination at the end of each day multiple of every
+        """
+        for name in (source, destination):
+            if name not in self.paddock_names:
+                raise ValueError(f"Unknown paddock {name}")
+        self.transfers.append(Transfer(source, destination, nb_animals, every, species))
+
+    def start(self) -> None:
+        """
+        Start workers and send them their paddocks (done by run_days if needed)
+        """
+        if self._workers:
+            return
+        nb_workers = max(1, min(self.nb_workers, len(self.paddock_names)))
+        self._workers = [LocalWorker()] if nb_workers == 1 else [ProcessWorker() for _ in range(nb_workers)]
+        groups: list[dict[str, Paddock]] = [{} for _ in range(nb_workers)]
+        for position, name in enumerate(self.paddock_names):
+            groups[position % nb_workers][name] = self._waiting_paddocks.pop(name)
+            self._worker_of[name] = self._workers[position % nb_workers]
+        for worker, paddocks in zip(self._workers, groups):
+            worker.send('add_paddocks', paddocks)
+        for worker in self._workers:
+            worker.receive()
+
+    def _broadcast(self, method: str, *args) -> list:
+        """
+        Call method of each group with args (all workers work at the same time) and return the results
+        """
+        self.start()
+        for worker in self._workers:
+            worker.send(method, *args)
+        return [worker.receive() for worker in self._workers]
+
+    def _call(self, name: str, method: str, *args):
+        """
+        Call method of the group holding paddock name and return the result
+        """
+        worker = self._worker_of[name]
+        worker.send(method, *args)
+        return worker.receive()
+
+    def run_days(self, nb_days: int, report_every: int = 0) -> int:
+        """
+        Run nb_days days in all paddocks, move animals when a transfer is due and display the zoo report
+        every report_every days (0 : no report). Workers run without talking to the zoo until the next transfer or report.
+        Return the number of simulated days
+        """
+        if nb_days < 0:
+            raise ValueError("Number of days can't be negative")
+        nb_simulated_days = 0
+        while nb_simulated_days < nb_days:
+            periods = [transfer.every for transfer in self.transfers] + ([report_every] if report_every > 0 else [])
+            nb_days_to_run = min([nb_days - nb_simulated_days] + [period - self.zoo_age % period for period in periods])
+            self._broadcast('run_days', nb_days_to_run)
+            self.zoo_age += nb_days_to_run
+            nb_simulated_days += nb_days_to_run
+            for transfer in self.transfers:
+                if transfer.is_due(self.zoo_age):
+                    animals = self._call(transfer.source, 'take_animals', transfer.source, transfer.nb_animals, transfer.species)
+                    self._call(transfer.destination, 'add_animals', transfer.destination, animals)
+                    self.nb_transferred_animals += len(animals)
+            if report_every > 0 and self.zoo_age % report_every == 0:
+                print(self.create_report())
+        return nb_simulated_days
+
+    def paddock_summaries(self) -> dict[str, dict]:
+        """
+        Return, for each paddock name (in insertion order), the age of the paddock and its species summary
+        """
+        summaries: dict[str, dict] = {}
+        for group_summaries in self._broadcast('paddock_summaries'):
+            summaries.update(group_summaries)
+        return {name: summaries[name] for name in self.paddock_names}
+
+    def species_summary(self) -> dict[str, dict]:
+        """
+        Return statistics of each species in the whole zoo (same format as Paddock.species_summary)
+        """
+        return merge_species_summaries(summary['species'] for summary in self.paddock_summaries().values())
+
+    def create_report(self) -> str:
+        """
+        Create a report with one line per paddock (age, alive animals and plants) and one line per species for the whole zoo
+        """
+        summaries = self.paddock_summaries()
+        lines = [f"Zoo's age : {self.zoo_age} day(s), {len(self.paddock_names)} paddock(s), {self.nb_transferred_animals} animal(s) moved\n",
+                 f"{'Paddock':<20}{'Age':>8}{'Animals':>10}{'Plants':>10}\n"]
+        for name, summary in summaries.items():
+            nb_plants = summary['species'].get(Plant.__name__, {}).get('alive', 0)
+            nb_animals = sum(row['alive'] for species_name, row in summary['species'].items() if species_name != Plant.__name__)
+            lines.append(f"{name:<20}{summary['age']:>8}{nb_animals:>10}{nb_plants:>10}\n")
+        lines.append(create_summary_table(merge_species_summaries(summary['species'] for summary in summaries.values())))
+        return "".join(lines)
+
+    def get_paddocks(self) -> dict[str, Paddock]:
+        """
+        Return all paddocks by name (copies of the paddocks held by worker processes)
+        """
+        if not self._workers:
+            return dict(self._waiting_paddocks)
+        paddocks: dict[str, Paddock] = {}
+        for group_paddocks in self._broadcast('get_paddocks'):
+            paddocks.update(group_paddocks)
+        return {name: paddocks[name] for name in self.paddock_names}
+
+    def close(self) -> None:
+        """
+        Stop worker processes. Paddocks come back to the zoo, so the simulation can go on later
+        """
+        if not self._workers:
+            return
+        self._waiting_paddocks = self.get_paddocks()
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+        self._worker_of = {}
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line of the zoo simulation
+    """
+    parser = argparse.ArgumentParser(prog='main.py zoo', description="Run many paddocks at the same time (one worker process per CPU)")
+    parser.add_argument('--paddock', action='append', required=True, help="Paddock NAME=CONFIG, CONFIG is a JSON file written by the 's' command (can be repeated)")
+    parser.add_argument('--copies', type=int, default=1, help="Number of copies of each paddock (named NAME-1, NAME-2...)")
+    parser.add_argument('--days', type=int, required=True, help="Number of days to simulate")
+    parser.add_argument('--transfer', action='append', default=[],
+                        help="Move animals SOURCE:DESTINATION:NB:EVERY[:SPECIES], e.g. north:south:2:10:Lion (can be repeated)")
+    parser.add_argument('--report-every', type=int, default=0, help="Display the zoo report every K days (0 : only the final report)")
+    parser.add_argument('--seed', type=int, help="Seed of the zoo (the same seed gives the same zoo)")
+    parser.add_argument('--workers', type=int, help="Number of worker processes (number of CPUs by default)")
+    parser.add_argument('--engine', choices=ENGINES, default='objects', help="Engine used to simulate a day")
+    parser.add_argument('--plant-engine', choices=PLANT_ENGINES, default='objects', help="Engine used to hold plants (with the 'objects' engine)")
+    parser.add_argument('--output', help="JSON file where final results are written")
+    return parser
+
+
+def create_zoo(args: argparse.Namespace, seed: int) -> Zoo:
+    """
+    Create the zoo described by command line arguments args
+    """
+    if args.copies < 1:
+        raise ValueError("Number of copies needs to be a positiv integer")
+    zoo = Zoo(args.workers, seed)
+    for description in args.paddock:
+        name, _, config = description.partition('=')
+        if not name or not config:
+            raise ValueError(f"Invalid paddock '{description}' (expected NAME=CONFIG)")
+        for copy in range(args.copies):
+            # The zoo report summarizes paddocks : dead animals are only counted
+            paddock = Paddock(dead_animals_in_report=0, engine=args.engine, plant_engine=args.plant_engine, events=EventBus(), report_level='summary')
+            # Many paddocks : the loading message is not displayed
+            with contextlib.redirect_stdout(io.StringIO()):
+                loaded = paddock.load_from_json(filename=config)
+            if not loaded:
+                raise ValueError(f"JSON file {config} can't be loaded")
+            zoo.add_paddock(name if args.copies == 1 else f"{name}-{copy + 1}", paddock)
+    for description in args.transfer:
+        infos = description.split(':')
+        if len(infos) not in (4, 5) or not infos[2].isdigit() or not infos[3].isdigit():
+            raise ValueError(f"Invalid transfer '{description}' (expected SOURCE:DESTINATION:NB:EVERY[:SPECIES])")
+        zoo.add_transfer(infos[0], infos[1], int(infos[2]), int(infos[3]), infos[4] if len(infos) == 5 else None)
+    return zoo
+
+
+def run_zoo_command(argv: list[str] | None = None) -> dict:
+    """
+    Run a zoo with command line arguments argv, display its report and return final results
+    """
+    parser = create_parser()
+    args = parser.parse_args(argv)
+    seed = args.seed if args.seed is not None else SimulationRandom().entropy
+    try:
+        zoo = create_zoo(args, seed)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    with zoo:
+        start = time.perf_counter()
+        nb_days = zoo.run_days(args.days, args.report_every)
+        elapsed = time.perf_counter() - start
+        if args.report_every <= 0 or nb_days % args.report_every != 0:
+            print(zoo.create_report())
+        summaries = zoo.paddock_summaries()
+    print(f"{nb_days} day(s) simulated in {elapsed:.3f}s ({len(zoo.paddock_names)} paddock(s), {min(zoo.nb_workers, len(zoo.paddock_names))} worker(s))")
+    results = {'seed': seed,
+               'simulated_days': nb_days,
+               'elapsed_seconds': elapsed,
+               'transferred_animals': zoo.nb_transferred_animals,
+               'species_summary': merge_species_summaries(summary['species'] for summary in summaries.values()),
+               'paddocks': {name: {'age': summary['age'], 'alive_by_species': {species_name: row['alive'] for species_name, row in summary['species'].items()}}
+                            for name, summary in summaries.items()}}
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(results, fp, indent=4)
+    return results